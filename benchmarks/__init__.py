@@ -0,0 +1,5 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Benchmarks for device detection, run with `python -m benchmarks.<name>` from the root of the repository."""
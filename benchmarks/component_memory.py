@@ -0,0 +1,94 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Measures the memory held by the Windows component descriptors of a replayed snapshot.
+
+Snapshots are synthesised for a number of boards and replayed, as in `benchmarks.windows_aggregation`. The components
+are built with the descriptors as they are, backed by slots and their named tuple of values, and as previously done,
+with an instance dictionary and a dictionary of the values set. The time and peak memory of the aggregation of the
+replayed components are measured by `benchmarks.windows_aggregation`.
+
+    python -m benchmarks.component_memory --boards 1 --boards 10 --boards 100 --boards 500
+"""
+import argparse
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.windows_aggregation import synthesise_snapshot
+from mbed_devices._internal.windows.component_descriptor_utils import UNKNOWN_VALUE
+from mbed_devices._internal.windows.system_data_snapshot import SystemDataSnapshot, from_json, to_json
+
+
+class DictionaryDescriptor:
+    """Component descriptor holding its values as previously done, as attributes in its instance dictionary."""
+
+    def __init__(self, win32_definition: type, win32_class_name: str) -> None:
+        """Initialiser."""
+        self._win32_definition = win32_definition
+        self._win32_class_name = win32_class_name
+        self._win32_filter = None
+        self._win32_fields = None
+        self._win32_usb_filter = None
+
+    def set_data_values(self, fields_values: dict) -> None:
+        """Sets fields values."""
+        for k, v in fields_values.items():
+            setattr(self, k, v)
+
+    def to_tuple(self) -> tuple:
+        """Translates into named tuple, building it at each call."""
+        fields = getattr(self._win32_definition, "_fields")
+        return self._win32_definition(*(getattr(self, name, UNKNOWN_VALUE) for name in fields))
+
+
+def replay_components(values: Dict[str, Any]) -> SystemDataSnapshot:
+    """Builds the components of a snapshot, backed by slots and named tuples."""
+    return from_json(values)
+
+
+def replay_dictionary_components(values: Dict[str, Any], snapshot: SystemDataSnapshot) -> List[DictionaryDescriptor]:
+    """Builds the components of a snapshot as previously done."""
+    components = list()
+    for cls in snapshot.system_data:
+        template = cls()
+        for fields in values["components"].get(cls.__name__, list()):
+            component = DictionaryDescriptor(template.win32_definition, template.win32_class_name)
+            component.set_data_values(fields)
+            components.append(component)
+    return components
+
+
+def measure_retained_memory(function: Callable[[], Any]) -> Tuple[int, int, Any]:
+    """Returns the size and number of the blocks allocated by a call to the function and still held by its result."""
+    tracemalloc.start()
+    try:
+        result = function()
+        statistics = tracemalloc.take_snapshot().statistics("filename")
+    finally:
+        tracemalloc.stop()
+    return sum(stat.size for stat in statistics), sum(stat.count for stat in statistics), result
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boards", type=int, action="append", help="Number of boards of a synthetic snapshot.")
+    args = parser.parse_args()
+
+    for boards in args.boards or [1, 10, 100, 500]:
+        values = to_json(synthesise_snapshot(boards))
+        slots, slots_blocks, snapshot = measure_retained_memory(lambda: replay_components(values))
+        dictionaries, dictionaries_blocks, _ = measure_retained_memory(
+            lambda: replay_dictionary_components(values, snapshot)
+        )
+        components = sum(len(c) for c in snapshot.system_data.values())
+        print(
+            f"{boards:>4} boards: {components:>5} components, "
+            f"{slots / 1024:.0f} KiB in {slots_blocks} blocks with slots, "
+            f"{dictionaries / 1024:.0f} KiB in {dictionaries_blocks} blocks with dictionaries"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Compares the cost of parsing the output of the tools each Darwin backend relies on.
+
+The output of `system_profiler` and `ioreg` is synthesised for a number of boards, so that the benchmark can run on any
+host. It does not account for the time taken by the tools themselves, `system_profiler` alone usually taking seconds.
+
+    python -m benchmarks.darwin_backends --boards 16 --repeat 100
+"""
+import argparse
+import plistlib
+import statistics
+import time
+from typing import Callable, Dict, List, Optional
+
+from mbed_devices._internal.darwin import ioreg, system_profiler
+
+
+def make_system_profiler_output(number_of_boards: int) -> bytes:
+    """Returns `system_profiler -xml SPUSBDataType` output listing boards behind a hub."""
+    boards = [
+        {
+            "_name": f"DAPLink CMSIS-DAP {i}",
+            "location_id": f"0x1411{i:04x} / {i + 2}",
+            "vendor_id": "0x0d28  (ARM)",
+            "product_id": "0x0204",
+            "serial_num": f"0240000034544e45{i:08x}",
+            "Media": [{"_name": "MBED VFS", "bsd_name": f"disk{i + 2}", "volumes": [{"bsd_name": f"disk{i + 2}"}]}],
+        }
+        for i in range(number_of_boards)
+    ]
+    hub = {"_name": "USB3.0 Hub", "location_id": "0x14100000 / 1", "_items": boards}
+    return plistlib.dumps([{"_dataType": "SPUSBDataType", "_items": [{"_name": "USB31Bus", "_items": [hub]}]}])
+
+
+def make_ioreg_output(number_of_boards: int) -> bytes:
+    """Returns `ioreg -a -r -l -c IOUSBHostDevice` output listing boards behind a hub."""
+    boards = [_make_ioreg_board(i) for i in range(number_of_boards)]
+    hub = _make_ioreg_entry("USB3.0 Hub", boards, locationID=0x14100000, idVendor=0x05E3, idProduct=0x0612)
+    hub["bDeviceClass"] = 9
+    return plistlib.dumps([hub])
+
+
+def _make_ioreg_board(i: int) -> Dict:
+    serial_port = _make_ioreg_entry("IOSerialBSDClient", IODialinDevice=f"/dev/tty.usbmodem1411{i}")
+    media = _make_ioreg_entry("IOMedia", **{"BSD Name": f"disk{i + 2}", "Whole": True})
+    # Storage media sit a few levels below their interface in the registry.
+    for driver in ["IOBlockStorageDriver", "IOBlockStorageServices", "IOUSBMassStorageDriver"]:
+        media = _make_ioreg_entry(driver, [media])
+    interfaces = [
+        _make_ioreg_entry("CMSIS-DAP", bInterfaceNumber=3, idVendor=0x0D28, idProduct=0x0204),
+        _make_ioreg_entry("mbed Serial Port", [serial_port], bInterfaceNumber=2, idVendor=0x0D28, idProduct=0x0204),
+        _make_ioreg_entry("USB_MSC", [media], bInterfaceNumber=0, idVendor=0x0D28, idProduct=0x0204),
+    ]
+    return _make_ioreg_entry(
+        f"DAPLink CMSIS-DAP {i}",
+        interfaces,
+        locationID=0x14110000 + i,
+        idVendor=0x0D28,
+        idProduct=0x0204,
+        **{"USB Serial Number": f"0240000034544e45{i:08x}"},
+    )
+
+
+def _make_ioreg_entry(name: str, children: Optional[List[Dict]] = None, **properties: object) -> Dict:
+    return {"IORegistryEntryName": name, "IORegistryEntryChildren": children or [], **properties}
+
+
+def parse_for_system_profiler_backend(system_profiler_output: bytes, ioreg_output: bytes) -> None:
+    """Parses what the system_profiler backend reads, which needs `ioreg` to find serial ports."""
+    data = plistlib.loads(system_profiler_output)
+    system_profiler._filter_end_devices(system_profiler._extract_leaf_devices(data))
+    ioreg.build_io_dialin_devices_index(plistlib.loads(ioreg_output))
+
+
+def parse_for_ioreg_backend(ioreg_output: bytes) -> None:
+    """Parses what the ioreg backend reads."""
+    ioreg.extract_end_usb_devices(plistlib.loads(ioreg_output))
+
+
+def time_call(function: Callable[[], None], repeat: int) -> List[float]:
+    """Returns the time taken by each call to the function, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boards", type=int, default=16, help="Number of connected boards.")
+    parser.add_argument("--repeat", type=int, default=100, help="Number of parses per backend.")
+    args = parser.parse_args()
+
+    system_profiler_output = make_system_profiler_output(args.boards)
+    ioreg_output = make_ioreg_output(args.boards)
+    backends = {
+        "SYSTEM_PROFILER": lambda: parse_for_system_profiler_backend(system_profiler_output, ioreg_output),
+        "IOREG": lambda: parse_for_ioreg_backend(ioreg_output),
+    }
+    for backend, parse in backends.items():
+        timings = time_call(parse, args.repeat)
+        print(f"{backend:>15}: median {statistics.median(timings) * 1000:.2f} ms, max {max(timings) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
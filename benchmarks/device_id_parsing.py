@@ -0,0 +1,83 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Compares the ways of parsing the PnP IDs of a scan.
+
+Device IDs are parsed with regexes compiled per token and device ID as previously done, with a single precompiled
+regex, and with the identifiers parsed by previous scans. The PnP IDs are those of the USB hubs, controllers and
+serial ports of a synthetic topology of boards.
+
+    python -m benchmarks.device_id_parsing --boards 500 --repeat 10
+"""
+import argparse
+import re
+import statistics
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.uid_canonicalisation import SyntheticSystem, time_call
+from mbed_devices._internal.windows.usb_device_identifier import (
+    KEY_UID,
+    USBIdentifierToken,
+    UsbIdentifier,
+    Win32DeviceIdParser,
+    parse_device_id,
+)
+
+DeviceIds = List[Tuple[str, Optional[str]]]
+
+
+def list_device_ids(number_of_boards: int) -> DeviceIds:
+    """Returns the PnP IDs parsed by a scan, along with the `ParentIdPrefix` of the hubs."""
+    system = SyntheticSystem(number_of_boards)
+    device_ids = [(hub["PNPDeviceID"], system.parent_id_prefixes.get(hub["PNPDeviceID"])) for hub in system.hubs]
+    device_ids.extend((controller["DeviceID"], None) for controller in system.controllers)
+    device_ids.extend((port["PNPDeviceID"], None) for port in system.serial_ports)
+    return device_ids
+
+
+def parse_compiling_per_token(id_string: str, serial_number: Optional[str]) -> UsbIdentifier:
+    """Parses a device ID as previously done, compiling the regex of each token for each device ID."""
+    parts = id_string.split("\\")
+    information: Dict[str, object] = {KEY_UID: Win32DeviceIdParser().parse_uid(parts[-1], serial_number)}
+    patterns = {token: re.compile(f"^{token.name}_(.*)$") for token in USBIdentifierToken}
+    for element in parts[-2].split("&"):
+        for token, pattern in patterns.items():
+            match = pattern.fullmatch(element)
+            if match:
+                information[token.name] = match.group(1)
+    return UsbIdentifier(**information)
+
+
+def parse_all(device_ids: DeviceIds, parse: Callable[[str, Optional[str]], UsbIdentifier]) -> None:
+    """Parses all the device IDs of a scan."""
+    for id_string, serial_number in device_ids:
+        parse(id_string, serial_number)
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boards", type=int, default=500, help="Number of connected boards.")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of scans per parsing method.")
+    args = parser.parse_args()
+
+    device_ids = list_device_ids(args.boards)
+    print(f"{len(device_ids)} device IDs")
+
+    def parse_uncached() -> None:
+        parse_device_id.cache_clear()
+        parse_all(device_ids, parse_device_id)
+
+    methods = {
+        "compiled per token": lambda: parse_all(device_ids, parse_compiling_per_token),
+        "precompiled": parse_uncached,
+        "cached across scans": lambda: parse_all(device_ids, parse_device_id),
+    }
+    for method, parse_scan in methods.items():
+        timings = time_call(parse_scan, args.repeat)
+        print(f"{method:>19}: median {statistics.median(timings) * 1000:.2f} ms, max {max(timings) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
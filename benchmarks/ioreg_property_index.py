@@ -0,0 +1,111 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Compares ways of looking up the serial port of every USB device in a deep synthetic registry tree.
+
+The tree is a chain of hubs, each with a board attached, the serial ports of the boards being a few levels below them.
+
+    python -m benchmarks.ioreg_property_index --depth 400 --repeat 10
+"""
+import argparse
+import statistics
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from mbed_devices._internal.darwin import ioreg
+
+
+def make_registry_tree(depth: int) -> List[Dict]:
+    """Returns `ioreg` data with a chain of hubs of the given depth."""
+    hub: Optional[Dict] = None
+    for level in reversed(range(depth)):
+        serial_port = {"IORegistryEntryName": "IOSerialBSDClient", "IODialinDevice": f"/dev/tty.usbmodem{level}"}
+        interface = {"IORegistryEntryName": "mbed Serial Port", "IORegistryEntryChildren": [serial_port]}
+        board = {
+            "IORegistryEntryName": "DAPLink CMSIS-DAP",
+            "locationID": 0x10000000 + 2 * level + 1,
+            "IORegistryEntryChildren": [interface],
+        }
+        children = [board] if hub is None else [hub, board]
+        hub = {
+            "IORegistryEntryName": "USB2.0 Hub",
+            "locationID": 0x10000000 + 2 * level,
+            "IORegistryEntryChildren": children,
+        }
+    return [hub] if hub else []
+
+
+def _eager_find_first_property_value(property_name: str, data: Iterable[Dict]) -> Any:
+    """The search previously used, which walks every subtree before checking the entry itself."""
+    found_value = None
+    for item in data:
+        found_value = item.get(
+            property_name,
+            _eager_find_first_property_value(property_name, data=item.get("IORegistryEntryChildren", [])),
+        )
+        if found_value:
+            break
+    return found_value
+
+
+def _iter_located_entries(data: Iterable[Dict]) -> List[Dict]:
+    entries = []
+    stack = list(data)
+    while stack:
+        entry = stack.pop()
+        if "locationID" in entry:
+            entries.append(entry)
+        stack.extend(entry.get("IORegistryEntryChildren", []))
+    return entries
+
+
+def look_up_with_eager_search(data: List[Dict]) -> None:
+    """Searches the subtree of every USB device, as ioreg was previously called once per device."""
+    for entry in _iter_located_entries(data):
+        _eager_find_first_property_value("IODialinDevice", [entry])
+
+
+def look_up_with_lazy_search(data: List[Dict]) -> None:
+    """Searches the subtree of every USB device, stopping at the first match."""
+    for entry in _iter_located_entries(data):
+        ioreg._find_first_property_value("IODialinDevice", [entry])
+
+
+def look_up_with_index(data: List[Dict]) -> None:
+    """Indexes the tree once, then looks up every USB device."""
+    index = ioreg.PropertyIndex(data)
+    for device_name in index.located_device_names:
+        index.find_first(index.get_path(device_name), "IODialinDevice")
+
+
+def time_call(function: Callable[[], None], repeat: int) -> List[float]:
+    """Returns the time taken by each call to the function, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depth", type=int, default=400, help="Number of nested hubs.")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of runs per lookup method.")
+    args = parser.parse_args()
+
+    data = make_registry_tree(args.depth)
+    methods = {
+        "eager search": look_up_with_eager_search,
+        "lazy search": look_up_with_lazy_search,
+        "index": look_up_with_index,
+    }
+    for method, look_up in methods.items():
+        timings = time_call(lambda: look_up(data), args.repeat)
+        print(f"{method:>12}: median {statistics.median(timings) * 1000:.2f} ms, max {max(timings) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
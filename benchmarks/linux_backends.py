@@ -0,0 +1,48 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Compares the cold start latency of the Linux backends.
+
+Each scan runs in a fresh interpreter, so that the cost of importing the backend is accounted for.
+
+    python -m benchmarks.linux_backends --repeat 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SCAN = (
+    "import time; start = time.perf_counter();"
+    "from mbed_devices._internal.linux.device_detector import LinuxBackend, LinuxDeviceDetector;"
+    "LinuxDeviceDetector(LinuxBackend.{backend}).find_candidates();"
+    "print(time.perf_counter() - start)"
+)
+
+
+def time_cold_scan(backend: str) -> float:
+    """Returns the time taken to import the detector and run a single scan, in seconds."""
+    output = subprocess.check_output([sys.executable, "-c", SCAN.format(backend=backend)], env=os.environ)
+    return float(output)
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10, help="Number of scans per backend.")
+    parser.add_argument("--backend", action="append", choices=["UDEV", "SYSFS"], help="Backends to benchmark.")
+    args = parser.parse_args()
+
+    for backend in args.backend or ["UDEV", "SYSFS"]:
+        try:
+            timings = [time_cold_scan(backend) for _ in range(args.repeat)]
+        except subprocess.CalledProcessError:
+            print(f"{backend:>6}: unavailable on this host")
+            continue
+        print(f"{backend:>6}: median {statistics.median(timings) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
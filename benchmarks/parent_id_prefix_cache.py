@@ -0,0 +1,91 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Compares reading the `ParentIdPrefix` of every USB device at each scan with keeping the values across scans.
+
+The registry is simulated, each key opened costing a fixed amount of time, so that the benchmark can run on any host.
+Between scans, one device is unplugged and another one plugged in.
+
+    python -m benchmarks.parent_id_prefix_cache --devices 64 --key-cost 0.2 --repeat 20
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from mbed_devices._internal.windows.device_instance_id import (
+    PARENT_ID_PREFIX_VALUE_NAME,
+    ParentIdPrefixCache,
+    RegistryReader,
+)
+
+
+class SimulatedRegistryReader(RegistryReader):
+    """Registry in which opening a device key takes a fixed time."""
+
+    def __init__(self, key_cost: float) -> None:
+        """Initialiser.
+
+        Args:
+            key_cost: time taken to open a key, in seconds.
+        """
+        self._key_cost = key_cost
+
+    def read_values(self, pnp_ids: Iterable[str], value_name: str) -> Dict[str, Optional[str]]:
+        """Reads a value of the key of each device."""
+        values: Dict[str, Optional[str]] = {}
+        for pnp_id in pnp_ids:
+            deadline = time.perf_counter() + self._key_cost
+            while time.perf_counter() < deadline:
+                pass
+            values[pnp_id] = f"8&{hash(pnp_id) & 0xFFFFFFF:x}&0"
+        return values
+
+
+def make_pnp_ids(first_device: int, number_of_devices: int) -> List[str]:
+    """Returns the plug and play IDs of a range of devices."""
+    devices = range(first_device, first_device + number_of_devices)
+    return [f"USB\\VID_0D28&PID_0204\\0240000034544E45{i:08X}" for i in devices]
+
+
+def time_scans(scan: Callable[[List[str]], None], number_of_devices: int, repeat: int) -> List[float]:
+    """Returns the time taken by each scan, in seconds, one device being replaced between scans."""
+    timings = []
+    for i in range(repeat):
+        pnp_ids = make_pnp_ids(i, number_of_devices)
+        start = time.perf_counter()
+        scan(pnp_ids)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=64, help="Number of USB hub entries.")
+    parser.add_argument("--key-cost", type=float, default=0.2, help="Time taken to open a key, in milliseconds.")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of scans per method.")
+    args = parser.parse_args()
+
+    registry_reader = SimulatedRegistryReader(args.key_cost / 1000)
+    cache = ParentIdPrefixCache(registry_reader)
+
+    def read_each_device(pnp_ids: List[str]) -> None:
+        for pnp_id in pnp_ids:
+            registry_reader.read_values([pnp_id], PARENT_ID_PREFIX_VALUE_NAME)
+
+    def read_new_devices(pnp_ids: List[str]) -> None:
+        cache.refresh(pnp_ids)
+        for pnp_id in pnp_ids:
+            cache.get(pnp_id)
+
+    methods = {"uncached": read_each_device, "cached": read_new_devices}
+    for method, scan in methods.items():
+        # The first scan of the cache reads all the devices, like the uncached method.
+        timings = time_scans(scan, args.devices, args.repeat)[1:]
+        print(f"{method:>8}: median {statistics.median(timings) * 1000:.2f} ms, max {max(timings) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
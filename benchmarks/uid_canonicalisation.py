@@ -0,0 +1,147 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Compares matching the USB hubs and serial ports of boards by identifier equality, and by canonical key.
+
+The system data is synthesised for a topology of boards plugged into chains of hubs, so that the benchmark can run on
+any host. Each board presents four interfaces and a serial port.
+
+    python -m benchmarks.uid_canonicalisation --boards 300 --repeat 10
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, Iterable, List, Optional, cast
+
+from mbed_devices._internal.windows.component_descriptor import ComponentDescriptor
+from mbed_devices._internal.windows.device_instance_id import ParentIdPrefixCache, RegistryReader
+from mbed_devices._internal.windows.serial_port import SerialPort
+from mbed_devices._internal.windows.serial_port_data_loader import SystemSerialPortInformation
+from mbed_devices._internal.windows.system_data_loader import SystemDataLoader
+from mbed_devices._internal.windows.usb_controller import UsbController
+from mbed_devices._internal.windows.usb_device_identifier import UsbIdentifier, parse_device_id
+from mbed_devices._internal.windows.usb_hub import UsbHub
+from mbed_devices._internal.windows.usb_hub_data_loader import SystemUsbDeviceInformation
+
+BOARDS_PER_HUB = 4
+NUMBER_OF_CONTROLLERS = 4
+
+
+class SyntheticSystem:
+    """System data of a topology of boards, along with the `ParentIdPrefix` of the devices."""
+
+    def __init__(self, number_of_boards: int) -> None:
+        """Initialiser."""
+        self.hubs: List[Dict[str, str]] = []
+        self.serial_ports: List[Dict[str, str]] = []
+        self.parent_id_prefixes: Dict[str, Optional[str]] = {}
+        self.controllers = [
+            {"DeviceID": f"PCI\\VEN_8086&DEV_A36D\\3&11583659&0&{i:02X}"} for i in range(NUMBER_OF_CONTROLLERS)
+        ]
+        hub_prefix = "5&31ac2c0b&0"
+        for i in range(number_of_boards):
+            if i % BOARDS_PER_HUB == 0:
+                hub_pnp_id = f"USB\\VID_2109&PID_2812\\{hub_prefix.upper()}&{i // BOARDS_PER_HUB + 1}"
+                hub_prefix = f"{6 + i // BOARDS_PER_HUB}&{i:08x}&0"
+                self._add_hub(hub_pnp_id, hub_prefix)
+            board_prefix = f"{100 + i}&{i:07x}f&0"
+            self._add_hub(f"USB\\VID_0D28&PID_0204\\0240000034544E45{i:08X}", board_prefix)
+            for interface in range(4):
+                interface_pnp_id = f"USB\\VID_0D28&PID_0204&MI_0{interface}\\{board_prefix.upper()}&000{interface}"
+                self._add_hub(interface_pnp_id, None)
+                if interface == 1:
+                    port = {"Caption": f"mbed Serial Port (COM{i + 3})", "DeviceID": f"COM{i + 3}"}
+                    self.serial_ports.append({**port, "PNPDeviceID": interface_pnp_id})
+
+    def _add_hub(self, pnp_id: str, parent_id_prefix: Optional[str]) -> None:
+        self.hubs.append({"DeviceID": pnp_id, "PNPDeviceID": pnp_id})
+        self.parent_id_prefixes[pnp_id] = parent_id_prefix
+
+
+class SyntheticRegistryReader(RegistryReader):
+    """Registry holding the `ParentIdPrefix` of the synthetic devices."""
+
+    def __init__(self, system: SyntheticSystem) -> None:
+        """Initialiser."""
+        self._system = system
+
+    def read_values(self, pnp_ids: Iterable[str], value_name: str) -> Dict[str, Optional[str]]:
+        """Reads a value of the key of each device."""
+        return {pnp_id: self._system.parent_id_prefixes.get(pnp_id) for pnp_id in pnp_ids}
+
+
+class SyntheticDataLoader(SystemDataLoader):
+    """Provides the components of the synthetic topology, which are only created once."""
+
+    def __init__(self, system: SyntheticSystem) -> None:
+        """Initialiser."""
+        super().__init__()
+        self._system_data = {
+            UsbHub: [_make_component(UsbHub, values) for values in system.hubs],
+            UsbController: [_make_component(UsbController, values) for values in system.controllers],
+            SerialPort: [_make_component(SerialPort, values) for values in system.serial_ports],
+        }
+
+
+def _make_component(cls: Callable, values: Dict[str, str]) -> ComponentDescriptor:
+    component = cls()
+    component.set_data_values(values)
+    return cast(ComponentDescriptor, component)
+
+
+def match_by_identifier_equality(data_loader: SyntheticDataLoader, parent_id_prefix_cache: ParentIdPrefixCache) -> None:
+    """Matches the components as previously done, with lists and dictionaries keyed by `UsbIdentifier`."""
+    controllers = [parse_device_id(c.component_id) for c in data_loader.get_system_data(UsbController)]
+    usb_devices: Dict[UsbIdentifier, List[UsbHub]] = {}
+    for hub in cast(List[UsbHub], data_loader.get_system_data(UsbHub)):
+        usb_id = parse_device_id(hub.component_id, serial_number=parent_id_prefix_cache.get(hub.pnp_id))
+        if usb_id in controllers:
+            continue
+        usb_devices.setdefault(usb_id, []).append(hub)
+    ports = cast(List[SerialPort], data_loader.get_system_data(SerialPort))
+    serial_ports = {parse_device_id(port.pnp_id): port for port in ports}
+    for usb_id in usb_devices:
+        usb_devices.get(usb_id)
+        serial_ports.get(usb_id)
+
+
+def match_by_canonical_key(data_loader: SyntheticDataLoader, parent_id_prefix_cache: ParentIdPrefixCache) -> None:
+    """Matches the components as the system information classes do."""
+    usb_data = SystemUsbDeviceInformation(data_loader, parent_id_prefix_cache)
+    serial_data = SystemSerialPortInformation(data_loader)
+    for usb_id in usb_data.usb_device_ids():
+        usb_data.get_usb_devices(usb_id)
+        serial_data.get_serial_port_information(usb_id)
+
+
+def time_call(function: Callable[[], None], repeat: int) -> List[float]:
+    """Returns the time taken by each call to the function, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boards", type=int, default=300, help="Number of connected boards.")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of runs per matching method.")
+    args = parser.parse_args()
+
+    system = SyntheticSystem(args.boards)
+    data_loader = SyntheticDataLoader(system)
+    parent_id_prefix_cache = ParentIdPrefixCache(SyntheticRegistryReader(system))
+    parent_id_prefix_cache.refresh(system.parent_id_prefixes)
+    print(f"{len(system.hubs)} USB hubs, {len(system.serial_ports)} serial ports")
+    methods = {"identifier equality": match_by_identifier_equality, "canonical key": match_by_canonical_key}
+    for method, match in methods.items():
+        timings = time_call(lambda: match(data_loader, parent_id_prefix_cache), args.repeat)
+        print(f"{method:>19}: median {statistics.median(timings) * 1000:.2f} ms, max {max(timings) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
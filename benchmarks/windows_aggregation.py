@@ -0,0 +1,137 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Measures the time and memory taken to aggregate the USB devices on Windows, replaying system data snapshots.
+
+Snapshots are either recorded on a Windows host, or synthesised for a number of boards so that the benchmark can run
+on any host. Each synthetic board presents four interfaces, a serial port and a disk. The volumes information is not
+part of the snapshots, volumes are left unknown.
+
+    python -m benchmarks.windows_aggregation --boards 1 --boards 10 --boards 100 --boards 500 --repeat 5
+    python -m benchmarks.windows_aggregation --snapshot recorded.json
+    python -m benchmarks.windows_aggregation --record recorded.json  # On Windows, records the system data.
+"""
+import argparse
+import statistics
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+from unittest import mock
+
+from benchmarks.uid_canonicalisation import SyntheticSystem, time_call
+from mbed_devices._internal.windows.device_detector import WindowsDeviceDetector
+from mbed_devices._internal.windows.system_data_snapshot import (
+    SNAPSHOT_FORMAT_VERSION,
+    RecordingSystemDataLoader,
+    ReplayingSystemDataLoader,
+    SystemDataSnapshot,
+    from_json,
+    load_snapshot,
+)
+from mbed_devices._internal.windows.usb_data_aggregation import SystemUsbData
+from mbed_devices._internal.windows.usb_hub import UsbHub
+
+
+def synthesise_snapshot(number_of_boards: int) -> SystemDataSnapshot:
+    """Builds the snapshot of a system which boards are plugged into, along with an internal disk C:."""
+    system = SyntheticSystem(number_of_boards)
+    disk_drives, partitions, relationships = [], [], []
+    logical_disks = [{"DeviceID": "C:", "Description": "Local Fixed Disk"}]
+    partitions.append({"DeviceID": "Disk #0, Partition #1", "DiskIndex": 0, "Type": "GPT: Basic Data"})
+    relationships.append(_make_relationship("Disk #0, Partition #1", "C:"))
+    board_pnp_ids = [h["PNPDeviceID"] for h in system.hubs if h["PNPDeviceID"].startswith("USB\\VID_0D28&PID_0204\\")]
+    for index, board_pnp_id in enumerate(board_pnp_ids, start=1):
+        serial_number = board_pnp_id.split("\\")[-1]
+        partition_id = f"Disk #{index}, Partition #0"
+        # Windows only has 23 drive letters left, further boards would be mounted in folders.
+        drive = f"{chr(ord('D') + index - 1)}:" if index <= 23 else f"C:\\mnt\\board{index}"
+        disk_drives.append(
+            {
+                "Index": index,
+                "InterfaceType": "USB",
+                "PNPDeviceID": f"USBSTOR\\DISK&VEN_MBED&PROD_VFS&REV_0.1\\{serial_number}&0",
+                "SerialNumber": serial_number,
+            }
+        )
+        partitions.append({"DeviceID": partition_id, "DiskIndex": index, "Type": "16-bit FAT"})
+        relationships.append(_make_relationship(partition_id, drive))
+        logical_disks.append({"DeviceID": drive, "Description": "Removable Disk"})
+    return from_json(
+        {
+            "version": SNAPSHOT_FORMAT_VERSION,
+            "components": {
+                "UsbHub": system.hubs,
+                "UsbController": system.controllers,
+                "SerialPort": system.serial_ports,
+                "DiskDrive": disk_drives,
+                "DiskPartition": partitions,
+                "DiskPartitionLogicalDiskRelationship": relationships,
+                "LogicalDisk": logical_disks,
+            },
+            "parent_id_prefixes": system.parent_id_prefixes,
+        }
+    )
+
+
+def _make_relationship(partition_id: str, logical_disk_id: str) -> Dict[str, str]:
+    return {
+        "Antecedent": f'\\\\HOST\\root\\cimv2:Win32_DiskPartition.DeviceID="{partition_id}"',
+        "Dependent": f'\\\\HOST\\root\\cimv2:Win32_LogicalDisk.DeviceID="{logical_disk_id}"',
+    }
+
+
+def aggregate(snapshot: SystemDataSnapshot) -> int:
+    """Aggregates the USB devices of a snapshot as a scan does, returning the number of candidates found."""
+    loader = ReplayingSystemDataLoader(snapshot)
+    usb_data = SystemUsbData(loader, loader.parent_id_prefix_cache)
+    return sum(1 for usb in usb_data.iter_devices() if WindowsDeviceDetector.is_valid_candidate(usb))
+
+
+def measure_peak_memory(function: Callable[[], Any]) -> int:
+    """Returns the peak memory allocated by a call to the function, in bytes."""
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def main() -> None:
+    """Runs the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--boards", type=int, action="append", help="Number of boards of a synthetic snapshot.")
+    parser.add_argument("--snapshot", type=Path, action="append", help="Recorded snapshot to replay.")
+    parser.add_argument("--record", type=Path, help="Records a snapshot of the system data of this Windows host.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of aggregations per snapshot.")
+    args = parser.parse_args()
+
+    if args.record:
+        RecordingSystemDataLoader(args.record).system_data
+        print(f"Recorded {args.record}")
+        return
+
+    snapshots: List[Tuple[str, SystemDataSnapshot]] = [(str(path), load_snapshot(path)) for path in args.snapshot or []]
+    if not snapshots or args.boards:
+        snapshots.extend(
+            (f"{boards} boards", synthesise_snapshot(boards)) for boards in args.boards or [1, 10, 100, 500]
+        )
+    unknown_volumes = mock.patch(
+        "mbed_devices._internal.windows.disk_aggregation.get_volumes_information", return_value=dict()
+    )
+    with unknown_volumes:
+        for name, snapshot in snapshots:
+            candidates = aggregate(snapshot)
+            timings = time_call(lambda: aggregate(snapshot), args.repeat)
+            peak = measure_peak_memory(lambda: aggregate(snapshot))
+            print(
+                f"{name:>12}: {len(snapshot.system_data[UsbHub]):>5} USB hubs, {candidates:>4} candidates, "
+                f"median {statistics.median(timings) * 1000:.2f} ms, max {max(timings) * 1000:.2f} ms, "
+                f"peak {peak / 1024:.0f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
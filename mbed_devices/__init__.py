@@ -11,6 +11,14 @@ Please see the documentation for mbed-targets for information on configuration o
 For the command line interface to the API see the package https://github.com/ARMmbed/mbed-tools
 """
 from mbed_devices._version import __version__
-from mbed_devices.mbed_devices import get_connected_devices
+from mbed_devices.mbed_devices import (
+    find_device,
+    find_devices,
+    get_connected_devices,
+    get_connected_devices_async,
+    iter_connected_devices,
+    iter_connected_devices_async,
+)
 from mbed_devices.device import Device
+from mbed_devices.device_watcher import DeviceWatcher
 from mbed_devices import exceptions
@@ -4,7 +4,7 @@
 #
 """Interface for device detectors."""
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List, Optional
 
 from mbed_devices._internal.candidate_device import CandidateDevice
 
@@ -16,3 +16,17 @@ class DeviceDetector(ABC):
     def find_candidates(self) -> List[CandidateDevice]:
         """Returns CandidateDevices."""
         pass
+
+    def iter_candidates(self, serial_number: Optional[str] = None) -> Iterator[CandidateDevice]:
+        """Yields CandidateDevices as they are found.
+
+        Detectors able to find devices one at a time override this, so that devices can be processed before the whole
+        system has been scanned, and so that devices which do not have the requested serial number are discarded
+        before any further information is gathered about them.
+
+        Args:
+            serial_number: only yield the candidates with this serial number, if specified.
+        """
+        for candidate in self.find_candidates():
+            if serial_number is None or candidate.serial_number == serial_number:
+                yield candidate
@@ -0,0 +1,252 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""On-disk cache of resolved boards.
+
+Resolving a board requires reading the HTM files on the device's mass storage and looking them up in the board
+database, which is slow for boards which stay connected for a long time. The outcome of the resolution is cached,
+keyed by the identity of the device and a fingerprint of its HTM files, so that repeated scans can skip both steps.
+
+The fingerprint is made of the name, size and modification time of the HTM files, which only requires listing the
+mount points rather than reading the files. Flashing a new interface firmware rewrites the HTM files, which changes the
+fingerprint and invalidates the entry. Devices which were not identified as Mbed Boards are only cached for a while,
+as they may be identified later, e.g. once the online board database is reachable.
+
+The cache is an SQLite database, which takes care of locking when it is shared by several processes. Entries are
+evicted in least recently used order once the cache grows beyond its configured size.
+"""
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import platform
+import sqlite3
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+import mbed_targets
+from mbed_targets import Board
+from mbed_targets.env import env as mbed_targets_env
+
+from mbed_devices._internal.candidate_device import CandidateDevice
+from mbed_devices._internal.resolve_board import _is_htm_file
+from mbed_devices.env import env
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 512
+
+# Time after which devices which were not identified are resolved again, in seconds.
+UNIDENTIFIED_DEVICE_TTL = 60 * 60
+
+# Time to wait for another process to release the database lock, in seconds.
+LOCK_TIMEOUT = 5.0
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS boards (
+    vendor_id TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    serial_number TEXT NOT NULL,
+    htm_fingerprint TEXT NOT NULL,
+    board_database TEXT NOT NULL,
+    board TEXT,
+    expires_at REAL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (vendor_id, product_id, serial_number, htm_fingerprint, board_database)
+);
+CREATE INDEX IF NOT EXISTS boards_last_used ON boards (last_used);
+"""
+
+
+class CacheKey(NamedTuple):
+    """Identity of a device, along with the state of its HTM files and of the board database."""
+
+    vendor_id: str
+    product_id: str
+    serial_number: str
+    htm_fingerprint: str
+    board_database: str
+
+
+class CachedBoard(NamedTuple):
+    """Outcome of a previous resolution, the board is None if the device was not identified as an Mbed Board."""
+
+    board: Optional[Board]
+
+
+class BoardCache:
+    """Resolved boards, stored in an SQLite database.
+
+    The database is only opened on first use. Errors accessing the database are logged and otherwise ignored, as the
+    cache must never prevent devices from being detected.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        max_entries: int = DEFAULT_CACHE_SIZE,
+        unidentified_device_ttl: float = UNIDENTIFIED_DEVICE_TTL,
+    ) -> None:
+        """Initialiser.
+
+        Args:
+            path: location of the database file, created along with its parent directories if needed.
+            max_entries: number of entries over which least recently used entries are evicted.
+            unidentified_device_ttl: time for which devices which were not identified are cached, in seconds.
+        """
+        self._path = path
+        self._max_entries = max_entries
+        self._unidentified_device_ttl = unidentified_device_ttl
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[CachedBoard]:
+        """Returns the cached outcome of the resolution, None if the device is not in the cache or its entry expired."""
+        try:
+            with self._lock, self._connect() as connection:
+                now = time.time()
+                row = connection.execute(
+                    "SELECT board FROM boards WHERE vendor_id = ? AND product_id = ? AND serial_number = ? "
+                    "AND htm_fingerprint = ? AND board_database = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (*key, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                connection.execute(
+                    "UPDATE boards SET last_used = ? WHERE vendor_id = ? AND product_id = ? AND serial_number = ? "
+                    "AND htm_fingerprint = ? AND board_database = ?",
+                    (now, *key),
+                )
+        except sqlite3.Error as e:
+            logger.debug(f"Could not read from the board cache '{self._path}': {e}")
+            return None
+        return CachedBoard(board=_deserialise_board(row[0]))
+
+    def put(self, key: CacheKey, board: Optional[Board]) -> None:
+        """Stores the outcome of the resolution, evicting least recently used entries if the cache is full.
+
+        Devices which were not identified expire after a while, boards are kept until they are evicted.
+        """
+        try:
+            with self._lock, self._connect() as connection:
+                now = time.time()
+                expires_at = now + self._unidentified_device_ttl if board is None else None
+                connection.execute(
+                    "INSERT OR REPLACE INTO boards VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (*key, _serialise_board(board), expires_at, now),
+                )
+                connection.execute(
+                    "DELETE FROM boards WHERE rowid NOT IN (SELECT rowid FROM boards ORDER BY last_used DESC LIMIT ?)",
+                    (self._max_entries,),
+                )
+        except sqlite3.Error as e:
+            logger.debug(f"Could not write to the board cache '{self._path}': {e}")
+
+    def close(self) -> None:
+        """Closes the connection to the database."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Returns the connection to the database, opening it on first use."""
+        if self._connection is None:
+            try:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                raise sqlite3.OperationalError(f"Could not create the cache directory: {e}") from e
+            connection = sqlite3.connect(str(self._path), timeout=LOCK_TIMEOUT, check_same_thread=False)
+            try:
+                if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                    connection.executescript(f"DROP TABLE IF EXISTS boards; PRAGMA user_version = {SCHEMA_VERSION};")
+                connection.executescript(SCHEMA)
+            except sqlite3.Error:
+                connection.close()
+                raise
+            self._connection = connection
+        return self._connection
+
+
+_board_caches: Dict[pathlib.Path, BoardCache] = {}
+_board_caches_lock = threading.Lock()
+
+
+def get_board_cache() -> Optional[BoardCache]:
+    """Returns the board cache set in the configuration, None if the cache is disabled."""
+    if env.MBED_DEVICES_BOARD_CACHE.upper() == "OFF":
+        return None
+    path = pathlib.Path(env.MBED_DEVICES_BOARD_CACHE_PATH or _default_cache_path())
+    with _board_caches_lock:
+        if path not in _board_caches:
+            _board_caches[path] = BoardCache(path, max_entries=_configured_cache_size())
+        return _board_caches[path]
+
+
+def is_cache_read_enabled() -> bool:
+    """States whether cached entries may be used, rather than only being refreshed."""
+    return env.MBED_DEVICES_BOARD_CACHE.upper() != "REFRESH"
+
+
+def make_cache_key(candidate: CandidateDevice) -> Optional[CacheKey]:
+    """Returns the cache key of a candidate, None if its mount points cannot be listed."""
+    try:
+        htm_fingerprint = _fingerprint_htm_files(candidate)
+    except OSError as e:
+        logger.debug(f"Could not list the mount points of the device '{candidate.serial_number}': {e}")
+        return None
+    return CacheKey(
+        vendor_id=candidate.vendor_id,
+        product_id=candidate.product_id,
+        serial_number=candidate.serial_number,
+        htm_fingerprint=htm_fingerprint,
+        board_database=f"{mbed_targets.__version__}:{mbed_targets_env.MBED_DATABASE_MODE.upper()}",
+    )
+
+
+def _fingerprint_htm_files(candidate: CandidateDevice) -> str:
+    """Digest of the name, size and modification time of the HTM files found on the device."""
+    htm_files = []
+    for mount_point in candidate.mount_points:
+        with os.scandir(mount_point) as entries:
+            for entry in entries:
+                if _is_htm_file(pathlib.Path(entry.name)):
+                    file_stat = entry.stat()
+                    htm_files.append(f"{entry.name}:{file_stat.st_size}:{file_stat.st_mtime_ns}")
+    return hashlib.sha1("/".join(sorted(htm_files)).encode()).hexdigest()
+
+
+def _serialise_board(board: Optional[Board]) -> Optional[str]:
+    return json.dumps(dataclasses.asdict(board)) if board is not None else None
+
+
+def _deserialise_board(serialised_board: Optional[str]) -> Optional[Board]:
+    if serialised_board is None:
+        return None
+    board_fields = json.loads(serialised_board)
+    return Board(**{name: tuple(value) if isinstance(value, list) else value for name, value in board_fields.items()})
+
+
+def _configured_cache_size() -> int:
+    try:
+        return max(int(env.MBED_DEVICES_BOARD_CACHE_SIZE), 0)
+    except ValueError:
+        logger.warning(f"Invalid board cache size '{env.MBED_DEVICES_BOARD_CACHE_SIZE}', using {DEFAULT_CACHE_SIZE}.")
+        return DEFAULT_CACHE_SIZE
+
+
+def _default_cache_path() -> pathlib.Path:
+    """Returns the platform's conventional location for cached data."""
+    if platform.system() == "Windows":
+        cache_directory = pathlib.Path(os.getenv("LOCALAPPDATA") or pathlib.Path.home() / "AppData" / "Local")
+    elif platform.system() == "Darwin":
+        cache_directory = pathlib.Path.home() / "Library" / "Caches"
+    else:
+        cache_directory = pathlib.Path(os.getenv("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache")
+    return cache_directory / "mbed-devices" / "boards.sqlite3"
@@ -6,15 +6,28 @@
 import logging
 import pathlib
 import re
-from typing import List, Tuple, Optional
+import time
+from enum import Enum
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional, cast
 from typing_extensions import TypedDict
 from mbed_devices._internal.base_detector import DeviceDetector
-from mbed_devices._internal.candidate_device import CandidateDevice
-from mbed_devices._internal.darwin import system_profiler, ioreg, diskutil
+from mbed_devices._internal.candidate_device import CandidateDevice, CandidateDeviceError
+from mbed_devices._internal.darwin import system_profiler, ioreg, diskutil, tools
+from mbed_devices.env import env
 
 
 logger = logging.getLogger(__name__)
 
+TOOL_COMMANDS = {
+    "system_profiler": system_profiler.USB_DATA_COMMAND,
+    "ioreg": ioreg.USB_DEVICES_COMMAND,
+    "diskutil": diskutil.EXTERNAL_DISKS_COMMAND,
+}
+# Time allowed to each tool, in seconds. `system_profiler` is notably slow, usually taking a few seconds.
+TOOL_TIMEOUTS = {"system_profiler": 15.0, "ioreg": 5.0, "diskutil": 5.0}
+# Time allowed to run all the tools of a scan, in seconds, after which the scan carries on with the output available.
+SCAN_TIMEOUT = 20.0
+
 
 class CandidateDeviceData(TypedDict):
     """CandidateDeviceData calculated from USBDevice."""
@@ -32,27 +45,154 @@ class InvalidCandidateDeviceDataError(ValueError):
     pass
 
 
+class DarwinBackend(Enum):
+    """Sources of USB device information on Darwin."""
+
+    IOREG = "IOREG"
+    SYSTEM_PROFILER = "SYSTEM_PROFILER"
+
+
+# Tools whose output is needed by a full scan with each backend.
+FULL_SCAN_TOOLS = {
+    DarwinBackend.IOREG: ["ioreg", "diskutil"],
+    DarwinBackend.SYSTEM_PROFILER: ["system_profiler", "diskutil", "ioreg"],
+}
+
+
 class DarwinDeviceDetector(DeviceDetector):
     """Darwin specific implementation of device detection."""
 
+    def __init__(
+        self,
+        backend: Optional[DarwinBackend] = None,
+        run_command: tools.CommandRunner = tools.run_command,
+        scan_timeout: float = SCAN_TIMEOUT,
+    ) -> None:
+        """Initialiser.
+
+        Args:
+            backend: source of USB device information, selected according to the configuration if not specified.
+            run_command: runs the command line tools providing device information.
+            scan_timeout: the time allowed to run all the tools of a scan, in seconds.
+        """
+        self._backend = backend if backend is not None else select_backend()
+        self._run_command = run_command
+        self._scan_timeout = scan_timeout
+
     def find_candidates(self) -> List[CandidateDevice]:
         """Return a list of CandidateDevices."""
-        usb_devices_data = system_profiler.get_end_usb_devices_data()
-        candidates = []
-        for device_data in usb_devices_data:
-            logging.debug(f"Building from: {device_data}.")
-            try:
-                candidate = _build_candidate(device_data)
-            except InvalidCandidateDeviceDataError:
-                pass
-            else:
-                logging.debug(f"Built candidate: {candidate}.")
-                candidates.append(candidate)
-        return candidates
-
-
-def _build_candidate(device_data: system_profiler.USBDevice) -> CandidateDevice:
-    assembled_data = _assemble_candidate_data(device_data)
+        return list(self.iter_candidates())
+
+    def iter_candidates(self, serial_number: Optional[str] = None) -> Iterator[CandidateDevice]:
+        """Yields CandidateDevices as they are found, only those with a serial number if specified."""
+        deadline = time.monotonic() + self._scan_timeout
+        outputs: Dict[str, Optional[bytes]] = {}
+        if serial_number is None:
+            # A full scan needs the output of every tool of the backend, which are run at the same time.
+            outputs = _run_tools(FULL_SCAN_TOOLS[self._backend], deadline, self._run_command)
+        # Otherwise, the tools listing the devices are run first, and the others only once a device matches.
+
+        def get_outputs(names: List[str]) -> Dict[str, Optional[bytes]]:
+            outputs.update(_run_tools([name for name in names if name not in outputs], deadline, self._run_command))
+            return {name: outputs[name] for name in names}
+
+        if self._backend == DarwinBackend.SYSTEM_PROFILER:
+            return _iter_candidates_from_system_profiler(
+                get_outputs(["system_profiler"])["system_profiler"],
+                lambda: get_outputs(["diskutil", "ioreg"]),
+                serial_number,
+            )
+        ioreg_output = get_outputs(["ioreg"])["ioreg"]
+        if ioreg_output is None:
+            logger.warning("Unable to list USB devices with ioreg, falling back to system_profiler.")
+            return _iter_candidates_from_system_profiler(
+                get_outputs(["system_profiler"])["system_profiler"],
+                lambda: get_outputs(["diskutil", "ioreg"]),
+                serial_number,
+            )
+        return _iter_candidates_from_ioreg(ioreg_output, lambda: get_outputs(["diskutil"])["diskutil"], serial_number)
+
+
+def select_backend() -> DarwinBackend:
+    """Returns the backend set in the configuration, `ioreg` being preferred if it is set to `AUTO`."""
+    configured_backend = env.MBED_DEVICES_DARWIN_BACKEND.upper()
+    if configured_backend in DarwinBackend.__members__:
+        return DarwinBackend[configured_backend]
+    if configured_backend != "AUTO":
+        logger.warning(f"Unknown Darwin backend '{configured_backend}', selecting one automatically.")
+    return DarwinBackend.IOREG
+
+
+def _run_tools(
+    names: Iterable[str], deadline: float, run_command: tools.CommandRunner
+) -> Dict[str, Optional[bytes]]:
+    """Runs the named tools concurrently, the output of those which failed or timed out being None."""
+    invocations = {name: tools.Invocation(TOOL_COMMANDS[name], TOOL_TIMEOUTS[name]) for name in names}
+    return tools.run_concurrently(invocations, max(deadline - time.monotonic(), 0.0), run_command)
+
+
+def _iter_candidates_from_ioreg(
+    ioreg_output: bytes, run_diskutil: Callable[[], Optional[bytes]], serial_number: Optional[str] = None
+) -> Iterator[CandidateDevice]:
+    usb_devices = ioreg.parse_end_usb_devices(ioreg_output)
+    volumes_index: Optional[Dict[str, diskutil.Volume]] = None
+    for usb_device in usb_devices:
+        if serial_number is not None and usb_device.serial_number != serial_number:
+            continue
+        if not usb_device.bsd_names:
+            # Only mass storage devices can be candidates, there is no need to look up their volumes.
+            logger.debug(f"Ignoring USB device without storage media: {usb_device}.")
+            continue
+        if volumes_index is None:
+            volumes_index = diskutil.parse_external_volumes_index(run_diskutil() or b"")
+        try:
+            candidate = CandidateDevice(
+                vendor_id=usb_device.vendor_id,
+                product_id=usb_device.product_id,
+                serial_number=cast(str, usb_device.serial_number),
+                mount_points=_find_mount_points(usb_device.bsd_names, volumes_index),
+                serial_port=usb_device.io_dialin_device,
+            )
+        except CandidateDeviceError as e:
+            logger.debug(f"Unable to build candidate from {usb_device}. {e}")
+        else:
+            logger.debug(f"Built candidate: {candidate}.")
+            yield candidate
+
+
+def _iter_candidates_from_system_profiler(
+    system_profiler_output: Optional[bytes],
+    run_lookup_tools: Callable[[], Dict[str, Optional[bytes]]],
+    serial_number: Optional[str] = None,
+) -> Iterator[CandidateDevice]:
+    usb_devices_data = system_profiler.parse_end_usb_devices_data(system_profiler_output or b"")
+    volumes_index: Optional[Dict[str, diskutil.Volume]] = None
+    serial_ports_index: Optional[Dict[str, str]] = None
+    for device_data in usb_devices_data:
+        # Mount points and serial ports are looked up using other tools, skip devices which cannot match.
+        if serial_number is not None and device_data.get("serial_num") != serial_number:
+            continue
+        if volumes_index is None or serial_ports_index is None:
+            # A single snapshot of the volumes and of the registry is shared by all the devices of the scan.
+            outputs = run_lookup_tools()
+            volumes_index = diskutil.parse_external_volumes_index(outputs["diskutil"] or b"")
+            serial_ports_index = ioreg.parse_io_dialin_devices_index(outputs["ioreg"] or b"")
+        logging.debug(f"Building from: {device_data}.")
+        try:
+            candidate = _build_candidate(device_data, volumes_index, serial_ports_index)
+        except InvalidCandidateDeviceDataError:
+            pass
+        else:
+            logging.debug(f"Built candidate: {candidate}.")
+            yield candidate
+
+
+def _build_candidate(
+    device_data: system_profiler.USBDevice,
+    volumes_index: Dict[str, diskutil.Volume],
+    serial_ports_index: Dict[str, str],
+) -> CandidateDevice:
+    assembled_data = _assemble_candidate_data(device_data, volumes_index, serial_ports_index)
     try:
         return CandidateDevice(**assembled_data)
     except ValueError as e:
@@ -60,13 +200,17 @@ def _build_candidate(device_data: system_profiler.USBDevice) -> CandidateDevice:
         raise InvalidCandidateDeviceDataError
 
 
-def _assemble_candidate_data(device_data: system_profiler.USBDevice) -> CandidateDeviceData:
+def _assemble_candidate_data(
+    device_data: system_profiler.USBDevice,
+    volumes_index: Dict[str, diskutil.Volume],
+    serial_ports_index: Dict[str, str],
+) -> CandidateDeviceData:
     return {
         "vendor_id": _format_vendor_id(device_data.get("vendor_id", "")),
         "product_id": device_data.get("product_id", ""),
         "serial_number": device_data.get("serial_num", ""),
-        "mount_points": _get_mount_points(device_data),
-        "serial_port": _get_serial_port(device_data),
+        "mount_points": _get_mount_points(device_data, volumes_index),
+        "serial_port": _get_serial_port(device_data, serial_ports_index),
     }
 
 
@@ -79,12 +223,21 @@ def _format_vendor_id(vendor_id: str) -> str:
     return vendor_id.split(maxsplit=1)[0]
 
 
-def _get_mount_points(device_data: system_profiler.USBDevice) -> Tuple[pathlib.Path, ...]:
+def _get_mount_points(
+    device_data: system_profiler.USBDevice, volumes_index: Dict[str, diskutil.Volume]
+) -> Tuple[pathlib.Path, ...]:
     """Returns mount points for a given device, empty list if device has no mount points."""
     storage_identifiers = [media["bsd_name"] for media in device_data.get("Media", []) if "bsd_name" in media]
+    return _find_mount_points(storage_identifiers, volumes_index)
+
+
+def _find_mount_points(
+    storage_identifiers: Iterable[str], volumes_index: Dict[str, diskutil.Volume]
+) -> Tuple[pathlib.Path, ...]:
+    """Returns mount points of the given storage devices, empty list if none of them is mounted."""
     mount_points = []
     for storage_identifier in storage_identifiers:
-        mount_point = diskutil.get_mount_point(storage_identifier)
+        mount_point = diskutil.get_mount_point(storage_identifier, volumes_index)
         if mount_point:
             mount_points.append(pathlib.Path(mount_point))
         else:
@@ -92,8 +245,13 @@ def _get_mount_points(device_data: system_profiler.USBDevice) -> Tuple[pathlib.P
     return tuple(mount_points)
 
 
-def _get_serial_port(device_data: system_profiler.USBDevice) -> Optional[str]:
-    """Returns serial port for a given device, None if serial port cannot be determined."""
+def _get_serial_port(device_data: system_profiler.USBDevice, serial_ports_index: Dict[str, str]) -> Optional[str]:
+    """Returns serial port for a given device, None if serial port cannot be determined.
+
+    Args:
+        device_data: data of the device from `system_profiler`.
+        serial_ports_index: serial ports indexed by ioreg device name, see `ioreg.build_io_dialin_devices_index`.
+    """
     device_name = device_data.get("_name")
     if not device_name:
         logging.debug('Missing "_name" in "{device_data}", which is required for ioreg name.')
@@ -105,26 +263,26 @@ def _get_serial_port(device_data: system_profiler.USBDevice) -> Optional[str]:
         return None
 
     ioreg_name = _build_ioreg_device_name(device_name=device_name, location_id=location_id)
-    serial_port = ioreg.get_io_dialin_device(ioreg_name)
-    return serial_port
+    return serial_ports_index.get(ioreg_name)
 
 
 def _build_ioreg_device_name(device_name: str, location_id: str) -> str:
     """Converts extracted `_name` and `location_id` attributes from `system_profiler` to a valid ioreg device name.
 
     `system_profiler` utility returns location ids in the form of `0xNNNNNNN`, with an optional suffix of ` / N`.
+    The location is lowercased, as in the keys of `ioreg.build_io_dialin_devices_index`.
 
     Example:
-        >>> _build_ioreg_device_name("STM32 Foo", "0x123456 / 2")
-        "STM32 Foo@123456"
+        >>> _build_ioreg_device_name("STM32 Foo", "0x14A00000 / 2")
+        "STM32 Foo@14a00000"
     """
     pattern = r"""
-    0x                # hexadecimal prefix
-    (?P<location>\d+) # location (i.e.: "123456" in "0x123456 / 2")
-    (\s\/\s\d+)?      # suffix of location (" / 14")
+    0x                         # hexadecimal prefix
+    (?P<location>[0-9a-fA-F]+) # location (i.e.: "14a00000" in "0x14a00000 / 2")
+    (\s\/\s\d+)?               # suffix of location (" / 14")
     """
     match = re.match(pattern, location_id, re.VERBOSE)
     if match:
-        return f"{device_name}@{match['location']}"
+        return f"{device_name}@{match['location'].lower()}"
     else:
         return device_name
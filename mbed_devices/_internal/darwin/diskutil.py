@@ -11,6 +11,8 @@ from typing_extensions import TypedDict
 
 VolumeTree = Dict  # mypy does not work with recursive types, which nested "Partitions" would require
 
+EXTERNAL_DISKS_COMMAND = ["diskutil", "list", "-plist", "external"]
+
 
 class Volume(TypedDict, total=False):
     """Representation of mounted volume."""
@@ -21,7 +23,12 @@ class Volume(TypedDict, total=False):
 
 def get_all_external_disks_data() -> List[VolumeTree]:
     """Returns parsed output of `diskutil` call, fetching only information of interest."""
-    output = subprocess.check_output(["diskutil", "list", "-plist", "external"], stderr=subprocess.DEVNULL)
+    output = subprocess.check_output(EXTERNAL_DISKS_COMMAND, stderr=subprocess.DEVNULL)
+    return parse_all_external_disks_data(output)
+
+
+def parse_all_external_disks_data(output: bytes) -> List[VolumeTree]:
+    """Parses the output of `diskutil` run with `EXTERNAL_DISKS_COMMAND`."""
     if output:
         data: Dict = plistlib.loads(output)
         return data.get("AllDisksAndPartitions", [])
@@ -38,6 +45,14 @@ def get_all_external_volumes_data() -> List[Volume]:
     return _filter_volumes(data)
 
 
+def parse_external_volumes_index(output: bytes) -> Dict[str, Volume]:
+    """Returns all external volumes data keyed by DeviceIdentifier, from the output of `EXTERNAL_DISKS_COMMAND`.
+
+    Meant to be parsed once per scan and shared by all the devices found.
+    """
+    return _index_volumes(_filter_volumes(parse_all_external_disks_data(output)))
+
+
 def get_external_volume_data(device_identifier: str) -> Optional[Volume]:
     """Returns external volume data for a given identifier."""
     data = get_all_external_volumes_data()
@@ -47,14 +62,27 @@ def get_external_volume_data(device_identifier: str) -> Optional[Volume]:
     return None
 
 
-def get_mount_point(device_identifier: str) -> Optional[str]:
-    """Returns mount point of a given device."""
-    device_data = get_external_volume_data(device_identifier)
+def get_mount_point(device_identifier: str, volumes_index: Optional[Dict[str, Volume]] = None) -> Optional[str]:
+    """Returns mount point of a given device.
+
+    Args:
+        device_identifier: BSD name of the device, e.g. disk2.
+        volumes_index: volumes previously parsed with `parse_external_volumes_index`, `diskutil` is called if not
+            specified.
+    """
+    if volumes_index is not None:
+        device_data = volumes_index.get(device_identifier)
+    else:
+        device_data = get_external_volume_data(device_identifier)
     if device_data and "MountPoint" in device_data:
         return device_data["MountPoint"]
     return None
 
 
+def _index_volumes(volumes: Iterable[Volume]) -> Dict[str, Volume]:
+    return {volume["DeviceIdentifier"]: volume for volume in volumes if "DeviceIdentifier" in volume}
+
+
 def _filter_volumes(data: Iterable[VolumeTree]) -> List[Volume]:
     """Flattens the structure returned by `diskutil` call.
 
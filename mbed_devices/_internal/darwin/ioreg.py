@@ -5,20 +5,83 @@
 """Interactions with `ioreg`."""
 import plistlib
 import subprocess
-from typing import Any, Dict, Iterable, List, Optional, cast
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, cast
 from xml.parsers.expat import ExpatError
 
+USB_DEVICE_CLASS = "IOUSBHostDevice"
+USB_HUB_DEVICE_CLASS = 9
+USB_DEVICES_COMMAND = ["ioreg", "-a", "-r", "-l", "-c", USB_DEVICE_CLASS]
+# Properties of the USB devices, and of the storage media and serial ports they present, read by the device detector.
+PROPERTIES_OF_INTEREST = (
+    "IORegistryEntryName",
+    "idVendor",
+    "idProduct",
+    "bDeviceClass",
+    "USB Serial Number",
+    "kUSBSerialNumberString",
+    "BSD Name",
+    "IODialinDevice",
+)
+
+
+class USBDevice(NamedTuple):
+    """USB device along with the storage and serial devices it presents, as described in the I/O Registry."""
+
+    name: str
+    vendor_id: str  # example: 0x0d28
+    product_id: str  # example: 0x0204
+    serial_number: Optional[str]
+    bsd_names: List[str]  # example: ["disk2"]
+    io_dialin_device: Optional[str]  # example: /dev/tty.usbmodem14102
+
 
 def get_data(device_name: str) -> List[Dict]:
     """Returns parsed output of `ioreg` call for a given device name."""
     output = subprocess.check_output(["ioreg", "-a", "-r", "-n", device_name, "-l"])
-    if output:
-        try:
-            return cast(List[Dict], plistlib.loads(output))
-        except ExpatError:
-            # Some devices seem to produce corrupt data
-            pass
-    return []
+    return _parse_output(output)
+
+
+def parse_end_usb_devices(output: bytes) -> List[USBDevice]:
+    """Returns the USB devices which are not hubs, from the output of `ioreg` run with `USB_DEVICES_COMMAND`."""
+    return extract_end_usb_devices(_parse_output(output))
+
+
+def parse_io_dialin_devices_index(output: bytes) -> Dict[str, str]:
+    """Returns the "IODialinDevice" of the USB devices by ioreg device name (i.e. "Some Device@14420000").
+
+    Parses the output of `ioreg` run with `USB_DEVICES_COMMAND`.
+    """
+    return build_io_dialin_devices_index(_parse_output(output))
+
+
+def extract_end_usb_devices(data: Iterable[Dict]) -> List[USBDevice]:
+    """Finds the USB devices which are not hubs in data from `ioreg`, in registry order.
+
+    The storage media and serial ports of a device are those found in its subtree, down to any nested USB device.
+    """
+    property_index = PropertyIndex(data)
+    end_devices = []
+    for path in property_index.usb_device_paths:
+        if property_index.get(path, "bDeviceClass") == USB_HUB_DEVICE_CLASS:
+            continue
+        # Only values which are set are indexed, e.g. a vendor id of 0 is not.
+        vendor_id = property_index.get(path, "idVendor") or 0
+        product_id = property_index.get(path, "idProduct") or 0
+        serial_number = property_index.get(path, "USB Serial Number") or property_index.get(
+            path, "kUSBSerialNumberString"
+        )
+        io_dialin_devices = property_index.get_device_values(path, "IODialinDevice")
+        end_devices.append(
+            USBDevice(
+                name=property_index.get(path, "IORegistryEntryName") or "",
+                vendor_id=f"0x{vendor_id:04x}",
+                product_id=f"0x{product_id:04x}",
+                serial_number=serial_number,
+                bsd_names=property_index.get_device_values(path, "BSD Name"),
+                io_dialin_device=io_dialin_devices[0] if io_dialin_devices else None,
+            )
+        )
+    return end_devices
 
 
 def get_io_dialin_device(device_name: str) -> Optional[str]:
@@ -28,14 +91,154 @@ def get_io_dialin_device(device_name: str) -> Optional[str]:
     return dialin_device
 
 
+def build_io_dialin_devices_index(data: Iterable[Dict]) -> Dict[str, str]:
+    """Indexes the first "IODialinDevice" found in the subtree of each located entry of data from `ioreg`.
+
+    Entries are indexed by `<IORegistryEntryName>@<locationID>`, the location being formatted in lowercase hexadecimal
+    without prefix. Entries without a location or without a "IODialinDevice" in their subtree are left out.
+    """
+    property_index = PropertyIndex(data, property_names=["IODialinDevice"])
+    index = {}
+    for device_name in property_index.located_device_names:
+        dialin_device = property_index.find_first(property_index.get_path(device_name), "IODialinDevice")
+        if dialin_device:
+            index[device_name] = dialin_device
+    return index
+
+
+class PropertyIndex:
+    """Properties of interest of the entries of an `ioreg` snapshot, indexed by registry path.
+
+    The registry path of an entry joins the ioreg device names of its ancestors and its own with "/", e.g.
+    "USB3.0 Hub@14100000/DAPLink CMSIS-DAP@14110000/mbed Serial Port". The ioreg device name of an entry is its name,
+    followed by its location in lowercase hexadecimal if it has one. Where entries share a registry path or an ioreg
+    device name, the first one in registry order is indexed.
+
+    The values found in the subtree of each USB device, leaving out those of nested USB devices, are also indexed, so
+    that the storage media and serial ports each device presents are known.
+
+    The snapshot is traversed once, without recursion, so that lookups do not walk the registry tree.
+    """
+
+    def __init__(self, data: Iterable[Dict], property_names: Iterable[str] = PROPERTIES_OF_INTEREST) -> None:
+        """Initialiser.
+
+        Args:
+            data: parsed output of `ioreg`.
+            property_names: names of the properties to index.
+        """
+        property_names = tuple(property_names)
+        self._properties: Dict[str, Dict[str, Any]] = {}
+        self._subtree_properties: Dict[str, Dict[str, Any]] = {}
+        self._device_values: Dict[str, Dict[str, List[Any]]] = {}
+        self._paths: Dict[str, str] = {}
+        self._usb_device_paths: List[str] = []
+        # Each entry is visited twice: when it is reached in registry order, then once its subtree has been visited, at
+        # which point the first values of the properties in its subtree are known.
+        stack: List[Tuple[Dict, str, bool]] = [(entry, "", False) for entry in reversed(list(data))]
+        subtree_properties_by_entry: Dict[int, Dict[str, Any]] = {}
+        device_values_by_entry: Dict[int, Dict[str, List[Any]]] = {}
+        indexed_entries = set()
+        while stack:
+            entry, path, is_subtree_visited = stack.pop()
+            children = entry.get("IORegistryEntryChildren", [])
+            if not is_subtree_visited:
+                device_name = _get_device_name(entry)
+                path = f"{path}/{device_name}" if path else device_name
+                if path not in self._properties:
+                    self._properties[path] = {name: entry[name] for name in property_names if entry.get(name)}
+                    indexed_entries.add(id(entry))
+                    if _is_usb_device(entry):
+                        self._usb_device_paths.append(path)
+                if isinstance(entry.get("locationID"), int):
+                    self._paths.setdefault(device_name, path)
+                stack.append((entry, path, True))
+                stack.extend((child, path, False) for child in reversed(children))
+                continue
+            subtree_properties = {name: entry[name] for name in property_names if entry.get(name)}
+            device_values = {name: [value] for name, value in subtree_properties.items()}
+            for child in children:
+                for name, value in subtree_properties_by_entry.pop(id(child)).items():
+                    subtree_properties.setdefault(name, value)
+                child_device_values = device_values_by_entry.pop(id(child))
+                if not _is_usb_device(child):
+                    for name, values in child_device_values.items():
+                        device_values.setdefault(name, []).extend(values)
+            subtree_properties_by_entry[id(entry)] = subtree_properties
+            device_values_by_entry[id(entry)] = device_values
+            if id(entry) in indexed_entries:
+                self._subtree_properties[path] = subtree_properties
+                if _is_usb_device(entry):
+                    self._device_values[path] = device_values
+
+    @property
+    def located_device_names(self) -> List[str]:
+        """The ioreg device names of the entries which have a location, in registry order."""
+        return list(self._paths)
+
+    def get_path(self, device_name: str) -> str:
+        """Returns the registry path of the entry with an ioreg device name, an empty string if not indexed."""
+        return self._paths.get(device_name, "")
+
+    def get(self, path: str, property_name: str) -> Any:
+        """Returns the value of a property of the entry at a registry path, None if not found."""
+        return self._properties.get(path, {}).get(property_name)
+
+    def find_first(self, path: str, property_name: str) -> Any:
+        """Returns the first value of a property in the subtree of the entry at a registry path, None if not found."""
+        return self._subtree_properties.get(path, {}).get(property_name)
+
+    @property
+    def usb_device_paths(self) -> List[str]:
+        """The registry paths of the USB devices, in registry order."""
+        return list(self._usb_device_paths)
+
+    def get_device_values(self, path: str, property_name: str) -> List[Any]:
+        """Returns the values of a property in the subtree of the USB device at a registry path, in registry order.
+
+        Values in the subtrees of nested USB devices are left out, the property of the device itself is included.
+        """
+        return list(self._device_values.get(path, {}).get(property_name, []))
+
+
+def _get_device_name(entry: Dict) -> str:
+    """Returns the ioreg device name of an entry, as `system_profiler` data is converted to by the device detector."""
+    name = entry.get("IORegistryEntryName", "")
+    location_id = entry.get("locationID")
+    if isinstance(location_id, int):
+        return f"{name}@{location_id:x}"
+    return str(name)
+
+
+def _is_usb_device(entry: Dict) -> bool:
+    """Tells USB devices apart from their interfaces, which also carry the vendor and product ids."""
+    return (
+        isinstance(entry.get("idVendor"), int)
+        and isinstance(entry.get("idProduct"), int)
+        and "bInterfaceNumber" not in entry
+    )
+
+
+def _parse_output(output: bytes) -> List[Dict]:
+    if output:
+        try:
+            return cast(List[Dict], plistlib.loads(output))
+        except ExpatError:
+            # Some devices seem to produce corrupt data
+            pass
+    return []
+
+
 def _find_first_property_value(property_name: str, data: Iterable[Dict]) -> Any:
-    """Finds a first value of a given proprety name in data from `ioreg`, returns None if not found."""
-    found_value = None
-    for item in data:
-        found_value = item.get(
-            property_name,
-            _find_first_property_value(property_name=property_name, data=item.get("IORegistryEntryChildren", [])),
-        )
+    """Finds a first value of a given proprety name in data from `ioreg`, returns None if not found.
+
+    Entries are searched in registry order, and the search stops at the first entry with the property.
+    """
+    stack = list(reversed(list(data)))
+    while stack:
+        item = stack.pop()
+        found_value = item.get(property_name)
         if found_value:
-            break
-    return found_value
+            return found_value
+        stack.extend(reversed(item.get("IORegistryEntryChildren", [])))
+    return None
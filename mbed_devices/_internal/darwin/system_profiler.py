@@ -11,6 +11,8 @@ from typing_extensions import TypedDict
 
 USBDeviceTree = Dict  # mypy does not work with recursive types, which "_items" would require
 
+USB_DATA_COMMAND = ["system_profiler", "-xml", "SPUSBDataType"]
+
 
 class USBDeviceMedia(TypedDict, total=False):
     """Representation of usb device storage."""
@@ -31,15 +33,29 @@ class USBDevice(TypedDict, total=False):
 
 def get_all_usb_devices_data() -> List[USBDeviceTree]:
     """Returns parsed output of `system_profiler` call."""
-    output = subprocess.check_output(["system_profiler", "-xml", "SPUSBDataType"], stderr=subprocess.DEVNULL)
-    if output:
-        return cast(List[USBDeviceTree], plistlib.loads(output))
-    return []
+    output = subprocess.check_output(USB_DATA_COMMAND, stderr=subprocess.DEVNULL)
+    return parse_all_usb_devices_data(output)
 
 
 def get_end_usb_devices_data() -> List[USBDevice]:
     """Returns only end devices from the output of `system_profiler` call."""
     data = get_all_usb_devices_data()
+    return _extract_end_devices(data)
+
+
+def parse_all_usb_devices_data(output: bytes) -> List[USBDeviceTree]:
+    """Parses the output of `system_profiler` run with `USB_DATA_COMMAND`."""
+    if output:
+        return cast(List[USBDeviceTree], plistlib.loads(output))
+    return []
+
+
+def parse_end_usb_devices_data(output: bytes) -> List[USBDevice]:
+    """Returns only end devices from the output of `system_profiler` run with `USB_DATA_COMMAND`."""
+    return _extract_end_devices(parse_all_usb_devices_data(output))
+
+
+def _extract_end_devices(data: Iterable[USBDeviceTree]) -> List[USBDevice]:
     leaf_devices = _extract_leaf_devices(data)
     end_devices = _filter_end_devices(leaf_devices)
     return end_devices
@@ -0,0 +1,68 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Concurrent invocations of the command line tools providing device information on macOS.
+
+The tools are independent of each other and spend most of their time waiting on the OS, so they are run at the same
+time. Each tool is given its own timeout, and the scan an overall deadline, so that a wedged tool only leaves out the
+information it would have provided instead of hanging the caller.
+"""
+import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+CommandRunner = Callable[[List[str], float], bytes]
+"""Runs a command and returns its output, raising if it fails or does not complete within the timeout in seconds."""
+
+
+class Invocation(NamedTuple):
+    """Command line of a tool, along with the time it is allowed to take in seconds."""
+
+    command: List[str]
+    timeout: float
+
+
+def run_command(command: List[str], timeout: float) -> bytes:
+    """Runs a command in a subprocess, which is killed if it does not complete within the timeout."""
+    return subprocess.check_output(command, stderr=subprocess.DEVNULL, timeout=timeout)
+
+
+def run_concurrently(
+    invocations: Dict[str, Invocation], deadline: float, run: CommandRunner = run_command
+) -> Dict[str, Optional[bytes]]:
+    """Runs the invocations at the same time.
+
+    Args:
+        invocations: invocations to run, by name.
+        deadline: the time allowed to complete all the invocations, in seconds.
+        run: runs the command of each invocation.
+
+    Returns:
+        The output of each invocation by name, None for the invocations which failed or did not complete in time.
+    """
+    if not invocations:
+        return {}
+    executor = ThreadPoolExecutor(max_workers=len(invocations), thread_name_prefix="darwin-tool")
+    futures = {
+        name: executor.submit(run, invocation.command, invocation.timeout) for name, invocation in invocations.items()
+    }
+    # Invocations still running past the deadline are abandoned, their thread stops once their own timeout expires.
+    executor.shutdown(wait=False)
+    wait(futures.values(), timeout=deadline)
+    outputs: Dict[str, Optional[bytes]] = {}
+    for name, future in futures.items():
+        outputs[name] = None
+        if not future.done():
+            logger.warning(f"{name} did not complete within the scan deadline of {deadline} seconds.")
+            continue
+        try:
+            outputs[name] = future.result()
+        except subprocess.TimeoutExpired:
+            logger.warning(f"{name} did not complete within {invocations[name].timeout} seconds.")
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"{name} failed. {e}")
+    return outputs
@@ -4,7 +4,7 @@
 #
 """Detect Mbed devices connected to host computer."""
 import platform
-from typing import Iterable
+from typing import Iterable, Iterator, Optional
 
 from mbed_devices._internal.candidate_device import CandidateDevice
 from mbed_devices._internal.base_detector import DeviceDetector
@@ -16,6 +16,12 @@ def detect_candidate_devices() -> Iterable[CandidateDevice]:
     return detector.find_candidates()
 
 
+def iter_candidate_devices(serial_number: Optional[str] = None) -> Iterator[CandidateDevice]:
+    """Yields Candidates connected to host computer as they are found, only those with a serial number if specified."""
+    detector = _get_detector_for_current_os()
+    return detector.iter_candidates(serial_number=serial_number)
+
+
 def _get_detector_for_current_os() -> DeviceDetector:
     """Returns DeviceDetector for current operating system."""
     if platform.system() == "Windows":
@@ -0,0 +1,112 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Sources of hotplug events, signalling that the set of connected devices may have changed."""
+import platform
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from mbed_devices._internal.candidate_device import CandidateDevice
+
+DEFAULT_POLLING_INTERVAL = 1.0  # seconds
+
+
+class HotplugEvent(NamedTuple):
+    """A change reported by the operating system.
+
+    Attributes:
+        action: What happened to the device, e.g. "add", "remove" or "change".
+        subsystem: The part of the system the event originates from, e.g. "block", "tty" or "mount", or the class of
+            the component on Windows, e.g. "Win32_PnPEntity".
+        device_file_path: The device file affected by the change, if known. On Windows, the ID of the component e.g.
+            the PnP device ID or the drive letter.
+    """
+
+    action: str
+    subsystem: str
+    device_file_path: Optional[str] = None
+
+
+class HotplugEventSource(ABC):
+    """Object in charge of reporting hotplug events."""
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[HotplugEvent]:
+        """Blocks until events occur and yields them, stops once the source is closed."""
+
+    def open(self) -> None:
+        """Starts collecting the events reported by the iteration, if they are only collected once it starts.
+
+        Called on the thread iterating over the source, before it scans the devices connected so that no event is
+        missed in between.
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """Stops the source, unblocking any iteration in progress."""
+
+
+class PollingEventSource(HotplugEventSource):
+    """Event source for systems without hotplug notifications, yielding an event at a fixed interval."""
+
+    def __init__(self, interval: float = DEFAULT_POLLING_INTERVAL) -> None:
+        """Initialiser.
+
+        Args:
+            interval: number of seconds between events.
+        """
+        self._interval = interval
+        self._closed = threading.Event()
+
+    def __iter__(self) -> Iterator[HotplugEvent]:
+        """Yields a "poll" event every interval until closed."""
+        while not self._closed.wait(self._interval):
+            yield HotplugEvent(action="poll", subsystem="")
+
+    def close(self) -> None:
+        """Stops the source."""
+        self._closed.set()
+
+
+class CandidateTracker(ABC):
+    """Keeps track of the candidate devices connected, updating only those affected by hotplug events."""
+
+    @abstractmethod
+    def scan(self) -> List[CandidateDevice]:
+        """Detects all the candidate devices connected."""
+
+    @abstractmethod
+    def update(self, event: HotplugEvent) -> Dict[str, Optional[CandidateDevice]]:
+        """Updates the candidate devices affected by an event.
+
+        Returns:
+            The candidate devices affected by serial number, None for those which are no longer connected.
+        """
+
+
+def get_event_source_for_current_os() -> HotplugEventSource:
+    """Returns the HotplugEventSource best suited to the current operating system."""
+    if platform.system() == "Windows":
+        from mbed_devices._internal.windows.hotplug_event_source import WmiEventSource
+
+        return WmiEventSource()
+    if platform.system() == "Linux":
+        from mbed_devices._internal.linux.device_detector import is_udev_available
+
+        # Without udev there is nothing to report device events, fall back to polling.
+        if is_udev_available():
+            from mbed_devices._internal.linux.hotplug_event_source import UdevEventSource
+
+            return UdevEventSource()
+    return PollingEventSource()
+
+
+def get_candidate_tracker_for_current_os() -> Optional[CandidateTracker]:
+    """Returns the CandidateTracker for the current operating system, None if candidates are only found by scanning."""
+    if platform.system() == "Windows":
+        from mbed_devices._internal.windows.candidate_tracker import WindowsCandidateTracker
+
+        return WindowsCandidateTracker()
+    return None
@@ -4,57 +4,156 @@
 #
 """Defines a device detector for Linux."""
 import logging
+from enum import Enum
 from pathlib import Path
-from typing import Tuple, List, Optional, cast
+from typing import Dict, Iterator, Tuple, List, Optional, cast
 
-import psutil
-import pyudev
+try:
+    import pyudev
+except ImportError:
+    # Minimal images may not provide pyudev, in which case devices are detected by reading sysfs directly.
+    pyudev = None
 
 from mbed_devices._internal.base_detector import DeviceDetector
-from mbed_devices._internal.candidate_device import CandidateDevice, FilesystemMountpointError
+from mbed_devices._internal.candidate_device import CandidateDevice, CandidateDeviceError, FilesystemMountpointError
+from mbed_devices._internal.linux import sysfs
+from mbed_devices._internal.linux.mountinfo import MountIndex
+from mbed_devices.env import env
 
 
 logger = logging.getLogger(__name__)
 
+# udev keeps a record of every device it has processed in this directory, it is missing if udev is not running.
+UDEV_DATABASE_PATH = Path("/run/udev/data")
+
+
+class LinuxBackend(Enum):
+    """Sources of device information on Linux."""
+
+    UDEV = "UDEV"
+    SYSFS = "SYSFS"
+
 
 class LinuxDeviceDetector(DeviceDetector):
     """Linux specific implementation of device detection."""
 
+    def __init__(self, backend: Optional[LinuxBackend] = None) -> None:
+        """Initialiser.
+
+        Args:
+            backend: source of device information, selected according to the configuration if not specified.
+        """
+        self._backend = backend if backend is not None else select_backend()
+
     def find_candidates(self) -> List[CandidateDevice]:
         """Return a list of CandidateDevices."""
-        context = pyudev.Context()
-        candidates = []
-        for disk in context.list_devices(subsystem="block", ID_BUS="usb"):
-            serial_number = disk.properties.get("ID_SERIAL_SHORT")
-            try:
-                candidates.append(
-                    CandidateDevice(
-                        mount_points=_find_fs_mounts_for_device(disk.properties.get("DEVNAME")),
-                        product_id=disk.properties.get("ID_MODEL_ID"),
-                        vendor_id=disk.properties.get("ID_VENDOR_ID"),
-                        serial_number=serial_number,
-                        serial_port=_find_serial_port_for_device(serial_number),
-                    )
-                )
-            except FilesystemMountpointError:
-                logger.warning(
-                    f"A USB block device was detected at path {disk.properties.get('DEVNAME')}. However, the"
-                    " file system has failed to mount. Please disconnect and reconnect your device and try again."
-                    "If this problem persists, try running fsck.vfat on your block device, as the file system may be "
-                    "corrupted."
-                )
-                continue
-        return candidates
-
-
-def _find_serial_port_for_device(disk_serial_id: str) -> Optional[str]:
-    """Try to find a serial port associated with the given device."""
-    for tty_dev in pyudev.Context().list_devices(subsystem="tty"):
-        if tty_dev.properties.get("ID_SERIAL_SHORT") == disk_serial_id:
-            return cast(str, tty_dev.properties.get("DEVNAME"))
-    return None
-
-
-def _find_fs_mounts_for_device(device_file_path: str) -> Tuple[Path, ...]:
+        return list(self.iter_candidates())
+
+    def iter_candidates(self, serial_number: Optional[str] = None) -> Iterator[CandidateDevice]:
+        """Yields CandidateDevices as they are found, only those with a serial number if specified."""
+        if self._backend == LinuxBackend.SYSFS:
+            return _iter_candidates_from_sysfs(serial_number)
+        return _iter_candidates_from_udev(serial_number)
+
+
+def select_backend() -> LinuxBackend:
+    """Returns the backend set in the configuration, or the most suitable one if it is set to `AUTO`."""
+    configured_backend = env.MBED_DEVICES_LINUX_BACKEND.upper()
+    if configured_backend in LinuxBackend.__members__:
+        backend = LinuxBackend[configured_backend]
+        if backend == LinuxBackend.UDEV and pyudev is None:
+            logger.warning("The udev backend is configured but pyudev is not installed, using the sysfs backend.")
+            return LinuxBackend.SYSFS
+        return backend
+    if configured_backend != "AUTO":
+        logger.warning(f"Unknown Linux backend '{configured_backend}', selecting one automatically.")
+    return LinuxBackend.UDEV if is_udev_available() else LinuxBackend.SYSFS
+
+
+def is_udev_available() -> bool:
+    """States whether pyudev can be used to retrieve device information."""
+    return pyudev is not None and UDEV_DATABASE_PATH.is_dir()
+
+
+def _iter_candidates_from_udev(serial_number: Optional[str] = None) -> Iterator[CandidateDevice]:
+    context = pyudev.Context()
+    # Let udev discard the tty devices which do not have the requested serial number. udev matches devices having
+    # any of the properties requested, so block devices are only matched on their bus and their serial number is
+    # compared here.
+    properties = {"ID_SERIAL_SHORT": serial_number} if serial_number is not None else {}
+    # Enumerate the tty subsystem and read the mount table once per scan, rather than once per detected block
+    # device.
+    serial_ports = _build_serial_port_index(context, **properties)
+    mount_index = MountIndex.from_mount_table()
+    for disk in context.list_devices(subsystem="block", ID_BUS="usb"):
+        disk_serial_number = disk.properties.get("ID_SERIAL_SHORT")
+        if serial_number is not None and disk_serial_number != serial_number:
+            continue
+        try:
+            yield CandidateDevice(
+                mount_points=_find_fs_mounts_for_device(disk.properties.get("DEVNAME"), mount_index),
+                product_id=disk.properties.get("ID_MODEL_ID"),
+                vendor_id=disk.properties.get("ID_VENDOR_ID"),
+                serial_number=disk_serial_number,
+                serial_port=serial_ports.get(disk_serial_number),
+            )
+        except FilesystemMountpointError:
+            _log_unmounted_device(disk.properties.get("DEVNAME"))
+
+
+def _iter_candidates_from_sysfs(serial_number: Optional[str] = None) -> Iterator[CandidateDevice]:
+    mount_index = MountIndex.from_mount_table()
+    for device_nodes in sysfs.list_usb_device_nodes():
+        if serial_number is not None and device_nodes.usb_device.serial_number != serial_number:
+            continue
+        mount_points: List[Path] = []
+        for block_device in device_nodes.block_devices:
+            for mount_point in mount_index.find_mount_points(
+                block_device.device_file_path, device_number=block_device.device_number
+            ):
+                if mount_point not in mount_points:
+                    mount_points.append(mount_point)
+        serial_port = device_nodes.tty_devices[0].device_file_path if device_nodes.tty_devices else None
+        try:
+            yield CandidateDevice(
+                mount_points=tuple(mount_points),
+                product_id=device_nodes.usb_device.product_id,
+                vendor_id=device_nodes.usb_device.vendor_id,
+                serial_number=cast(str, device_nodes.usb_device.serial_number),
+                serial_port=serial_port,
+            )
+        except FilesystemMountpointError:
+            _log_unmounted_device(", ".join(block.device_file_path for block in device_nodes.block_devices))
+        except CandidateDeviceError as e:
+            logger.debug(f"Ignoring USB device {device_nodes.usb_device}: {e}")
+
+
+def _log_unmounted_device(device_file_path: str) -> None:
+    logger.warning(
+        f"A USB block device was detected at path {device_file_path}. However, the"
+        " file system has failed to mount. Please disconnect and reconnect your device and try again."
+        "If this problem persists, try running fsck.vfat on your block device, as the file system may be "
+        "corrupted."
+    )
+
+
+def _build_serial_port_index(context: "pyudev.Context", **properties: str) -> Dict[str, str]:
+    """Map the serial number of every tty device to its device file path.
+
+    When several tty devices share a serial number, the first one enumerated is kept.
+
+    Args:
+        context: the udev context to enumerate devices from.
+        properties: only index the tty devices with any of these udev properties.
+    """
+    serial_ports: Dict[str, str] = {}
+    for tty_dev in context.list_devices(subsystem="tty", **properties):
+        serial_number = tty_dev.properties.get("ID_SERIAL_SHORT")
+        if serial_number and serial_number not in serial_ports:
+            serial_ports[serial_number] = tty_dev.properties.get("DEVNAME")
+    return serial_ports
+
+
+def _find_fs_mounts_for_device(device_file_path: str, mount_index: MountIndex) -> Tuple[Path, ...]:
     """Find the file system mount point for a block device file path."""
-    return tuple(Path(part.mountpoint) for part in psutil.disk_partitions() if part.device == device_file_path)
+    return mount_index.find_mount_points(device_file_path)
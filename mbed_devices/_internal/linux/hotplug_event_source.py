@@ -0,0 +1,113 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Hotplug events on Linux, reported by udev and by the kernel mount table."""
+import logging
+import os
+import select
+import threading
+from pathlib import Path
+from typing import IO, Iterator, Optional, cast
+
+import pyudev
+
+from mbed_devices._internal.hotplug import HotplugEvent, HotplugEventSource
+from mbed_devices._internal.linux.mountinfo import MOUNTINFO_PATH
+
+logger = logging.getLogger(__name__)
+
+MONITORED_SUBSYSTEMS = ["block", "tty"]
+
+
+class UdevEventSource(HotplugEventSource):
+    """Reports block and tty devices events from udev, as well as changes to the mount table.
+
+    The kernel signals mount table changes by flagging `/proc/self/mountinfo` with POLLPRI, see `proc(5)`.
+
+    Events are collected from the time the source is opened, or the iteration starts if it was not. The source can
+    only be iterated once. Its resources are released once it is closed and the iteration, if any, has stopped.
+    """
+
+    def __init__(self, mountinfo_path: Path = MOUNTINFO_PATH) -> None:
+        """Initialiser."""
+        self._monitor: Optional[pyudev.Monitor] = pyudev.Monitor.from_netlink(pyudev.Context())
+        for subsystem in MONITORED_SUBSYSTEMS:
+            self._monitor.filter_by(subsystem)
+        self._mountinfo_path = mountinfo_path
+        self._mountinfo: Optional[IO[str]] = None
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        self._lock = threading.Lock()
+        self._is_iterating = False
+        self._is_closed = False
+        self._has_released_resources = False
+
+    def open(self) -> None:
+        """Starts the udev monitor and watches the mount table, opening the source more than once has no effect."""
+        with self._lock:
+            if self._is_closed or self._has_released_resources or self._mountinfo is not None:
+                return
+            cast(pyudev.Monitor, self._monitor).start()
+            # Mount table changes are signalled from the time the file is opened.
+            self._mountinfo = open(self._mountinfo_path)
+
+    def __iter__(self) -> Iterator[HotplugEvent]:
+        """Yields events as they are reported, until the source is closed."""
+        self.open()
+        with self._lock:
+            if self._is_closed or self._has_released_resources or self._is_iterating:
+                return
+            self._is_iterating = True
+        try:
+            yield from self._iter_events(cast(pyudev.Monitor, self._monitor), cast(IO[str], self._mountinfo))
+        finally:
+            with self._lock:
+                self._is_iterating = False
+                self._release_resources()
+
+    def _iter_events(self, monitor: "pyudev.Monitor", mountinfo: IO[str]) -> Iterator[HotplugEvent]:
+        poller = select.poll()
+        poller.register(monitor.fileno(), select.POLLIN)
+        poller.register(mountinfo.fileno(), select.POLLPRI | select.POLLERR)
+        poller.register(self._wakeup_read, select.POLLIN)
+        while True:
+            for file_descriptor, _ in poller.poll():
+                if file_descriptor == self._wakeup_read:
+                    return
+                if file_descriptor == mountinfo.fileno():
+                    # The notification is only cleared once the mount table has been read again.
+                    mountinfo.seek(0)
+                    mountinfo.read()
+                    yield HotplugEvent(action="change", subsystem="mount")
+                    continue
+                device = monitor.poll(timeout=0)
+                if device is not None:
+                    logger.debug(f"udev event: {device.action} {device.subsystem} {device.device_node}.")
+                    yield HotplugEvent(
+                        action=device.action, subsystem=device.subsystem, device_file_path=device.device_node
+                    )
+
+    def close(self) -> None:
+        """Stops the source, closing it more than once has no effect."""
+        with self._lock:
+            if self._is_closed:
+                return
+            self._is_closed = True
+            if self._is_iterating:
+                # The iteration releases the resources once it is woken up.
+                os.write(self._wakeup_write, b"\0")
+            else:
+                self._release_resources()
+
+    def _release_resources(self) -> None:
+        """Releases the wakeup pipe, the mount table and the udev monitor, must be called with the lock held."""
+        if self._has_released_resources:
+            return
+        self._has_released_resources = True
+        os.close(self._wakeup_read)
+        os.close(self._wakeup_write)
+        if self._mountinfo is not None:
+            self._mountinfo.close()
+            self._mountinfo = None
+        # pyudev does not provide a way of stopping a monitor, its socket is closed once it is released.
+        self._monitor = None
@@ -0,0 +1,134 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Interactions with the kernel mount table.
+
+The mount table is read from `/proc/self/mountinfo`, each line of which looks like:
+
+    36 35 98:0 /mnt1 /mnt2 rw,noatime master:1 - ext3 /dev/root rw,errors=continue
+
+The fields of interest are the third one (`major:minor` of the mounted device), the fifth one (mount point) and the
+second field after the `-` separator (mount source, which is the device file path for block devices).
+See https://www.kernel.org/doc/Documentation/filesystems/proc.txt for the full format.
+"""
+import logging
+import os
+import re
+import stat
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+MOUNTINFO_PATH = Path("/proc/self/mountinfo")
+
+OPTIONAL_FIELDS_SEPARATOR = "-"
+
+# Spaces, tabs, newlines and backslashes are octal escaped in mountinfo, e.g. "\040" for a space.
+ESCAPED_CHARACTER_PATTERN = re.compile(r"\\([0-7]{3})")
+
+
+class MountEntry(NamedTuple):
+    """A single line of the mount table."""
+
+    device_number: str  # e.g. 8:17
+    mount_point: Path  # e.g. /media/user/DAPLINK
+    source: str  # e.g. /dev/sdb1
+
+
+class MountIndex:
+    """Mount points indexed by device file path and by device number.
+
+    The index is meant to be built once per scan and shared by all detected block devices, so that the mount table is
+    only read and parsed once regardless of the number of devices connected.
+    """
+
+    def __init__(self, entries: Iterable[MountEntry]) -> None:
+        """Initialiser.
+
+        Args:
+            entries: the mount table entries to index.
+        """
+        self._by_device_path: Dict[str, List[Path]] = {}
+        self._by_device_number: Dict[str, List[Path]] = {}
+        for entry in entries:
+            if entry.source.startswith("/"):
+                self._by_device_path.setdefault(_canonical_path(entry.source), []).append(entry.mount_point)
+            if entry.device_number:
+                self._by_device_number.setdefault(entry.device_number, []).append(entry.mount_point)
+
+    @classmethod
+    def from_mount_table(cls, mountinfo_path: Path = MOUNTINFO_PATH) -> "MountIndex":
+        """Builds the index from a single read of the mount table.
+
+        Falls back to `psutil` if the mount table cannot be read, in which case only device file paths are indexed.
+        """
+        try:
+            return cls(read_mount_entries(mountinfo_path))
+        except OSError as e:
+            logger.debug(f"Could not read the mount table from '{mountinfo_path}', falling back to psutil: {e}")
+            return cls(
+                MountEntry(device_number="", mount_point=Path(part.mountpoint), source=part.device)
+                for part in psutil.disk_partitions()
+            )
+
+    def find_mount_points(self, device_file_path: str, device_number: Optional[str] = None) -> Tuple[Path, ...]:
+        """Returns the mount points of a block device.
+
+        Symbolic links, such as `/dev/disk/by-id/*`, resolve to the same mount points as the device file they point to.
+
+        Args:
+            device_file_path: path to the device file of the block device.
+            device_number: `major:minor` number of the block device, read from the device file if not specified.
+        """
+        if device_number is None:
+            device_number = _device_number(device_file_path)
+        mount_points = list(self._by_device_number.get(device_number or "", []))
+        for mount_point in self._by_device_path.get(_canonical_path(device_file_path), []):
+            if mount_point not in mount_points:
+                mount_points.append(mount_point)
+        return tuple(mount_points)
+
+
+def read_mount_entries(mountinfo_path: Path = MOUNTINFO_PATH) -> List[MountEntry]:
+    """Returns all the entries of the mount table."""
+    with open(mountinfo_path, encoding="utf-8", errors="surrogateescape") as mountinfo:
+        entries = (_parse_mountinfo_line(line) for line in mountinfo)
+        return [entry for entry in entries if entry]
+
+
+def _parse_mountinfo_line(line: str) -> Optional[MountEntry]:
+    """Parses a line of the mount table, returns None if the line is malformed."""
+    fields = line.split()
+    try:
+        separator_index = fields.index(OPTIONAL_FIELDS_SEPARATOR, 6)
+        return MountEntry(
+            device_number=fields[2],
+            mount_point=Path(_unescape(fields[4])),
+            source=_unescape(fields[separator_index + 2]),
+        )
+    except (ValueError, IndexError):
+        logger.debug(f"Ignoring malformed mount table entry: '{line.rstrip()}'.")
+        return None
+
+
+def _unescape(field: str) -> str:
+    return ESCAPED_CHARACTER_PATTERN.sub(lambda match: chr(int(match.group(1), 8)), field)
+
+
+def _canonical_path(device_file_path: str) -> str:
+    return os.path.realpath(device_file_path)
+
+
+def _device_number(device_file_path: str) -> Optional[str]:
+    """Returns the `major:minor` number of a block device file, None if it is not a block device."""
+    try:
+        device_stat = os.stat(device_file_path)
+    except OSError:
+        return None
+    if not stat.S_ISBLK(device_stat.st_mode):
+        return None
+    return f"{os.major(device_stat.st_rdev)}:{os.minor(device_stat.st_rdev)}"
@@ -0,0 +1,116 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Device detection reading sysfs directly, without relying on udev.
+
+Every USB device is listed in `/sys/bus/usb/devices`, along with its interfaces. Devices can be told apart from
+interfaces as only devices expose `idVendor` and `idProduct` attribute files.
+
+Block and tty devices are listed in `/sys/class/block` and `/sys/class/tty`, as symbolic links to their location in the
+device tree. The USB device a block or tty device belongs to is its closest ancestor in the device tree, e.g.
+
+    /sys/devices/pci0000:00/0000:00:14.0/usb1/1-2                                     <- USB device
+    /sys/devices/pci0000:00/0000:00:14.0/usb1/1-2/1-2:1.0/host3/target3:0:0/3:0:0:0/block/sdb/sdb1   <- partition
+    /sys/devices/pci0000:00/0000:00:14.0/usb1/1-2/1-2:1.1/tty/ttyACM0                 <- serial port
+
+See https://www.kernel.org/doc/Documentation/ABI/stable/sysfs-bus-usb
+"""
+import logging
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+SYSFS_ROOT = Path("/sys")
+
+
+class UsbDevice(NamedTuple):
+    """USB device as described by its sysfs attributes."""
+
+    vendor_id: str
+    product_id: str
+    serial_number: Optional[str]
+
+
+class ClassDevice(NamedTuple):
+    """Block or tty device belonging to a USB device."""
+
+    name: str  # e.g. sdb1
+    device_number: Optional[str]  # e.g. 8:17
+
+    @property
+    def device_file_path(self) -> str:
+        """Path to the device file, assuming the kernel default naming."""
+        return f"/dev/{self.name}"
+
+
+class UsbDeviceNodes(NamedTuple):
+    """A USB device along with the block and tty devices it presents."""
+
+    usb_device: UsbDevice
+    block_devices: List[ClassDevice]
+    tty_devices: List[ClassDevice]
+
+
+def list_usb_device_nodes(sysfs_root: Path = SYSFS_ROOT) -> List[UsbDeviceNodes]:
+    """Lists all USB devices presenting at least one block device, ordered by location in the device tree."""
+    usb_devices = _list_usb_devices(sysfs_root)
+    block_devices = _group_by_usb_device(sysfs_root / "class" / "block", usb_devices)
+    tty_devices = _group_by_usb_device(sysfs_root / "class" / "tty", usb_devices)
+    return [
+        UsbDeviceNodes(
+            usb_device=usb_devices[path],
+            block_devices=block_devices[path],
+            tty_devices=tty_devices.get(path, []),
+        )
+        for path in sorted(block_devices)
+    ]
+
+
+def _list_usb_devices(sysfs_root: Path) -> Dict[Path, UsbDevice]:
+    """Returns USB devices, keyed by their resolved location in the device tree."""
+    usb_devices = {}
+    for entry in _iterate_directory(sysfs_root / "bus" / "usb" / "devices"):
+        vendor_id = _read_attribute(entry / "idVendor")
+        product_id = _read_attribute(entry / "idProduct")
+        if vendor_id and product_id:
+            usb_devices[entry.resolve()] = UsbDevice(
+                vendor_id=vendor_id, product_id=product_id, serial_number=_read_attribute(entry / "serial")
+            )
+    return usb_devices
+
+
+def _group_by_usb_device(class_directory: Path, usb_devices: Dict[Path, UsbDevice]) -> Dict[Path, List[ClassDevice]]:
+    """Groups the devices of a class by the USB device they belong to, devices not on USB are left out."""
+    grouped_devices: Dict[Path, List[ClassDevice]] = {}
+    for entry in sorted(_iterate_directory(class_directory)):
+        usb_device_path = _find_usb_ancestor(entry.resolve(), usb_devices)
+        if usb_device_path is not None:
+            grouped_devices.setdefault(usb_device_path, []).append(
+                ClassDevice(name=entry.name, device_number=_read_attribute(entry / "dev"))
+            )
+    return grouped_devices
+
+
+def _find_usb_ancestor(device_path: Path, usb_devices: Dict[Path, UsbDevice]) -> Optional[Path]:
+    for ancestor in device_path.parents:
+        if ancestor in usb_devices:
+            return ancestor
+    return None
+
+
+def _iterate_directory(directory: Path) -> List[Path]:
+    try:
+        return list(directory.iterdir())
+    except OSError as e:
+        logger.debug(f"Could not list '{directory}': {e}")
+        return []
+
+
+def _read_attribute(attribute_file: Path) -> Optional[str]:
+    """Returns the stripped content of a sysfs attribute file, None if it does not exist or is empty."""
+    try:
+        return attribute_file.read_text().strip() or None
+    except OSError:
+        return None
@@ -11,7 +11,9 @@ For more information on the mbed-targets package visit https://github.com/ARMmbe
 """
 import itertools
 import logging
+import os
 import pathlib
+import threading
 
 from typing import Iterable, List, Optional
 
@@ -25,6 +27,17 @@ from mbed_devices._internal.exceptions import NoBoardForCandidate
 
 logger = logging.getLogger(__name__)
 
+# Name of the interface file written by DAPLink and other Mbed Enabled interface firmwares, compared case-insensitively.
+KNOWN_HTM_FILE_NAMES = ["mbed.htm"]
+
+# The product code and online id are found within the first few hundred bytes of the HTM files, there is no point
+# reading large files in full over a slow USB mass storage link.
+MAX_HTM_FILE_READ_SIZE = 4096
+
+# Bytes read from the HTM files since the process started, devices being resolved concurrently.
+_htm_bytes_read = 0
+_htm_bytes_read_lock = threading.Lock()
+
 
 def resolve_board(candidate: CandidateDevice) -> Board:
     """Resolves board for a given CandidateDevice.
@@ -72,6 +85,12 @@ def resolve_board(candidate: CandidateDevice) -> Board:
         raise NoBoardForCandidate
 
 
+def get_htm_bytes_read() -> int:
+    """Returns the number of bytes read from the HTM files of the devices since the process started."""
+    with _htm_bytes_read_lock:
+        return _htm_bytes_read
+
+
 def _extract_product_code(all_files_contents: Iterable[str]) -> Optional[str]:
     """Return first product code found in files contents, None if not found."""
     for contents in all_files_contents:
@@ -91,20 +110,42 @@ def _extract_online_id(all_files_contents: Iterable[str]) -> Optional[OnlineId]:
 
 
 def _get_all_htm_files_contents(directories: Iterable[pathlib.Path]) -> List[str]:
-    """Yields all htm files contents found in the list of given directories."""
-    files_in_each_directory = (directory.iterdir() for directory in directories)
-    all_files = itertools.chain.from_iterable(files_in_each_directory)
+    """Returns the contents of the interface HTM files found in the list of given directories.
+
+    Each directory is listed once. If it contains a well-known interface file, only that file is read, otherwise all the
+    HTM files found are read.
+    """
+    all_files = itertools.chain.from_iterable(_find_htm_files(directory) for directory in directories)
     return _read_htm_file_contents(all_files)
 
 
+def _find_htm_files(directory: pathlib.Path) -> List[pathlib.Path]:
+    """Returns the well-known interface files found in the directory, or all HTM files if there are none."""
+    with os.scandir(directory) as entries:
+        htm_files = sorted(pathlib.Path(entry.path) for entry in entries if _is_htm_file(pathlib.Path(entry.name)))
+    known_files = [file for file in htm_files if file.name.lower() in KNOWN_HTM_FILE_NAMES]
+    return known_files or htm_files
+
+
 def _read_htm_file_contents(all_files: Iterable[pathlib.Path]) -> List[str]:
+    global _htm_bytes_read
     htm_files_contents = []
+    files_read = []
+    bytes_read = 0
     for file in all_files:
         if _is_htm_file(file):
             try:
-                htm_files_contents.append(file.read_text())
+                with file.open("rb") as htm_file:
+                    contents = htm_file.read(MAX_HTM_FILE_READ_SIZE)
             except OSError:
                 logger.warning(f"The file '{file}' could not be read from the device, target may not be identified.")
+                continue
+            files_read.append(str(file))
+            bytes_read += len(contents)
+            htm_files_contents.append(contents.decode("utf-8", errors="replace"))
+    with _htm_bytes_read_lock:
+        _htm_bytes_read += bytes_read
+    logger.debug(f"Read {bytes_read} bytes from the HTM files {files_read}.")
     return htm_files_contents
 
 
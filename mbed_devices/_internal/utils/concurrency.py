@@ -0,0 +1,158 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Helpers for running blocking calls concurrently."""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Optional, TypeVar
+
+T = TypeVar("T")
+
+# The task run by each worker thread, if any.
+_current_call = threading.local()
+
+
+class CallTimedOut(TimeoutError):
+    """The call did not complete within its deadline."""
+
+
+class DeadlineExecutor:
+    """Runs calls on a bounded pool of threads, allowing each call a limited time to complete.
+
+    The deadline of a call starts when a worker picks it up, so that calls waiting for a free worker are not penalised.
+    Calls still running past their deadline are abandoned rather than interrupted, which Python does not allow: they
+    keep running on a daemon thread, which cannot prevent the interpreter from exiting, and a new worker takes over the
+    remaining calls. Abandoned calls should check `is_current_call_abandoned` before having any side effect, as their
+    outcome is no longer expected.
+
+    Workers are started as calls are submitted and stop once there is nothing left to run, so the executor does not
+    need to be shut down.
+    """
+
+    def __init__(self, timeout: float, max_workers: int, name: str = "worker") -> None:
+        """Initialiser.
+
+        Args:
+            timeout: the time each call is allowed to take, in seconds.
+            max_workers: the maximum number of calls running at the same time, not counting abandoned calls.
+            name: prefix of the name of the worker threads.
+        """
+        self._timeout = timeout
+        self._max_workers = max_workers
+        self._name = name
+        self._pending_tasks: Deque[_Task] = deque()
+        self._supervised_tasks: Deque[_Task] = deque()
+        self._number_of_workers = 0
+        self._number_of_running_calls = 0
+        self._is_supervising = False
+        self._state_changed = threading.Condition()
+
+    def submit(self, function: Callable[[T], Any], argument: T) -> Future:
+        """Schedules a call to the function with the argument.
+
+        Returns:
+            A future which completes when the call does or when its deadline passes. The future of an abandoned call
+            holds a `CallTimedOut` exception.
+        """
+        task = _Task(function, argument)
+        with self._state_changed:
+            self._pending_tasks.append(task)
+            self._supervised_tasks.append(task)
+            if self._number_of_workers < self._max_workers:
+                self._start_thread(self._run_tasks)
+                self._number_of_workers += 1
+            if not self._is_supervising:
+                self._start_thread(self._enforce_deadlines, "supervisor")
+                self._is_supervising = True
+        return task.future
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Waits until all the calls submitted have returned, including those which were abandoned.
+
+        Args:
+            timeout: the maximum time to wait for, in seconds, no limit if not specified.
+
+        Returns:
+            Whether all the calls have returned.
+        """
+        with self._state_changed:
+            return self._state_changed.wait_for(
+                lambda: not self._pending_tasks and not self._number_of_running_calls, timeout
+            )
+
+    def _start_thread(self, target: Callable[[], None], suffix: str = "") -> None:
+        name = f"{self._name}-{suffix}" if suffix else self._name
+        threading.Thread(target=target, name=name, daemon=True).start()
+
+    def _run_tasks(self) -> None:
+        while True:
+            with self._state_changed:
+                if not self._pending_tasks:
+                    self._number_of_workers -= 1
+                    return
+                task = self._pending_tasks.popleft()
+                if not task.future.set_running_or_notify_cancel():
+                    self._state_changed.notify_all()
+                    continue
+                task.started_at = time.monotonic()
+                self._number_of_running_calls += 1
+                self._state_changed.notify_all()
+            _current_call.task = task
+            try:
+                result, exception = task.function(task.argument), None
+            except BaseException as e:
+                result, exception = None, e
+            finally:
+                _current_call.task = None
+            with self._state_changed:
+                self._number_of_running_calls -= 1
+                self._state_changed.notify_all()
+                if task.future.done():
+                    # The call was abandoned, the thread is no longer counted as a worker.
+                    return
+                if exception is not None:
+                    task.future.set_exception(exception)
+                else:
+                    task.future.set_result(result)
+                self._state_changed.notify_all()
+
+    def _enforce_deadlines(self) -> None:
+        # Tasks are started in the order they are submitted, so their deadlines expire in that order too.
+        with self._state_changed:
+            while self._supervised_tasks:
+                task = self._supervised_tasks[0]
+                if task.future.done():
+                    self._supervised_tasks.popleft()
+                    continue
+                if task.started_at is None:
+                    self._state_changed.wait()
+                    continue
+                remaining_time = task.started_at + self._timeout - time.monotonic()
+                if remaining_time > 0:
+                    self._state_changed.wait(remaining_time)
+                    continue
+                task.future.set_exception(CallTimedOut(f"The call did not complete within {self._timeout} seconds."))
+                self._supervised_tasks.popleft()
+                self._number_of_workers -= 1
+                if self._pending_tasks:
+                    self._start_thread(self._run_tasks)
+                    self._number_of_workers += 1
+            self._is_supervising = False
+
+
+def is_current_call_abandoned() -> bool:
+    """States whether the call running on the current thread was abandoned by its `DeadlineExecutor`."""
+    task: Optional[_Task] = getattr(_current_call, "task", None)
+    # The future of a running call is only completed by the executor once the call returns, unless it is abandoned.
+    return task is not None and task.future.done()
+
+
+class _Task:
+    def __init__(self, function: Callable[[Any], Any], argument: Any) -> None:
+        self.function = function
+        self.argument = argument
+        self.future: Future = Future()
+        self.started_at: Optional[float] = None
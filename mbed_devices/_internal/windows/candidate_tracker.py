@@ -0,0 +1,220 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Keeps track of the candidate devices on Windows, from the hotplug events reported by the WMI service.
+
+The system data is only loaded in full by the first scan. On each event, only the components affected are loaded or
+dropped, and only the USB device they belong to is aggregated again.
+"""
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, cast
+
+from mbed_devices._internal.candidate_device import CandidateDevice
+from mbed_devices._internal.hotplug import CandidateTracker, HotplugEvent
+from mbed_devices._internal.windows.component_descriptor import ComponentDescriptor
+from mbed_devices._internal.windows.component_descriptor_utils import is_undefined_value
+from mbed_devices._internal.windows.device_detector import WindowsDeviceDetector
+from mbed_devices._internal.windows.device_instance_id import ParentIdPrefixCache
+from mbed_devices._internal.windows.disk_aggregation import WindowsDiskDataAggregator
+from mbed_devices._internal.windows.disk_drive import DiskDrive
+from mbed_devices._internal.windows.disk_partition import DiskPartition
+from mbed_devices._internal.windows.disk_partition_logical_disk_relationships import (
+    DiskPartitionLogicalDiskRelationship,
+)
+from mbed_devices._internal.windows.hotplug_event_source import LOGICAL_DISK_CLASS, PNP_ENTITY_CLASS
+from mbed_devices._internal.windows.logical_disk import LogicalDisk
+from mbed_devices._internal.windows.serial_port import SerialPort
+from mbed_devices._internal.windows.system_data_loader import (
+    SYSTEM_DATA_TYPES,
+    ComponentSource,
+    SystemDataLoader,
+    Win32ComponentSource,
+)
+from mbed_devices._internal.windows.usb_data_aggregation import AggregatedUsbData, SystemUsbData
+from mbed_devices._internal.windows.usb_hub import UsbHub
+
+logger = logging.getLogger(__name__)
+
+# Types of the PnP entities making up a USB device.
+PNP_ENTITY_TYPES = [UsbHub, SerialPort, DiskDrive]
+
+
+class _TrackedSystemData(SystemDataLoader):
+    """System data loaded once, then updated component by component."""
+
+    def __init__(self, system_data: Dict[type, List[ComponentDescriptor]]) -> None:
+        """Initialiser."""
+        super().__init__()
+        self._system_data = {cls: list(system_data.get(cls, list())) for cls in SYSTEM_DATA_TYPES}
+
+    def add(self, cls: type, components: Iterable[ComponentDescriptor]) -> None:
+        """Adds components of a type."""
+        self.system_data[cls].extend(components)
+
+    def remove(self, cls: type, predicate: Callable[[ComponentDescriptor], bool]) -> None:
+        """Removes the components of a type satisfying a predicate."""
+        self.system_data[cls] = [component for component in self.system_data[cls] if not predicate(component)]
+
+    def replace(self, cls: type, components: Iterable[ComponentDescriptor]) -> None:
+        """Replaces all the components of a type."""
+        self.system_data[cls] = list(components)
+
+
+def _has_id(component: ComponentDescriptor, field_name: str, component_id: str) -> bool:
+    """States whether a field of a component holds an ID, IDs being compared without regard to case."""
+    value = component.get(field_name)
+    return isinstance(value, str) and value.upper() == component_id.upper()
+
+
+def _get_component_ids(usb_data: AggregatedUsbData) -> List[str]:
+    """Returns the IDs reported by hotplug events for all the components of a USB device."""
+    ids = [cast(UsbHub, hub).pnp_id for hub in usb_data.get("related_usb_interfaces")]
+    ids.extend(cast(SerialPort, port).pnp_id for port in usb_data.get("serial_port"))
+    for disk in usb_data.get("disks"):
+        ids.extend([disk.component_id, disk.get("pnp_device_id")])
+    return [component_id.upper() for component_id in ids if not is_undefined_value(component_id)]
+
+
+class WindowsCandidateTracker(CandidateTracker):
+    """Keeps track of the candidate devices, aggregating again only the USB devices affected by each event."""
+
+    def __init__(
+        self,
+        component_source: Optional[ComponentSource] = None,
+        parent_id_prefix_cache: Optional[ParentIdPrefixCache] = None,
+    ) -> None:
+        """Initialiser.
+
+        Args:
+            component_source: loads the system components, from the WMI service if not specified.
+            parent_id_prefix_cache: `ParentIdPrefix` of the devices, the cache shared across scans if not specified.
+        """
+        self._component_source = component_source if component_source is not None else Win32ComponentSource()
+        self._parent_id_prefix_cache = parent_id_prefix_cache
+        self._system_data: Optional[_TrackedSystemData] = None
+        self._candidates: Dict[str, CandidateDevice] = dict()
+        # Serial number of the USB device each component belongs to, by the ID reported by hotplug events.
+        self._serial_numbers_by_component_id: Dict[str, str] = dict()
+        # Scans and updates may be requested from several threads, e.g. by a DeviceWatcher running in the background.
+        self._lock = threading.RLock()
+
+    def scan(self) -> List[CandidateDevice]:
+        """Loads all the system data and detects all the candidate devices connected."""
+        with self._lock:
+            self._system_data = _TrackedSystemData(self._component_source.load_system_data())
+            self._candidates = dict()
+            self._serial_numbers_by_component_id = dict()
+            for usb_data in self._make_usb_data().iter_devices():
+                self._track(usb_data)
+            return list(self._candidates.values())
+
+    def update(self, event: HotplugEvent) -> Dict[str, Optional[CandidateDevice]]:
+        """Updates the candidate devices affected by an event.
+
+        Events which do not identify a component lead to a full scan.
+        """
+        with self._lock:
+            return self._update(event)
+
+    def _update(self, event: HotplugEvent) -> Dict[str, Optional[CandidateDevice]]:
+        component_id = event.device_file_path
+        handlers = self._EVENT_HANDLERS.get(event.subsystem, dict())
+        handler = handlers.get(event.action)
+        if self._system_data is None or handler is None or not component_id:
+            return self._rescan()
+
+        known_serial_number = self._serial_numbers_by_component_id.get(component_id.upper())
+        handler(self, component_id)
+        usb_data = self._make_usb_data()
+        serial_numbers = {known_serial_number} if known_serial_number else set()
+        if event.action == "add":
+            serial_numbers.update(self._identify_new_component(event.subsystem, component_id, usb_data))
+        logger.debug(f"Devices affected by {event}: {serial_numbers}.")
+
+        changes: Dict[str, Optional[CandidateDevice]] = dict()
+        for serial_number in serial_numbers:
+            previous = self._candidates.pop(serial_number, None)
+            self._forget(serial_number)
+            for aggregated_usb_data in usb_data.iter_devices(serial_number=serial_number):
+                self._track(aggregated_usb_data)
+            current = self._candidates.get(serial_number)
+            if current != previous:
+                changes[serial_number] = current
+        return changes
+
+    def _rescan(self) -> Dict[str, Optional[CandidateDevice]]:
+        previous = self._candidates
+        current = {candidate.serial_number: candidate for candidate in self.scan()}
+        changes: Dict[str, Optional[CandidateDevice]] = {s: None for s in previous if s not in current}
+        changes.update({s: candidate for s, candidate in current.items() if previous.get(s) != candidate})
+        return changes
+
+    def _make_usb_data(self) -> SystemUsbData:
+        return SystemUsbData(cast(_TrackedSystemData, self._system_data), self._parent_id_prefix_cache)
+
+    def _track(self, usb_data: AggregatedUsbData) -> None:
+        serial_number = usb_data.uid.uid.presumed_serial_number
+        for component_id in _get_component_ids(usb_data):
+            self._serial_numbers_by_component_id[component_id] = serial_number
+        if WindowsDeviceDetector.is_valid_candidate(usb_data):
+            self._candidates[serial_number] = WindowsDeviceDetector.map_to_candidate(usb_data)
+
+    def _forget(self, serial_number: str) -> None:
+        self._serial_numbers_by_component_id = {
+            component_id: s for component_id, s in self._serial_numbers_by_component_id.items() if s != serial_number
+        }
+
+    def _identify_new_component(self, subsystem: str, component_id: str, usb_data: SystemUsbData) -> Set[str]:
+        """Determines the serial numbers of the USB devices a component which was just added belongs to."""
+        system_data = cast(_TrackedSystemData, self._system_data)
+        serial_numbers = set()
+        if subsystem == PNP_ENTITY_CLASS:
+            serial_numbers.add(usb_data.get_presumed_serial_number(component_id))
+            serial_numbers.update(
+                cast(DiskDrive, disk).uid.presumed_serial_number
+                for disk in system_data.get_system_data(DiskDrive)
+                if _has_id(disk, "PNPDeviceID", component_id)
+            )
+        else:
+            aggregator = WindowsDiskDataAggregator(system_data)
+            serial_numbers.update(
+                aggregator.aggregate(cast(LogicalDisk, logical_disk)).get("uid").presumed_serial_number
+                for logical_disk in system_data.get_system_data(LogicalDisk)
+                if _has_id(logical_disk, "DeviceID", component_id)
+            )
+        return {s for s in serial_numbers if s and not is_undefined_value(s)}
+
+    def _on_pnp_entity_added(self, pnp_id: str) -> None:
+        system_data = cast(_TrackedSystemData, self._system_data)
+        for cls in PNP_ENTITY_TYPES:
+            system_data.remove(cls, lambda component: _has_id(component, "PNPDeviceID", pnp_id))
+            system_data.add(cls, self._component_source.load_matching(cls, "PNPDeviceID", pnp_id))
+
+    def _on_pnp_entity_removed(self, pnp_id: str) -> None:
+        system_data = cast(_TrackedSystemData, self._system_data)
+        for cls in PNP_ENTITY_TYPES:
+            system_data.remove(cls, lambda component: _has_id(component, "PNPDeviceID", pnp_id))
+
+    def _on_logical_disk_added(self, label: str) -> None:
+        system_data = cast(_TrackedSystemData, self._system_data)
+        system_data.remove(LogicalDisk, lambda component: _has_id(component, "DeviceID", label))
+        system_data.add(LogicalDisk, self._component_source.load_matching(LogicalDisk, "DeviceID", label))
+        # Partitions and their relationships to logical disks are not PnP entities, and have no creation events.
+        for cls in (DiskPartition, DiskPartitionLogicalDiskRelationship):
+            system_data.replace(cls, self._component_source.load_all(cls))
+
+    def _on_logical_disk_removed(self, label: str) -> None:
+        system_data = cast(_TrackedSystemData, self._system_data)
+        system_data.remove(LogicalDisk, lambda component: _has_id(component, "DeviceID", label))
+        system_data.remove(
+            DiskPartitionLogicalDiskRelationship,
+            lambda relationship: cast(DiskPartitionLogicalDiskRelationship, relationship).logical_disk_id.upper()
+            == label.upper(),
+        )
+
+    _EVENT_HANDLERS: Dict[str, Dict[str, Callable[["WindowsCandidateTracker", str], None]]] = {
+        PNP_ENTITY_CLASS: {"add": _on_pnp_entity_added, "remove": _on_pnp_entity_removed},
+        LOGICAL_DISK_CLASS: {"add": _on_logical_disk_added, "remove": _on_logical_disk_removed},
+    }
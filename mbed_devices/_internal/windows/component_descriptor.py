@@ -5,55 +5,188 @@
 """Defines a generic Win32 component."""
 import logging
 from abc import ABC, abstractmethod
-from typing import List, Any, Generator, Optional, NamedTuple, cast
+from typing import Dict, FrozenSet, List, Any, Callable, Generator, Optional, NamedTuple, Tuple, cast
 
-import pythoncom
-import win32com.client
-
-from mbed_devices._internal.windows.component_descriptor_utils import (
-    UNKNOWN_VALUE,
-    is_undefined_data_object,
-)
+from mbed_devices._internal.windows.component_descriptor_utils import UNKNOWN_VALUE, is_undefined_value
 
 NAMED_TUPLE_FIELDS_ATTRIBUTE = "_fields"
 
 logger = logging.getLogger(__name__)
 
+# Flags of IWbemServices::ExecQuery enumerating results once, as they are found.
+# See https://docs.microsoft.com/en-us/windows/win32/api/wbemcli/ne-wbemcli-wbem_generic_flag_type
+WBEM_FLAG_RETURN_IMMEDIATELY = 0x10
+WBEM_FLAG_FORWARD_ONLY = 0x20
+
+WmiConnectionFactory = Callable[[], Any]
+"""Returns a connection to the WMI service, usable on the calling thread."""
+
+
+def connect_to_wmi() -> Any:
+    """Initialises COM on the calling thread and returns a connection to the WMI service."""
+    # Imported here so that the components can be loaded from other sources where pywin32 is unavailable.
+    import pythoncom
+    import win32com.client
+
+    # Setting pyWin32 so that it can be used across multiple threads
+    # See:
+    # https://stackoverflow.com/questions/37258257/why-does-this-script-not-work-with-threading-python
+    # https://gist.github.com/vlasenkov/f8fe40d5b2d9e43fd46ad8363067acce
+    # https://stackoverflow.com/questions/26764978/using-win32com-with-multithreading/27966218#27966218
+    pythoncom.CoInitialize()
+    try:
+        return win32com.client.GetObject("winmgmts:")
+    except BaseException:
+        # No connection is handed over to be released by `disconnect_from_wmi`.
+        pythoncom.CoUninitialize()
+        raise
+
+
+def disconnect_from_wmi() -> None:
+    """Uninitialises COM on the calling thread, once the connections established by `connect_to_wmi` are released."""
+    import pythoncom
+
+    pythoncom.CoUninitialize()
+
+
+class _ComponentLayout(NamedTuple):
+    """Definition of the descriptors of a kind of component, shared by all of them.
+
+    The values of a descriptor are held in a tuple aligned with the field names of its layout, which are the queried
+    fields unless other fields of the definition are set.
+    """
+
+    win32_definition: type
+    win32_class_name: str
+    win32_filter: Optional[str]
+    win32_fields: Tuple[str, ...]
+    win32_usb_filter: Optional[str]
+    field_names: Tuple[str, ...]
+    field_indexes: Dict[str, int]
+    definition_field_names: FrozenSet[str]
+    undefined_values: tuple
+
+
+_LAYOUTS: Dict[tuple, _ComponentLayout] = dict()
+
+
+def _get_layout(
+    win32_definition: type,
+    win32_class_name: str,
+    win32_filter: Optional[str],
+    win32_fields: Tuple[str, ...],
+    win32_usb_filter: Optional[str],
+    field_names: Tuple[str, ...],
+) -> _ComponentLayout:
+    """Returns the layout of descriptors, creating it the first time it is needed."""
+    key = (win32_definition, win32_class_name, win32_filter, win32_fields, win32_usb_filter, field_names)
+    layout = _LAYOUTS.get(key)
+    if layout is None:
+        layout = _ComponentLayout(
+            win32_definition,
+            win32_class_name,
+            win32_filter,
+            win32_fields,
+            win32_usb_filter,
+            field_names,
+            {name: index for index, name in enumerate(field_names)},
+            frozenset(getattr(win32_definition, NAMED_TUPLE_FIELDS_ATTRIBUTE)),
+            (UNKNOWN_VALUE,) * len(field_names),
+        )
+        _LAYOUTS[key] = layout
+    return layout
+
 
 class ComponentDescriptor(ABC):
-    """Win32 component descriptor."""
+    """Win32 component descriptor.
+
+    The field values are held in a tuple built once when they are set, and the definition of the component is shared
+    by all its descriptors. Descriptors have no instance dictionary, subclasses must declare empty `__slots__`.
+    """
 
-    def __init__(self, win32_definition: type, win32_class_name: str, win32_filter: Optional[str] = None):
+    __slots__ = ("_layout", "_values", "_is_undefined")
+
+    def __init__(
+        self,
+        win32_definition: type,
+        win32_class_name: str,
+        win32_filter: Optional[str] = None,
+        win32_fields: Optional[List[str]] = None,
+        win32_usb_filter: Optional[str] = None,
+    ):
         """Initialiser.
 
         Args:
             win32_definition: definition of the Windows component as defined in MSDN.
             win32_class_name: Win32 class name of the component
             win32_filter: Any extra filter to apply such as a subcategory of a Win32 class.
+            win32_fields: names of the fields to retrieve from the system, all the fields of the definition if not
+                specified.
+            win32_usb_filter: filter leaving out the components which do not relate to USB devices, if any.
         """
-        self._win32_definition = win32_definition
-        self._win32_class_name = win32_class_name
-        self._win32_filter = win32_filter
+        queried_field_names = tuple(win32_fields or getattr(win32_definition, NAMED_TUPLE_FIELDS_ATTRIBUTE))
+        self._layout = _get_layout(
+            win32_definition,
+            win32_class_name,
+            win32_filter,
+            queried_field_names,
+            win32_usb_filter,
+            queried_field_names,
+        )
+        self._values = self._layout.undefined_values
+        self._is_undefined: Optional[bool] = None
 
     def set_data_values(self, fields_values: dict) -> None:
-        """Sets fields values based on what is defined in dictionary."""
+        """Sets fields values based on what is defined in dictionary.
+
+        Raises:
+            ValueError: a field is not part of the definition.
+        """
+        layout = self._layout
+        if not all(name in layout.field_indexes for name in fields_values):
+            unknown_field_names = set(fields_values) - layout.definition_field_names
+            if unknown_field_names:
+                raise ValueError(f"{self.__class__.__name__} has no fields {sorted(unknown_field_names)}")
+            # Fields which are not queried are set, all the fields of the definition are held from now on.
+            layout = _get_layout(*layout[:5], getattr(layout.win32_definition, NAMED_TUPLE_FIELDS_ATTRIBUTE))
+        values = list(self._values) if layout is self._layout else [getattr(self, k) for k in layout.field_names]
         for k, v in fields_values.items():
-            setattr(self, k, v)
+            values[layout.field_indexes[k]] = v
+        self._layout = layout
+        self._values = tuple(values)
+        self._is_undefined = None
+
+    def __getattr__(self, field_name: str) -> Any:
+        """Gets the value of a field, e.g. `hub.PNPDeviceID`."""
+        if field_name.startswith("_"):
+            # Slots which are not set yet, e.g. while initialising.
+            raise AttributeError(field_name)
+        index = self._layout.field_indexes.get(field_name)
+        if index is not None:
+            return self._values[index]
+        if field_name in self._layout.definition_field_names:
+            return UNKNOWN_VALUE
+        raise AttributeError(f"{self.__class__.__name__} has no field {field_name}")
 
     @property
     def win32_definition(self) -> type:
         """Gets descriptor definition."""
-        return self._win32_definition
+        return self._layout.win32_definition
 
     @property
     def win32_class_name(self) -> str:
         """Returns the name of the Win32 Class."""
-        return self._win32_class_name
+        return self._layout.win32_class_name
 
     @property
     def field_names(self) -> List[str]:
         """Returns the names of all the fields of the descriptor."""
-        return [k for k in getattr(self._win32_definition, NAMED_TUPLE_FIELDS_ATTRIBUTE)]
+        return [k for k in getattr(self._layout.win32_definition, NAMED_TUPLE_FIELDS_ATTRIBUTE)]
+
+    @property
+    def queried_field_names(self) -> List[str]:
+        """Returns the names of the fields retrieved from the system."""
+        return list(self._layout.win32_fields)
 
     @property
     @abstractmethod
@@ -66,16 +199,33 @@ class ComponentDescriptor(ABC):
 
         For instance, the current component can be a subclass/subcategory of a component exposed by Win32.
         """
-        return self._win32_filter
+        return self._layout.win32_filter
+
+    @property
+    def win32_usb_filter(self) -> Optional[str]:
+        """Filter leaving out the components which do not relate to USB devices."""
+        return self._layout.win32_usb_filter
+
+    @property
+    def win32_query(self) -> str:
+        """WQL query retrieving the components from the system."""
+        return self.build_win32_query()
+
+    def build_win32_query(self, extra_filters: Optional[List[str]] = None) -> str:
+        """Builds the WQL query retrieving the components from the system which also satisfy extra filters."""
+        filters = [f for f in [self.win32_filter, self.win32_usb_filter] if f] + (extra_filters or [])
+        return build_query(self.win32_class_name, self.queried_field_names, filters)
 
     def to_tuple(self) -> NamedTuple:
-        """Translates into named tuple."""
-        return cast(NamedTuple, self.win32_definition(**{k: self.get(k) for k in self.field_names}))
+        """Translates into named tuple, fields which were not set being unknown."""
+        return cast(NamedTuple, self.win32_definition(*(getattr(self, k) for k in self.field_names)))
 
     @property
     def is_undefined(self) -> bool:
         """Determines whether the structure is undefined or not i.e. none of the fields are actually defined."""
-        return is_undefined_data_object(self.to_tuple())
+        if self._is_undefined is None:
+            self._is_undefined = all(is_undefined_value(v) for v in self._values)
+        return self._is_undefined
 
     def get(self, field_name: str) -> Any:
         """Gets the field value."""
@@ -85,24 +235,45 @@ class ComponentDescriptor(ABC):
             logger.debug(f"Attribute [{field_name}] is undefined on this instance {self}: {e}")
             return UNKNOWN_VALUE
 
+    @property
+    def known_values(self) -> Dict[str, Any]:
+        """Returns the values of the fields which are known, e.g. which were queried."""
+        return {
+            k: v
+            for k, v in zip(self._layout.field_names, self._values)
+            if not (isinstance(v, str) and v == UNKNOWN_VALUE)
+        }
+
     def __str__(self) -> str:
         """String representation."""
-        values = {k: v for k, v in self.__dict__.items() if not k.startswith("_")}
-        return f"{self.__class__.__name__}({values})"
+        return f"{self.__class__.__name__}({self.known_values})"
+
+
+def escape_wql_string(value: str) -> str:
+    """Escapes a value so that it can be used as a WQL string literal, e.g. a device ID containing backslashes."""
+    return value.replace("\\", "\\\\").replace("'", "\\'")
+
+
+def build_query(win32_class_name: str, field_names: List[str], filters: List[str]) -> str:
+    """Builds a WQL query selecting fields of the instances of a class which satisfy all the filters."""
+    query = f"Select {', '.join(field_names) or '*'} from {win32_class_name}"
+    if filters:
+        query += " where " + " and ".join(f"({f})" if len(filters) > 1 else f for f in filters)
+    return query
 
 
 class Win32Wrapper:
     """Wraps win32 objects and methods in order to simplify their use."""
 
-    def __init__(self) -> None:
-        """Wrapper initialisation."""
-        # Setting pyWin32 so that it can be used across multiple threads
-        # See:
-        # https://stackoverflow.com/questions/37258257/why-does-this-script-not-work-with-threading-python
-        # https://gist.github.com/vlasenkov/f8fe40d5b2d9e43fd46ad8363067acce
-        # https://stackoverflow.com/questions/26764978/using-win32com-with-multithreading/27966218#27966218
-        pythoncom.CoInitialize()
-        self.wmi = win32com.client.GetObject("winmgmts:")
+    def __init__(self, wmi: Optional[Any] = None) -> None:
+        """Wrapper initialisation.
+
+        Args:
+            wmi: connection to the WMI service, established on the calling thread if not specified.
+        """
+        self.wmi = wmi if wmi is not None else connect_to_wmi()
+        # Number of fields read from the elements returned, each being a COM call.
+        self.property_reads = 0
 
     def _read_cdispatch_fields(self, win32_element: Any, element_fields_list: List[str]) -> dict:
         """Reads all the fields from a cdispatch object returned by pywin32."""
@@ -112,6 +283,7 @@ class Win32Wrapper:
 
     def _read_cdispatch_field(self, win32_element: Any, key: str) -> Any:
         """Reads a specific field on a cdispatch object."""
+        self.property_reads += 1
         try:
             return getattr(win32_element, key)
         except AttributeError as e:
@@ -121,32 +293,36 @@ class Win32Wrapper:
     def map_element(self, win32_element: Any, to_cls: type) -> ComponentDescriptor:
         """Maps a win32 element into an element of the class `to_cls`."""
         instance = to_cls()
-        instance.set_data_values(self._read_cdispatch_fields(win32_element, instance.field_names))
+        instance.set_data_values(self._read_cdispatch_fields(win32_element, instance.queried_field_names))
         return cast(ComponentDescriptor, instance)
 
-    def _get_list_iterator(self, win32_class_name: str, list_filter: Optional[str]) -> Generator[Any, None, None]:
-        if list_filter:
-            query = f"Select * from {win32_class_name} where {list_filter}"
-            return self.wmi.ExecQuery(query)  # type: ignore
-        return self.wmi.InstancesOf(win32_class_name)  # type: ignore
+    def _get_list_iterator(self, query: str) -> Generator[Any, None, None]:
+        return self.wmi.ExecQuery(  # type: ignore
+            query, "WQL", WBEM_FLAG_FORWARD_ONLY | WBEM_FLAG_RETURN_IMMEDIATELY
+        )
 
-    def element_generator(
-        self, to_cls: type, win32_class_name: str, list_filter: Optional[str]
-    ) -> Generator["ComponentDescriptor", None, None]:
-        """Gets a generator over all elements currently registered in the system."""
-        for element in self._get_list_iterator(win32_class_name, list_filter):
+    def element_generator(self, to_cls: type, query: str) -> Generator["ComponentDescriptor", None, None]:
+        """Gets a generator over the elements returned by a WQL query."""
+        for element in self._get_list_iterator(query):
             yield self.map_element(win32_element=element, to_cls=to_cls)
 
 
 class ComponentDescriptorWrapper:
     """Wraps a component descriptor."""
 
-    def __init__(self, cls: type):
-        """initialiser."""
+    def __init__(self, cls: type, win32_wrapper: Optional[Win32Wrapper] = None):
+        """initialiser.
+
+        Args:
+            cls: component descriptor class.
+            win32_wrapper: wrapper of the connection to use, a new connection is established if not specified.
+        """
         self._cls = cls
-        self._win32_wrapper = Win32Wrapper()
+        self._win32_wrapper = win32_wrapper if win32_wrapper is not None else Win32Wrapper()
 
-    def element_generator(self) -> Generator["ComponentDescriptor", None, None]:
-        """Gets a generator over all elements currently registered in the system."""
+    def element_generator(
+        self, extra_filters: Optional[List[str]] = None
+    ) -> Generator["ComponentDescriptor", None, None]:
+        """Gets a generator over all elements currently registered in the system, which satisfy extra filters if any."""
         instance = self._cls()
-        return self._win32_wrapper.element_generator(self._cls, instance.win32_class_name, instance.win32_filter)
+        return self._win32_wrapper.element_generator(self._cls, instance.build_win32_query(extra_filters))
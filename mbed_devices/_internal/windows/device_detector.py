@@ -4,28 +4,38 @@
 #
 """Defines a device detector for Windows."""
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Optional
 
 from mbed_devices._internal.base_detector import DeviceDetector
 from mbed_devices._internal.candidate_device import CandidateDevice
 from mbed_devices._internal.windows.system_data_loader import SystemDataLoader
 from mbed_devices._internal.windows.usb_data_aggregation import SystemUsbData, AggregatedUsbData
 
+# Time after which the system data is loaded again by a detector, in seconds.
+SYSTEM_DATA_TTL = 1.0
+
 
 class WindowsDeviceDetector(DeviceDetector):
     """Windows specific implementation of device detection."""
 
-    def __init__(self) -> None:
-        """Initialiser."""
-        self._data_loader = SystemDataLoader()
+    def __init__(self, system_data_ttl: Optional[float] = SYSTEM_DATA_TTL) -> None:
+        """Initialiser.
+
+        Args:
+            system_data_ttl: time after which the system data is loaded again, so that a detector can be reused
+                across scans, in seconds. The data is never loaded again if None.
+        """
+        self._data_loader = SystemDataLoader(ttl=system_data_ttl)
 
     def find_candidates(self) -> List[CandidateDevice]:
         """Return a generator of Candidates."""
-        return [
-            WindowsDeviceDetector.map_to_candidate(usb)
-            for usb in SystemUsbData(data_loader=self._data_loader).all()
-            if WindowsDeviceDetector.is_valid_candidate(usb)
-        ]
+        return list(self.iter_candidates())
+
+    def iter_candidates(self, serial_number: Optional[str] = None) -> Iterator[CandidateDevice]:
+        """Yields Candidates as they are found, only those with a serial number if specified."""
+        for usb in SystemUsbData(data_loader=self._data_loader).iter_devices(serial_number=serial_number):
+            if WindowsDeviceDetector.is_valid_candidate(usb):
+                yield WindowsDeviceDetector.map_to_candidate(usb)
 
     @staticmethod
     def map_to_candidate(usb_data: AggregatedUsbData) -> CandidateDevice:
@@ -2,25 +2,54 @@
 # Copyright (C) 2020 Arm Mbed. All rights reserved.
 # SPDX-License-Identifier: Apache-2.0
 #
-"""Utility in charge of finding the instance ID of a device."""
-import win32con
-import win32api
-from mbed_devices._internal.exceptions import SystemException
+"""Utility in charge of finding the instance ID of a device.
+
+The `ParentIdPrefix` of a device is read from the registry. As it does not change while the device is plugged in, the
+values read are kept across scans by `ParentIdPrefixCache`, which only reads the registry for devices it has not seen.
+"""
 import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Optional
 
-from typing import Optional, Any
+from mbed_devices._internal.exceptions import SystemException
 
 logger = logging.getLogger(__name__)
 
+# Although the registry should not be accessed directly
+# (See https://docs.microsoft.com/en-us/windows-hardware/drivers/install/hklm-system-currentcontrolset-enum-registry-tree), # noqa E501
+# and SetupDi functions/APIs should be used instead in a similar fashion to Miro utility
+# (See https://github.com/cool-RR/Miro/blob/7b9ecd9bc0878e463f5a5e26e8b00b675e3f98ac/tv/windows/plat/usbutils.py)
+# Most libraries seems to be reading the registry:
+#     - Pyserial: https://github.com/pyserial/pyserial/blob/master/serial/tools/list_ports_windows.py
+#     - Node serialport: https://github.com/serialport/node-serialport/blob/cd112ca5a3a3fe186e1ac6fa78eeeb5ea7396185/packages/bindings/src/serialport_win.cpp # noqa E501
+#     - USB device forensics: https://github.com/woanware/usbdeviceforensics/blob/master/pyTskusbdeviceforensics.py
+# For more details about the registry key actually looked at, See:
+# - https://stackoverflow.com/questions/3331043/get-list-of-connected-usb-devices
+# - https://docs.microsoft.com/en-us/windows-hardware/drivers/usbcon/usb-device-specific-registry-settings
+ENUM_REGISTRY_KEY = "SYSTEM\\CurrentControlSet\\Enum"
+PARENT_ID_PREFIX_VALUE_NAME = "ParentIdPrefix"
+
 
 class RegKey(object):
     """Context manager in charge of opening and closing registry keys."""
 
-    def __init__(self, sub_registry_key: str) -> None:
-        """Initialiser."""
+    def __init__(self, sub_registry_key: str, parent_key: Any = None) -> None:
+        """Initialiser.
+
+        Args:
+            sub_registry_key: path of the key to open.
+            parent_key: open key the path is relative to, `HKEY_LOCAL_MACHINE` if not specified.
+        """
+        # Imported here so that the registry can be read from other sources where pywin32 is unavailable.
+        import win32api
+        import win32con
+
         access = win32con.KEY_READ | win32con.KEY_ENUMERATE_SUB_KEYS | win32con.KEY_QUERY_VALUE
+        if parent_key is None:
+            parent_key = win32con.HKEY_LOCAL_MACHINE
         try:
-            self._hkey = win32api.RegOpenKey(win32con.HKEY_LOCAL_MACHINE, sub_registry_key, 0, access)
+            self._hkey = win32api.RegOpenKey(parent_key, sub_registry_key, 0, access)
         except win32api.error as e:
             raise SystemException(f"Could not read key [{sub_registry_key}] in the registry: {e}")
 
@@ -30,31 +59,111 @@ class RegKey(object):
 
     def __exit__(self, type: Any, value: Any, traceback: Any) -> None:
         """Actions on exit."""
+        import win32api
+
         win32api.RegCloseKey(self._hkey)
         self._hkey.close()
 
 
-def get_children_instance_id(pnpid: str) -> Optional[str]:
-    """Gets the USB children instance ID from the plug and play ID.
+class RegistryReader(ABC):
+    r"""Reads values of the device keys found under `HKLM\SYSTEM\CurrentControlSet\Enum`."""
+
+    @abstractmethod
+    def read_values(self, pnp_ids: Iterable[str], value_name: str) -> Dict[str, Optional[str]]:
+        """Reads a value of the key of each device.
+
+        Args:
+            pnp_ids: plug and play IDs of the devices, which are the paths of their keys.
+            value_name: name of the value to read.
+
+        Returns:
+            The value read by plug and play ID, None where the key has no such value. Devices whose key could not be
+            opened are left out.
+        """
+
+
+class Win32RegistryReader(RegistryReader):
+    """Reads the registry of the system, opening the key of the device tree once for all the devices."""
+
+    def read_values(self, pnp_ids: Iterable[str], value_name: str) -> Dict[str, Optional[str]]:
+        """Reads a value of the key of each device."""
+        pnp_ids = list(pnp_ids)
+        if not pnp_ids:
+            return {}
+        values: Dict[str, Optional[str]] = {}
+        with RegKey(ENUM_REGISTRY_KEY) as enum_hkey:
+            for pnp_id in pnp_ids:
+                try:
+                    with RegKey(pnp_id, parent_key=enum_hkey) as hkey:
+                        values[pnp_id] = _query_value(hkey, value_name, pnp_id)
+                except SystemException as e:
+                    logger.debug(e)
+        return values
+
+
+def _query_value(hkey: Any, value_name: str, pnp_id: str) -> Optional[str]:
+    import win32api
 
-    See https://docs.microsoft.com/en-us/windows-hardware/drivers/install/instance-ids.
+    try:
+        value = win32api.RegQueryValueEx(hkey, value_name)
+        return str(value[0]) if value else None
+    except win32api.error as e:
+        logger.debug(f"Error occurred reading `{value_name}` field of key [{pnp_id}] in the registry: {e}")
+        return None
+
+
+class ParentIdPrefixCache:
+    """`ParentIdPrefix` of the devices present in the system, kept across scans.
+
+    The registry is only read for devices which were not present at the previous refresh, and the values of devices
+    which are no longer present are discarded.
     """
-    # Although the registry should not be accessed directly
-    # (See https://docs.microsoft.com/en-us/windows-hardware/drivers/install/hklm-system-currentcontrolset-enum-registry-tree), # noqa E501
-    # and SetupDi functions/APIs should be used instead in a similar fashion to Miro utility
-    # (See https://github.com/cool-RR/Miro/blob/7b9ecd9bc0878e463f5a5e26e8b00b675e3f98ac/tv/windows/plat/usbutils.py)
-    # Most libraries seems to be reading the registry:
-    #     - Pyserial: https://github.com/pyserial/pyserial/blob/master/serial/tools/list_ports_windows.py
-    #     - Node serialport: https://github.com/serialport/node-serialport/blob/cd112ca5a3a3fe186e1ac6fa78eeeb5ea7396185/packages/bindings/src/serialport_win.cpp # noqa E501
-    #     - USB device forensics: https://github.com/woanware/usbdeviceforensics/blob/master/pyTskusbdeviceforensics.py
-    # For more details about the registry key actually looked at, See:
-    # - https://stackoverflow.com/questions/3331043/get-list-of-connected-usb-devices
-    # - https://docs.microsoft.com/en-us/windows-hardware/drivers/usbcon/usb-device-specific-registry-settings
-    key_path = f"SYSTEM\\CurrentControlSet\\Enum\\{pnpid}"
-    with RegKey(key_path) as hkey:
-        try:
-            value = win32api.RegQueryValueEx(hkey, "ParentIdPrefix")
-            return str(value[0]) if value else None
-        except win32api.error as e:
-            logger.debug(f"Error occurred reading `ParentIdPrefix` field of key [{key_path}] in the registry: {e}")
-            return None
+
+    def __init__(self, registry_reader: Optional[RegistryReader] = None) -> None:
+        """Initialiser.
+
+        Args:
+            registry_reader: reads the registry, the registry of the system if not specified.
+        """
+        self._registry_reader = registry_reader or Win32RegistryReader()
+        self._values: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, pnp_ids: Iterable[str]) -> None:
+        """Updates the cache to the devices presently in the system.
+
+        Args:
+            pnp_ids: plug and play IDs of all the devices present.
+        """
+        present_pnp_ids = dict.fromkeys(pnp_ids)
+        with self._lock:
+            self._values = {pnp_id: value for pnp_id, value in self._values.items() if pnp_id in present_pnp_ids}
+            new_pnp_ids = [pnp_id for pnp_id in present_pnp_ids if pnp_id not in self._values]
+        if not new_pnp_ids:
+            return
+        values = self._registry_reader.read_values(new_pnp_ids, PARENT_ID_PREFIX_VALUE_NAME)
+        with self._lock:
+            self._values.update(values)
+
+    def get(self, pnp_id: str) -> Optional[str]:
+        """Returns the `ParentIdPrefix` of a device, None if it has none or has not been read."""
+        with self._lock:
+            return self._values.get(pnp_id)
+
+    def __len__(self) -> int:
+        """Number of devices whose `ParentIdPrefix` has been read."""
+        with self._lock:
+            return len(self._values)
+
+
+_shared_cache: Optional[ParentIdPrefixCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_shared_parent_id_prefix_cache() -> ParentIdPrefixCache:
+    """Returns the cache shared by all the scans of the process, which is created on first use."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ParentIdPrefixCache()
+        return _shared_cache
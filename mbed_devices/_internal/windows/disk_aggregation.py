@@ -9,7 +9,7 @@ Partitions and Logical Drives.
 This file tries to reconcile all these pieces of information so that it is presented
 as a single object: AggregatedDiskData.
 """
-from typing import List, Optional, Callable
+from typing import Dict, Iterable, List, Optional, Callable
 from typing import NamedTuple, cast
 
 from mbed_devices._internal.windows.component_descriptor import ComponentDescriptor
@@ -21,7 +21,11 @@ from mbed_devices._internal.windows.disk_partition_logical_disk_relationships im
     DiskPartitionLogicalDiskRelationship,
 )
 from mbed_devices._internal.windows.logical_disk import LogicalDisk
-from mbed_devices._internal.windows.volume_set import VolumeInformation, get_volume_information
+from mbed_devices._internal.windows.volume_set import (
+    UNKNOWN_VOLUME_INFORMATION,
+    VolumeInformation,
+    get_volumes_information,
+)
 from mbed_devices._internal.windows.system_data_loader import SystemDataLoader, ComponentsLoader
 
 
@@ -50,6 +54,8 @@ class AggregatedDiskDataDefinition(NamedTuple):
 class AggregatedDiskData(ComponentDescriptor):
     """Disk information based on lots of different sources."""
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         """Initialiser."""
         super().__init__(AggregatedDiskDataDefinition, win32_class_name="DiskDataAggregation")
@@ -82,6 +88,18 @@ class DiskDataAggregator:
         partition_id = self.logical_disk_partition_relationships.get(logical_disk.component_id)
         return self._partition_disks.get(partition_id, DiskPartition()) if partition_id else DiskPartition()
 
+    def _get_corresponding_physical_disk(self, partition: DiskPartition) -> Optional[DiskDrive]:
+        """Determines which physical disk a partition is on, None if not one of the physical disks considered."""
+        # See https://superuser.com/questions/1147218/on-which-physical-drive-is-this-logical-drive
+        return self._physical_disks.get(partition.get("DiskIndex"))
+
+    def is_on_physical_disk(self, logical_disk: LogicalDisk) -> bool:
+        """States whether a logical disk is on one of the physical disks considered.
+
+        Network drives have no partition, and only the disk drives connected through USB are loaded from the system.
+        """
+        return self._get_corresponding_physical_disk(self._get_corresponding_partition(logical_disk)) is not None
+
     @property
     def physical_disks(self) -> dict:
         """Gets local cache of physical disks data."""
@@ -100,10 +118,13 @@ class DiskDataAggregator:
     def aggregate(self, logical_disk: LogicalDisk) -> AggregatedDiskData:
         """Aggregates data about a disk from different sources."""
         corresponding_partition = self._get_corresponding_partition(logical_disk)
-        corresponding_volume_information = self._lookup_volume_information(logical_disk)
-        # Determines which physical disk the partition is on
-        # See https://superuser.com/questions/1147218/on-which-physical-drive-is-this-logical-drive
-        corresponding_physical = self._physical_disks.get(corresponding_partition.get("DiskIndex"), DiskDrive())
+        corresponding_physical = self._get_corresponding_physical_disk(corresponding_partition)
+        if corresponding_physical is None:
+            # Volumes of other disks are not queried, as this may block for seconds e.g. for network or optical drives.
+            corresponding_physical = DiskDrive()
+            corresponding_volume_information = UNKNOWN_VOLUME_INFORMATION
+        else:
+            corresponding_volume_information = self._lookup_volume_information(logical_disk)
         aggregatedData = AggregatedDiskData()
         aggregatedData.set_data_values(
             dict(
@@ -130,23 +151,32 @@ class DiskDataAggregator:
 
 
 class WindowsDiskDataAggregator(DiskDataAggregator):
-    """Disk Data aggregator for Windows."""
+    """Disk Data aggregator for Windows.
+
+    The information of the volumes is retrieved beforehand with `load_volume_information`.
+    """
 
     def __init__(self, data_loader: SystemDataLoader) -> None:
         """Initialiser."""
+        self._volumes_information: Dict[str, VolumeInformation] = dict()
         super().__init__(
-            physical_disks={
-                d.Index: d  # type: ignore
-                for d in ComponentsLoader(data_loader, DiskDrive).element_generator()
-            },
+            physical_disks={d.Index: d for d in ComponentsLoader(data_loader, DiskDrive).element_generator()},
             partition_disks={
                 p.component_id: p for p in ComponentsLoader(data_loader, DiskPartition).element_generator()
             },
             logical_partition_relationships={
-                r.logical_disk_id: r.disk_partition_id  # type: ignore
+                r.logical_disk_id: r.disk_partition_id
                 for r in ComponentsLoader(data_loader, DiskPartitionLogicalDiskRelationship).element_generator()
             },
-            lookup_volume_information=lambda logical_disk: get_volume_information(logical_disk.component_id),
+            lookup_volume_information=lambda logical_disk: self._volumes_information.get(
+                logical_disk.component_id, UNKNOWN_VOLUME_INFORMATION
+            ),
+        )
+
+    def load_volume_information(self, logical_disks: Iterable[LogicalDisk]) -> None:
+        """Retrieves the information of the volumes of the logical disks on USB physical disks, concurrently."""
+        self._volumes_information = get_volumes_information(
+            logical_disk.component_id for logical_disk in logical_disks if self.is_on_physical_disk(logical_disk)
         )
 
 
@@ -163,8 +193,12 @@ class SystemDiskInformation:
         aggregator = WindowsDiskDataAggregator(self._data_loader)
         disk_data_by_serialnumber: dict = dict()  # The type is enforced so that mypy is happy.
         disk_data_by_label = dict()
-        for ld in ComponentsLoader(self._data_loader, LogicalDisk).element_generator():
-            aggregation = aggregator.aggregate(cast(LogicalDisk, ld))
+        logical_disks = cast(
+            List[LogicalDisk], list(ComponentsLoader(self._data_loader, LogicalDisk).element_generator())
+        )
+        aggregator.load_volume_information(logical_disks)
+        for ld in logical_disks:
+            aggregation = aggregator.aggregate(ld)
             key = aggregation.get("uid").presumed_serial_number
             disk_data_list = disk_data_by_serialnumber.get(key, list())
             disk_data_list.append(aggregation)
@@ -79,9 +79,27 @@ class DiskDrive(ComponentDescriptor):
     See https://docs.microsoft.com/en-us/windows/win32/cimwin32prov/win32-diskdrive
     """
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         """Initialiser."""
-        super().__init__(DiskDriveMsdnDefinition, win32_class_name="Win32_DiskDrive")
+        super().__init__(
+            DiskDriveMsdnDefinition,
+            win32_class_name="Win32_DiskDrive",
+            win32_fields=[
+                "Caption",
+                "DeviceID",
+                "Index",
+                "InterfaceType",
+                "Manufacturer",
+                "MediaType",
+                "Model",
+                "PNPDeviceID",
+                "SerialNumber",
+                "Status",
+            ],
+            win32_usb_filter="InterfaceType='USB'",
+        )
 
     @property
     def component_id(self) -> str:
@@ -63,9 +63,15 @@ class DiskPartition(ComponentDescriptor):
     See https://docs.microsoft.com/en-us/windows/win32/cimwin32prov/win32-diskpartition
     """
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         """Initialiser."""
-        super().__init__(DiskPartitionMsdnDefinition, win32_class_name="Win32_DiskPartition")
+        super().__init__(
+            DiskPartitionMsdnDefinition,
+            win32_class_name="Win32_DiskPartition",
+            win32_fields=["DeviceID", "DiskIndex", "Type"],
+        )
 
     @property
     def component_id(self) -> str:
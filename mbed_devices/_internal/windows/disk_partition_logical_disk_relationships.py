@@ -27,9 +27,15 @@ class DiskPartitionLogicalDiskRelationship(ComponentDescriptor):
     See https://docs.microsoft.com/en-us/windows/win32/cimwin32prov/win32-logicaldisktopartition
     """
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         """Initialiser."""
-        super().__init__(DiskToPartitionMsdnDefinition, win32_class_name="Win32_LogicalDiskToPartition")
+        super().__init__(
+            DiskToPartitionMsdnDefinition,
+            win32_class_name="Win32_LogicalDiskToPartition",
+            win32_fields=["Antecedent", "Dependent"],
+        )
 
     @property
     def component_id(self) -> str:
@@ -0,0 +1,107 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Hotplug events on Windows, reported by the WMI service.
+
+Creations and deletions of PnP entities, which all the USB components are, and of logical disks, are subscribed to.
+"""
+import logging
+import threading
+from typing import Any, Callable, Iterator, Optional, cast
+
+from mbed_devices._internal.hotplug import HotplugEvent, HotplugEventSource
+from mbed_devices._internal.windows.component_descriptor import connect_to_wmi
+
+logger = logging.getLogger(__name__)
+
+PNP_ENTITY_CLASS = "Win32_PnPEntity"
+LOGICAL_DISK_CLASS = "Win32_LogicalDisk"
+# Intrinsic events of these classes are found by the WMI service polling at this interval, in seconds.
+WMI_POLLING_INTERVAL = 1
+NOTIFICATION_QUERY = (
+    f"Select * from __InstanceOperationEvent within {WMI_POLLING_INTERVAL} "
+    "where (__Class = '__InstanceCreationEvent' or __Class = '__InstanceDeletionEvent') "
+    f"and (TargetInstance isa '{PNP_ENTITY_CLASS}' or TargetInstance isa '{LOGICAL_DISK_CLASS}')"
+)
+ACTIONS = {"__InstanceCreationEvent": "add", "__InstanceDeletionEvent": "remove"}
+ID_FIELDS = {PNP_ENTITY_CLASS: "PNPDeviceID", LOGICAL_DISK_CLASS: "DeviceID"}
+# Error reported by SWbemEventSource.NextEvent when no event occurred within the timeout.
+WBEM_E_TIMED_OUT = 0x80043001
+# Time after which waiting for an event is interrupted to check whether the source was closed, in seconds.
+CLOSE_CHECK_INTERVAL = 0.5
+
+WmiEventReader = Callable[[float], Optional[Any]]
+"""Returns the next WMI event, waiting up to a timeout in seconds, None if no event occurred in time."""
+
+
+def subscribe_to_wmi_events() -> WmiEventReader:
+    """Subscribes to the events of interest with a connection established on the calling thread."""
+    # Imported here so that the events can be provided by other sources where pywin32 is unavailable.
+    import pywintypes
+
+    events = connect_to_wmi().ExecNotificationQuery(NOTIFICATION_QUERY)
+
+    def read_next_event(timeout: float) -> Optional[Any]:
+        try:
+            return events.NextEvent(int(timeout * 1000))
+        except pywintypes.com_error as e:
+            if _is_timeout(e):
+                return None
+            raise
+
+    return read_next_event
+
+
+class WmiEventSource(HotplugEventSource):
+    """Reports the creations and deletions of PnP entities and logical disks."""
+
+    def __init__(self, subscribe: Callable[[], WmiEventReader] = subscribe_to_wmi_events) -> None:
+        """Initialiser.
+
+        Args:
+            subscribe: subscribes to the events of interest, called on the thread iterating over the source.
+        """
+        self._subscribe = subscribe
+        self._read_next_event: Optional[WmiEventReader] = None
+        self._closed = threading.Event()
+
+    def open(self) -> None:
+        """Subscribes to the events, on the calling thread which must then iterate over the source."""
+        if self._read_next_event is None:
+            self._read_next_event = self._subscribe()
+
+    def __iter__(self) -> Iterator[HotplugEvent]:
+        """Yields events as they are reported, until the source is closed."""
+        self.open()
+        read_next_event = cast(WmiEventReader, self._read_next_event)
+        while not self._closed.is_set():
+            wmi_event = read_next_event(CLOSE_CHECK_INTERVAL)
+            if wmi_event is None:
+                continue
+            event = to_hotplug_event(wmi_event)
+            if event is not None:
+                logger.debug(f"WMI event: {event}.")
+                yield event
+
+    def close(self) -> None:
+        """Stops the source, within `CLOSE_CHECK_INTERVAL`."""
+        self._closed.set()
+
+
+def to_hotplug_event(wmi_event: Any) -> Optional[HotplugEvent]:
+    """Converts a WMI event, None if it is not of interest."""
+    action = ACTIONS.get(wmi_event.Path_.Class)
+    target_instance = wmi_event.TargetInstance
+    subsystem = target_instance.Path_.Class
+    if action is None or subsystem not in ID_FIELDS:
+        return None
+    device_id = getattr(target_instance, ID_FIELDS[subsystem])
+    return HotplugEvent(action=action, subsystem=subsystem, device_file_path=device_id)
+
+
+def _is_timeout(error: Any) -> bool:
+    """States whether a COM error reports that no event occurred within the timeout."""
+    excepinfo = error.excepinfo if getattr(error, "excepinfo", None) else (None,) * 6
+    codes = [getattr(error, "hresult", None), excepinfo[5]]
+    return any(code is not None and code & 0xFFFFFFFF == WBEM_E_TIMED_OUT for code in codes)
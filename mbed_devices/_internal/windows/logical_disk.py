@@ -49,9 +49,15 @@ class LogicalDisk(ComponentDescriptor):
     See https://docs.microsoft.com/en-us/windows/win32/cimwin32prov/cim-logicaldisk
     """
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         """Initialiser."""
-        super().__init__(LogicalDiskMsdnDefinition, win32_class_name="CIM_LogicalDisk")
+        super().__init__(
+            LogicalDiskMsdnDefinition,
+            win32_class_name="CIM_LogicalDisk",
+            win32_fields=["Description", "DeviceID", "FreeSpace", "Size"],
+        )
 
     @property
     def component_id(self) -> str:
@@ -68,14 +68,19 @@ class SerialPort(ComponentDescriptor):
     As can be seen in Windows documentation,
     https://docs.microsoft.com/en-us/windows-hardware/drivers/install/system-defined-device-setup-classes-available-to-vendors#ports--com---lpt-ports--,
     ports are devices with ClassGuid = {4d36e978-e325-11ce-bfc1-08002be10318}. Hence the filter below.
+    Ports of USB devices are enumerated under USB, or under FTDIBUS when using the FTDI driver.
     """
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         """Initialiser."""
         super().__init__(
             PnPEntityMsdnDefinition,
             win32_class_name="Win32_PnPEntity",
             win32_filter='ClassGuid="{4d36e978-e325-11ce-bfc1-08002be10318}"',
+            win32_fields=["Caption", "DeviceID", "PNPDeviceID"],
+            win32_usb_filter="PNPDeviceID like 'USB%' or PNPDeviceID like 'FTDIBUS%'",
         )
 
     @property
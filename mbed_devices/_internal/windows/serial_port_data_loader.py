@@ -8,6 +8,7 @@ from typing import Optional, Generator, cast, List
 from mbed_devices._internal.windows.system_data_loader import SystemDataLoader, ComponentsLoader
 from mbed_devices._internal.windows.usb_device_identifier import UsbIdentifier, parse_device_id
 from mbed_devices._internal.windows.serial_port import SerialPort
+from mbed_devices._internal.windows.uid_canonicaliser import get_instance_id_key
 
 
 class SystemSerialPortInformation:
@@ -19,8 +20,9 @@ class SystemSerialPortInformation:
         self._data_loader = data_loader
 
     def _load_data(self) -> None:
+        # Ports are indexed by the instance ID their device refers to them by, i.e. its `ParentIdPrefix`.
         self._serial_port_by_usb_id = {
-            parse_device_id(p.pnp_id): p
+            get_instance_id_key(parse_device_id(p.pnp_id)): p
             for p in cast(
                 Generator[SerialPort, None, None], ComponentsLoader(self._data_loader, SerialPort).element_generator()
             )
@@ -28,12 +30,13 @@ class SystemSerialPortInformation:
 
     @property
     def serial_port_data_by_id(self) -> dict:
-        """Gets system's serial ports by usb id."""
-        if not self._serial_port_by_usb_id:
+        """Gets system's serial ports by key of the instance ID of their usb id."""
+        # A system without serial ports is only queried once, as one with some.
+        if self._serial_port_by_usb_id is None:
             self._load_data()
-        return self._serial_port_by_usb_id if self._serial_port_by_usb_id else dict()
+        return cast(dict, self._serial_port_by_usb_id)
 
     def get_serial_port_information(self, usb_id: UsbIdentifier) -> List[SerialPort]:
         """Gets all disk information for a given serial number."""
-        port = self.serial_port_data_by_id.get(usb_id)
+        port = self.serial_port_data_by_id.get(get_instance_id_key(usb_id))
         return [port] if port else list()
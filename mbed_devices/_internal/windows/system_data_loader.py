@@ -3,10 +3,18 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 """Loads system data in parallel and all at once in order to improve performance."""
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Tuple, Dict, Generator, Optional, cast
+import logging
+import time
+from abc import ABC, abstractmethod
+from functools import partial
+from typing import Callable, List, Tuple, Dict, Generator, Optional, cast
 
-from mbed_devices._internal.windows.component_descriptor import ComponentDescriptorWrapper, ComponentDescriptor
+from mbed_devices._internal.windows.component_descriptor import (
+    ComponentDescriptorWrapper,
+    ComponentDescriptor,
+    Win32Wrapper,
+    escape_wql_string,
+)
 from mbed_devices._internal.windows.disk_drive import DiskDrive
 from mbed_devices._internal.windows.disk_partition import DiskPartition
 from mbed_devices._internal.windows.disk_partition_logical_disk_relationships import (
@@ -16,6 +24,9 @@ from mbed_devices._internal.windows.logical_disk import LogicalDisk
 from mbed_devices._internal.windows.serial_port import SerialPort
 from mbed_devices._internal.windows.usb_controller import UsbController
 from mbed_devices._internal.windows.usb_hub import UsbHub
+from mbed_devices._internal.windows.wmi_connection_pool import WmiConnectionPool, get_shared_connection_pool
+
+logger = logging.getLogger(__name__)
 
 # All Windows system data of interest in order to retrieve the information for DeviceCandidate.
 SYSTEM_DATA_TYPES = [
@@ -29,32 +40,104 @@ SYSTEM_DATA_TYPES = [
 ]
 
 
-def load_all(cls: type) -> Tuple[type, List[ComponentDescriptor]]:
-    """Loads all elements present in the system referring to a specific type."""
-    return (cls, [element for element in ComponentDescriptorWrapper(cls).element_generator()])
+def load_all(cls: type, win32_wrapper: Optional[Win32Wrapper] = None) -> Tuple[type, List[ComponentDescriptor]]:
+    """Loads all elements present in the system referring to a specific type.
+
+    Args:
+        cls: component descriptor class.
+        win32_wrapper: wrapper of the connection to use, a new connection is established if not specified.
+    """
+    return (cls, [element for element in ComponentDescriptorWrapper(cls, win32_wrapper).element_generator()])
+
+
+def _load_all_counting_reads(
+    cls: type, win32_wrapper: Win32Wrapper
+) -> Tuple[Tuple[type, List[ComponentDescriptor]], int]:
+    """Loads all elements of a type, along with the number of COM property reads it took."""
+    property_reads = win32_wrapper.property_reads
+    loaded = load_all(cls, win32_wrapper)
+    return loaded, win32_wrapper.property_reads - property_reads
 
 
 class SystemDataLoader:
     """Object in charge of loading all system data with regards to Usb, Disk or serial port.
 
-    It loads all the data in parallel and all at once in order to improve performance.
+    It loads all the data in parallel and all at once in order to improve performance. The data of each type is kept
+    until it is older than the time to live, if any, or until it is explicitly refreshed. Each load or refresh makes a
+    new generation of the data.
     """
 
-    def __init__(self) -> None:
-        """Initialiser."""
+    def __init__(
+        self,
+        connection_pool: Optional[WmiConnectionPool] = None,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialiser.
+
+        Args:
+            connection_pool: pool of connections to load the data with, the pool shared by all the scans of the
+                process is used if not specified.
+            ttl: time after which the data of a type is loaded again when accessed, in seconds. The data is kept
+                until refreshed if not specified.
+            clock: returns the current time, in seconds.
+        """
         self._system_data: Optional[Dict[type, List[ComponentDescriptor]]] = None
+        self._connection_pool = connection_pool
+        self._ttl = ttl
+        self._clock = clock
+        self._loaded_at: Dict[type, float] = dict()
+        # Number of times the data was loaded or refreshed.
+        self.generation = 0
+        # Number of WMI queries issued, and of COM calls made to read the fields of the components, by the last load.
+        self.queries = 0
+        self.property_reads = 0
 
-    def _load(self) -> None:
-        """Loads all system data in parallel."""
-        with ThreadPoolExecutor() as executor:
-            results = executor.map(load_all, SYSTEM_DATA_TYPES)
-        self._system_data = {k: v for (k, v) in results}
+    def _query(self, types: List[type]) -> Dict[type, List[ComponentDescriptor]]:
+        """Queries all the elements of types from the system, in parallel."""
+        connection_pool = self._connection_pool or get_shared_connection_pool()
+        futures = [connection_pool.submit(partial(_load_all_counting_reads, cls)) for cls in types]
+        results = [future.result() for future in futures]
+        self.queries = len(types)
+        self.property_reads = sum(property_reads for _, property_reads in results)
+        logger.debug(f"Loaded system data with {self.queries} WMI queries, {self.property_reads} COM property reads.")
+        return {k: v for (k, v), _ in results}
+
+    def _load(self, types: Optional[List[type]] = None) -> None:
+        """Loads the system data of types, all the system data types if not specified.
+
+        The data previously loaded for other types is kept.
+        """
+        loaded = self._query(list(SYSTEM_DATA_TYPES) if types is None else types)
+        loaded_at = self._clock()
+        self._system_data = {**(self._system_data or dict()), **loaded}
+        self._loaded_at.update({cls: loaded_at for cls in loaded})
+        self.generation += 1
+
+    def refresh(self, *types: type) -> None:
+        """Loads the system data of some types again, e.g. only `LogicalDisk` when drive letters change.
+
+        Args:
+            types: types of the data to load again, all the system data types if none is specified.
+        """
+        self._load(list(types) if types else None)
+
+    def _get_expired_types(self) -> List[type]:
+        ttl = self._ttl
+        if ttl is None:
+            return list()
+        now = self._clock()
+        return [cls for cls, loaded_at in self._loaded_at.items() if now - loaded_at >= ttl]
 
     @property
     def system_data(self) -> Dict[type, List[ComponentDescriptor]]:
-        """Gets all system data."""
-        if not self._system_data:
+        """Gets all system data, loading the data which was never loaded or is out of date."""
+        if self._system_data is None:
             self._load()
+        else:
+            expired_types = self._get_expired_types()
+            if expired_types:
+                self._load(expired_types)
         return cast(Dict[type, List[ComponentDescriptor]], self._system_data)
 
     def get_system_data(self, cls: type) -> List[ComponentDescriptor]:
@@ -74,3 +157,54 @@ class ComponentsLoader:
         """Gets a generator over all elements currently registered in the system."""
         for component in self._data_loader.get_system_data(self._cls):
             yield component
+
+
+class ComponentSource(ABC):
+    """Source of system components, which can be loaded all at once or selectively."""
+
+    @abstractmethod
+    def load_system_data(self) -> Dict[type, List[ComponentDescriptor]]:
+        """Loads all the elements of all the system data types."""
+
+    @abstractmethod
+    def load_all(self, cls: type) -> List[ComponentDescriptor]:
+        """Loads all the elements of a type."""
+
+    @abstractmethod
+    def load_matching(self, cls: type, field_name: str, value: str) -> List[ComponentDescriptor]:
+        """Loads the elements of a type whose field has a value, compared without regard to case."""
+
+
+class Win32ComponentSource(ComponentSource):
+    """Loads the components from the WMI service."""
+
+    def __init__(self, connection_pool: Optional[WmiConnectionPool] = None) -> None:
+        """Initialiser.
+
+        Args:
+            connection_pool: pool of connections to load the data with, the pool shared by all the scans of the
+                process is used if not specified.
+        """
+        self._connection_pool = connection_pool
+
+    def load_system_data(self) -> Dict[type, List[ComponentDescriptor]]:
+        """Loads all the elements of all the system data types, in parallel."""
+        return SystemDataLoader(self._connection_pool).system_data
+
+    def load_all(self, cls: type) -> List[ComponentDescriptor]:
+        """Loads all the elements of a type."""
+        _, elements = self._get_connection_pool().submit(partial(load_all, cls)).result()
+        return elements
+
+    def load_matching(self, cls: type, field_name: str, value: str) -> List[ComponentDescriptor]:
+        """Loads the elements of a type whose field has a value."""
+        # WQL string comparisons are case insensitive.
+        extra_filters = [f"{field_name} = '{escape_wql_string(value)}'"]
+        return self._get_connection_pool().submit(partial(_load_matching, cls, extra_filters)).result()
+
+    def _get_connection_pool(self) -> WmiConnectionPool:
+        return self._connection_pool or get_shared_connection_pool()
+
+
+def _load_matching(cls: type, extra_filters: List[str], win32_wrapper: Win32Wrapper) -> List[ComponentDescriptor]:
+    return list(ComponentDescriptorWrapper(cls, win32_wrapper).element_generator(extra_filters))
@@ -0,0 +1,153 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Snapshots of the system data, recorded on Windows and replayed anywhere.
+
+A snapshot holds the components of all the system data types, along with the `ParentIdPrefix` of the USB hubs read
+from the registry, which is all the aggregation of the USB devices relies on besides the volumes information. This
+allows the aggregation to be run and profiled without `pywin32`.
+"""
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, cast
+
+from mbed_devices._internal.windows.component_descriptor import ComponentDescriptor
+from mbed_devices._internal.windows.device_instance_id import (
+    PARENT_ID_PREFIX_VALUE_NAME,
+    ParentIdPrefixCache,
+    RegistryReader,
+    Win32RegistryReader,
+)
+from mbed_devices._internal.windows.system_data_loader import SYSTEM_DATA_TYPES, SystemDataLoader
+from mbed_devices._internal.windows.usb_hub import UsbHub
+from mbed_devices._internal.windows.wmi_connection_pool import WmiConnectionPool
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+class SystemDataSnapshot(NamedTuple):
+    """System data, along with the registry values it is aggregated with."""
+
+    system_data: Dict[type, List[ComponentDescriptor]]
+    parent_id_prefixes: Dict[str, Optional[str]]
+
+
+def to_json(snapshot: SystemDataSnapshot) -> Dict[str, Any]:
+    """Converts a snapshot to JSON serialisable values, only retaining the known fields of each component."""
+    return {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "components": {
+            cls.__name__: [component.known_values for component in components]
+            for cls, components in snapshot.system_data.items()
+        },
+        "parent_id_prefixes": snapshot.parent_id_prefixes,
+    }
+
+
+def from_json(values: Dict[str, Any]) -> SystemDataSnapshot:
+    """Builds a snapshot from the values returned by `to_json`.
+
+    Raises:
+        ValueError: the values are not those of a snapshot of a supported format.
+    """
+    if values.get("version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported system data snapshot format: {values.get('version')}.")
+    types_by_name = {cls.__name__: cls for cls in SYSTEM_DATA_TYPES}
+    system_data: Dict[type, List[ComponentDescriptor]] = {cls: list() for cls in SYSTEM_DATA_TYPES}
+    for name, components in values.get("components", dict()).items():
+        if name not in types_by_name:
+            raise ValueError(f"Unknown type of component in system data snapshot: {name}.")
+        system_data[types_by_name[name]] = [_make_component(types_by_name[name], fields) for fields in components]
+    return SystemDataSnapshot(system_data, dict(values.get("parent_id_prefixes", dict())))
+
+
+def save_snapshot(snapshot: SystemDataSnapshot, path: Path) -> None:
+    """Saves a snapshot to a JSON file."""
+    # Values which are not JSON types, if any, are recorded as their string representation.
+    path.write_text(json.dumps(to_json(snapshot), indent=2, default=str))
+
+
+def load_snapshot(path: Path) -> SystemDataSnapshot:
+    """Loads a snapshot from a JSON file saved with `save_snapshot`."""
+    return from_json(json.loads(path.read_text()))
+
+
+def _make_component(cls: type, fields: Dict[str, Any]) -> ComponentDescriptor:
+    component = cast(ComponentDescriptor, cls())
+    component.set_data_values(fields)
+    return component
+
+
+class SnapshotRegistryReader(RegistryReader):
+    """Registry values recorded in a snapshot."""
+
+    def __init__(self, parent_id_prefixes: Dict[str, Optional[str]]) -> None:
+        """Initialiser."""
+        self._parent_id_prefixes = parent_id_prefixes
+
+    def read_values(self, pnp_ids: Iterable[str], value_name: str) -> Dict[str, Optional[str]]:
+        """Reads a value of the key of each device, only `ParentIdPrefix` is recorded."""
+        if value_name != PARENT_ID_PREFIX_VALUE_NAME:
+            return dict()
+        return {pnp_id: self._parent_id_prefixes[pnp_id] for pnp_id in pnp_ids if pnp_id in self._parent_id_prefixes}
+
+
+class RecordingSystemDataLoader(SystemDataLoader):
+    """Loads the system data from the system, and records a snapshot of it."""
+
+    def __init__(
+        self,
+        path: Path,
+        connection_pool: Optional[WmiConnectionPool] = None,
+        registry_reader: Optional[RegistryReader] = None,
+    ) -> None:
+        """Initialiser.
+
+        Args:
+            path: path of the JSON file to save the snapshot to.
+            connection_pool: pool of connections to load the data with, the pool shared by all the scans of the
+                process is used if not specified.
+            registry_reader: reads the registry values recorded along with the system data, from the Windows
+                registry if not specified.
+        """
+        super().__init__(connection_pool)
+        self._path = path
+        self._registry_reader = registry_reader
+
+    def _load(self, types: Optional[List[type]] = None) -> None:
+        """Loads system data in parallel, then saves all of it along with the registry values of the USB hubs."""
+        super()._load(types)
+        system_data = cast(Dict[type, List[ComponentDescriptor]], self._system_data)
+        registry_reader = self._registry_reader if self._registry_reader is not None else Win32RegistryReader()
+        pnp_ids = [cast(UsbHub, hub).pnp_id for hub in system_data.get(UsbHub, list())]
+        parent_id_prefixes = registry_reader.read_values(pnp_ids, PARENT_ID_PREFIX_VALUE_NAME)
+        save_snapshot(SystemDataSnapshot(system_data, parent_id_prefixes), self._path)
+
+
+class ReplayingSystemDataLoader(SystemDataLoader):
+    """Provides the system data of a snapshot instead of loading it from the system.
+
+    The `ParentIdPrefix` recorded must be provided to the aggregation with `parent_id_prefix_cache`, e.g.
+    `SystemUsbData(loader, loader.parent_id_prefix_cache)`.
+    """
+
+    def __init__(self, snapshot: SystemDataSnapshot) -> None:
+        """Initialiser."""
+        super().__init__()
+        self._snapshot = snapshot
+        self._parent_id_prefix_cache = ParentIdPrefixCache(SnapshotRegistryReader(snapshot.parent_id_prefixes))
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ReplayingSystemDataLoader":
+        """Replays a snapshot saved to a JSON file."""
+        return cls(load_snapshot(path))
+
+    @property
+    def parent_id_prefix_cache(self) -> ParentIdPrefixCache:
+        """Returns the cache of the `ParentIdPrefix` recorded in the snapshot."""
+        return self._parent_id_prefix_cache
+
+    def _query(self, types: List[type]) -> Dict[type, List[ComponentDescriptor]]:
+        """Provides the components of the snapshot."""
+        return {cls: list(self._snapshot.system_data.get(cls, list())) for cls in types}
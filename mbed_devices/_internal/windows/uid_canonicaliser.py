@@ -0,0 +1,116 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Canonical keys of the USB devices, so that their components can be matched with dictionary lookups.
+
+The components of a same device refer to it by different identifiers e.g. its serial number, the instance ID Windows
+generated for one of its interfaces, or the `ParentIdPrefix` of its interfaces. `UsbIdentifier` equality checks all
+of them, which makes matching components quadratic. Instead, the instance ID and the serial number of each identifier
+are turned into keys, and keys of a same identifier are merged, so that all the variants of a device lead to one key.
+"""
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from mbed_devices._internal.windows.usb_device_identifier import UsbIdentifier
+
+
+class UidKey(NamedTuple):
+    """Exact key of a device identifier variant.
+
+    Values are only compared within the same vendor and product IDs, as the instance IDs generated by Windows for
+    devices plugged into a same hub share their prefix.
+    """
+
+    value: str  # e.g. 8&2f125ec6&0 or 0240000034544e45001a00018aa900292011000097969900
+    vendor_id: str
+    product_id: str
+
+
+def get_instance_id_key(usb_id: UsbIdentifier) -> UidKey:
+    """Returns the key of the instance ID of an identifier, which is how its components refer to it."""
+    uid = usb_id.uid
+    value = "" if uid is None else uid.instance_id.lower()
+    return UidKey(value, usb_id.vendor_id, usb_id.product_id)
+
+
+def get_serial_number_key(usb_id: UsbIdentifier) -> Optional[UidKey]:
+    """Returns the key of the serial number of an identifier, None if it has no genuine serial number."""
+    uid = usb_id.uid
+    if uid is None or not uid.contains_genuine_serial_number():
+        return None
+    return UidKey(uid.presumed_serial_number.lower(), usb_id.vendor_id, usb_id.product_id)
+
+
+def get_variant_keys(usb_id: UsbIdentifier) -> Tuple[UidKey, ...]:
+    """Returns the keys of the instance ID of an identifier, followed by that of its serial number if genuine."""
+    serial_number_key = get_serial_number_key(usb_id)
+    instance_id_key = get_instance_id_key(usb_id)
+    return (instance_id_key,) if serial_number_key is None else (instance_id_key, serial_number_key)
+
+
+class UidCanonicaliser:
+    """Maps the keys of all the identifier variants of a device to a single canonical key.
+
+    The variants are merged with a union-find, the canonical key of a device being the first key added for it.
+    """
+
+    def __init__(self) -> None:
+        """Initialiser."""
+        self._parents: Dict[UidKey, UidKey] = {}
+        self._insertion_order: Dict[UidKey, int] = {}
+
+    def add(self, usb_id: UsbIdentifier) -> UidKey:
+        """Adds the variants of an identifier, merging them with those already added.
+
+        Returns:
+            The canonical key of the device, which may change as further variants are added.
+        """
+        return self.add_keys(get_variant_keys(usb_id))
+
+    def add_keys(self, keys: Iterable[UidKey]) -> UidKey:
+        """Adds the keys of the variants of an identifier, as returned by `get_variant_keys`."""
+        canonical_key: Optional[UidKey] = None
+        for key in keys:
+            root = self._add_key(key)
+            canonical_key = root if canonical_key is None else self._union(canonical_key, root)
+        if canonical_key is None:
+            raise ValueError("An identifier has at least one variant.")
+        return canonical_key
+
+    def find(self, usb_id: UsbIdentifier) -> Optional[UidKey]:
+        """Returns the canonical key of the device an identifier refers to, None if none of its variants was added."""
+        return self.find_keys(get_variant_keys(usb_id))
+
+    def find_keys(self, keys: Iterable[UidKey]) -> Optional[UidKey]:
+        """Returns the canonical key of the first of the keys added, None if none of them was added."""
+        for key in keys:
+            if key in self._parents:
+                return self.get_canonical_key(key)
+        return None
+
+    def get_canonical_key(self, key: UidKey) -> UidKey:
+        """Returns the canonical key of a key which was added, e.g. a canonical key returned before merging devices."""
+        root = key
+        while self._parents[root] != root:
+            root = self._parents[root]
+        # Path compression, so that further lookups of the variants are direct.
+        while self._parents[key] != root:
+            self._parents[key], key = root, self._parents[key]
+        return root
+
+    def __contains__(self, usb_id: object) -> bool:
+        """States whether the device an identifier refers to was added."""
+        return isinstance(usb_id, UsbIdentifier) and self.find(usb_id) is not None
+
+    def _add_key(self, key: UidKey) -> UidKey:
+        if key not in self._parents:
+            self._parents[key] = key
+            self._insertion_order[key] = len(self._insertion_order)
+        return self.get_canonical_key(key)
+
+    def _union(self, root: UidKey, other_root: UidKey) -> UidKey:
+        """Merges two devices, the root added first remaining the canonical key."""
+        if self._insertion_order[other_root] < self._insertion_order[root]:
+            root, other_root = other_root, root
+        self._parents[other_root] = root
+        return root
@@ -48,9 +48,13 @@ class UsbController(ComponentDescriptor):
     Similar to https://docs.microsoft.com/en-gb/windows/win32/cimwin32prov/win32-usbcontrollerdevice
     """
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         """Initialiser."""
-        super().__init__(UsbControllerMsdnDefinition, win32_class_name="Win32_USBController")
+        super().__init__(
+            UsbControllerMsdnDefinition, win32_class_name="Win32_USBController", win32_fields=["DeviceID"],
+        )
 
     @property
     def component_id(self) -> str:
@@ -3,9 +3,10 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 """Aggregation of all USB data given by Windows in various locations."""
-from typing import NamedTuple, List, cast
+from typing import Iterator, NamedTuple, List, Optional, cast
 
 from mbed_devices._internal.windows.component_descriptor import ComponentDescriptor
+from mbed_devices._internal.windows.device_instance_id import ParentIdPrefixCache
 from mbed_devices._internal.windows.disk_aggregation import SystemDiskInformation, AggregatedDiskData
 from mbed_devices._internal.windows.serial_port import SerialPort
 from mbed_devices._internal.windows.serial_port_data_loader import SystemSerialPortInformation
@@ -29,6 +30,8 @@ class AggregatedUsbDataDefinition(NamedTuple):
 class AggregatedUsbData(ComponentDescriptor):
     """Usb information based on lots of different sources."""
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         """Initialiser."""
         super().__init__(AggregatedUsbDataDefinition, win32_class_name="AggregatedUsbData")
@@ -83,9 +86,16 @@ class UsbDataAggregator:
 class SystemUsbData:
     """System in charge of gathering all the data related to USB devices."""
 
-    def __init__(self, data_loader: SystemDataLoader) -> None:
-        """Initialiser."""
-        self._usb_devices = SystemUsbDeviceInformation(data_loader)
+    def __init__(
+        self, data_loader: SystemDataLoader, parent_id_prefix_cache: Optional[ParentIdPrefixCache] = None
+    ) -> None:
+        """Initialiser.
+
+        Args:
+            data_loader: loads the system data.
+            parent_id_prefix_cache: `ParentIdPrefix` of the devices, the cache shared across scans if not specified.
+        """
+        self._usb_devices = SystemUsbDeviceInformation(data_loader, parent_id_prefix_cache)
         self._aggregator = UsbDataAggregator(
             disk_data=SystemDiskInformation(data_loader),
             serial_data=SystemSerialPortInformation(data_loader),
@@ -94,4 +104,18 @@ class SystemUsbData:
 
     def all(self) -> List[AggregatedUsbData]:
         """Gets all the system data about USB devices."""
-        return [self._aggregator.aggregate(usb_id) for usb_id in self._usb_devices.usb_device_ids()]
+        return list(self.iter_devices())
+
+    def get_presumed_serial_number(self, pnp_id: str) -> Optional[str]:
+        """Gets the presumed serial number of the USB device a hub or a serial port relates to, if known."""
+        usb_id = self._usb_devices.find_usb_device_id(pnp_id)
+        return usb_id.uid.presumed_serial_number if usb_id else None
+
+    def iter_devices(self, serial_number: Optional[str] = None) -> Iterator[AggregatedUsbData]:
+        """Yields the system data about USB devices, only those with a serial number if specified.
+
+        Data is only aggregated for the devices yielded.
+        """
+        for usb_id in self._usb_devices.usb_device_ids():
+            if serial_number is None or usb_id.uid.presumed_serial_number == serial_number:
+                yield self._aggregator.aggregate(usb_id)
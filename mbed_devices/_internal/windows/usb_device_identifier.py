@@ -6,13 +6,16 @@
 
 import re
 from enum import Enum
-from typing import Optional, Pattern, Any, List, cast
+from functools import lru_cache
+from typing import Dict, Optional, Pattern, Any, List, cast
 
 from mbed_devices._internal.utils.python_helpers import named_tuple_with_defaults
 from mbed_devices._internal.windows.component_descriptor_utils import is_undefined_data_object
 from mbed_devices._internal.windows.windows_identifier import WindowsUID
 
 KEY_UID = "UID"
+# Number of parsed device IDs kept across scans, well above the number of USB components of a host.
+PARSED_DEVICE_IDS_CACHE_SIZE = 4096
 
 
 class USBIdentifierToken(Enum):
@@ -29,12 +32,19 @@ class USBIdentifierToken(Enum):
     @property
     def pattern(self) -> Pattern:
         """Gets the regex pattern for the corresponding part."""
-        return re.compile(f"^{self.name}_(.*)$")
+        return _TOKEN_PATTERNS[self]
 
     @staticmethod
     def get_patterns_dict() -> dict:
         """Returns a dictionary of all the regexes."""
-        return {p: p.pattern for p in USBIdentifierToken}
+        return dict(_TOKEN_PATTERNS)
+
+
+_TOKEN_PATTERNS: Dict[USBIdentifierToken, Pattern] = {
+    token: re.compile(f"^{token.name}_(.*)$") for token in USBIdentifierToken
+}
+# Matches any token of the device ID, the name of the token being the first group and its value the second.
+TOKENS_PATTERN = re.compile(f"^({'|'.join(token.name for token in USBIdentifierToken)})_(.*)$")
 
 
 class UsbIdentifier(
@@ -115,21 +125,18 @@ class Win32DeviceIdParser:
         # The following tries to only consider what may be the ParentPrefixID.
         return WindowsUID(uid="&".join(id_elements[:-1]).lower(), raw_uid=raw_id, serial_number=serial_number)
 
-    def record_id_element(self, element: str, valuable_information: dict, patterns_dict: dict) -> None:
-        """Stores recognised parts of the device ID based on patterns defined."""
-        for k, p in patterns_dict.items():
-            match = p.fullmatch(element)
-            if match:
-                valuable_information[k.name] = match.group(1)
+    def record_id_element(self, element: str, valuable_information: dict) -> None:
+        """Stores the token an element of the device ID is, if any."""
+        match = TOKENS_PATTERN.fullmatch(element)
+        if match:
+            valuable_information[match.group(1)] = match.group(2)
 
     def split_id_elements(self, parts: List[str], serial_number: str = None) -> dict:
         """Splits the different elements of an Device ID."""
         information = dict()
         information[KEY_UID] = self.parse_uid(parts[-1], serial_number)
-        other_elements = parts[-2].split("&")
-        patterns_dict = USBIdentifierToken.get_patterns_dict()
-        for element in other_elements:
-            self.record_id_element(element, information, patterns_dict)
+        for element in parts[-2].split("&"):
+            self.record_id_element(element, information)
         return information
 
     def parse(self, id_string: Optional[str], serial_number: Optional[str] = None) -> "UsbIdentifier":
@@ -160,9 +167,13 @@ class Win32DeviceIdParser:
         return UsbIdentifier(**self.split_id_elements(parts, serial_number))
 
 
+@lru_cache(maxsize=PARSED_DEVICE_IDS_CACHE_SIZE)
 def parse_device_id(id_string: Optional[str], serial_number: Optional[str] = None) -> UsbIdentifier:
     """Parses the device id string and retrieves the different elements of interest.
 
+    The identifiers parsed are kept across scans, as the same devices are found on each scan. They must therefore not
+    be modified.
+
     See https://docs.microsoft.com/en-us/windows-hardware/drivers/install/standard-usb-identifiers
     """
     return Win32DeviceIdParser().parse(id_string, serial_number)
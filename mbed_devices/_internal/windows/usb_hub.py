@@ -53,9 +53,13 @@ class UsbHub(ComponentDescriptor):
     Seems similar to https://docs.microsoft.com/en-us/windows/win32/cimwin32prov/cim-usbhub
     """
 
+    __slots__ = ()
+
     def __init__(self) -> None:
         """Initialiser."""
-        super().__init__(UsbHubMsdnDefinition, win32_class_name="Win32_USBHub")
+        super().__init__(
+            UsbHubMsdnDefinition, win32_class_name="Win32_USBHub", win32_fields=["DeviceID", "PNPDeviceID"],
+        )
 
     @property
     def component_id(self) -> str:
@@ -4,10 +4,14 @@
 #
 """Loads System's USB hub."""
 
-from typing import Dict, List, cast, Optional, Set, Generator
+from typing import Dict, List, cast, Optional, Set, Generator, Tuple
 
 from mbed_devices._internal.windows.component_descriptor import ComponentDescriptor
-from mbed_devices._internal.windows.device_instance_id import get_children_instance_id
+from mbed_devices._internal.windows.device_instance_id import (
+    ParentIdPrefixCache,
+    get_shared_parent_id_prefix_cache,
+)
+from mbed_devices._internal.windows.uid_canonicaliser import UidCanonicaliser, UidKey, get_variant_keys
 from mbed_devices._internal.windows.system_data_loader import SystemDataLoader, ComponentsLoader
 from mbed_devices._internal.windows.usb_controller import UsbController
 from mbed_devices._internal.windows.usb_device_identifier import parse_device_id, UsbIdentifier
@@ -22,11 +26,24 @@ class SystemUsbDeviceInformation:
     This cache tries to reduce the list of UsbHubs to only genuinely different devices.
     """
 
-    def __init__(self, data_loader: SystemDataLoader) -> None:
-        """Initialiser."""
+    def __init__(
+        self, data_loader: SystemDataLoader, parent_id_prefix_cache: Optional[ParentIdPrefixCache] = None
+    ) -> None:
+        """Initialiser.
+
+        Args:
+            data_loader: loads the system data.
+            parent_id_prefix_cache: `ParentIdPrefix` of the devices, the cache shared across scans if not specified.
+        """
         self._cache: Optional[Dict[UsbIdentifier, List[UsbHub]]] = None
         self._ids_cache: Optional[Set[UsbIdentifier]] = None
+        self._devices_by_key: Dict[UidKey, List[UsbHub]] = dict()
+        self._ids_by_key: Dict[UidKey, UsbIdentifier] = dict()
+        self._canonicaliser = UidCanonicaliser()
         self._data_loader = data_loader
+        if parent_id_prefix_cache is None:
+            parent_id_prefix_cache = get_shared_parent_id_prefix_cache()
+        self._parent_id_prefix_cache = parent_id_prefix_cache
 
     def _list_usb_controller_ids(self) -> List[UsbIdentifier]:
         return cast(
@@ -40,48 +57,73 @@ class SystemUsbDeviceInformation:
     def _iterate_over_hubs(self) -> Generator[ComponentDescriptor, None, None]:
         return ComponentsLoader(self._data_loader, UsbHub).element_generator()
 
-    def _populate_id_cache_with_non_serialnumbers(self) -> None:
-        if not self._cache or not self._ids_cache:
-            return
-        for usb_id in self._cache:
-            if usb_id not in self._ids_cache:
-                self._ids_cache.add(usb_id)
+    def _read_potential_serial_numbers(self, usb_devices: List[UsbHub]) -> None:
+        """Reads the registry in one go for the devices plugged in since the previous scan."""
+        self._parent_id_prefix_cache.refresh(usb_device.pnp_id for usb_device in usb_devices)
 
     def _determine_potential_serial_number(self, usb_device: UsbHub) -> Optional[str]:
-        return get_children_instance_id(usb_device.pnp_id)
+        return self._parent_id_prefix_cache.get(usb_device.pnp_id)
 
     def _load(self) -> None:
-        """Populates the cache."""
-        self._cache = cast(Dict[UsbIdentifier, List[UsbHub]], dict())
-        self._ids_cache = cast(Set[UsbIdentifier], set())
-        controllers = self._list_usb_controller_ids()
-        for usb_device in self._iterate_over_hubs():
+        """Populates the cache.
+
+        Hubs are grouped by the canonical key of their identifier, so that they are matched with dictionary lookups.
+        """
+        controllers = UidCanonicaliser()
+        for controller_id in self._list_usb_controller_ids():
+            controllers.add(controller_id)
+        usb_devices = cast(List[UsbHub], list(self._iterate_over_hubs()))
+        self._read_potential_serial_numbers(usb_devices)
+        canonicaliser = UidCanonicaliser()
+        identified_usb_devices = []
+        for usb_device in usb_devices:
             usb_id = parse_device_id(
-                usb_device.component_id, serial_number=self._determine_potential_serial_number(cast(UsbHub, usb_device))
+                usb_device.component_id, serial_number=self._determine_potential_serial_number(usb_device)
             )
-            if usb_id in controllers:
+            # Keys are only computed once per hub, as this involves most of the identifier logic.
+            keys = get_variant_keys(usb_id)
+            if controllers.find_keys(keys) is not None:
                 continue
-            entry = self._cache.get(usb_id, list())
-            entry.append(cast(UsbHub, usb_device))
-            self._cache[usb_id] = entry
-
-            if usb_id.contains_genuine_serial_number():
-                self._ids_cache.add(usb_id)
-        self._populate_id_cache_with_non_serialnumbers()
+            identified_usb_devices.append((usb_id, usb_device, canonicaliser.add_keys(keys), len(keys) > 1))
+        # Keys are only looked up once all hubs are added, as variants added later may merge devices.
+        usb_devices_by_key: Dict[UidKey, List[UsbHub]] = dict()
+        ids_by_key: Dict[UidKey, Tuple[UsbIdentifier, bool]] = dict()
+        for usb_id, usb_device, key, has_serial_number in identified_usb_devices:
+            key = canonicaliser.get_canonical_key(key)
+            usb_devices_by_key.setdefault(key, list()).append(usb_device)
+            # A device is identified by its first interface with a genuine serial number, if any.
+            if key not in ids_by_key or (has_serial_number and not ids_by_key[key][1]):
+                ids_by_key[key] = (usb_id, has_serial_number)
+        self._canonicaliser = canonicaliser
+        self._cache = {ids_by_key[key][0]: usb_devices for key, usb_devices in usb_devices_by_key.items()}
+        self._devices_by_key = usb_devices_by_key
+        self._ids_by_key = {key: usb_id for key, (usb_id, _) in ids_by_key.items()}
+        self._ids_cache = set(self._ids_by_key.values())
 
     @property
     def usb_devices(self) -> Dict[UsbIdentifier, List[UsbHub]]:
         """Usb devices present in the system."""
-        if not self._cache:
+        if self._cache is None:
             self._load()
         return cast(Dict[UsbIdentifier, List[UsbHub]], self._cache)
 
     def get_usb_devices(self, uid: UsbIdentifier) -> List[UsbHub]:
         """Gets all USB devices related to an identifier."""
-        return self.usb_devices.get(uid, list())
+        if self._cache is None:
+            self._load()
+        key = self._canonicaliser.find(uid)
+        return self._devices_by_key.get(key, list()) if key else list()
+
+    def find_usb_device_id(self, pnp_id: str) -> Optional[UsbIdentifier]:
+        """Gets the identifier of the USB device a hub or a serial port relates to, None if not a known device."""
+        if self._cache is None:
+            self._load()
+        usb_id = parse_device_id(pnp_id, serial_number=self._parent_id_prefix_cache.get(pnp_id))
+        key = self._canonicaliser.find(usb_id)
+        return self._ids_by_key.get(key) if key else None
 
     def usb_device_ids(self) -> List[UsbIdentifier]:
         """Gets system usb device IDs."""
-        if not self._ids_cache:
+        if self._ids_cache is None:
             self._load()
         return cast(List[UsbIdentifier], self._ids_cache)
@@ -10,15 +10,17 @@ Therefore, a specific data model needs to be constructed using other Windows met
 """
 
 from enum import Enum
-from typing import NamedTuple, List
+from typing import Callable, Dict, Iterable, NamedTuple, List
+from mbed_devices._internal.utils.concurrency import CallTimedOut, DeadlineExecutor
 from mbed_devices._internal.windows.component_descriptor import UNKNOWN_VALUE
 
 import logging
-import win32.win32api
-import win32.win32file
 
 logger = logging.getLogger(__name__)
 
+# Time allowed to retrieve information about a volume, in seconds.
+VOLUME_QUERY_TIMEOUT = 5.0
+
 
 class DriveType(Enum):
     """Drive type as defined in Win32 API.
@@ -54,7 +56,13 @@ class VolumeInformation(NamedTuple):
     DriveType: DriveType  # As defined by GetDriveType
 
 
+UNKNOWN_VOLUME_INFORMATION = VolumeInformation(*([UNKNOWN_VALUE] * 6), DriveType.DRIVE_UNKNOWN)  # type: ignore
+
+
 def _get_windows_volume_information(volume: str) -> List[str]:
+    # Imported here so that the calls to the Win32 API can be mocked where pywin32 is unavailable.
+    import win32.win32api
+
     try:
         return list(win32.win32api.GetVolumeInformation(volume))
     except Exception as e:
@@ -63,6 +71,8 @@ def _get_windows_volume_information(volume: str) -> List[str]:
 
 
 def _get_volume_name_for_mount_point(volume: str) -> str:
+    import win32.win32file
+
     try:
         return str(win32.win32file.GetVolumeNameForVolumeMountPoint(volume))
     except Exception as e:
@@ -71,6 +81,8 @@ def _get_volume_name_for_mount_point(volume: str) -> str:
 
 
 def _get_drive_type(volume: str) -> DriveType:
+    import win32.win32file
+
     try:
         return DriveType(win32.win32file.GetDriveType(volume))
     except Exception as e:
@@ -87,3 +99,40 @@ def get_volume_information(volume: str) -> VolumeInformation:
         _get_drive_type(volume),  # type: ignore
     ]
     return VolumeInformation(*values)
+
+
+def get_volumes_information(
+    volumes: Iterable[str],
+    timeout: float = VOLUME_QUERY_TIMEOUT,
+    get_information: Callable[[str], VolumeInformation] = get_volume_information,
+) -> Dict[str, VolumeInformation]:
+    """Gets the information of volumes concurrently.
+
+    Retrieving the information of a volume may block for seconds, e.g. while a drive spins up, so volumes are queried
+    at the same time and each of them is given the same time to complete.
+
+    Args:
+        volumes: volumes to get information about e.g. F:
+        timeout: time allowed to retrieve information about each volume, in seconds.
+        get_information: gets the information of a volume.
+
+    Returns:
+        The information of each volume, unknown for the volumes which could not be queried in time.
+    """
+    volumes = list(dict.fromkeys(volumes))
+    if not volumes:
+        return {}
+    # Calls to the Win32 API cannot be interrupted: queries still running past the timeout are abandoned, on daemon
+    # threads which do not prevent the interpreter from exiting.
+    executor = DeadlineExecutor(timeout=timeout, max_workers=len(volumes), name="volume")
+    futures = {volume: executor.submit(get_information, volume) for volume in volumes}
+    volumes_information = {}
+    for volume, future in futures.items():
+        volumes_information[volume] = UNKNOWN_VOLUME_INFORMATION
+        try:
+            volumes_information[volume] = future.result()
+        except CallTimedOut:
+            logger.warning(f"Information about volume {volume} could not be retrieved within {timeout} seconds.")
+        except Exception as e:
+            logger.debug(f"Cannot retrieve information about volume {volume}. Reason: {e}")
+    return volumes_information
@@ -0,0 +1,165 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Pool of threads keeping their connection to the WMI service across scans.
+
+Initialising COM and connecting to the WMI service takes a significant part of a scan. Connections are only usable on
+the thread which established them, so each thread of the pool establishes its own on first use and keeps it until the
+pool is shut down, when COM is uninitialised on the thread. The pool shared by the scans is shut down at exit.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from mbed_devices._internal.windows.component_descriptor import (
+    Win32Wrapper,
+    WmiConnectionFactory,
+    connect_to_wmi,
+    disconnect_from_wmi,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# One thread per type of system data loaded in parallel.
+DEFAULT_MAX_WORKERS = 8
+# Time in seconds the shared pool is waited for at exit, so that a call stuck in the WMI service does not hang the exit.
+SHUTDOWN_TIMEOUT = 5.0
+
+
+class WmiConnectionPool:
+    """Runs calls on a pool of threads, each holding a connection to the WMI service.
+
+    Threads are started as calls are submitted, when no thread is idle, up to the maximum number of workers. Unlike the
+    threads of a `ThreadPoolExecutor`, they disconnect from the WMI service before stopping.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        connect: WmiConnectionFactory = connect_to_wmi,
+        disconnect: Callable[[], None] = disconnect_from_wmi,
+    ) -> None:
+        """Initialiser.
+
+        Args:
+            max_workers: the maximum number of threads, hence of connections.
+            connect: establishes a connection on the calling thread.
+            disconnect: releases the resources of the connection of the calling thread, once it is no longer used.
+        """
+        self._max_workers = max_workers
+        self._connect = connect
+        self._disconnect = disconnect
+        self._calls: "queue.Queue[Optional[Tuple[Future, Callable[[Win32Wrapper], object], bool]]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        # Counts the threads with no call assigned. A call is assigned to a thread when it is submitted, either to an
+        # idle thread or to a thread started for it; calls submitted while all threads are busy are not assigned.
+        self._idle_threads = threading.Semaphore(0)
+        self._is_shut_down = False
+        self._lock = threading.Lock()
+
+    def submit(self, function: Callable[[Win32Wrapper], T]) -> "Future[T]":
+        """Schedules a call to the function with the connection of the thread running it."""
+        future: "Future[T]" = Future()
+        with self._lock:
+            if self._is_shut_down:
+                raise RuntimeError("Cannot schedule new calls after the pool is shut down.")
+            is_assigned = self._idle_threads.acquire(blocking=False)
+            if not is_assigned and len(self._threads) < self._max_workers:
+                thread = threading.Thread(target=self._work, name=f"wmi_{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+                is_assigned = True
+            self._calls.put((future, function, is_assigned))
+        return future
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None) -> None:
+        """Stops the threads of the pool, along with their connections, once the pending calls are complete.
+
+        Args:
+            wait: whether to wait for the threads to stop.
+            timeout: the time in seconds to wait for at most, None to wait until the threads have stopped.
+        """
+        with self._lock:
+            if not self._is_shut_down:
+                self._is_shut_down = True
+                for _ in self._threads:
+                    self._calls.put(None)
+        if wait:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            for thread in self._threads:
+                thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+
+    def _work(self) -> None:
+        win32_wrapper: Optional[Win32Wrapper] = None
+        try:
+            while True:
+                call = self._calls.get()
+                if call is None:
+                    return
+                future, function, is_assigned = call
+                if future.set_running_or_notify_cancel():
+                    try:
+                        if win32_wrapper is None:
+                            # A connection failure is reported to the caller, and attempted again on the next call.
+                            win32_wrapper = Win32Wrapper(self._connect())
+                        future.set_result(function(win32_wrapper))
+                    except BaseException as e:
+                        future.set_exception(e)
+                if is_assigned:
+                    # The thread which ran the call is idle again, while any call it took in place of the one assigned
+                    # to it has left another thread idle.
+                    self._idle_threads.release()
+        finally:
+            if win32_wrapper is not None:
+                # The connection is released before disconnecting, which uninitialises COM on the thread.
+                del win32_wrapper
+                try:
+                    self._disconnect()
+                except Exception as e:
+                    logger.warning(f"Unable to disconnect from the WMI service. {e}")
+
+    def __enter__(self) -> "WmiConnectionPool":
+        """Enters the context of the pool."""
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Shuts the pool down."""
+        self.shutdown()
+
+
+_shared_pool: Optional[WmiConnectionPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_connection_pool() -> WmiConnectionPool:
+    """Returns the pool shared by all the scans of the process, which is started on first use."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = WmiConnectionPool()
+        return _shared_pool
+
+
+def shutdown_shared_connection_pool(timeout: Optional[float] = None) -> None:
+    """Shuts down the pool shared by all the scans of the process, a new one is started if scanning again.
+
+    Args:
+        timeout: the time in seconds to wait for the threads of the pool for at most, None to wait until they stopped.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        pool, _shared_pool = _shared_pool, None
+    if pool is not None:
+        pool.shutdown(timeout=timeout)
+
+
+# The threads of the pool are daemon threads, which the interpreter does not wait for: they are stopped at exit so that
+# COM is uninitialised on each of them, without waiting longer than the timeout for those busy in the WMI service.
+atexit.register(shutdown_shared_connection_pool, timeout=SHUTDOWN_TIMEOUT)
@@ -29,6 +29,22 @@ class Device:
     serial_port: Optional[str]
     mount_points: Tuple[Path, ...]
 
+    @classmethod
+    def from_candidate(cls, candidate_device: CandidateDevice, mbed_board: Optional[Board] = None) -> "Device":
+        """Create a Device from a candidate device and optionally the Board it was identified as.
+
+        Args:
+            candidate_device: a CandidateDevice object containing the device information.
+            mbed_board: a Board object for identified devices, for unidentified devices this will be None.
+        """
+        return cls(
+            serial_port=candidate_device.serial_port,
+            serial_number=candidate_device.serial_number,
+            mount_points=candidate_device.mount_points,
+            # Create an empty Board to ensure the device is fully populated and rendering is simple
+            mbed_board=mbed_board if mbed_board is not None else Board.from_offline_board_entry({}),
+        )
+
 
 @dataclass(order=True)
 class ConnectedDevices:
@@ -55,13 +71,7 @@ class ConnectedDevices:
             candidate_device: a CandidateDevice object containing the device information.
             mbed_board: a Board object for identified devices, for unidentified devices this will be None.
         """
-        new_device = Device(
-            serial_port=candidate_device.serial_port,
-            serial_number=candidate_device.serial_number,
-            mount_points=candidate_device.mount_points,
-            # Create an empty Board to ensure the device is fully populated and rendering is simple
-            mbed_board=mbed_board if mbed_board is not None else Board.from_offline_board_entry({}),
-        )
+        new_device = Device.from_candidate(candidate_device, mbed_board)
 
         if mbed_board is None:
             # Keep a list of devices that could not be identified but are Mbed Boards
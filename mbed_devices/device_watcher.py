@@ -0,0 +1,178 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""API for watching devices as they are connected to and disconnected from the host computer."""
+import logging
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from mbed_targets import Board
+
+from mbed_devices._internal.candidate_device import CandidateDevice
+from mbed_devices._internal.detect_candidate_devices import detect_candidate_devices
+from mbed_devices._internal.hotplug import (
+    CandidateTracker,
+    HotplugEventSource,
+    get_candidate_tracker_for_current_os,
+    get_event_source_for_current_os,
+)
+from mbed_devices.device import Device
+from mbed_devices.exceptions import DeviceLookupFailed
+from mbed_devices.mbed_devices import iter_resolved_candidates
+
+logger = logging.getLogger(__name__)
+
+DeviceCallback = Callable[[Device], None]
+
+
+class _TrackedDevice(NamedTuple):
+    candidate: CandidateDevice
+    device: Device
+
+
+class DeviceWatcher:
+    """Keeps an up to date registry of the devices connected to the host computer.
+
+    The registry is refreshed whenever the operating system reports a change which may affect connected devices. Where
+    events identify the components affected, e.g. on Windows, only the devices they belong to are detected again.
+    Only newly connected devices are looked up in the board database, devices which were already known keep the
+    Board they were identified as, even if their mount points or serial port change.
+
+    Callbacks are called from the thread processing the events, which is a background thread if the watcher was
+    started with `start`.
+
+    Example:
+        >>> with DeviceWatcher(on_attached=lambda device: print(f"Connected {device.serial_number}")):
+        ...     time.sleep(60)
+    """
+
+    def __init__(
+        self,
+        on_attached: Optional[DeviceCallback] = None,
+        on_detached: Optional[DeviceCallback] = None,
+        on_changed: Optional[DeviceCallback] = None,
+        event_source: Optional[HotplugEventSource] = None,
+        candidate_tracker: Optional[CandidateTracker] = None,
+    ) -> None:
+        """Initialiser.
+
+        Args:
+            on_attached: called with each Device which gets connected.
+            on_detached: called with each Device which gets disconnected.
+            on_changed: called with the updated Device when the mount points or serial port of a device change.
+            event_source: source of the hotplug events, defaults to the one best suited to the operating system.
+            candidate_tracker: updates the candidates affected by each event, all candidates are detected again on
+                each event if None. Defaults to the one of the operating system if no event source is specified.
+        """
+        self._on_attached = on_attached
+        self._on_detached = on_detached
+        self._on_changed = on_changed
+        if event_source is None:
+            event_source = get_event_source_for_current_os()
+            if candidate_tracker is None:
+                candidate_tracker = get_candidate_tracker_for_current_os()
+        self._event_source = event_source
+        self._candidate_tracker = candidate_tracker
+        self._tracked_devices: Dict[str, _TrackedDevice] = {}
+        self._lock = threading.Lock()
+        # Serialises the scans and updates of the candidates, along with the application of their outcome.
+        self._update_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def devices(self) -> List[Device]:
+        """Devices currently connected."""
+        with self._lock:
+            return [tracked.device for tracked in self._tracked_devices.values()]
+
+    def refresh(self) -> None:
+        """Detects connected devices and updates the registry, calling the relevant callbacks."""
+        with self._update_lock:
+            if self._candidate_tracker is not None:
+                candidates = {candidate.serial_number: candidate for candidate in self._candidate_tracker.scan()}
+            else:
+                candidates = {candidate.serial_number: candidate for candidate in detect_candidate_devices()}
+            changes: Dict[str, Optional[CandidateDevice]] = dict()
+            with self._lock:
+                changes.update({s: None for s in self._tracked_devices if s not in candidates})
+            changes.update(candidates)
+            self._apply(changes)
+
+    def _apply(self, changes: Dict[str, Optional[CandidateDevice]]) -> None:
+        """Updates the registry with the candidates by serial number, None for devices disconnected."""
+        with self._lock:
+            new_candidates = [c for s, c in changes.items() if c is not None and s not in self._tracked_devices]
+        # Boards are looked up without holding the lock, as it may take a while, e.g. querying the online database.
+        # They are looked up concurrently, a device which cannot be identified in time being tracked as unidentified.
+        boards: Dict[str, Optional[Board]] = dict()
+        try:
+            for new_candidate, board in iter_resolved_candidates(new_candidates):
+                boards[new_candidate.serial_number] = board
+        except DeviceLookupFailed as e:
+            # The devices not looked up are not recorded so that the look up is attempted again on the next refresh.
+            logger.error(f"Could not look up the devices connected: {e}")
+
+        notifications = []
+        with self._lock:
+            for serial_number, candidate in changes.items():
+                tracked = self._tracked_devices.get(serial_number)
+                if candidate is None:
+                    if tracked is not None:
+                        notifications.append((self._on_detached, self._tracked_devices.pop(serial_number).device))
+                elif tracked is None:
+                    if serial_number not in boards:
+                        # The look up failed, or the device was detached by another refresh in the meantime and is
+                        # looked up on the next one.
+                        continue
+                    device = Device.from_candidate(candidate, boards[serial_number])
+                    self._tracked_devices[serial_number] = _TrackedDevice(candidate, device)
+                    notifications.append((self._on_attached, device))
+                elif tracked.candidate != candidate:
+                    device = Device.from_candidate(candidate, tracked.device.mbed_board)
+                    self._tracked_devices[serial_number] = _TrackedDevice(candidate, device)
+                    notifications.append((self._on_changed, device))
+
+        # Callbacks are called once the registry is consistent, so that they can safely query the watcher.
+        for callback, device in notifications:
+            if callback is not None:
+                try:
+                    callback(device)
+                except Exception:
+                    # The watcher keeps running, as other devices may still be of interest.
+                    logger.exception(f"Callback {callback} failed for the device '{device.serial_number}'.")
+
+    def run(self) -> None:
+        """Refreshes the registry on every hotplug event, until the watcher is stopped."""
+        # Events are collected before the first refresh, so that devices connected in between are not missed.
+        self._event_source.open()
+        self.refresh()
+        for event in self._event_source:
+            if self._candidate_tracker is not None:
+                logger.debug(f"Updating the devices affected by {event}.")
+                with self._update_lock:
+                    self._apply(self._candidate_tracker.update(event))
+            else:
+                logger.debug(f"Refreshing connected devices following {event}.")
+                self.refresh()
+
+    def start(self) -> None:
+        """Runs the watcher in a background thread."""
+        self._thread = threading.Thread(target=self.run, name="mbed-devices-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the watcher, waiting for the background thread to finish if there is one."""
+        self._event_source.close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "DeviceWatcher":
+        """Starts the watcher in a background thread."""
+        self.start()
+        return self
+
+    def __exit__(self, type: Any, value: Any, traceback: Any) -> None:
+        """Stops the watcher."""
+        self.stop()
@@ -0,0 +1,106 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+"""Environment options for `mbed-devices`.
+
+All the env configuration options can be set either via environment variables or using a `.env` file
+containing the variable definitions as follows:
+
+```
+VARIABLE=value
+```
+
+Environment variables take precendence, meaning the values set in the file will be overriden
+by any values previously set in your environment.
+"""
+import os
+import dotenv
+
+dotenv.load_dotenv(dotenv.find_dotenv(usecwd=True))
+
+
+class Env:
+    """Provides access to environment variables.
+
+    Ensures variables are reloaded when environment changes during runtime.
+    Additionally allows to expose documented instance variables in pdoc
+    generated output.
+    """
+
+    @property
+    def MBED_DEVICES_LINUX_BACKEND(self) -> str:
+        """Source of device information to use on Linux.
+
+        The mode can be set to one of the following:
+
+        - `AUTO`: udev is used if its database is available, otherwise sysfs is read directly.
+        - `UDEV`: the udev database is always used, which requires `pyudev` and a running udev daemon.
+        - `SYSFS`: sysfs is always read directly, which suits containers and minimal images without udev.
+
+        If `MBED_DEVICES_LINUX_BACKEND` is not set, it defaults to `AUTO`.
+        """
+        return os.getenv("MBED_DEVICES_LINUX_BACKEND", "AUTO")
+
+    @property
+    def MBED_DEVICES_DARWIN_BACKEND(self) -> str:
+        """Source of USB device information to use on macOS.
+
+        The mode can be set to one of the following:
+
+        - `AUTO` or `IOREG`: the I/O Registry is read with `ioreg`, which is much faster than `system_profiler`.
+          `system_profiler` is used instead if `ioreg` cannot be run.
+        - `SYSTEM_PROFILER`: USB devices are always listed with `system_profiler`, as in previous versions.
+
+        If `MBED_DEVICES_DARWIN_BACKEND` is not set, it defaults to `AUTO`.
+        """
+        return os.getenv("MBED_DEVICES_DARWIN_BACKEND", "AUTO")
+
+    @property
+    def MBED_DEVICES_BOARD_CACHE(self) -> str:
+        """Use of the on-disk cache of resolved boards.
+
+        Boards are cached by device identity and by the size and modification time of the HTM files on the device,
+        so that boards which stay connected are not looked up again on every scan.
+
+        The mode can be set to one of the following:
+
+        - `ON`: boards are read from and stored in the cache.
+        - `REFRESH`: boards are always looked up, and the cache is updated with the outcome.
+        - `OFF`: the cache is not used at all.
+
+        If `MBED_DEVICES_BOARD_CACHE` is not set, it defaults to `ON`.
+        """
+        return os.getenv("MBED_DEVICES_BOARD_CACHE", "ON")
+
+    @property
+    def MBED_DEVICES_BOARD_CACHE_PATH(self) -> str:
+        """Location of the board cache database file.
+
+        If `MBED_DEVICES_BOARD_CACHE_PATH` is not set, the database is stored in the platform's cache directory, e.g.
+        `~/.cache/mbed-devices/boards.sqlite3` on Linux.
+        """
+        return os.getenv("MBED_DEVICES_BOARD_CACHE_PATH", "")
+
+    @property
+    def MBED_DEVICES_BOARD_CACHE_SIZE(self) -> str:
+        """Maximum number of entries in the board cache, least recently used entries are evicted first.
+
+        If `MBED_DEVICES_BOARD_CACHE_SIZE` is not set, it defaults to 512.
+        """
+        return os.getenv("MBED_DEVICES_BOARD_CACHE_SIZE", "512")
+
+    @property
+    def MBED_DEVICES_BOARD_RESOLUTION_TIMEOUT(self) -> str:
+        """Time allowed to identify each connected device, in seconds.
+
+        Devices which cannot be identified in time, for instance because their mass storage is unresponsive, are
+        reported as unidentified devices rather than delaying the listing of the other devices.
+
+        If `MBED_DEVICES_BOARD_RESOLUTION_TIMEOUT` is not set, it defaults to 10 seconds.
+        """
+        return os.getenv("MBED_DEVICES_BOARD_RESOLUTION_TIMEOUT", "10")
+
+
+env = Env()
+"""Instance of `Env` class."""
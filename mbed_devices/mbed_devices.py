@@ -3,15 +3,34 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 """API for listing devices."""
+import asyncio
+import itertools
+import logging
+import pathlib
+from collections import deque
+from concurrent.futures import Future
+from typing import AsyncIterator, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+from mbed_targets import Board
 from mbed_targets.exceptions import MbedTargetsError
 
-from mbed_devices._internal.detect_candidate_devices import detect_candidate_devices
+from mbed_devices._internal.board_cache import get_board_cache, is_cache_read_enabled, make_cache_key
+from mbed_devices._internal.candidate_device import CandidateDevice
+from mbed_devices._internal.detect_candidate_devices import iter_candidate_devices
 from mbed_devices._internal.resolve_board import resolve_board
 from mbed_devices._internal.exceptions import NoBoardForCandidate
+from mbed_devices._internal.utils.concurrency import CallTimedOut, DeadlineExecutor, is_current_call_abandoned
 
-from mbed_devices.device import ConnectedDevices
-from mbed_devices.exceptions import DeviceLookupFailed
+from mbed_devices.device import ConnectedDevices, Device
+from mbed_devices.env import env
+from mbed_devices.exceptions import DeviceLookupFailed, DeviceNotFound
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of devices identified at the same time.
+MAX_CONCURRENT_RESOLUTIONS = 8
+
+DEFAULT_RESOLUTION_TIMEOUT = 10.0  # seconds
 
 
 def get_connected_devices() -> ConnectedDevices:
@@ -20,19 +39,257 @@ def get_connected_devices() -> ConnectedDevices:
     Connected devices which have been identified as Mbed Boards and also connected devices which are potentially
     Mbed Boards (but not could not be identified in the database) are returned.
 
+    Devices are identified concurrently. A device which cannot be identified in time, for instance because its mass
+    storage is unresponsive, is returned as an unidentified device.
+
     Raises:
         DeviceLookupFailed: If there is a problem with the process of identifying Mbed Boards from connected devices.
     """
     connected_devices = ConnectedDevices()
 
-    for candidate_device in detect_candidate_devices():
-        try:
-            board = resolve_board(candidate_device)
-        except NoBoardForCandidate:
-            board = None
-        except MbedTargetsError as err:
-            raise DeviceLookupFailed("A problem occurred when looking up board data for connected devices.") from err
-
+    for candidate_device, board in iter_resolved_candidates(iter_candidate_devices()):
         connected_devices.add_device(candidate_device, board)
 
     return connected_devices
+
+
+def iter_connected_devices() -> Iterator[Device]:
+    """Yields Mbed Devices connected to host computer.
+
+    Devices are yielded in the order they are detected. Each device is identified while the next ones are still being
+    detected, so that callers only interested in the first few devices do not have to wait for the whole system to be
+    scanned. Devices which could not be identified as Mbed Boards are yielded with an empty `mbed_board`, as they are
+    in `ConnectedDevices.unidentified_devices`.
+
+    Example:
+        >>> device = next(device for device in iter_connected_devices() if device.mbed_board.board_type == "K64F")
+
+    Raises:
+        DeviceLookupFailed: If there is a problem with the process of identifying a Mbed Board.
+    """
+    for candidate_device, board in iter_resolved_candidates(iter_candidate_devices()):
+        yield Device.from_candidate(candidate_device, board)
+
+
+def find_devices(
+    serial_number: Optional[str] = None,
+    mount_point: Union[None, str, pathlib.Path] = None,
+    product_code: Optional[str] = None,
+    board_type: Optional[str] = None,
+) -> List[Device]:
+    """Returns the connected Mbed Devices matching all the criteria given.
+
+    Only the devices which may match the serial number and mount point are identified, and the scan stops as soon as
+    the device with the given serial number or mount point is found, as no other device can have them.
+
+    Args:
+        serial_number: serial number of the device.
+        mount_point: one of the mount points of the device.
+        product_code: product code of the Mbed Board the device was identified as.
+        board_type: board type of the Mbed Board the device was identified as, compared case-insensitively.
+
+    Raises:
+        DeviceLookupFailed: If there is a problem with the process of identifying a Mbed Board.
+    """
+    return list(_iter_matching_devices(serial_number, mount_point, product_code, board_type))
+
+
+def find_device(
+    serial_number: Optional[str] = None,
+    mount_point: Union[None, str, pathlib.Path] = None,
+    product_code: Optional[str] = None,
+    board_type: Optional[str] = None,
+) -> Device:
+    """Returns the first connected Mbed Device matching all the criteria given.
+
+    See `find_devices` for the arguments. The scan stops as soon as a matching device is found.
+
+    Example:
+        >>> find_device(serial_number="0240000032044e4500257009997b00386781000097969900").mount_points
+
+    Raises:
+        DeviceNotFound: If no connected device matches the criteria.
+        DeviceLookupFailed: If there is a problem with the process of identifying a Mbed Board.
+    """
+    for device in _iter_matching_devices(serial_number, mount_point, product_code, board_type):
+        return device
+    criteria = {
+        "serial number": serial_number,
+        "mount point": mount_point,
+        "product code": product_code,
+        "board type": board_type,
+    }
+    description = ", ".join(f"{name} '{value}'" for name, value in criteria.items() if value is not None)
+    raise DeviceNotFound(f"No connected device matches the {description or 'criteria'}.")
+
+
+async def get_connected_devices_async() -> ConnectedDevices:
+    """Returns Mbed Devices connected to host computer, without blocking the event loop.
+
+    Asynchronous equivalent of `get_connected_devices`, the devices are detected and identified on background threads.
+
+    Raises:
+        DeviceLookupFailed: If there is a problem with the process of identifying Mbed Boards from connected devices.
+    """
+    connected_devices = ConnectedDevices()
+
+    candidate_devices = await _detect_candidate_devices_async()
+    timeout = _configured_resolution_timeout()
+    results = _submit_resolutions(candidate_devices, timeout)
+    if results:
+        await asyncio.wait([asyncio.wrap_future(result) for result in results])
+    for candidate_device, result in zip(candidate_devices, results):
+        connected_devices.add_device(candidate_device, _get_resolved_board(candidate_device, result, timeout))
+
+    return connected_devices
+
+
+async def iter_connected_devices_async() -> AsyncIterator[Device]:
+    """Yields Mbed Devices connected to host computer as soon as each of them is identified.
+
+    Devices are yielded in the order they are identified, which may differ from one call to the next. Devices which
+    could not be identified as Mbed Boards are yielded with an empty `mbed_board`, as they are in
+    `ConnectedDevices.unidentified_devices`.
+
+    Example:
+        >>> async for device in iter_connected_devices_async():
+        ...     print(device.serial_number)
+
+    Raises:
+        DeviceLookupFailed: If there is a problem with the process of identifying a Mbed Board.
+    """
+    candidate_devices = await _detect_candidate_devices_async()
+    timeout = _configured_resolution_timeout()
+    results = _submit_resolutions(candidate_devices, timeout)
+    pending: Dict["asyncio.Future[Optional[Board]]", Tuple[int, CandidateDevice, Future]] = {
+        asyncio.wrap_future(result): (index, candidate_device, result)
+        for index, (candidate_device, result) in enumerate(zip(candidate_devices, results))
+    }
+    while pending:
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for _, candidate_device, result in sorted(pending.pop(future) for future in done):
+            yield Device.from_candidate(candidate_device, _get_resolved_board(candidate_device, result, timeout))
+
+
+async def _detect_candidate_devices_async() -> List[CandidateDevice]:
+    # `get_running_loop` is not available on Python 3.6, where `get_event_loop` returns the running loop in coroutines.
+    get_running_loop = getattr(asyncio, "get_running_loop", asyncio.get_event_loop)
+    return await get_running_loop().run_in_executor(None, lambda: list(iter_candidate_devices()))
+
+
+def _iter_matching_devices(
+    serial_number: Optional[str],
+    mount_point: Union[None, str, pathlib.Path],
+    product_code: Optional[str],
+    board_type: Optional[str],
+) -> Iterator[Device]:
+    """Yields the devices matching all the criteria given, only identifying those which may match."""
+    candidate_devices: Iterable[CandidateDevice] = iter_candidate_devices(serial_number=serial_number)
+    if mount_point is not None:
+        candidate_devices = (
+            candidate for candidate in candidate_devices if pathlib.Path(mount_point) in candidate.mount_points
+        )
+    if serial_number is not None or mount_point is not None:
+        # Serial numbers and mount points are unique, there is no need to look any further once a device has them.
+        candidate_devices = itertools.islice(candidate_devices, 1)
+
+    for candidate_device, board in iter_resolved_candidates(candidate_devices):
+        if product_code is not None and (board is None or board.product_code.lower() != product_code.lower()):
+            continue
+        if board_type is not None and (board is None or board.board_type.lower() != board_type.lower()):
+            continue
+        yield Device.from_candidate(candidate_device, board)
+
+
+def iter_resolved_candidates(
+    candidate_devices: Iterable[CandidateDevice], timeout: Optional[float] = None
+) -> Iterator[Tuple[CandidateDevice, Optional[Board]]]:
+    """Yields each candidate device along with its Board, in the order they are detected.
+
+    Candidates are submitted for resolution as soon as they are detected, and yielded as soon as they and all the
+    candidates detected before them are resolved. The Board of a candidate which cannot be identified in time is None.
+
+    Args:
+        candidate_devices: the candidate devices to identify.
+        timeout: the time allowed to identify each candidate, in seconds, the configured timeout if not specified.
+
+    Raises:
+        DeviceLookupFailed: If there is a problem with the process of identifying an Mbed Board.
+    """
+    if timeout is None:
+        timeout = _configured_resolution_timeout()
+    executor = _make_resolution_executor(timeout)
+    pending: Deque[Tuple[CandidateDevice, Future]] = deque()
+    for candidate_device in candidate_devices:
+        pending.append((candidate_device, executor.submit(_resolve_board, candidate_device)))
+        while pending and pending[0][1].done():
+            candidate_device, result = pending.popleft()
+            yield candidate_device, _get_resolved_board(candidate_device, result, timeout)
+    while pending:
+        candidate_device, result = pending.popleft()
+        yield candidate_device, _get_resolved_board(candidate_device, result, timeout)
+
+
+def _submit_resolutions(candidate_devices: List[CandidateDevice], timeout: float) -> List[Future]:
+    """Starts resolving the Board of each candidate device on background threads."""
+    executor = _make_resolution_executor(timeout)
+    return [executor.submit(_resolve_board, candidate_device) for candidate_device in candidate_devices]
+
+
+def _make_resolution_executor(timeout: float) -> DeadlineExecutor:
+    return DeadlineExecutor(timeout=timeout, max_workers=MAX_CONCURRENT_RESOLUTIONS, name="mbed-devices-resolver")
+
+
+def _get_resolved_board(candidate_device: CandidateDevice, result: Future, timeout: float) -> Optional[Board]:
+    """Waits for the Board of a candidate device, None if it could not be identified in time.
+
+    Raises:
+        DeviceLookupFailed: If there is a problem with the process of identifying the Mbed Board.
+    """
+    try:
+        return result.result()
+    except CallTimedOut:
+        logger.warning(
+            f"Timed out after {timeout} seconds identifying the device with the serial number "
+            f"'{candidate_device.serial_number}', its mass storage may be unresponsive. Reporting it as unidentified."
+        )
+        return None
+
+
+def _resolve_board(candidate_device: CandidateDevice) -> Optional[Board]:
+    """Returns the Board of a candidate device, None if the candidate could not be identified as an Mbed Board.
+
+    The outcome is read from the board cache if the device was resolved before, and stored in it otherwise.
+
+    Raises:
+        DeviceLookupFailed: If there is a problem with the process of identifying the Mbed Board.
+    """
+    board_cache = get_board_cache()
+    cache_key = make_cache_key(candidate_device) if board_cache is not None else None
+    if board_cache is not None and cache_key is not None and is_cache_read_enabled():
+        cached_board = board_cache.get(cache_key)
+        if cached_board is not None:
+            return cached_board.board
+
+    try:
+        board: Optional[Board] = resolve_board(candidate_device)
+    except NoBoardForCandidate:
+        board = None
+    except MbedTargetsError as err:
+        raise DeviceLookupFailed("A problem occurred when looking up board data for connected devices.") from err
+
+    # Resolutions abandoned past their deadline must not have side effects, e.g. once the caller has returned.
+    if board_cache is not None and cache_key is not None and not is_current_call_abandoned():
+        board_cache.put(cache_key, board)
+    return board
+
+
+def _configured_resolution_timeout() -> float:
+    try:
+        return float(env.MBED_DEVICES_BOARD_RESOLUTION_TIMEOUT)
+    except ValueError:
+        logger.warning(
+            f"Invalid board resolution timeout '{env.MBED_DEVICES_BOARD_RESOLUTION_TIMEOUT}', "
+            f"using {DEFAULT_RESOLUTION_TIMEOUT} seconds."
+        )
+        return DEFAULT_RESOLUTION_TIMEOUT
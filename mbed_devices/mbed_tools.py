@@ -3,8 +3,13 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 """Integration with https://github.com/ARMmbed/mbed-tools."""
+import pdoc
+
 from mbed_devices._internal.mbed_tools.list_connected_devices import list_connected_devices
+from mbed_devices.env import Env
 from mbed_targets.mbed_tools import env_variables as mbed_targets_env_variables
 
 cli = list_connected_devices
-env_variables = mbed_targets_env_variables
+env_variables = (
+    mbed_targets_env_variables + pdoc.Class("Env", pdoc.Module("mbed_devices.env"), Env).instance_variables()
+)
@@ -0,0 +1 @@
+Add `DeviceWatcher` to keep track of devices as they are connected and disconnected, driven by udev and mount table events on Linux.
@@ -0,0 +1 @@
+Add a sysfs backend on Linux, used when udev is not available. The backend can be forced with the `MBED_DEVICES_LINUX_BACKEND` environment variable.
@@ -0,0 +1 @@
+Cache resolved boards on disk, so that boards which stay connected are not looked up again on every scan. The cache is configured with `MBED_DEVICES_BOARD_CACHE`, `MBED_DEVICES_BOARD_CACHE_PATH` and `MBED_DEVICES_BOARD_CACHE_SIZE`.
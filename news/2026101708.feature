@@ -0,0 +1 @@
+Add `get_connected_devices_async` and `iter_connected_devices_async` to list devices from asyncio applications without blocking the event loop, the latter yielding each device as soon as it is identified.
@@ -0,0 +1 @@
+Add `iter_connected_devices`, a generator yielding devices as they are detected and identified, so that callers looking for a particular board can stop before the whole system is scanned.
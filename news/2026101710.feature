@@ -0,0 +1 @@
+Add `find_device` and `find_devices` to look up connected devices by serial number, mount point, product code or board type, only identifying the devices which may match.
@@ -0,0 +1 @@
+Watch devices on Windows from WMI creation and deletion events, only aggregating again the USB device affected by each event instead of scanning all the system data.
@@ -0,0 +1 @@
+Add system data snapshots on Windows, recorded to JSON and replayed without pywin32, with a benchmark of the USB device aggregation over recorded and synthetic snapshots of 1 to 500 boards.
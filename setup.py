@@ -44,6 +44,7 @@ setup(
         "Click==7.0",
         "mbed-targets~=1.0",
         "mbed-tools-lib~=1.2",
+        "pdoc3",
         "pywin32; platform_system=='Windows'",
         "psutil; platform_system=='Linux'",
         "pyudev; platform_system=='Linux'",
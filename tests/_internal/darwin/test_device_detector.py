@@ -3,12 +3,18 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 import pathlib
+import plistlib
+import subprocess
+import threading
+from collections import Counter
 from unittest import TestCase, mock
 
 from tests.factories import CandidateDeviceFactory
 from mbed_devices._internal.candidate_device import CandidateDevice
 from mbed_devices._internal.darwin import system_profiler, diskutil, ioreg
 from mbed_devices._internal.darwin.device_detector import (
+    FULL_SCAN_TOOLS,
+    DarwinBackend,
     DarwinDeviceDetector,
     InvalidCandidateDeviceDataError,
     _assemble_candidate_data,
@@ -16,26 +22,289 @@ from mbed_devices._internal.darwin.device_detector import (
     _build_ioreg_device_name,
     _get_mount_points,
     _get_serial_port,
+    select_backend,
 )
 
+FIXTURES_PATH = pathlib.Path(__file__).parent / "fixtures"
 
+
+def run_no_tool(command, timeout):
+    raise FileNotFoundError(command[0])
+
+
+@mock.patch("mbed_devices._internal.darwin.device_detector.ioreg", spec_set=ioreg)
+@mock.patch("mbed_devices._internal.darwin.device_detector.diskutil", spec_set=diskutil)
 @mock.patch("mbed_devices._internal.darwin.device_detector._build_candidate")
 @mock.patch("mbed_devices._internal.darwin.device_detector.system_profiler", spec_set=system_profiler)
 class TestDarwinDeviceDetector(TestCase):
-    def test_find_candidates_successful_build_yields_candidate(self, system_profiler, _build_candidate):
+    def make_detector(self):
+        return DarwinDeviceDetector(DarwinBackend.SYSTEM_PROFILER, run_command=run_no_tool)
+
+    def test_find_candidates_successful_build_yields_candidate(
+        self, system_profiler, _build_candidate, diskutil, ioreg
+    ):
         device_data = {"some": "data"}
-        system_profiler.get_end_usb_devices_data.return_value = [device_data]
+        system_profiler.parse_end_usb_devices_data.return_value = [device_data]
         candidate = CandidateDeviceFactory()
         _build_candidate.return_value = candidate
-        self.assertEqual(DarwinDeviceDetector().find_candidates(), [candidate])
-        _build_candidate.assert_called_with(device_data)
+        self.assertEqual(self.make_detector().find_candidates(), [candidate])
+        _build_candidate.assert_called_with(device_data, mock.ANY, mock.ANY)
 
-    def test_find_candidates_does_not_yield_failed_candidate_builds(self, system_profiler, _build_candidate):
+    def test_find_candidates_does_not_yield_failed_candidate_builds(
+        self, system_profiler, _build_candidate, diskutil, ioreg
+    ):
         device_data = {"other": "data"}
-        system_profiler.get_end_usb_devices_data.return_value = [device_data]
+        system_profiler.parse_end_usb_devices_data.return_value = [device_data]
         _build_candidate.side_effect = InvalidCandidateDeviceDataError
-        self.assertEqual(DarwinDeviceDetector().find_candidates(), [])
-        _build_candidate.assert_called_with(device_data)
+        self.assertEqual(self.make_detector().find_candidates(), [])
+        _build_candidate.assert_called_with(device_data, mock.ANY, mock.ANY)
+
+    def test_iter_candidates_only_builds_candidates_with_serial_number(
+        self, system_profiler, _build_candidate, diskutil, ioreg
+    ):
+        device_data = {"serial_num": "123"}
+        system_profiler.parse_end_usb_devices_data.return_value = [{"serial_num": "456"}, device_data]
+
+        candidates = list(self.make_detector().iter_candidates(serial_number="123"))
+
+        self.assertEqual(candidates, [_build_candidate.return_value])
+        _build_candidate.assert_called_once_with(
+            device_data,
+            diskutil.parse_external_volumes_index.return_value,
+            ioreg.parse_io_dialin_devices_index.return_value,
+        )
+
+    def test_takes_a_single_snapshot_of_each_tool_per_scan(self, system_profiler, _build_candidate, diskutil, ioreg):
+        system_profiler.parse_end_usb_devices_data.return_value = [{"serial_num": str(i)} for i in range(5)]
+
+        self.make_detector().find_candidates()
+
+        diskutil.parse_external_volumes_index.assert_called_once_with(b"")
+        ioreg.parse_io_dialin_devices_index.assert_called_once_with(b"")
+
+
+class FakeDarwinTools:
+    """Runs commands answering like the macOS tools would for a number of boards."""
+
+    def __init__(self, number_of_boards):
+        self.number_of_boards = number_of_boards
+        self.invocations = []
+
+    def run(self, command, timeout):
+        self.invocations.append(command[0])
+        if command[0] == "system_profiler":
+            return plistlib.dumps(
+                [
+                    {
+                        "_items": [
+                            {
+                                "_name": f"DAPLink CMSIS-DAP {i}",
+                                "location_id": f"0x1410{i:04x} / {i}",
+                                "vendor_id": "0x0d28  (ARM)",
+                                "product_id": "0x0204",
+                                "serial_num": f"0240000034544e45{i:08x}",
+                                "Media": [{"bsd_name": f"disk{i + 2}"}],
+                            }
+                            for i in range(self.number_of_boards)
+                        ]
+                    }
+                ]
+            )
+        if command[0] == "diskutil":
+            return plistlib.dumps(
+                {
+                    "AllDisksAndPartitions": [
+                        {"DeviceIdentifier": f"disk{i + 2}", "MountPoint": f"/Volumes/DAPLINK{i}"}
+                        for i in range(self.number_of_boards)
+                    ]
+                }
+            )
+        if command[0] == "ioreg":
+            return plistlib.dumps(
+                [
+                    {
+                        "IORegistryEntryName": f"DAPLink CMSIS-DAP {i}",
+                        "locationID": 0x14100000 + i,
+                        "idVendor": 0x0D28,
+                        "idProduct": 0x0204,
+                        "USB Serial Number": f"0240000034544e45{i:08x}",
+                        "IORegistryEntryChildren": [
+                            {"IODialinDevice": f"/dev/tty.usbmodem1410{i}"},
+                            {"BSD Name": f"disk{i + 2}"},
+                        ],
+                    }
+                    for i in range(self.number_of_boards)
+                ]
+            )
+        return plistlib.dumps([])
+
+
+class TestDarwinDeviceDetectorSubprocessInvocations(TestCase):
+    def count_invocations(self, number_of_boards, backend):
+        tools = FakeDarwinTools(number_of_boards)
+        candidates = DarwinDeviceDetector(backend, run_command=tools.run).find_candidates()
+        self.assertEqual(len(candidates), number_of_boards)
+        self.assertEqual(
+            [candidate.serial_port for candidate in candidates],
+            [f"/dev/tty.usbmodem1410{i}" for i in range(number_of_boards)],
+        )
+        return Counter(tools.invocations)
+
+    def test_calls_diskutil_once_regardless_of_number_of_devices(self):
+        for backend in DarwinBackend:
+            with self.subTest(backend=backend):
+                self.assertEqual(self.count_invocations(1, backend)["diskutil"], 1)
+                self.assertEqual(self.count_invocations(16, backend)["diskutil"], 1)
+
+    def test_calls_ioreg_once_regardless_of_number_of_devices(self):
+        for backend in DarwinBackend:
+            with self.subTest(backend=backend):
+                self.assertEqual(self.count_invocations(1, backend)["ioreg"], 1)
+                self.assertEqual(self.count_invocations(16, backend)["ioreg"], 1)
+
+    def test_ioreg_backend_does_not_call_system_profiler(self):
+        self.assertEqual(self.count_invocations(16, DarwinBackend.IOREG)["system_profiler"], 0)
+
+    def test_runs_all_the_tools_of_a_full_scan_at_the_same_time(self):
+        for backend, tool_names in FULL_SCAN_TOOLS.items():
+            with self.subTest(backend=backend):
+                tools = FakeDarwinTools(2)
+                all_running = threading.Barrier(len(tool_names), timeout=5)
+
+                def run(command, timeout):
+                    all_running.wait()
+                    return tools.run(command, timeout)
+
+                self.assertEqual(len(DarwinDeviceDetector(backend, run_command=run).find_candidates()), 2)
+                self.assertEqual(sorted(tools.invocations), sorted(tool_names))
+
+    def test_does_not_look_up_devices_when_serial_number_matches_nothing(self):
+        listing_tools = {DarwinBackend.IOREG: "ioreg", DarwinBackend.SYSTEM_PROFILER: "system_profiler"}
+        for backend, listing_tool in listing_tools.items():
+            with self.subTest(backend=backend):
+                tools = FakeDarwinTools(16)
+                detector = DarwinDeviceDetector(backend, run_command=tools.run)
+
+                self.assertEqual(list(detector.iter_candidates(serial_number="does-not-exist")), [])
+                self.assertEqual(tools.invocations, [listing_tool])
+
+
+class RecordedDarwinTools:
+    """Runs commands answering with the output of the macOS tools recorded on a host."""
+
+    FIXTURES = {
+        "diskutil": "diskutil_external_disks.plist",
+        "ioreg": "ioreg_usb_host_devices.plist",
+        "system_profiler": "system_profiler_usb_data.plist",
+    }
+
+    def run(self, command, timeout):
+        return (FIXTURES_PATH / self.FIXTURES[command[0]]).read_bytes()
+
+
+class TestDarwinDeviceDetectorWithRecordedData(TestCase):
+    expected_candidates = [
+        CandidateDevice(
+            vendor_id="0x0d28",
+            product_id="0x0204",
+            serial_number="0240000034544e45001b00028d4f00158d2f0000",
+            mount_points=(pathlib.Path("/Volumes/DAPLINK"),),
+            serial_port="/dev/tty.usbmodem14112",
+        ),
+        CandidateDevice(
+            vendor_id="0x0483",
+            product_id="0x374b",
+            serial_number="066EFF555051897267233656",
+            mount_points=(pathlib.Path("/Volumes/NODE_F429ZI"),),
+            serial_port="/dev/tty.usbmodem14a03",
+        ),
+    ]
+
+    def test_backends_find_the_same_candidates(self):
+        for backend in DarwinBackend:
+            with self.subTest(backend=backend):
+                self.assertEqual(
+                    DarwinDeviceDetector(backend, run_command=RecordedDarwinTools().run).find_candidates(),
+                    self.expected_candidates,
+                )
+
+    def test_backends_only_find_candidates_with_serial_number(self):
+        for backend in DarwinBackend:
+            with self.subTest(backend=backend):
+                self.assertEqual(
+                    list(
+                        DarwinDeviceDetector(backend, run_command=RecordedDarwinTools().run).iter_candidates(
+                            serial_number="066EFF555051897267233656"
+                        )
+                    ),
+                    self.expected_candidates[1:],
+                )
+
+
+class TestIoregBackendFallback(TestCase):
+    def test_falls_back_to_system_profiler_when_ioreg_cannot_be_run(self):
+        tools = RecordedDarwinTools()
+
+        def run(command, timeout):
+            if command[0] == "ioreg":
+                raise FileNotFoundError(command[0])
+            return tools.run(command, timeout)
+
+        with self.assertLogs(level="WARNING"):
+            candidates = DarwinDeviceDetector(DarwinBackend.IOREG, run_command=run).find_candidates()
+
+        self.assertEqual(
+            [(candidate.serial_number, candidate.serial_port) for candidate in candidates],
+            [("0240000034544e45001b00028d4f00158d2f0000", None), ("066EFF555051897267233656", None)],
+        )
+
+
+class TestDarwinDeviceDetectorWithWedgedTools(TestCase):
+    def test_finds_candidates_without_serial_ports_when_ioreg_is_wedged(self):
+        tools = RecordedDarwinTools()
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def run(command, timeout):
+            if command[0] == "ioreg":
+                release.wait(5)
+            return tools.run(command, timeout)
+
+        detector = DarwinDeviceDetector(DarwinBackend.SYSTEM_PROFILER, run_command=run, scan_timeout=0.2)
+        with self.assertLogs(level="WARNING"):
+            candidates = detector.find_candidates()
+
+        self.assertEqual(
+            [(candidate.serial_number, candidate.serial_port) for candidate in candidates],
+            [("0240000034544e45001b00028d4f00158d2f0000", None), ("066EFF555051897267233656", None)],
+        )
+
+    def test_finds_no_candidates_when_system_profiler_times_out(self):
+        tools = RecordedDarwinTools()
+
+        def run(command, timeout):
+            if command[0] == "system_profiler":
+                raise subprocess.TimeoutExpired(command, timeout)
+            return tools.run(command, timeout)
+
+        detector = DarwinDeviceDetector(DarwinBackend.SYSTEM_PROFILER, run_command=run)
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(detector.find_candidates(), [])
+
+
+class TestSelectBackend(TestCase):
+    @mock.patch.dict("os.environ", {"MBED_DEVICES_DARWIN_BACKEND": "system_profiler"})
+    def test_returns_configured_backend(self):
+        self.assertEqual(select_backend(), DarwinBackend.SYSTEM_PROFILER)
+
+    @mock.patch.dict("os.environ", {"MBED_DEVICES_DARWIN_BACKEND": "AUTO"})
+    def test_prefers_ioreg(self):
+        self.assertEqual(select_backend(), DarwinBackend.IOREG)
+
+    @mock.patch.dict("os.environ", {"MBED_DEVICES_DARWIN_BACKEND": "whatever"})
+    def test_prefers_ioreg_when_configured_backend_is_unknown(self):
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(select_backend(), DarwinBackend.IOREG)
 
 
 @mock.patch("mbed_devices._internal.darwin.device_detector._assemble_candidate_data")
@@ -51,14 +320,14 @@ class TestBuildCandidateDevice(TestCase):
         _assemble_candidate_data.return_value = device_data
 
         self.assertEqual(
-            _build_candidate(device_data), CandidateDevice(**device_data),
+            _build_candidate(device_data, {}, {}), CandidateDevice(**device_data),
         )
 
     @mock.patch("mbed_devices._internal.darwin.device_detector.CandidateDevice")
     def test_raises_if_candidate_cannot_be_built(self, CandidateDevice, _assemble_candidate_data):
         CandidateDevice.side_effect = ValueError
         with self.assertRaises(InvalidCandidateDeviceDataError):
-            _build_candidate({})
+            _build_candidate({}, {}, {})
 
 
 @mock.patch("mbed_devices._internal.darwin.device_detector._get_serial_port")
@@ -74,7 +343,7 @@ class TestAssembleCandidateDeviceData(TestCase):
         _get_mount_points.return_value = ["/Volumes/A"]
 
         self.assertEqual(
-            _assemble_candidate_data(device_data),
+            _assemble_candidate_data(device_data, {}, {}),
             {
                 "vendor_id": device_data.get("vendor_id"),
                 "product_id": device_data.get("product_id"),
@@ -86,42 +355,48 @@ class TestAssembleCandidateDeviceData(TestCase):
 
     def test_formats_vendor_id_containing_vendor_name(self, _get_mount_points, _get_serial_port):
         device_data = {"vendor_id": "0x12  (SomeVendor)"}
-        result = _assemble_candidate_data(device_data)
+        result = _assemble_candidate_data(device_data, {}, {})
         self.assertEqual(result["vendor_id"], "0x12")
 
 
 class TestGetMountPoints(TestCase):
-    @mock.patch("mbed_devices._internal.darwin.device_detector.diskutil", spec_set=diskutil)
-    def test_maps_storage_identifiers_to_mount_points(self, diskutil):
-        device_data = {"Media": [{"bsd_name": "disk1"}, {"bsd_name": "disk2"}]}
-        diskutil.get_mount_point.side_effect = ["/Volumes/Disk1", "/Volumes/Disk2"]
+    def test_maps_storage_identifiers_to_mount_points(self):
+        device_data = {"Media": [{"bsd_name": "disk1"}, {"bsd_name": "disk2"}, {"bsd_name": "disk3"}]}
+        volumes_index = {
+            "disk1": {"DeviceIdentifier": "disk1", "MountPoint": "/Volumes/Disk1"},
+            "disk2": {"DeviceIdentifier": "disk2", "MountPoint": "/Volumes/Disk2"},
+        }
 
         self.assertEqual(
-            _get_mount_points(device_data), (pathlib.Path("/Volumes/Disk1"), pathlib.Path("/Volumes/Disk2"))
+            _get_mount_points(device_data, volumes_index),
+            (pathlib.Path("/Volumes/Disk1"), pathlib.Path("/Volumes/Disk2")),
         )
-        diskutil.get_mount_point.assert_has_calls([mock.call("disk1"), mock.call("disk2")])
 
 
 class TestGetSerialPort(TestCase):
-    @mock.patch("mbed_devices._internal.darwin.device_detector.ioreg", spec_set=ioreg)
-    def test_returns_retrieved_io_dialin_device(self, ioreg):
-        """Given enough data, it constructs an ioreg device name and fetches serial port information."""
+    def test_returns_indexed_io_dialin_device(self):
+        """Given enough data, it constructs an ioreg device name and looks up its serial port in the index."""
         device_data = {
             "location_id": "0x12345 / 2",
             "_name": "SomeDevice",
         }
         serial_port = "/dev/tty.usb1234"
-        ioreg.get_io_dialin_device.return_value = serial_port
         ioreg_device_name = _build_ioreg_device_name(
             device_name=device_data["_name"], location_id=device_data["location_id"],
         )
 
-        self.assertEqual(_get_serial_port(device_data), serial_port)
-        ioreg.get_io_dialin_device.assert_called_once_with(ioreg_device_name)
+        self.assertEqual(_get_serial_port(device_data, {ioreg_device_name: serial_port}), serial_port)
+
+    def test_returns_none_when_device_is_not_indexed(self):
+        device_data = {
+            "location_id": "0x12345 / 2",
+            "_name": "SomeDevice",
+        }
 
-    @mock.patch("mbed_devices._internal.darwin.device_detector.ioreg", spec_set=ioreg)
-    def test_returns_none_when_cant_determine_ioreg_name(self, ioreg):
-        self.assertIsNone(_get_serial_port({}))
+        self.assertIsNone(_get_serial_port(device_data, {"OtherDevice@12345": "/dev/tty.usb1234"}))
+
+    def test_returns_none_when_cant_determine_ioreg_name(self):
+        self.assertIsNone(_get_serial_port({}, {}))
 
 
 class TestBuildIoregDeviceName(TestCase):
@@ -130,3 +405,8 @@ class TestBuildIoregDeviceName(TestCase):
             _build_ioreg_device_name(device_name="VeryNiceDevice Really", location_id="0x14420000 / 2",),
             "VeryNiceDevice Really@14420000",
         )
+
+    def test_keeps_hexadecimal_digits_of_location_in_lowercase(self):
+        self.assertEqual(
+            _build_ioreg_device_name(device_name="STM32 STLink", location_id="0x14A00000 / 3"), "STM32 STLink@14a00000",
+        )
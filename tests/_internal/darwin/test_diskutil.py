@@ -9,6 +9,7 @@ from mbed_devices._internal.darwin.diskutil import (
     get_all_external_disks_data,
     get_all_external_volumes_data,
     get_mount_point,
+    parse_external_volumes_index,
 )
 
 
@@ -78,6 +79,30 @@ class TestGetAllExternalVolumesData(TestCase):
         )
 
 
+class TestParseExternalVolumesIndex(TestCase):
+    def test_indexes_volumes_of_diskutil_output_by_device_identifier(self):
+        output = plistlib.dumps(
+            {
+                "AllDisksAndPartitions": [
+                    {"DeviceIdentifier": "disk2", "MountPoint": "/Volumes/A"},
+                    {"Partitions": [{"DeviceIdentifier": "disk3s1", "MountPoint": "/Volumes/B"}]},
+                    {"VolumeName": "no identifier"},
+                ]
+            }
+        )
+
+        self.assertEqual(
+            parse_external_volumes_index(output),
+            {
+                "disk2": {"DeviceIdentifier": "disk2", "MountPoint": "/Volumes/A"},
+                "disk3s1": {"DeviceIdentifier": "disk3s1", "MountPoint": "/Volumes/B"},
+            },
+        )
+
+    def test_handles_empty_output(self):
+        self.assertEqual(parse_external_volumes_index(b""), {})
+
+
 class TestGetMountPoint(TestCase):
     @mock.patch("mbed_devices._internal.darwin.diskutil.get_all_external_volumes_data")
     def test_returns_mountpoint_if_avaiable(self, get_all_external_volumes_data):
@@ -96,3 +121,11 @@ class TestGetMountPoint(TestCase):
         get_all_external_volumes_data.return_value = [{"DeviceIdentifier": "disk4"}]
 
         self.assertIsNone(get_mount_point("disk4"), None)
+
+    @mock.patch("mbed_devices._internal.darwin.diskutil.get_all_external_volumes_data")
+    def test_uses_volumes_index_if_given(self, get_all_external_volumes_data):
+        volumes_index = {"disk5": {"DeviceIdentifier": "disk5", "MountPoint": "/Volumes/Bar"}}
+
+        self.assertEqual(get_mount_point("disk5", volumes_index), "/Volumes/Bar")
+        self.assertIsNone(get_mount_point("disk6", volumes_index))
+        get_all_external_volumes_data.assert_not_called()
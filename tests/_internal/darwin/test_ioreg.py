@@ -2,10 +2,23 @@
 # Copyright (C) 2020 Arm Mbed. All rights reserved.
 # SPDX-License-Identifier: Apache-2.0
 #
+import pathlib
 import plistlib
 from unittest import TestCase, mock
 
-from mbed_devices._internal.darwin.ioreg import get_data, get_io_dialin_device
+from mbed_devices._internal.darwin.ioreg import (
+    PropertyIndex,
+    USBDevice,
+    _find_first_property_value,
+    build_io_dialin_devices_index,
+    extract_end_usb_devices,
+    get_data,
+    get_io_dialin_device,
+    parse_end_usb_devices,
+    parse_io_dialin_devices_index,
+)
+
+FIXTURE_PATH = pathlib.Path(__file__).parent / "fixtures" / "ioreg_usb_host_devices.plist"
 
 
 @mock.patch("mbed_devices._internal.darwin.ioreg.subprocess.check_output")
@@ -58,3 +71,240 @@ class TestGetIoDialinDevice(TestCase):
 
         self.assertEqual(get_io_dialin_device("some_device"), "/dev/tty.usbmodem1234")
         get_data.assert_called_once_with("some_device")
+
+
+class TestBuildIoDialinDevicesIndex(TestCase):
+    def test_indexes_first_io_dialin_device_of_located_entries(self):
+        data = plistlib.loads(FIXTURE_PATH.read_bytes())
+
+        self.assertEqual(
+            build_io_dialin_devices_index(data),
+            {
+                "USB3.0 Hub@14100000": "/dev/tty.usbmodem14112",
+                "DAPLink CMSIS-DAP@14110000": "/dev/tty.usbmodem14112",
+                "STM32 STLink@14a00000": "/dev/tty.usbmodem14a03",
+            },
+        )
+
+    def test_keeps_first_io_dialin_device_in_subtree(self):
+        data = [
+            {
+                "IORegistryEntryName": "Composite",
+                "locationID": 0x14200000,
+                "IORegistryEntryChildren": [
+                    {"IORegistryEntryChildren": [{"IODialinDevice": "/dev/tty.first"}]},
+                    {"IODialinDevice": "/dev/tty.second"},
+                ],
+            }
+        ]
+
+        self.assertEqual(build_io_dialin_devices_index(data), {"Composite@14200000": "/dev/tty.first"})
+
+
+class TestParseIoDialinDevicesIndex(TestCase):
+    def test_indexes_io_dialin_devices_of_ioreg_output(self):
+        output = plistlib.dumps(
+            [{"IORegistryEntryName": "Board", "locationID": 0x1410, "IODialinDevice": "/dev/tty.usbmodem1410"}]
+        )
+
+        self.assertEqual(parse_io_dialin_devices_index(output), {"Board@1410": "/dev/tty.usbmodem1410"})
+
+    def test_handles_empty_output(self):
+        self.assertEqual(parse_io_dialin_devices_index(b""), {})
+
+
+class TestExtractEndUsbDevices(TestCase):
+    def test_extracts_usb_devices_which_are_not_hubs(self):
+        data = plistlib.loads(FIXTURE_PATH.read_bytes())
+
+        self.assertEqual(
+            extract_end_usb_devices(data),
+            [
+                USBDevice(
+                    name="DAPLink CMSIS-DAP",
+                    vendor_id="0x0d28",
+                    product_id="0x0204",
+                    serial_number="0240000034544e45001b00028d4f00158d2f0000",
+                    bsd_names=["disk2"],
+                    io_dialin_device="/dev/tty.usbmodem14112",
+                ),
+                USBDevice(
+                    name="STM32 STLink",
+                    vendor_id="0x0483",
+                    product_id="0x374b",
+                    serial_number="066EFF555051897267233656",
+                    bsd_names=["disk3"],
+                    io_dialin_device="/dev/tty.usbmodem14a03",
+                ),
+                USBDevice(
+                    name="Apple Keyboard",
+                    vendor_id="0x05ac",
+                    product_id="0x0250",
+                    serial_number=None,
+                    bsd_names=[],
+                    io_dialin_device=None,
+                ),
+            ],
+        )
+
+    def test_does_not_attribute_nested_device_nodes_to_parent_device(self):
+        data = [
+            {
+                "IORegistryEntryName": "Composite",
+                "idVendor": 1,
+                "idProduct": 2,
+                "IORegistryEntryChildren": [
+                    {"idVendor": 1, "idProduct": 2, "bInterfaceNumber": 0, "IODialinDevice": "/dev/tty.parent"},
+                    {
+                        "IORegistryEntryName": "Nested",
+                        "idVendor": 3,
+                        "idProduct": 4,
+                        "IORegistryEntryChildren": [{"BSD Name": "disk4"}],
+                    },
+                ],
+            }
+        ]
+
+        self.assertEqual(
+            extract_end_usb_devices(data),
+            [
+                USBDevice("Composite", "0x0001", "0x0002", None, [], "/dev/tty.parent"),
+                USBDevice("Nested", "0x0003", "0x0004", None, ["disk4"], None),
+            ],
+        )
+
+
+class TestParseEndUsbDevices(TestCase):
+    def test_extracts_end_devices_from_ioreg_output(self):
+        devices = parse_end_usb_devices(FIXTURE_PATH.read_bytes())
+
+        self.assertEqual(
+            [(device.name, device.serial_number, device.bsd_names, device.io_dialin_device) for device in devices],
+            [
+                ("DAPLink CMSIS-DAP", "0240000034544e45001b00028d4f00158d2f0000", ["disk2"], "/dev/tty.usbmodem14112"),
+                ("STM32 STLink", "066EFF555051897267233656", ["disk3"], "/dev/tty.usbmodem14a03"),
+                ("Apple Keyboard", None, [], None),
+            ],
+        )
+
+    def test_handles_empty_and_corrupt_output(self):
+        self.assertEqual(parse_end_usb_devices(b""), [])
+        self.assertEqual(parse_end_usb_devices(b"<plist version=\"1.0\"><string>\xc3\xbf\x06</plist>"), [])
+
+
+class TestPropertyIndex(TestCase):
+    def setUp(self):
+        self.index = PropertyIndex(plistlib.loads(FIXTURE_PATH.read_bytes()))
+
+    def test_indexes_properties_of_entries_by_registry_path(self):
+        path = "USB3.0 Hub@14100000/DAPLink CMSIS-DAP@14110000"
+
+        self.assertEqual(self.index.get(path, "USB Serial Number"), "0240000034544e45001b00028d4f00158d2f0000")
+        self.assertIsNone(self.index.get(path, "IODialinDevice"))
+
+    def test_finds_first_property_values_in_subtrees(self):
+        path = "STM32 STLink@14a00000"
+
+        self.assertEqual(self.index.find_first(path, "IODialinDevice"), "/dev/tty.usbmodem14a03")
+        self.assertEqual(self.index.find_first(path, "BSD Name"), "disk3")
+        self.assertEqual(self.index.find_first(path, "USB Serial Number"), "066EFF555051897267233656")
+
+    def test_finds_registry_path_of_located_entries(self):
+        self.assertEqual(
+            self.index.located_device_names,
+            ["USB3.0 Hub@14100000", "DAPLink CMSIS-DAP@14110000", "STM32 STLink@14a00000", "Apple Keyboard@14200000"],
+        )
+        self.assertEqual(
+            self.index.get_path("DAPLink CMSIS-DAP@14110000"), "USB3.0 Hub@14100000/DAPLink CMSIS-DAP@14110000"
+        )
+        self.assertEqual(self.index.get_path("Unknown@1"), "")
+
+    def test_returns_none_for_unknown_paths_and_properties(self):
+        self.assertIsNone(self.index.get("Unknown", "BSD Name"))
+        self.assertIsNone(self.index.find_first("Apple Keyboard@14200000", "BSD Name"))
+        self.assertIsNone(self.index.find_first("STM32 STLink@14a00000", "IOCalloutDevice"))
+        self.assertEqual(self.index.get_device_values("Unknown", "BSD Name"), [])
+
+    def test_finds_registry_path_of_usb_devices(self):
+        self.assertEqual(
+            self.index.usb_device_paths,
+            [
+                "USB3.0 Hub@14100000",
+                "USB3.0 Hub@14100000/DAPLink CMSIS-DAP@14110000",
+                "STM32 STLink@14a00000",
+                "Apple Keyboard@14200000",
+            ],
+        )
+
+    def test_indexes_values_of_usb_devices_up_to_nested_usb_devices(self):
+        data = [
+            {
+                "IORegistryEntryName": "Hub",
+                "idVendor": 1,
+                "idProduct": 1,
+                "IORegistryEntryChildren": [
+                    {"IORegistryEntryName": "Interface", "BSD Name": "disk1"},
+                    {
+                        "IORegistryEntryName": "Device",
+                        "idVendor": 2,
+                        "idProduct": 2,
+                        "IORegistryEntryChildren": [
+                            {"IORegistryEntryName": "Interface", "BSD Name": "disk2"},
+                            {"IORegistryEntryName": "Serial", "BSD Name": "disk3", "IODialinDevice": "/dev/tty.dev"},
+                        ],
+                    },
+                ],
+            }
+        ]
+
+        index = PropertyIndex(data)
+
+        self.assertEqual(index.usb_device_paths, ["Hub", "Hub/Device"])
+        self.assertEqual(index.get_device_values("Hub", "BSD Name"), ["disk1"])
+        self.assertEqual(index.get_device_values("Hub", "IODialinDevice"), [])
+        self.assertEqual(index.get_device_values("Hub/Device", "BSD Name"), ["disk2", "disk3"])
+        self.assertEqual(index.get_device_values("Hub/Device", "IODialinDevice"), ["/dev/tty.dev"])
+        self.assertEqual(index.get_device_values("Hub/Device", "idVendor"), [2])
+
+    def test_indexes_first_of_entries_sharing_a_path(self):
+        data = [
+            {
+                "IORegistryEntryName": "Device",
+                "IORegistryEntryChildren": [
+                    {"IORegistryEntryName": "Interface", "BSD Name": "disk2"},
+                    {"IORegistryEntryName": "Interface", "BSD Name": "disk3", "IODialinDevice": "/dev/tty.second"},
+                ],
+            }
+        ]
+
+        index = PropertyIndex(data)
+
+        self.assertEqual(index.get("Device/Interface", "BSD Name"), "disk2")
+        self.assertIsNone(index.find_first("Device/Interface", "IODialinDevice"))
+        self.assertEqual(index.find_first("Device", "IODialinDevice"), "/dev/tty.second")
+
+    def test_indexes_deep_trees(self):
+        entry = {"IORegistryEntryName": "Leaf", "IODialinDevice": "/dev/tty.deep"}
+        for depth in range(5000):
+            entry = {"IORegistryEntryName": "Hub", "locationID": depth, "IORegistryEntryChildren": [entry]}
+
+        index = PropertyIndex([entry])
+
+        self.assertEqual(index.find_first("Hub@1387", "IODialinDevice"), "/dev/tty.deep")
+
+
+class TestFindFirstPropertyValue(TestCase):
+    def test_stops_searching_at_first_entry_with_property(self):
+        children = mock.MagicMock()
+        data = [{"IODialinDevice": "/dev/tty.first", "IORegistryEntryChildren": children}]
+
+        self.assertEqual(_find_first_property_value("IODialinDevice", data), "/dev/tty.first")
+        children.__iter__.assert_not_called()
+
+    def test_searches_entries_in_registry_order(self):
+        data = [
+            {"IORegistryEntryChildren": [{"IORegistryEntryChildren": [{"BSD Name": "disk2"}]}]},
+            {"BSD Name": "disk3"},
+        ]
+
+        self.assertEqual(_find_first_property_value("BSD Name", data), "disk2")
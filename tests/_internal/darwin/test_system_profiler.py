@@ -8,6 +8,7 @@ from unittest import TestCase, mock
 from mbed_devices._internal.darwin.system_profiler import (
     get_all_usb_devices_data,
     get_end_usb_devices_data,
+    parse_end_usb_devices_data,
 )
 
 
@@ -109,3 +110,15 @@ class TestGetEndUSBDevicesData(TestCase):
         get_all_usb_devices_data.return_value = plistlib.loads(plist)
 
         self.assertEqual(get_end_usb_devices_data(), [])
+
+
+class TestParseEndUSBDevicesData(TestCase):
+    def test_identifies_end_devices_in_system_profiler_output(self):
+        output = plistlib.dumps(
+            [{"_name": "USB31Bus", "_items": [{"_name": "USB3.0 Hub", "_items": [{"_name": "Board"}]}]}]
+        )
+
+        self.assertEqual(parse_end_usb_devices_data(output), [{"_name": "Board"}])
+
+    def test_handles_empty_output(self):
+        self.assertEqual(parse_end_usb_devices_data(b""), [])
@@ -0,0 +1,111 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import TestCase, mock
+
+from mbed_devices._internal.darwin.tools import Invocation, run_command, run_concurrently
+
+
+class TestRunConcurrently(TestCase):
+    def test_runs_invocations_at_the_same_time(self):
+        all_started = threading.Barrier(3, timeout=5)
+
+        def run(command, timeout):
+            all_started.wait()
+            return command[0].encode()
+
+        invocations = {name: Invocation([name], 1.0) for name in ["a", "b", "c"]}
+
+        self.assertEqual(run_concurrently(invocations, deadline=5, run=run), {"a": b"a", "b": b"b", "c": b"c"})
+
+    def test_passes_timeout_of_each_invocation(self):
+        run = mock.Mock(return_value=b"")
+
+        run_concurrently({"tool": Invocation(["tool", "--flag"], 2.5)}, deadline=5, run=run)
+
+        run.assert_called_once_with(["tool", "--flag"], 2.5)
+
+    def test_output_is_none_when_invocation_fails_or_times_out(self):
+        def run(command, timeout):
+            if command[0] == "missing":
+                raise FileNotFoundError(command[0])
+            if command[0] == "failing":
+                raise subprocess.CalledProcessError(1, command)
+            if command[0] == "slow":
+                raise subprocess.TimeoutExpired(command, timeout)
+            return b"output"
+
+        invocations = {name: Invocation([name], 1.0) for name in ["missing", "failing", "slow", "working"]}
+
+        with self.assertLogs(level="WARNING"):
+            outputs = run_concurrently(invocations, deadline=5, run=run)
+
+        self.assertEqual(outputs, {"missing": None, "failing": None, "slow": None, "working": b"output"})
+
+    def test_abandons_invocations_running_past_the_deadline(self):
+        release = threading.Event()
+
+        def run(command, timeout):
+            if command[0] == "wedged":
+                release.wait(5)
+            return b"output"
+
+        invocations = {name: Invocation([name], 5.0) for name in ["wedged", "working"]}
+        start = time.monotonic()
+        try:
+            with self.assertLogs(level="WARNING"):
+                outputs = run_concurrently(invocations, deadline=0.2, run=run)
+        finally:
+            release.set()
+
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(outputs, {"wedged": None, "working": b"output"})
+
+    def test_runs_nothing_without_invocations(self):
+        self.assertEqual(run_concurrently({}, deadline=1), {})
+
+
+@unittest.skipIf(sys.platform == "win32", "Fake binaries are shell scripts.")
+class TestRunCommandWithFakeBinaries(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.bin_path = pathlib.Path(directory.name)
+        path_patcher = mock.patch.dict("os.environ", {"PATH": f"{self.bin_path}{os.pathsep}{os.environ['PATH']}"})
+        path_patcher.start()
+        self.addCleanup(path_patcher.stop)
+
+    def make_binary(self, name, script):
+        binary = self.bin_path / name
+        binary.write_text(f"#!/bin/sh\n{script}\n")
+        binary.chmod(0o755)
+
+    def test_returns_output_of_command(self):
+        self.make_binary("ioreg", 'echo "$@"')
+
+        self.assertEqual(run_command(["ioreg", "-a", "-l"], timeout=5), b"-a -l\n")
+
+    def test_raises_when_command_exceeds_timeout(self):
+        self.make_binary("system_profiler", "sleep 5")
+
+        with self.assertRaises(subprocess.TimeoutExpired):
+            run_command(["system_profiler"], timeout=0.2)
+
+    def test_wedged_binary_degrades_to_partial_results(self):
+        self.make_binary("system_profiler", "sleep 5")
+        self.make_binary("diskutil", "echo volumes")
+
+        invocations = {"system_profiler": Invocation(["system_profiler"], 0.2), "diskutil": Invocation(["diskutil"], 5)}
+        with self.assertLogs(level="WARNING"):
+            outputs = run_concurrently(invocations, deadline=5)
+
+        self.assertEqual(outputs, {"system_profiler": None, "diskutil": b"volumes\n"})
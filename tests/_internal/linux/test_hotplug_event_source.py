@@ -0,0 +1,145 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import os
+import pathlib
+import tempfile
+import threading
+from unittest import TestCase, mock, skipIf
+
+from mbed_devices._internal.hotplug import HotplugEvent
+
+try:
+    from mbed_devices._internal.linux.hotplug_event_source import UdevEventSource
+
+    import_succeeded = True
+except ImportError:
+    import_succeeded = False
+
+
+@skipIf(not import_succeeded, "Tests require package dependencies only used on Linux.")
+@mock.patch("mbed_devices._internal.linux.hotplug_event_source.pyudev")
+class TestUdevEventSource(TestCase):
+    def test_yields_udev_events_until_closed(self, pyudev):
+        monitor_read, monitor_write = os.pipe()
+        monitor = pyudev.Monitor.from_netlink.return_value
+        monitor.fileno.return_value = monitor_read
+
+        def receive_device(timeout):
+            os.read(monitor_read, 1)
+            return mock.Mock(action="add", subsystem="tty", device_node="/dev/ttyACM0")
+
+        monitor.poll.side_effect = receive_device
+        with tempfile.TemporaryDirectory() as directory:
+            mountinfo = pathlib.Path(directory, "mountinfo")
+            mountinfo.write_text("")
+            source = UdevEventSource(mountinfo_path=mountinfo)
+            os.write(monitor_write, b"\0")
+
+            events = []
+            for event in source:
+                events.append(event)
+                source.close()
+
+        os.close(monitor_read)
+        os.close(monitor_write)
+        self.assertEqual(events, [HotplugEvent(action="add", subsystem="tty", device_file_path="/dev/ttyACM0")])
+        monitor.start.assert_called_once()
+
+    def test_releases_resources_once_closed(self, pyudev):
+        monitor_read, monitor_write = os.pipe()
+        self.addCleanup(os.close, monitor_read)
+        self.addCleanup(os.close, monitor_write)
+        pyudev.Monitor.from_netlink.return_value.fileno.return_value = monitor_read
+        with tempfile.TemporaryDirectory() as directory:
+            mountinfo = pathlib.Path(directory, "mountinfo")
+            mountinfo.write_text("")
+            source = UdevEventSource(mountinfo_path=mountinfo)
+            wakeup_pipe = [source._wakeup_read, source._wakeup_write]
+
+            iterating = threading.Thread(target=lambda: list(source))
+            iterating.start()
+            source.close()
+            source.close()
+            iterating.join(timeout=5)
+
+        self.assertFalse(iterating.is_alive())
+
+        for file_descriptor in wakeup_pipe:
+            with self.assertRaises(OSError):
+                os.fstat(file_descriptor)
+        self.assertIsNone(source._monitor)
+
+    def test_releases_resources_when_closed_before_iterating(self, pyudev):
+        source = UdevEventSource()
+        wakeup_pipe = [source._wakeup_read, source._wakeup_write]
+
+        source.close()
+        source.close()
+
+        for file_descriptor in wakeup_pipe:
+            with self.assertRaises(OSError):
+                os.fstat(file_descriptor)
+        self.assertIsNone(source._monitor)
+        self.assertEqual(list(source), [])
+        pyudev.Monitor.from_netlink.return_value.start.assert_not_called()
+
+    def test_collects_events_from_the_time_it_is_opened(self, pyudev):
+        monitor_read, monitor_write = os.pipe()
+        self.addCleanup(os.close, monitor_read)
+        self.addCleanup(os.close, monitor_write)
+        monitor = pyudev.Monitor.from_netlink.return_value
+        monitor.fileno.return_value = monitor_read
+
+        def receive_device(timeout):
+            os.read(monitor_read, 1)
+            return mock.Mock(action="add", subsystem="block", device_node="/dev/sdb")
+
+        monitor.poll.side_effect = receive_device
+        with tempfile.TemporaryDirectory() as directory:
+            mountinfo = pathlib.Path(directory, "mountinfo")
+            mountinfo.write_text("")
+            source = UdevEventSource(mountinfo_path=mountinfo)
+
+            source.open()
+            source.open()
+            monitor.start.assert_called_once_with()
+            os.write(monitor_write, b"\0")
+
+            events = []
+            for event in source:
+                events.append(event)
+                source.close()
+
+        monitor.start.assert_called_once_with()
+        self.assertEqual(events, [HotplugEvent(action="add", subsystem="block", device_file_path="/dev/sdb")])
+
+    def test_watcher_starts_monitoring_before_its_first_scan(self, pyudev):
+        from mbed_devices.device_watcher import DeviceWatcher
+
+        monitor = pyudev.Monitor.from_netlink.return_value
+        monitor_read, monitor_write = os.pipe()
+        self.addCleanup(os.close, monitor_read)
+        self.addCleanup(os.close, monitor_write)
+        monitor.fileno.return_value = monitor_read
+        scanned = threading.Event()
+        monitored_when_scanning = []
+
+        def scan():
+            monitored_when_scanning.append(monitor.start.called)
+            scanned.set()
+            return []
+
+        candidate_tracker = mock.Mock(scan=mock.Mock(side_effect=scan))
+        with tempfile.TemporaryDirectory() as directory:
+            mountinfo = pathlib.Path(directory, "mountinfo")
+            mountinfo.write_text("")
+            source = UdevEventSource(mountinfo_path=mountinfo)
+            watcher = DeviceWatcher(event_source=source, candidate_tracker=candidate_tracker)
+
+            watcher.start()
+            self.assertTrue(scanned.wait(timeout=5))
+            watcher.stop()
+
+        self.assertEqual(monitored_when_scanning, [True])
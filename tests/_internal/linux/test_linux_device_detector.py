@@ -5,11 +5,14 @@
 """Test Linux Device Detector."""
 
 from collections import namedtuple
+from pathlib import Path
 from unittest import TestCase, mock, skipIf
 from mbed_devices._internal.candidate_device import CandidateDevice
 
 try:
     from mbed_devices._internal.linux import device_detector
+    from mbed_devices._internal.linux.mountinfo import MountEntry, MountIndex
+    from mbed_devices._internal.linux.sysfs import ClassDevice, UsbDevice, UsbDeviceNodes
 
     import_succeeded = True
 except ImportError:
@@ -20,17 +23,39 @@ def mock_device_factory(**props):
     return namedtuple("MockDevice", "properties")(props)
 
 
+class MockUdevContext:
+    """Stands in for `pyudev.Context`, recording which subsystems are enumerated."""
+
+    def __init__(self, block, tty):
+        self._devices = {"block": block, "tty": tty}
+        self.enumerations = []
+
+    def list_devices(self, subsystem, **kwargs):
+        self.enumerations.append(subsystem)
+        # Like libudev, match the devices of the subsystem which have any of the properties requested. The devices
+        # listed are all on the USB bus, which they do not record.
+        properties = {key: value for key, value in kwargs.items() if key != "ID_BUS"}
+        matches_bus = "ID_BUS" in kwargs
+        return iter(
+            device
+            for device in self._devices[subsystem]
+            if not kwargs
+            or matches_bus
+            or any(device.properties.get(key) == value for key, value in properties.items())
+        )
+
+
 @skipIf(not import_succeeded, "Tests require package dependencies only used on Linux.")
 class TestLinuxDeviceDetector(TestCase):
     @mock.patch("mbed_devices._internal.linux.device_detector.pyudev.Context")
     @mock.patch("mbed_devices._internal.linux.device_detector._find_fs_mounts_for_device")
-    @mock.patch("mbed_devices._internal.linux.device_detector._find_serial_port_for_device")
-    def test_builds_list_of_candidates(self, mock_find_serial_port, mock_find_fs_mounts, mock_udev_context):
+    @mock.patch("mbed_devices._internal.linux.device_detector._build_serial_port_index")
+    def test_builds_list_of_candidates(self, mock_build_serial_port_index, mock_find_fs_mounts, mock_udev_context):
         expected_serial = "2090290209"
         expected_vid = "0x45"
         expected_pid = "0x48"
         expected_fs_mount = ["/media/user/DAPLINK"]
-        mock_find_serial_port.return_value = None
+        mock_build_serial_port_index.return_value = {}
         mock_find_fs_mounts.return_value = expected_fs_mount
         devs = [
             mock_device_factory(
@@ -41,7 +66,7 @@ class TestLinuxDeviceDetector(TestCase):
             )
         ]
         mock_udev_context().list_devices.return_value = devs
-        detector = device_detector.LinuxDeviceDetector()
+        detector = device_detector.LinuxDeviceDetector(backend=device_detector.LinuxBackend.UDEV)
         candidates = detector.find_candidates()
         self.assertEqual(
             candidates,
@@ -65,31 +90,230 @@ class TestLinuxDeviceDetector(TestCase):
             )
         ]
         mock_udev_context().list_devices.return_value = devs
-        detector = device_detector.LinuxDeviceDetector()
+        detector = device_detector.LinuxDeviceDetector(backend=device_detector.LinuxBackend.UDEV)
         candidates = detector.find_candidates()
         self.assertEqual(candidates, [])
 
-    @mock.patch("mbed_devices._internal.linux.device_detector.pyudev.Context")
-    def test_finds_serial_port_with_matching_serial_id(self, mock_udev_context):
-        matching_serial = "a"
-        disk_device = mock_device_factory(ID_SERIAL_SHORT=matching_serial, DEVNAME="/dev/sdc")
-        serial_device_match = mock_device_factory(ID_SERIAL_SHORT=matching_serial, DEVNAME="/dev/ttyACM0")
+    @mock.patch("mbed_devices._internal.linux.device_detector._find_fs_mounts_for_device")
+    def test_finds_serial_port_with_matching_serial_id(self, mock_find_fs_mounts):
+        mock_find_fs_mounts.return_value = ["/media/user/DAPLINK"]
+        disk_device = mock_device_factory(
+            ID_SERIAL_SHORT="a", ID_VENDOR_ID="0x45", ID_MODEL_ID="0x48", DEVNAME="/dev/sdc"
+        )
+        serial_device_match = mock_device_factory(ID_SERIAL_SHORT="a", DEVNAME="/dev/ttyACM0")
         serial_device_diff = mock_device_factory(ID_SERIAL_SHORT="b", DEVNAME="/dev/ttyUSB0")
-        mock_udev_context().list_devices.return_value = [serial_device_match, serial_device_diff]
-        serial_port = device_detector._find_serial_port_for_device(disk_device.properties["ID_SERIAL_SHORT"])
-        self.assertEqual(serial_port, serial_device_match.properties["DEVNAME"])
+        context = MockUdevContext(block=[disk_device], tty=[serial_device_diff, serial_device_match])
 
-    @mock.patch("mbed_devices._internal.linux.device_detector.pyudev.Context")
-    def test_returns_empty_none_when_no_matching_serial_id(self, mock_udev_context):
-        disk_device = mock_device_factory(ID_SERIAL_SHORT="i", DEVNAME="/dev/sdc")
+        with mock.patch("mbed_devices._internal.linux.device_detector.pyudev.Context", return_value=context):
+            candidates = device_detector.LinuxDeviceDetector(
+                backend=device_detector.LinuxBackend.UDEV
+            ).find_candidates()
+
+        self.assertEqual(candidates[0].serial_port, serial_device_match.properties["DEVNAME"])
+
+    def test_serial_port_index_keeps_first_matching_tty(self):
+        first = mock_device_factory(ID_SERIAL_SHORT="a", DEVNAME="/dev/ttyACM0")
+        second = mock_device_factory(ID_SERIAL_SHORT="a", DEVNAME="/dev/ttyACM1")
+        no_serial = mock_device_factory(DEVNAME="/dev/tty0")
+        context = MockUdevContext(block=[], tty=[first, second, no_serial])
+
+        self.assertEqual(device_detector._build_serial_port_index(context), {"a": "/dev/ttyACM0"})
+
+    def test_returns_empty_none_when_no_matching_serial_id(self):
         serial_device = mock_device_factory(ID_SERIAL_SHORT="a", DEVNAME="/dev/ttyACM0")
-        mock_udev_context().list_devices.return_value = [serial_device]
-        serial_port = device_detector._find_serial_port_for_device(disk_device.properties["ID_SERIAL_SHORT"])
-        self.assertEqual(serial_port, None)
-
-    @mock.patch("mbed_devices._internal.linux.device_detector.psutil")
-    def test_finds_fs_mountpoints_for_device_files(self, mock_psutil):
-        partition = namedtuple("Partition", "mountpoint,device")("/media/user/DAPLINK", "/dev/sdc")
-        mock_psutil.disk_partitions.return_value = [partition]
-        mounts = device_detector._find_fs_mounts_for_device("/dev/sdc")
-        self.assertEqual(str(mounts[0]), partition.mountpoint)
+        context = MockUdevContext(block=[], tty=[serial_device])
+
+        serial_ports = device_detector._build_serial_port_index(context)
+
+        self.assertIsNone(serial_ports.get("i"))
+
+    @mock.patch("mbed_devices._internal.linux.device_detector._find_fs_mounts_for_device")
+    def test_enumerates_udev_once_per_subsystem_regardless_of_board_count(self, mock_find_fs_mounts):
+        number_of_boards = 200
+        mock_find_fs_mounts.return_value = ["/media/user/DAPLINK"]
+        disks = [
+            mock_device_factory(
+                ID_SERIAL_SHORT=f"{i:08x}", ID_VENDOR_ID="0x0d28", ID_MODEL_ID="0x0204", DEVNAME=f"/dev/sd{i}"
+            )
+            for i in range(number_of_boards)
+        ]
+        ttys = [
+            mock_device_factory(ID_SERIAL_SHORT=f"{i:08x}", DEVNAME=f"/dev/ttyACM{i}") for i in range(number_of_boards)
+        ]
+        context = MockUdevContext(block=disks, tty=ttys)
+
+        with mock.patch(
+            "mbed_devices._internal.linux.device_detector.pyudev.Context", return_value=context
+        ) as mock_context:
+            candidates = device_detector.LinuxDeviceDetector(
+                backend=device_detector.LinuxBackend.UDEV
+            ).find_candidates()
+
+        self.assertEqual(len(candidates), number_of_boards)
+        self.assertEqual(candidates[-1].serial_port, f"/dev/ttyACM{number_of_boards - 1}")
+        mock_context.assert_called_once()
+        self.assertCountEqual(context.enumerations, ["block", "tty"])
+
+    def test_finds_fs_mountpoints_for_device_files(self):
+        entry = MountEntry(device_number="", mount_point=Path("/media/user/DAPLINK"), source="/dev/sdc")
+        mounts = device_detector._find_fs_mounts_for_device("/dev/sdc", MountIndex([entry]))
+        self.assertEqual(mounts, (entry.mount_point,))
+
+    @mock.patch("mbed_devices._internal.linux.device_detector._build_serial_port_index", return_value={})
+    @mock.patch("mbed_devices._internal.linux.device_detector.MountIndex")
+    def test_reads_mount_table_once_per_scan(self, mock_mount_index, _):
+        mock_mount_index.from_mount_table.return_value.find_mount_points.return_value = (Path("/media/user/A"),)
+        disks = [
+            mock_device_factory(
+                ID_SERIAL_SHORT=f"{i:08x}", ID_VENDOR_ID="0x0d28", ID_MODEL_ID="0x0204", DEVNAME=f"/dev/sd{i}"
+            )
+            for i in range(10)
+        ]
+        context = MockUdevContext(block=disks, tty=[])
+
+        with mock.patch("mbed_devices._internal.linux.device_detector.pyudev.Context", return_value=context):
+            candidates = device_detector.LinuxDeviceDetector(
+                backend=device_detector.LinuxBackend.UDEV
+            ).find_candidates()
+
+        self.assertEqual(len(candidates), 10)
+        mock_mount_index.from_mount_table.assert_called_once_with()
+
+    @mock.patch("mbed_devices._internal.linux.device_detector.MountIndex")
+    def test_only_lists_devices_with_serial_number(self, mock_mount_index):
+        mock_mount_index.from_mount_table.return_value.find_mount_points.return_value = (Path("/media/user/A"),)
+        disks = [
+            mock_device_factory(
+                ID_SERIAL_SHORT=serial, ID_VENDOR_ID="0x0d28", ID_MODEL_ID="0x0204", DEVNAME=f"/dev/sd{serial}"
+            )
+            for serial in "abc"
+        ]
+        ttys = [mock_device_factory(ID_SERIAL_SHORT=serial, DEVNAME=f"/dev/ttyACM{serial}") for serial in "abc"]
+        context = MockUdevContext(block=disks, tty=ttys)
+
+        with mock.patch("mbed_devices._internal.linux.device_detector.pyudev.Context", return_value=context):
+            candidates = list(
+                device_detector.LinuxDeviceDetector(backend=device_detector.LinuxBackend.UDEV).iter_candidates(
+                    serial_number="b"
+                )
+            )
+
+        self.assertEqual([(c.serial_number, c.serial_port) for c in candidates], [("b", "/dev/ttyACMb")])
+
+    @mock.patch("mbed_devices._internal.linux.device_detector.MountIndex")
+    def test_does_not_list_other_boards_when_serial_number_matches_nothing(self, mock_mount_index):
+        mock_mount_index.from_mount_table.return_value.find_mount_points.return_value = (Path("/media/user/A"),)
+        disks = [
+            mock_device_factory(
+                ID_SERIAL_SHORT=serial, ID_VENDOR_ID="0x0d28", ID_MODEL_ID="0x0204", DEVNAME=f"/dev/sd{serial}"
+            )
+            for serial in "ab"
+        ]
+        context = MockUdevContext(block=disks, tty=[])
+        detector = device_detector.LinuxDeviceDetector(backend=device_detector.LinuxBackend.UDEV)
+
+        with mock.patch("mbed_devices._internal.linux.device_detector.pyudev.Context", return_value=context):
+            self.assertEqual([c.serial_number for c in detector.iter_candidates(serial_number="b")], ["b"])
+            self.assertEqual(list(detector.iter_candidates(serial_number="c")), [])
+
+
+@skipIf(not import_succeeded, "Tests require package dependencies only used on Linux.")
+@mock.patch("mbed_devices._internal.linux.device_detector.MountIndex")
+@mock.patch("mbed_devices._internal.linux.device_detector.sysfs.list_usb_device_nodes")
+class TestLinuxDeviceDetectorSysfsBackend(TestCase):
+    def test_builds_list_of_candidates(self, list_usb_device_nodes, mock_mount_index):
+        mount_points = {"8:16": (), "8:17": (Path("/media/user/DAPLINK"),)}
+        mock_mount_index.from_mount_table.return_value.find_mount_points.side_effect = (
+            lambda path, device_number: mount_points[device_number]
+        )
+        list_usb_device_nodes.return_value = [
+            UsbDeviceNodes(
+                usb_device=UsbDevice(vendor_id="0d28", product_id="0204", serial_number="0240000034544e45"),
+                block_devices=[ClassDevice(name="sdb", device_number="8:16"), ClassDevice("sdb1", "8:17")],
+                tty_devices=[ClassDevice(name="ttyACM0", device_number="166:0")],
+            ),
+            UsbDeviceNodes(
+                usb_device=UsbDevice(vendor_id="0d28", product_id="0204", serial_number=None),
+                block_devices=[ClassDevice(name="sdc1", device_number="8:17")],
+                tty_devices=[],
+            ),
+            UsbDeviceNodes(
+                usb_device=UsbDevice(vendor_id="0d28", product_id="0204", serial_number="1234"),
+                block_devices=[ClassDevice(name="sdd", device_number="8:16")],
+                tty_devices=[],
+            ),
+        ]
+
+        candidates = device_detector.LinuxDeviceDetector(backend=device_detector.LinuxBackend.SYSFS).find_candidates()
+
+        self.assertEqual(
+            candidates,
+            [
+                CandidateDevice(
+                    serial_number="0240000034544e45",
+                    vendor_id="0d28",
+                    product_id="0204",
+                    mount_points=[Path("/media/user/DAPLINK")],
+                    serial_port="/dev/ttyACM0",
+                )
+            ],
+        )
+
+    def test_only_lists_devices_with_serial_number(self, list_usb_device_nodes, mock_mount_index):
+        mock_mount_index.from_mount_table.return_value.find_mount_points.return_value = (Path("/media/user/A"),)
+        list_usb_device_nodes.return_value = [
+            UsbDeviceNodes(
+                usb_device=UsbDevice(vendor_id="0d28", product_id="0204", serial_number=serial_number),
+                block_devices=[ClassDevice(name=f"sd{serial_number}", device_number="8:16")],
+                tty_devices=[],
+            )
+            for serial_number in "abc"
+        ]
+
+        candidates = list(
+            device_detector.LinuxDeviceDetector(backend=device_detector.LinuxBackend.SYSFS).iter_candidates(
+                serial_number="c"
+            )
+        )
+
+        self.assertEqual([candidate.serial_number for candidate in candidates], ["c"])
+        mock_mount_index.from_mount_table.return_value.find_mount_points.assert_called_once_with(
+            "/dev/sdc", device_number="8:16"
+        )
+
+
+@skipIf(not import_succeeded, "Tests require package dependencies only used on Linux.")
+@mock.patch("mbed_devices._internal.linux.device_detector.is_udev_available")
+class TestSelectBackend(TestCase):
+    @mock.patch.dict("os.environ", {"MBED_DEVICES_LINUX_BACKEND": "sysfs"})
+    def test_uses_configured_backend(self, is_udev_available):
+        is_udev_available.return_value = True
+
+        self.assertEqual(device_detector.select_backend(), device_detector.LinuxBackend.SYSFS)
+
+    @mock.patch.dict("os.environ", {"MBED_DEVICES_LINUX_BACKEND": "udev"})
+    @mock.patch("mbed_devices._internal.linux.device_detector.pyudev", None)
+    def test_falls_back_to_sysfs_when_configured_udev_cannot_be_imported(self, is_udev_available):
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(device_detector.select_backend(), device_detector.LinuxBackend.SYSFS)
+
+    @mock.patch.dict("os.environ", {"MBED_DEVICES_LINUX_BACKEND": "AUTO"})
+    def test_uses_udev_when_available(self, is_udev_available):
+        is_udev_available.return_value = True
+
+        self.assertEqual(device_detector.select_backend(), device_detector.LinuxBackend.UDEV)
+
+    @mock.patch.dict("os.environ", {"MBED_DEVICES_LINUX_BACKEND": "whatever"})
+    def test_falls_back_to_sysfs_when_udev_is_not_available(self, is_udev_available):
+        is_udev_available.return_value = False
+
+        self.assertEqual(device_detector.select_backend(), device_detector.LinuxBackend.SYSFS)
+
+    def test_detector_uses_selected_backend(self, is_udev_available):
+        is_udev_available.return_value = False
+
+        with mock.patch("mbed_devices._internal.linux.device_detector._iter_candidates_from_sysfs") as from_sysfs:
+            from_sysfs.return_value = iter([mock.sentinel.candidate])
+            candidates = device_detector.LinuxDeviceDetector().find_candidates()
+
+        self.assertEqual(candidates, [mock.sentinel.candidate])
@@ -0,0 +1,120 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import os
+import pathlib
+import tempfile
+from unittest import TestCase, mock, skipIf
+
+try:
+    from mbed_devices._internal.linux.mountinfo import MountEntry, MountIndex, read_mount_entries
+
+    import_succeeded = True
+except ImportError:
+    import_succeeded = False
+
+BOARD_MOUNTS = [
+    "120 29 8:17 / /media/user/DAPLINK rw,nosuid,nodev,relatime shared:65 - vfat /dev/sdb1 rw,uid=1000",
+    "121 29 8:33 / /media/user/NOD\\040F429 rw,nosuid,nodev,relatime shared:66 - vfat /dev/sdc1 rw,uid=1000",
+    "122 29 8:48 / /media/user/JLINK rw,nosuid,nodev,relatime - vfat /dev/sdd rw,uid=1000",
+]
+
+
+def write_mountinfo(directory, number_of_overlay_mounts):
+    """Writes a fake mount table resembling a CI host running many containers."""
+    lines = [
+        "22 1 259:2 / / rw,relatime shared:1 - ext4 /dev/nvme0n1p2 rw,errors=remount-ro",
+        "23 22 0:21 / /proc rw,nosuid,nodev,noexec,relatime shared:12 - proc proc rw",
+    ]
+    for i in range(number_of_overlay_mounts):
+        lines.append(
+            f"{1000 + i} 22 0:{100 + i} / /var/lib/docker/overlay2/{i:064x}/merged rw,relatime shared:{200 + i} "
+            f"- overlay overlay rw,lowerdir=/var/lib/docker/overlay2/l/{i:026x},upperdir=/u/{i},workdir=/w/{i}"
+        )
+        if i % 10 == 0:
+            lines.append(f"{5000 + i} 22 259:2 /srv/{i} /bind/{i} rw,relatime shared:1 - ext4 /dev/nvme0n1p2 rw")
+    lines.extend(BOARD_MOUNTS)
+    path = pathlib.Path(directory, "mountinfo")
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+@skipIf(not import_succeeded, "Tests require package dependencies only used on Linux.")
+class TestReadMountEntries(TestCase):
+    def test_parses_mount_table(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory, "mountinfo")
+            path.write_text("\n".join(BOARD_MOUNTS) + "\nmalformed line\n")
+
+            entries = read_mount_entries(path)
+
+        self.assertEqual(
+            entries,
+            [
+                MountEntry(device_number="8:17", mount_point=pathlib.Path("/media/user/DAPLINK"), source="/dev/sdb1"),
+                MountEntry(device_number="8:33", mount_point=pathlib.Path("/media/user/NOD F429"), source="/dev/sdc1"),
+                MountEntry(device_number="8:48", mount_point=pathlib.Path("/media/user/JLINK"), source="/dev/sdd"),
+            ],
+        )
+
+
+@skipIf(not import_succeeded, "Tests require package dependencies only used on Linux.")
+class TestMountIndex(TestCase):
+    def test_finds_mount_points_in_large_mount_table(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_mountinfo(directory, number_of_overlay_mounts=5000)
+
+            with mock.patch("builtins.open", wraps=open) as mock_open:
+                index = MountIndex.from_mount_table(path)
+                mount_points = [index.find_mount_points(device) for device in ("/dev/sdb1", "/dev/sdc1", "/dev/sdd")]
+
+        mock_open.assert_called_once()
+        self.assertEqual(
+            mount_points,
+            [
+                (pathlib.Path("/media/user/DAPLINK"),),
+                (pathlib.Path("/media/user/NOD F429"),),
+                (pathlib.Path("/media/user/JLINK"),),
+            ],
+        )
+
+    def test_resolves_symlinked_device_paths(self):
+        with tempfile.TemporaryDirectory() as directory:
+            device = pathlib.Path(directory, "sdb1")
+            device.touch()
+            by_id = pathlib.Path(directory, "usb-MBED_VFS_0240000034544e45-0:0-part1")
+            by_id.symlink_to(device)
+            index = MountIndex(
+                [MountEntry(device_number="8:17", mount_point=pathlib.Path("/media/user/DAPLINK"), source=str(by_id))]
+            )
+
+            self.assertEqual(index.find_mount_points(str(device)), (pathlib.Path("/media/user/DAPLINK"),))
+            self.assertEqual(index.find_mount_points(str(by_id)), (pathlib.Path("/media/user/DAPLINK"),))
+
+    @mock.patch("mbed_devices._internal.linux.mountinfo._device_number", return_value="8:17")
+    def test_finds_mount_points_by_device_number(self, _device_number):
+        index = MountIndex(
+            [
+                MountEntry(device_number="8:17", mount_point=pathlib.Path("/media/user/DAPLINK"), source="/dev/root"),
+                MountEntry(device_number="8:17", mount_point=pathlib.Path("/mnt/bind"), source="/dev/sdb1"),
+            ]
+        )
+
+        self.assertEqual(
+            index.find_mount_points("/dev/sdb1"), (pathlib.Path("/media/user/DAPLINK"), pathlib.Path("/mnt/bind"))
+        )
+
+    def test_returns_empty_tuple_for_unmounted_device(self):
+        index = MountIndex([])
+
+        self.assertEqual(index.find_mount_points("/dev/sdz"), ())
+
+    @mock.patch("mbed_devices._internal.linux.mountinfo.psutil")
+    def test_falls_back_to_psutil_when_mount_table_cannot_be_read(self, mock_psutil):
+        partition = mock.Mock(mountpoint="/media/user/DAPLINK", device="/dev/sdc")
+        mock_psutil.disk_partitions.return_value = [partition]
+
+        index = MountIndex.from_mount_table(pathlib.Path(os.devnull, "missing"))
+
+        self.assertEqual(index.find_mount_points("/dev/sdc"), (pathlib.Path("/media/user/DAPLINK"),))
@@ -0,0 +1,98 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import os
+import pathlib
+import tempfile
+from unittest import TestCase
+
+from mbed_devices._internal.linux.sysfs import ClassDevice, UsbDevice, UsbDeviceNodes, list_usb_device_nodes
+
+USB_BUS = "devices/pci0000:00/0000:00:14.0/usb1"
+
+
+class FakeSysfs:
+    """Builds a sysfs tree on disk, mimicking the layout exposed by the kernel."""
+
+    def __init__(self, root):
+        self.root = pathlib.Path(root)
+        for directory in ("bus/usb/devices", "class/block", "class/tty"):
+            (self.root / directory).mkdir(parents=True)
+        self.add_usb_device("usb1", vendor_id="1d6b", product_id="0003", serial_number="0000:00:14.0")
+
+    def add_usb_device(self, port, vendor_id, product_id, serial_number=None):
+        device_path = self.root / USB_BUS if port == "usb1" else self.root / USB_BUS / port
+        device_path.mkdir(parents=True, exist_ok=True)
+        (device_path / "idVendor").write_text(f"{vendor_id}\n")
+        (device_path / "idProduct").write_text(f"{product_id}\n")
+        if serial_number is not None:
+            (device_path / "serial").write_text(f"{serial_number}\n")
+        self._link(self.root / "bus/usb/devices" / port, device_path)
+        # Interfaces are also listed alongside devices, but do not have any USB descriptor attributes.
+        interface_path = device_path / f"{port}:1.0"
+        interface_path.mkdir(exist_ok=True)
+        self._link(self.root / "bus/usb/devices" / interface_path.name, interface_path)
+
+    def add_block_device(self, port, name, device_number, partitions=()):
+        disk_path = self.root / USB_BUS / port / f"{port}:1.0/host2/target2:0:0/2:0:0:0/block" / name
+        self._add_class_device("block", disk_path, device_number)
+        for partition_name, partition_number in partitions:
+            self._add_class_device("block", disk_path / partition_name, partition_number)
+
+    def add_tty_device(self, port, name):
+        self._add_class_device("tty", self.root / USB_BUS / port / f"{port}:1.1/tty" / name, "166:0")
+
+    def add_virtual_device(self, class_name, name, device_number):
+        self._add_class_device(class_name, self.root / "devices/virtual" / class_name / name, device_number)
+
+    def _add_class_device(self, class_name, device_path, device_number):
+        device_path.mkdir(parents=True)
+        (device_path / "dev").write_text(f"{device_number}\n")
+        self._link(self.root / "class" / class_name / device_path.name, device_path)
+
+    @staticmethod
+    def _link(link, target):
+        link.symlink_to(os.path.relpath(target, link.parent))
+
+
+class TestListUsbDeviceNodes(TestCase):
+    def test_groups_block_and_tty_devices_by_usb_device(self):
+        with tempfile.TemporaryDirectory() as root:
+            sysfs = FakeSysfs(root)
+            sysfs.add_usb_device("1-1", vendor_id="0d28", product_id="0204", serial_number="0240000034544e45")
+            sysfs.add_block_device("1-1", "sdb", "8:16")
+            sysfs.add_tty_device("1-1", "ttyACM0")
+            sysfs.add_usb_device("1-2", vendor_id="1366", product_id="1015", serial_number="000440112138")
+            sysfs.add_block_device("1-2", "sdc", "8:32", partitions=[("sdc1", "8:33")])
+            sysfs.add_usb_device("1-3", vendor_id="046d", product_id="c52b")
+            sysfs.add_virtual_device("block", "loop0", "7:0")
+            sysfs.add_virtual_device("tty", "tty0", "4:0")
+
+            nodes = list_usb_device_nodes(pathlib.Path(root))
+
+        self.assertEqual(
+            nodes,
+            [
+                UsbDeviceNodes(
+                    usb_device=UsbDevice(vendor_id="0d28", product_id="0204", serial_number="0240000034544e45"),
+                    block_devices=[ClassDevice(name="sdb", device_number="8:16")],
+                    tty_devices=[ClassDevice(name="ttyACM0", device_number="166:0")],
+                ),
+                UsbDeviceNodes(
+                    usb_device=UsbDevice(vendor_id="1366", product_id="1015", serial_number="000440112138"),
+                    block_devices=[
+                        ClassDevice(name="sdc", device_number="8:32"),
+                        ClassDevice(name="sdc1", device_number="8:33"),
+                    ],
+                    tty_devices=[],
+                ),
+            ],
+        )
+
+    def test_handles_missing_sysfs(self):
+        with tempfile.TemporaryDirectory() as root:
+            self.assertEqual(list_usb_device_nodes(pathlib.Path(root, "missing")), [])
+
+    def test_device_file_path(self):
+        self.assertEqual(ClassDevice(name="sdb1", device_number="8:17").device_file_path, "/dev/sdb1")
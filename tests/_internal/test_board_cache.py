@@ -0,0 +1,139 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import os
+import pathlib
+import tempfile
+from unittest import TestCase, mock
+
+from mbed_targets import Board
+
+from tests.factories import CandidateDeviceFactory
+from mbed_devices._internal.board_cache import BoardCache, CacheKey, CachedBoard, get_board_cache, make_cache_key
+
+
+def make_board(product_code="0240"):
+    return Board(
+        board_type="K64F",
+        board_name="FRDM-K64F",
+        product_code=product_code,
+        target_type="platform",
+        slug="FRDM-K64F",
+        build_variant=("S", "NS"),
+        mbed_os_support=("Mbed OS 5",),
+        mbed_enabled=("Baseline",),
+    )
+
+
+def make_key(serial_number="0240000034544e45", htm_fingerprint="fingerprint"):
+    return CacheKey(
+        vendor_id="0d28",
+        product_id="0204",
+        serial_number=serial_number,
+        htm_fingerprint=htm_fingerprint,
+        board_database="1.1.1:AUTO",
+    )
+
+
+class TestBoardCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.directory.name, "cache", "boards.sqlite3")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def make_cache(self, max_entries=10):
+        cache = BoardCache(self.path, max_entries=max_entries)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_stores_boards(self):
+        self.make_cache().put(make_key(), make_board())
+
+        self.assertEqual(self.make_cache().get(make_key()), CachedBoard(board=make_board()))
+
+    def test_stores_unidentified_devices(self):
+        cache = self.make_cache()
+        cache.put(make_key(), None)
+
+        self.assertEqual(cache.get(make_key()), CachedBoard(board=None))
+
+    def test_unidentified_devices_expire(self):
+        cache = BoardCache(self.path, unidentified_device_ttl=60)
+        self.addCleanup(cache.close)
+        with mock.patch("mbed_devices._internal.board_cache.time") as time:
+            time.time.return_value = 0
+            cache.put(make_key("unidentified"), None)
+            cache.put(make_key("identified"), make_board())
+            time.time.return_value = 59
+            self.assertEqual(cache.get(make_key("unidentified")), CachedBoard(board=None))
+            time.time.return_value = 60
+
+            self.assertIsNone(cache.get(make_key("unidentified")))
+            self.assertEqual(cache.get(make_key("identified")), CachedBoard(board=make_board()))
+
+    def test_misses_when_htm_files_changed(self):
+        cache = self.make_cache()
+        cache.put(make_key(htm_fingerprint="before"), make_board())
+
+        self.assertIsNone(cache.get(make_key(htm_fingerprint="after")))
+
+    def test_evicts_least_recently_used_entries(self):
+        cache = self.make_cache(max_entries=2)
+        with mock.patch("mbed_devices._internal.board_cache.time") as time:
+            for timestamp, serial_number in enumerate(["first", "second"]):
+                time.time.return_value = timestamp
+                cache.put(make_key(serial_number), make_board())
+            time.time.return_value = 2
+            cache.get(make_key("first"))
+            time.time.return_value = 3
+            cache.put(make_key("third"), make_board())
+
+        self.assertIsNotNone(cache.get(make_key("first")))
+        self.assertIsNone(cache.get(make_key("second")))
+        self.assertIsNotNone(cache.get(make_key("third")))
+
+    def test_ignores_database_errors(self):
+        self.path.parent.mkdir()
+        self.path.write_text("Not a database")
+        cache = self.make_cache()
+
+        cache.put(make_key(), make_board())
+        self.assertIsNone(cache.get(make_key()))
+
+
+class TestGetBoardCache(TestCase):
+    @mock.patch.dict(os.environ, {"MBED_DEVICES_BOARD_CACHE": "off"})
+    def test_returns_none_when_disabled(self):
+        self.assertIsNone(get_board_cache())
+
+    def test_uses_configured_location(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "boards.sqlite3")
+            with mock.patch.dict(os.environ, {"MBED_DEVICES_BOARD_CACHE_PATH": path}):
+                cache = get_board_cache()
+                cache.put(make_key(), make_board())
+                cache.close()
+
+                self.assertIs(get_board_cache(), cache)
+            self.assertTrue(os.path.isfile(path))
+
+
+class TestMakeCacheKey(TestCase):
+    def test_fingerprint_depends_on_htm_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            candidate = CandidateDeviceFactory(mount_points=[pathlib.Path(directory)])
+            pathlib.Path(directory, "DETAILS.TXT").write_text("Version: 0254")
+            before = make_cache_key(candidate)
+            pathlib.Path(directory, "MBED.HTM").write_text("<html></html>")
+            after = make_cache_key(candidate)
+
+        self.assertEqual(before.serial_number, candidate.serial_number)
+        self.assertNotEqual(before.htm_fingerprint, after.htm_fingerprint)
+
+    def test_returns_none_when_mount_point_cannot_be_listed(self):
+        candidate = CandidateDeviceFactory(mount_points=[pathlib.Path("this-directory-does-not-exist")])
+
+        self.assertIsNone(make_cache_key(candidate))
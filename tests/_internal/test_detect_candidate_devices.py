@@ -4,10 +4,12 @@
 #
 from unittest import TestCase, mock
 
+from tests.factories import CandidateDeviceFactory
 from tests.markers import windows_only, darwin_only, linux_only
 from mbed_devices._internal.base_detector import DeviceDetector
 from mbed_devices._internal.detect_candidate_devices import (
     detect_candidate_devices,
+    iter_candidate_devices,
     _get_detector_for_current_os,
 )
 
@@ -19,6 +21,33 @@ class TestDetectCandidateDevices(TestCase):
         _get_detector_for_current_os.return_value = detector
         self.assertEqual(detect_candidate_devices(), detector.find_candidates.return_value)
 
+    @mock.patch("mbed_devices._internal.detect_candidate_devices._get_detector_for_current_os")
+    def test_iterates_candidates_using_os_specific_detector(self, _get_detector_for_current_os):
+        detector = mock.Mock(spec_set=DeviceDetector)
+        _get_detector_for_current_os.return_value = detector
+        self.assertEqual(iter_candidate_devices(serial_number="123"), detector.iter_candidates.return_value)
+        detector.iter_candidates.assert_called_once_with(serial_number="123")
+
+
+class TestDeviceDetector(TestCase):
+    def test_iterates_over_found_candidates_by_default(self):
+        class Detector(DeviceDetector):
+            def find_candidates(self):
+                return [mock.sentinel.candidate]
+
+        self.assertEqual(list(Detector().iter_candidates()), [mock.sentinel.candidate])
+
+    def test_filters_found_candidates_by_serial_number(self):
+        candidates = CandidateDeviceFactory.create_batch(3)
+
+        class Detector(DeviceDetector):
+            def find_candidates(self):
+                return candidates
+
+        self.assertEqual(
+            list(Detector().iter_candidates(serial_number=candidates[1].serial_number)), [candidates[1]]
+        )
+
 
 class TestGetDetectorForCurrentOS(TestCase):
     @windows_only
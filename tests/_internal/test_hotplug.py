@@ -0,0 +1,75 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import threading
+from unittest import TestCase, mock
+
+from tests.markers import linux_only
+from mbed_devices._internal.hotplug import (
+    HotplugEvent,
+    PollingEventSource,
+    get_candidate_tracker_for_current_os,
+    get_event_source_for_current_os,
+)
+
+
+class TestPollingEventSource(TestCase):
+    def test_yields_events_until_closed(self):
+        source = PollingEventSource(interval=0.001)
+        events = []
+        for event in source:
+            events.append(event)
+            if len(events) == 3:
+                threading.Thread(target=source.close).start()
+
+        self.assertEqual(events[:3], [HotplugEvent(action="poll", subsystem="")] * 3)
+
+
+class TestGetEventSourceForCurrentOS(TestCase):
+    @mock.patch("mbed_devices._internal.hotplug.platform")
+    def test_polls_on_systems_without_hotplug_notifications(self, platform):
+        platform.system.return_value = "Darwin"
+
+        self.assertIsInstance(get_event_source_for_current_os(), PollingEventSource)
+
+    @mock.patch("mbed_devices._internal.hotplug.platform")
+    def test_windows_subscribes_to_wmi_events(self, platform):
+        from mbed_devices._internal.windows.hotplug_event_source import WmiEventSource
+
+        platform.system.return_value = "Windows"
+
+        self.assertIsInstance(get_event_source_for_current_os(), WmiEventSource)
+
+    @linux_only
+    @mock.patch("mbed_devices._internal.linux.device_detector.is_udev_available", return_value=True)
+    @mock.patch("mbed_devices._internal.linux.hotplug_event_source.pyudev")
+    def test_linux_uses_udev(self, pyudev, _):
+        from mbed_devices._internal.linux.hotplug_event_source import UdevEventSource
+
+        source = get_event_source_for_current_os()
+
+        self.assertIsInstance(source, UdevEventSource)
+        pyudev.Monitor.from_netlink.return_value.filter_by.assert_has_calls([mock.call("block"), mock.call("tty")])
+        source.close()
+
+    @linux_only
+    @mock.patch("mbed_devices._internal.linux.device_detector.is_udev_available", return_value=False)
+    def test_linux_polls_without_udev(self, _):
+        self.assertIsInstance(get_event_source_for_current_os(), PollingEventSource)
+
+
+class TestGetCandidateTrackerForCurrentOS(TestCase):
+    @mock.patch("mbed_devices._internal.hotplug.platform")
+    def test_windows_tracks_candidates_from_events(self, platform):
+        from mbed_devices._internal.windows.candidate_tracker import WindowsCandidateTracker
+
+        platform.system.return_value = "Windows"
+
+        self.assertIsInstance(get_candidate_tracker_for_current_os(), WindowsCandidateTracker)
+
+    @mock.patch("mbed_devices._internal.hotplug.platform")
+    def test_other_systems_scan_for_candidates(self, platform):
+        platform.system.return_value = "Linux"
+
+        self.assertIsNone(get_candidate_tracker_for_current_os())
@@ -10,8 +10,10 @@ from mbed_targets.exceptions import UnknownBoard
 from tests.factories import CandidateDeviceFactory
 from mbed_devices._internal.htm_file import OnlineId
 from mbed_devices._internal.resolve_board import (
+    MAX_HTM_FILE_READ_SIZE,
     NoBoardForCandidate,
     resolve_board,
+    get_htm_bytes_read,
     _get_all_htm_files_contents,
     _read_htm_file_contents,
     _is_htm_file,
@@ -126,6 +128,26 @@ class TestGetAllHtmFilesContents(TestCase):
 
         self.assertEqual(result, ["foo", "bar"])
 
+    def test_only_reads_well_known_file_when_present(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pathlib.Path(directory, "MBED.HTM").write_text("foo")
+            pathlib.Path(directory, "user_page.htm").write_text("not an interface file")
+
+            result = _get_all_htm_files_contents([pathlib.Path(directory)])
+
+        self.assertEqual(result, ["foo"])
+
+    def test_reads_a_bounded_prefix_of_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pathlib.Path(directory, "mbed.htm").write_text("code=0240" + "x" * 10 * MAX_HTM_FILE_READ_SIZE)
+
+            with self.assertLogs("mbed_devices._internal.resolve_board", level="DEBUG") as logs:
+                result = _get_all_htm_files_contents([pathlib.Path(directory)])
+
+        self.assertEqual(len(result[0]), MAX_HTM_FILE_READ_SIZE)
+        self.assertTrue(result[0].startswith("code=0240"))
+        self.assertIn(f"Read {MAX_HTM_FILE_READ_SIZE} bytes", logs.output[0])
+
 
 class TestReadHtmFilesContents(TestCase):
     def test_handles_unreadable_htm_file(self):
@@ -137,6 +159,18 @@ class TestReadHtmFilesContents(TestCase):
 
         self.assertEqual(result, ["foo"])
 
+    def test_counts_bytes_read(self):
+        with tempfile.TemporaryDirectory() as directory:
+            small_file = pathlib.Path(directory, "mbed.htm")
+            small_file.write_text("code=0240")
+            large_file = pathlib.Path(directory, "large.htm")
+            large_file.write_text("x" * 10 * MAX_HTM_FILE_READ_SIZE)
+            bytes_read = get_htm_bytes_read()
+
+            _read_htm_file_contents([small_file, large_file, pathlib.Path("error.htm")])
+
+        self.assertEqual(get_htm_bytes_read() - bytes_read, len("code=0240") + MAX_HTM_FILE_READ_SIZE)
+
 
 class TestIsHtmFile(TestCase):
     def test_lower_case_htm(self):
@@ -0,0 +1,114 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import threading
+from unittest import TestCase
+
+from mbed_devices._internal.utils.concurrency import CallTimedOut, DeadlineExecutor, is_current_call_abandoned
+
+
+def submit_all(function, arguments, timeout, max_workers):
+    executor = DeadlineExecutor(timeout=timeout, max_workers=max_workers)
+    return [executor.submit(function, argument) for argument in arguments]
+
+
+class TestDeadlineExecutorWithManyCalls(TestCase):
+    def test_returns_results_in_order(self):
+        results = submit_all(lambda x: x * 2, range(20), timeout=5, max_workers=4)
+
+        self.assertEqual([result.result() for result in results], [x * 2 for x in range(20)])
+
+    def test_propagates_exceptions(self):
+        def fail(x):
+            raise ValueError(x)
+
+        results = submit_all(fail, [1], timeout=5, max_workers=4)
+
+        with self.assertRaises(ValueError):
+            results[0].result()
+
+    def test_abandons_calls_past_their_deadline(self):
+        hang = threading.Event()
+        self.addCleanup(hang.set)
+
+        def call(x):
+            if x == "hung":
+                hang.wait()
+            return x
+
+        results = submit_all(call, ["hung", "a", "b"], timeout=0.1, max_workers=1)
+
+        with self.assertRaises(CallTimedOut):
+            results[0].result()
+        self.assertEqual([result.result() for result in results[1:]], ["a", "b"])
+
+    def test_runs_calls_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        results = submit_all(lambda x: barrier.wait(), range(3), timeout=5, max_workers=3)
+
+        self.assertCountEqual([result.result() for result in results], [0, 1, 2])
+
+    def test_skips_cancelled_calls(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        results = submit_all(lambda x: release.wait(), range(2), timeout=5, max_workers=1)
+        results[1].cancel()
+        release.set()
+
+        self.assertTrue(results[0].result())
+        self.assertTrue(results[1].cancelled())
+
+    def test_handles_no_arguments(self):
+        self.assertEqual(submit_all(lambda x: x, [], timeout=1, max_workers=4), [])
+
+
+class TestDeadlineExecutor(TestCase):
+    def test_accepts_calls_after_becoming_idle(self):
+        executor = DeadlineExecutor(timeout=5, max_workers=2)
+
+        self.assertEqual(executor.submit(str, 1).result(timeout=5), "1")
+        self.assertEqual(executor.submit(str, 2).result(timeout=5), "2")
+
+    def test_replaces_workers_running_abandoned_calls(self):
+        hang = threading.Event()
+        self.addCleanup(hang.set)
+        executor = DeadlineExecutor(timeout=0.1, max_workers=1)
+
+        hung_call = executor.submit(hang.wait, None)
+        with self.assertRaises(CallTimedOut):
+            hung_call.result(timeout=5)
+
+        self.assertEqual(executor.submit(str, 1).result(timeout=5), "1")
+
+    def test_abandoned_calls_can_tell_they_were_abandoned(self):
+        hang = threading.Event()
+        executor = DeadlineExecutor(timeout=0.1, max_workers=1)
+        abandoned = []
+
+        def call(x):
+            hang.wait()
+            abandoned.append(is_current_call_abandoned())
+
+        hung_call = executor.submit(call, None)
+        with self.assertRaises(CallTimedOut):
+            hung_call.result(timeout=5)
+        self.assertEqual(executor.submit(lambda x: is_current_call_abandoned(), None).result(timeout=5), False)
+        hang.set()
+
+        self.assertTrue(executor.join(timeout=5))
+        self.assertEqual(abandoned, [True])
+        self.assertFalse(is_current_call_abandoned())
+
+    def test_join_waits_for_abandoned_calls(self):
+        release = threading.Event()
+        executor = DeadlineExecutor(timeout=0.1, max_workers=1)
+
+        with self.assertRaises(CallTimedOut):
+            executor.submit(release.wait, None).result(timeout=5)
+
+        self.assertFalse(executor.join(timeout=0.1))
+        release.set()
+        self.assertTrue(executor.join(timeout=5))
@@ -0,0 +1,237 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import pathlib
+import threading
+from unittest import TestCase, mock
+
+from mbed_devices._internal.candidate_device import CandidateDevice
+from mbed_devices._internal.hotplug import HotplugEvent
+from mbed_devices._internal.windows.candidate_tracker import WindowsCandidateTracker
+from mbed_devices._internal.windows.device_instance_id import ParentIdPrefixCache
+from mbed_devices._internal.windows.disk_drive import DiskDrive
+from mbed_devices._internal.windows.disk_partition import DiskPartition
+from mbed_devices._internal.windows.disk_partition_logical_disk_relationships import (
+    DiskPartitionLogicalDiskRelationship,
+)
+from mbed_devices._internal.windows.logical_disk import LogicalDisk
+from mbed_devices._internal.windows.serial_port import SerialPort
+from mbed_devices._internal.windows.system_data_loader import SYSTEM_DATA_TYPES, ComponentSource
+from mbed_devices._internal.windows.usb_hub import UsbHub
+from tests._internal.windows.test_disk_data_aggregation import make_component
+from tests._internal.windows.test_usb_hub_data_loader import FakeRegistryReader
+
+
+class FakeComponentSource(ComponentSource):
+    """Components of a system which boards are plugged into, recording what is loaded."""
+
+    def __init__(self):
+        self.components = {cls: [] for cls in SYSTEM_DATA_TYPES}
+        self.parent_id_prefixes = {}
+        self.loads = []
+
+    def load_system_data(self):
+        self.loads.append("system data")
+        return {cls: list(components) for cls, components in self.components.items()}
+
+    def load_all(self, cls):
+        self.loads.append(cls.__name__)
+        return list(self.components[cls])
+
+    def load_matching(self, cls, field_name, value):
+        self.loads.append((cls.__name__, value))
+        return [c for c in self.components[cls] if c.get(field_name).upper() == value.upper()]
+
+
+class Board:
+    """A DAPLink board, with the components Windows creates for it in the order they appear."""
+
+    def __init__(self, serial_number, parent_id_prefix, disk_index, drive_letter, com_port):
+        self.serial_number = serial_number.lower()
+        self.drive_letter = drive_letter
+        self.com_port = com_port
+        parent_pnp_id = f"USB\\VID_0D28&PID_0204\\{serial_number}"
+        interface_pnp_ids = [f"USB\\VID_0D28&PID_0204&MI_0{i}\\{parent_id_prefix.upper()}&000{i}" for i in range(2)]
+        disk_pnp_id = f"USBSTOR\\DISK&VEN_MBED&PROD_VFS&REV_0.1\\{serial_number}&0"
+        partition_id = f"Disk #{disk_index}, Partition #0"
+        self.parent_id_prefixes = {parent_pnp_id: parent_id_prefix}
+        self.pnp_ids = [parent_pnp_id, *interface_pnp_ids, disk_pnp_id]
+        self.pnp_components = {
+            UsbHub: [make_component(UsbHub, DeviceID=pnp_id, PNPDeviceID=pnp_id) for pnp_id in self.pnp_ids[:3]],
+            SerialPort: [
+                make_component(
+                    SerialPort,
+                    Caption=f"mbed Serial Port ({com_port})",
+                    DeviceID=interface_pnp_ids[1],
+                    PNPDeviceID=interface_pnp_ids[1],
+                )
+            ],
+            DiskDrive: [
+                make_component(
+                    DiskDrive,
+                    Index=disk_index,
+                    InterfaceType="USB",
+                    PNPDeviceID=disk_pnp_id,
+                    SerialNumber=serial_number,
+                )
+            ],
+        }
+        self.disk_components = {
+            DiskPartition: [make_component(DiskPartition, DeviceID=partition_id, DiskIndex=disk_index)],
+            DiskPartitionLogicalDiskRelationship: [
+                make_component(
+                    DiskPartitionLogicalDiskRelationship,
+                    Antecedent=f'\\\\HOST\\root\\cimv2:Win32_DiskPartition.DeviceID="{partition_id}"',
+                    Dependent=f'\\\\HOST\\root\\cimv2:Win32_LogicalDisk.DeviceID="{drive_letter}"',
+                )
+            ],
+            LogicalDisk: [make_component(LogicalDisk, DeviceID=drive_letter)],
+        }
+
+    @property
+    def candidate(self):
+        return CandidateDevice(
+            product_id="0204",
+            vendor_id="0d28",
+            mount_points=(pathlib.Path(self.drive_letter),),
+            serial_number=self.serial_number,
+            serial_port=self.com_port,
+        )
+
+    def plug(self, source):
+        """Adds the components of the board to the system, returning the events reported."""
+        source.parent_id_prefixes.update(self.parent_id_prefixes)
+        for components in [self.pnp_components, self.disk_components]:
+            for cls, board_components in components.items():
+                source.components[cls].extend(board_components)
+        return [HotplugEvent("add", "Win32_PnPEntity", pnp_id) for pnp_id in self.pnp_ids] + [
+            HotplugEvent("add", "Win32_LogicalDisk", self.drive_letter)
+        ]
+
+    def unplug(self, source):
+        """Removes the components of the board from the system, returning the events reported."""
+        for components in [self.pnp_components, self.disk_components]:
+            for cls, board_components in components.items():
+                source.components[cls] = [c for c in source.components[cls] if c not in board_components]
+        return [HotplugEvent("remove", "Win32_LogicalDisk", self.drive_letter)] + [
+            HotplugEvent("remove", "Win32_PnPEntity", pnp_id) for pnp_id in reversed(self.pnp_ids)
+        ]
+
+
+@mock.patch("mbed_devices._internal.windows.disk_aggregation.get_volumes_information", mock.Mock(return_value={}))
+class TestWindowsCandidateTracker(TestCase):
+    def setUp(self):
+        self.source = FakeComponentSource()
+        self.tracker = WindowsCandidateTracker(
+            self.source, ParentIdPrefixCache(FakeRegistryReader(self.source.parent_id_prefixes))
+        )
+        self.connected_board = Board(
+            "0240000032044E4500257009997B00386781000097969900", "8&1a2b3c4d&0", 1, "E:", "COM3"
+        )
+        self.board = Board("0240000034544E45001A00018AA900292011000097969900", "8&2f125ec6&0", 2, "F:", "COM5")
+        self.connected_board.plug(self.source)
+
+    def test_scans_all_connected_boards(self):
+        self.board.plug(self.source)
+
+        self.assertCountEqual(self.tracker.scan(), [self.connected_board.candidate, self.board.candidate])
+
+    def test_attaches_board_once_all_its_components_are_created(self):
+        self.tracker.scan()
+
+        changes = [self.tracker.update(event) for event in self.board.plug(self.source)]
+
+        self.assertEqual(changes, [{}] * 4 + [{self.board.serial_number: self.board.candidate}])
+
+    def test_only_loads_the_components_affected_by_events(self):
+        self.tracker.scan()
+        self.source.loads.clear()
+
+        events = self.board.plug(self.source)
+        self.tracker.update(events[1])
+        self.tracker.update(events[-1])
+
+        self.assertEqual(
+            self.source.loads,
+            [
+                ("UsbHub", events[1].device_file_path),
+                ("SerialPort", events[1].device_file_path),
+                ("DiskDrive", events[1].device_file_path),
+                ("LogicalDisk", "F:"),
+                "DiskPartition",
+                "DiskPartitionLogicalDiskRelationship",
+            ],
+        )
+
+    def test_detaches_board_once_its_disk_is_removed(self):
+        self.board.plug(self.source)
+        self.tracker.scan()
+
+        changes = [self.tracker.update(event) for event in self.board.unplug(self.source)]
+
+        self.assertEqual(changes, [{self.board.serial_number: None}] + [{}] * 4)
+        self.assertEqual(self.source.loads, ["system data"])
+
+    def test_reattaches_board_when_plugged_in_again(self):
+        self.tracker.scan()
+        for event in self.board.plug(self.source) + self.board.unplug(self.source):
+            self.tracker.update(event)
+
+        changes = [self.tracker.update(event) for event in self.board.plug(self.source)]
+
+        self.assertEqual(changes[-1], {self.board.serial_number: self.board.candidate})
+
+    def test_events_not_identifying_a_component_lead_to_a_full_scan(self):
+        self.tracker.scan()
+        self.board.plug(self.source)
+        self.connected_board.unplug(self.source)
+
+        changes = self.tracker.update(HotplugEvent("poll", ""))
+
+        self.assertEqual(
+            changes, {self.connected_board.serial_number: None, self.board.serial_number: self.board.candidate}
+        )
+        self.assertEqual(self.source.loads, ["system data", "system data"])
+
+    def test_scans_on_first_event(self):
+        self.board.plug(self.source)
+
+        changes = self.tracker.update(HotplugEvent("remove", "Win32_LogicalDisk", "G:"))
+
+        self.assertEqual(
+            changes,
+            {
+                self.connected_board.serial_number: self.connected_board.candidate,
+                self.board.serial_number: self.board.candidate,
+            },
+        )
+
+    def test_updates_wait_for_scans_in_progress(self):
+        self.tracker.scan()
+        loading = threading.Event()
+        release = threading.Event()
+        load_system_data = self.source.load_system_data
+
+        def load_system_data_once_released():
+            loading.set()
+            release.wait(timeout=5)
+            return load_system_data()
+
+        self.source.load_system_data = load_system_data_once_released
+        scanning = threading.Thread(target=self.tracker.scan)
+        scanning.start()
+        self.assertTrue(loading.wait(timeout=5))
+        events = self.board.plug(self.source)
+        changes = []
+        updating = threading.Thread(target=lambda: changes.extend(self.tracker.update(e) for e in events))
+        updating.start()
+        updating.join(timeout=0.2)
+        self.assertTrue(updating.is_alive())
+
+        release.set()
+        scanning.join(timeout=5)
+        updating.join(timeout=5)
+
+        self.assertEqual(changes, [{}] * 5)
+        self.assertCountEqual(self.tracker.scan(), [self.connected_board.candidate, self.board.candidate])
@@ -0,0 +1,83 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+from unittest import TestCase
+
+from mbed_devices._internal.windows.device_instance_id import (
+    PARENT_ID_PREFIX_VALUE_NAME,
+    ParentIdPrefixCache,
+    RegistryReader,
+    get_shared_parent_id_prefix_cache,
+)
+
+DAPLINK = "USB\\VID_0D28&PID_0204\\0240000034544E45001A00018AA900292011000097969900"
+DAPLINK_INTERFACE = "USB\\VID_0D28&PID_0204&MI_00\\0240000034544E45001A00018AA900292011000097969900"
+STLINK = "USB\\VID_0483&PID_374B\\0670FF303931594E43184021"
+UNREADABLE = "USB\\VID_1366&PID_1015\\000440112138"
+
+
+class FakeRegistryReader(RegistryReader):
+    def __init__(self):
+        self.values = {DAPLINK: "8&2f125ec6&0", DAPLINK_INTERFACE: None, STLINK: "8&2ae96f5b&0"}
+        self.reads = []
+
+    def read_values(self, pnp_ids, value_name):
+        pnp_ids = list(pnp_ids)
+        self.reads.append((pnp_ids, value_name))
+        return {pnp_id: self.values[pnp_id] for pnp_id in pnp_ids if pnp_id in self.values}
+
+
+class TestParentIdPrefixCache(TestCase):
+    def setUp(self):
+        self.registry_reader = FakeRegistryReader()
+        self.cache = ParentIdPrefixCache(self.registry_reader)
+
+    def test_reads_values_of_all_the_devices_in_one_go(self):
+        self.cache.refresh([DAPLINK, DAPLINK_INTERFACE, STLINK])
+
+        self.assertEqual(self.registry_reader.reads, [([DAPLINK, DAPLINK_INTERFACE, STLINK], "ParentIdPrefix")])
+        self.assertEqual(self.cache.get(DAPLINK), "8&2f125ec6&0")
+        self.assertIsNone(self.cache.get(DAPLINK_INTERFACE))
+        self.assertEqual(self.cache.get(STLINK), "8&2ae96f5b&0")
+
+    def test_only_reads_values_of_new_devices(self):
+        self.cache.refresh([DAPLINK, DAPLINK_INTERFACE])
+        self.registry_reader.values[DAPLINK] = "changed"
+
+        self.cache.refresh([DAPLINK, DAPLINK_INTERFACE, STLINK])
+        self.cache.refresh([DAPLINK, DAPLINK_INTERFACE, STLINK])
+
+        self.assertEqual(
+            self.registry_reader.reads,
+            [([DAPLINK, DAPLINK_INTERFACE], PARENT_ID_PREFIX_VALUE_NAME), ([STLINK], PARENT_ID_PREFIX_VALUE_NAME)],
+        )
+        self.assertEqual(self.cache.get(DAPLINK), "8&2f125ec6&0")
+
+    def test_discards_values_of_devices_no_longer_present(self):
+        self.cache.refresh([DAPLINK, STLINK])
+        self.registry_reader.values[DAPLINK] = "8&12345678&0"
+
+        self.cache.refresh([STLINK])
+        self.assertIsNone(self.cache.get(DAPLINK))
+        self.assertEqual(len(self.cache), 1)
+
+        self.cache.refresh([DAPLINK, STLINK])
+        self.assertEqual(self.cache.get(DAPLINK), "8&12345678&0")
+
+    def test_reads_devices_whose_key_could_not_be_opened_again(self):
+        self.cache.refresh([UNREADABLE])
+        self.cache.refresh([UNREADABLE])
+
+        self.assertEqual(len(self.registry_reader.reads), 2)
+        self.assertIsNone(self.cache.get(UNREADABLE))
+
+    def test_does_not_read_the_registry_without_new_devices(self):
+        self.cache.refresh([])
+
+        self.assertEqual(self.registry_reader.reads, [])
+
+
+class TestGetSharedParentIdPrefixCache(TestCase):
+    def test_returns_the_same_cache(self):
+        self.assertIs(get_shared_parent_id_prefix_cache(), get_shared_parent_id_prefix_cache())
@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 import unittest
+from unittest import mock
 from tests.markers import windows_only
 
 
@@ -208,3 +209,114 @@ class TestDiskDataAggregrator(unittest.TestCase):
         self.assertIsNotNone(uid)
         labels = [d.label.lower() for d in disks.get_disk_information(uid)]
         self.assertTrue("c:" in labels)
+
+
+def make_component(cls, **values):
+    component = cls()
+    component.set_data_values(values)
+    return component
+
+
+class DiskTopology:
+    """A USB disk drive F:, an internal drive C: and a network drive Z:."""
+
+    def __init__(self):
+        from mbed_devices._internal.windows.disk_drive import DiskDrive
+        from mbed_devices._internal.windows.disk_partition import DiskPartition
+        from mbed_devices._internal.windows.disk_partition_logical_disk_relationships import (
+            DiskPartitionLogicalDiskRelationship,
+        )
+        from mbed_devices._internal.windows.logical_disk import LogicalDisk
+
+        # Only disk drives connected through USB are loaded.
+        self.disk_drives = [
+            make_component(
+                DiskDrive,
+                Index=1,
+                InterfaceType="USB",
+                PNPDeviceID="USBSTOR\\DISK&VEN_MBED&PROD_VFS&REV_0.1\\4454646",
+                SerialNumber="0240000034544e45001a00018aa900292011000097969900",
+            )
+        ]
+        self.partitions = [
+            make_component(DiskPartition, DeviceID="Disk #0, Partition #1", DiskIndex=0, Type="GPT: Basic Data"),
+            make_component(DiskPartition, DeviceID="Disk #1, Partition #0", DiskIndex=1, Type="16-bit FAT"),
+        ]
+        self.relationships = [
+            make_component(
+                DiskPartitionLogicalDiskRelationship,
+                Antecedent='\\\\HOST\\root\\cimv2:Win32_DiskPartition.DeviceID="Disk #0, Partition #1"',
+                Dependent='\\\\HOST\\root\\cimv2:Win32_LogicalDisk.DeviceID="C:"',
+            ),
+            make_component(
+                DiskPartitionLogicalDiskRelationship,
+                Antecedent='\\\\HOST\\root\\cimv2:Win32_DiskPartition.DeviceID="Disk #1, Partition #0"',
+                Dependent='\\\\HOST\\root\\cimv2:Win32_LogicalDisk.DeviceID="F:"',
+            ),
+        ]
+        self.logical_disks = [
+            make_component(LogicalDisk, DeviceID="C:", Description="Local Fixed Disk"),
+            make_component(LogicalDisk, DeviceID="F:", Description="Removable Disk"),
+            make_component(LogicalDisk, DeviceID="Z:", Description="Network Connection"),
+        ]
+
+    def make_data_loader(self):
+        from mbed_devices._internal.windows.disk_drive import DiskDrive
+        from mbed_devices._internal.windows.disk_partition import DiskPartition
+        from mbed_devices._internal.windows.disk_partition_logical_disk_relationships import (
+            DiskPartitionLogicalDiskRelationship,
+        )
+        from mbed_devices._internal.windows.logical_disk import LogicalDisk
+        from mbed_devices._internal.windows.system_data_loader import SystemDataLoader
+
+        data_loader = SystemDataLoader()
+        data_loader._system_data = {
+            DiskDrive: self.disk_drives,
+            DiskPartition: self.partitions,
+            DiskPartitionLogicalDiskRelationship: self.relationships,
+            LogicalDisk: self.logical_disks,
+        }
+        return data_loader
+
+
+class TestVolumeQueries(unittest.TestCase):
+    def test_only_looks_up_volumes_of_usb_disks(self):
+        from mbed_devices._internal.windows.disk_aggregation import DiskDataAggregator
+        from mbed_devices._internal.windows.volume_set import UNKNOWN_VOLUME_INFORMATION
+
+        topology = DiskTopology()
+        lookup_volume_information = mock.Mock(return_value="F: volume information")
+        aggregator = DiskDataAggregator(
+            physical_disks={d.get("Index"): d for d in topology.disk_drives},
+            partition_disks={p.component_id: p for p in topology.partitions},
+            logical_partition_relationships={"C:": "Disk #0, Partition #1", "F:": "Disk #1, Partition #0"},
+            lookup_volume_information=lookup_volume_information,
+        )
+
+        volumes_information = {
+            ld.component_id: aggregator.aggregate(ld).get("volume_information") for ld in topology.logical_disks
+        }
+
+        lookup_volume_information.assert_called_once_with(topology.logical_disks[1])
+        self.assertEqual(
+            volumes_information,
+            {"C:": UNKNOWN_VOLUME_INFORMATION, "F:": "F: volume information", "Z:": UNKNOWN_VOLUME_INFORMATION},
+        )
+
+    @mock.patch("mbed_devices._internal.windows.disk_aggregation.get_volumes_information")
+    def test_system_disk_information_only_queries_volumes_of_usb_disks(self, get_volumes_information):
+        from mbed_devices._internal.windows.disk_aggregation import SystemDiskInformation
+
+        queried_volumes = []
+
+        def get_information(volumes):
+            queried_volumes.extend(volumes)
+            return {volume: f"{volume} information" for volume in queried_volumes}
+
+        get_volumes_information.side_effect = get_information
+
+        disks = SystemDiskInformation(DiskTopology().make_data_loader())
+
+        self.assertEqual(disks.get_disk_information_by_label("f:").get("volume_information"), "F: information")
+        self.assertEqual(queried_volumes, ["F:"])
+        self.assertEqual(set(disks.disk_data_by_label), {"C:", "F:", "Z:"})
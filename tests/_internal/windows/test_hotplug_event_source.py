@@ -0,0 +1,85 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+from types import SimpleNamespace
+from unittest import TestCase
+
+from mbed_devices._internal.hotplug import HotplugEvent
+from mbed_devices._internal.windows.hotplug_event_source import (
+    WBEM_E_TIMED_OUT,
+    WmiEventSource,
+    _is_timeout,
+    to_hotplug_event,
+)
+
+
+def make_wmi_event(event_class, target_class, **fields):
+    return SimpleNamespace(
+        Path_=SimpleNamespace(Class=event_class),
+        TargetInstance=SimpleNamespace(Path_=SimpleNamespace(Class=target_class), **fields),
+    )
+
+
+class TestToHotplugEvent(TestCase):
+    def test_converts_pnp_entity_creations(self):
+        pnp_id = "USB\\VID_0D28&PID_0204\\0240000034544E45001A00018AA900292011000097969900"
+        wmi_event = make_wmi_event("__InstanceCreationEvent", "Win32_PnPEntity", PNPDeviceID=pnp_id)
+
+        self.assertEqual(to_hotplug_event(wmi_event), HotplugEvent("add", "Win32_PnPEntity", pnp_id))
+
+    def test_converts_logical_disk_deletions(self):
+        wmi_event = make_wmi_event("__InstanceDeletionEvent", "Win32_LogicalDisk", DeviceID="F:")
+
+        self.assertEqual(to_hotplug_event(wmi_event), HotplugEvent("remove", "Win32_LogicalDisk", "F:"))
+
+    def test_ignores_other_events(self):
+        self.assertIsNone(to_hotplug_event(make_wmi_event("__InstanceModificationEvent", "Win32_LogicalDisk")))
+        self.assertIsNone(to_hotplug_event(make_wmi_event("__InstanceCreationEvent", "Win32_Process")))
+
+
+class TestWmiEventSource(TestCase):
+    def test_yields_events_until_closed(self):
+        wmi_events = [
+            make_wmi_event("__InstanceCreationEvent", "Win32_LogicalDisk", DeviceID="E:"),
+            None,
+            make_wmi_event("__InstanceCreationEvent", "Win32_Process"),
+            make_wmi_event("__InstanceDeletionEvent", "Win32_LogicalDisk", DeviceID="E:"),
+        ]
+        subscriptions = []
+
+        def subscribe():
+            subscriptions.append(True)
+            return lambda timeout: wmi_events.pop(0) if wmi_events else source.close()
+
+        source = WmiEventSource(subscribe=subscribe)
+
+        self.assertEqual(
+            list(source),
+            [HotplugEvent("add", "Win32_LogicalDisk", "E:"), HotplugEvent("remove", "Win32_LogicalDisk", "E:")],
+        )
+        self.assertEqual(subscriptions, [True])
+
+    def test_events_are_subscribed_to_when_opened(self):
+        subscriptions = []
+
+        def subscribe():
+            subscriptions.append(True)
+            return lambda timeout: source.close()
+
+        source = WmiEventSource(subscribe=subscribe)
+        source.open()
+        self.assertEqual(subscriptions, [True])
+
+        self.assertEqual(list(source), [])
+        self.assertEqual(subscriptions, [True])
+
+
+class TestIsTimeout(TestCase):
+    def test_timeouts_are_reported_in_the_exception_information(self):
+        error = SimpleNamespace(hresult=-2147352567, excepinfo=(0, None, None, None, 0, WBEM_E_TIMED_OUT - 2 ** 32))
+
+        self.assertTrue(_is_timeout(error))
+
+    def test_other_errors_are_not_timeouts(self):
+        self.assertFalse(_is_timeout(SimpleNamespace(hresult=-2147352567, excepinfo=None)))
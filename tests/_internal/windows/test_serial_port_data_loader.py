@@ -0,0 +1,20 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+from unittest import TestCase, mock
+
+from mbed_devices._internal.windows.serial_port_data_loader import SystemSerialPortInformation
+from mbed_devices._internal.windows.usb_device_identifier import parse_device_id
+
+
+class TestSystemSerialPortInformation(TestCase):
+    @mock.patch("mbed_devices._internal.windows.serial_port_data_loader.ComponentsLoader", autospec=True)
+    def test_does_not_query_again_a_system_without_serial_ports(self, ComponentsLoader):
+        ComponentsLoader.return_value.element_generator.side_effect = lambda: iter([])
+        information = SystemSerialPortInformation(mock.Mock())
+        usb_id = parse_device_id("USB\\VID_0483&PID_374B\\0670FF303931594E43184021")
+
+        self.assertEqual(information.serial_port_data_by_id, {})
+        self.assertEqual(information.get_serial_port_information(usb_id), [])
+        ComponentsLoader.return_value.element_generator.assert_called_once_with()
@@ -3,7 +3,8 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 import unittest
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 
 from tests.markers import windows_only
 
@@ -14,7 +15,7 @@ class TestSystemDataLoader(unittest.TestCase):
     def test_system_data_load(self, load_all):
         from mbed_devices._internal.windows.system_data_loader import SystemDataLoader, SYSTEM_DATA_TYPES
 
-        def mock_system_element_fetcher(arg):
+        def mock_system_element_fetcher(arg, win32_wrapper=None):
             return (arg, list())
 
         load_all.side_effect = mock_system_element_fetcher
@@ -24,3 +25,118 @@ class TestSystemDataLoader(unittest.TestCase):
             self.assertIsNotNone(loader.get_system_data(type))
             self.assertTrue(isinstance(loader.get_system_data(type), list))
         load_all.assert_called()
+
+
+class FakeWmi:
+    """Stands in for the WMI service, listing a single instance of each class queried."""
+
+    def ExecQuery(self, query, language, flags):
+        win32_class_name = query.split(" from ")[1].split()[0]
+        return [SimpleNamespace(DeviceID=f"{win32_class_name}-1")]
+
+
+class TestSystemDataLoaderWithFakeWmi(unittest.TestCase):
+    def test_loads_system_data_with_connections_of_the_pool(self):
+        from mbed_devices._internal.windows.system_data_loader import SystemDataLoader, SYSTEM_DATA_TYPES
+        from mbed_devices._internal.windows.wmi_connection_pool import WmiConnectionPool
+        from mbed_devices._internal.windows.usb_hub import UsbHub
+
+        connect = Mock(side_effect=FakeWmi)
+        with WmiConnectionPool(max_workers=2, connect=connect, disconnect=Mock()) as pool:
+            for _ in range(3):
+                loader = SystemDataLoader(connection_pool=pool)
+                for type in SYSTEM_DATA_TYPES:
+                    self.assertEqual(len(loader.get_system_data(type)), 1)
+
+        self.assertEqual(loader.get_system_data(UsbHub)[0].component_id, "Win32_USBHub-1")
+        self.assertLessEqual(connect.call_count, 2)
+
+    def test_counts_com_property_reads_of_the_scan(self):
+        from mbed_devices._internal.windows.system_data_loader import SystemDataLoader, SYSTEM_DATA_TYPES
+        from mbed_devices._internal.windows.wmi_connection_pool import WmiConnectionPool
+
+        with WmiConnectionPool(max_workers=2, connect=FakeWmi, disconnect=Mock()) as pool:
+            loaders = [SystemDataLoader(connection_pool=pool) for _ in range(2)]
+            for loader in loaders:
+                loader.get_system_data(SYSTEM_DATA_TYPES[0])
+
+        # A single element of each type is listed, of which only the queried fields are read.
+        expected_reads = sum(len(cls().queried_field_names) for cls in SYSTEM_DATA_TYPES)
+        self.assertEqual([loader.property_reads for loader in loaders], [expected_reads, expected_reads])
+
+
+class CountingWmi:
+    """Stands in for the WMI service, recording the classes queried and listing the instances given for each."""
+
+    def __init__(self, instances=None):
+        self.queried_classes = []
+        self.instances = instances or {}
+
+    def ExecQuery(self, query, language, flags):
+        win32_class_name = query.split(" from ")[1].split()[0]
+        self.queried_classes.append(win32_class_name)
+        return list(self.instances.get(win32_class_name, []))
+
+
+class TestSystemDataLoaderRefresh(unittest.TestCase):
+    def setUp(self):
+        from mbed_devices._internal.windows.wmi_connection_pool import WmiConnectionPool
+
+        self.wmi = CountingWmi()
+        self.pool = WmiConnectionPool(max_workers=1, connect=lambda: self.wmi, disconnect=Mock())
+        self.addCleanup(self.pool.shutdown)
+        self.now = 0.0
+
+    def make_loader(self, ttl=None):
+        from mbed_devices._internal.windows.system_data_loader import SystemDataLoader
+
+        return SystemDataLoader(connection_pool=self.pool, ttl=ttl, clock=lambda: self.now)
+
+    def test_empty_results_are_kept(self):
+        from mbed_devices._internal.windows.system_data_loader import SYSTEM_DATA_TYPES
+
+        loader = self.make_loader()
+        for _ in range(3):
+            for cls in SYSTEM_DATA_TYPES:
+                self.assertEqual(loader.get_system_data(cls), [])
+
+        self.assertEqual(len(self.wmi.queried_classes), len(SYSTEM_DATA_TYPES))
+        self.assertEqual((loader.generation, loader.queries), (1, len(SYSTEM_DATA_TYPES)))
+
+    def test_data_is_loaded_again_once_out_of_date(self):
+        from mbed_devices._internal.windows.system_data_loader import SYSTEM_DATA_TYPES
+
+        loader = self.make_loader(ttl=1.0)
+        loader.system_data
+        self.now = 0.5
+        loader.system_data
+        self.assertEqual(loader.generation, 1)
+
+        self.now = 1.0
+        loader.system_data
+
+        self.assertEqual(loader.generation, 2)
+        self.assertEqual(len(self.wmi.queried_classes), 2 * len(SYSTEM_DATA_TYPES))
+
+    def test_refreshes_only_given_types(self):
+        from mbed_devices._internal.windows.logical_disk import LogicalDisk
+        from mbed_devices._internal.windows.usb_hub import UsbHub
+
+        loader = self.make_loader(ttl=1.0)
+        usb_hubs = loader.get_system_data(UsbHub)
+        self.wmi.queried_classes.clear()
+        self.wmi.instances["CIM_LogicalDisk"] = [SimpleNamespace(DeviceID="F:")]
+
+        self.now = 0.5
+        loader.refresh(LogicalDisk)
+
+        self.assertEqual([disk.component_id for disk in loader.get_system_data(LogicalDisk)], ["F:"])
+        self.assertIs(loader.get_system_data(UsbHub), usb_hubs)
+        self.assertEqual(self.wmi.queried_classes, ["CIM_LogicalDisk"])
+        self.assertEqual((loader.generation, loader.queries), (2, 1))
+
+        # Only the types loaded earlier are out of date.
+        self.now = 1.0
+        loader.system_data
+        self.assertNotIn("CIM_LogicalDisk", self.wmi.queried_classes[1:])
+        self.assertEqual(loader.queries, len(self.wmi.queried_classes[1:]))
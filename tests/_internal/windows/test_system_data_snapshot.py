@@ -0,0 +1,107 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import pathlib
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase, mock
+
+from mbed_devices._internal.windows.device_detector import WindowsDeviceDetector
+from mbed_devices._internal.windows.disk_drive import DiskDrive
+from mbed_devices._internal.windows.system_data_loader import SYSTEM_DATA_TYPES
+from mbed_devices._internal.windows.system_data_snapshot import (
+    RecordingSystemDataLoader,
+    ReplayingSystemDataLoader,
+    SystemDataSnapshot,
+    from_json,
+    load_snapshot,
+    save_snapshot,
+    to_json,
+)
+from mbed_devices._internal.windows.usb_data_aggregation import SystemUsbData
+from mbed_devices._internal.windows.usb_hub import UsbHub
+from mbed_devices._internal.windows.wmi_connection_pool import WmiConnectionPool
+from tests._internal.windows.test_candidate_tracker import Board, FakeComponentSource
+from tests._internal.windows.test_usb_hub_data_loader import FakeRegistryReader
+
+
+def make_board_snapshot():
+    source = FakeComponentSource()
+    board = Board("0240000034544E45001A00018AA900292011000097969900", "8&2f125ec6&0", 1, "F:", "COM5")
+    board.plug(source)
+    return board, SystemDataSnapshot(source.components, source.parent_id_prefixes)
+
+
+class TestSystemDataSnapshot(TestCase):
+    def test_saved_snapshot_loads_identical_components(self):
+        _, snapshot = make_board_snapshot()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory, "snapshot.json")
+            save_snapshot(snapshot, path)
+            loaded = load_snapshot(path)
+
+        self.assertEqual(loaded.parent_id_prefixes, snapshot.parent_id_prefixes)
+        self.assertEqual(set(loaded.system_data), set(SYSTEM_DATA_TYPES))
+        for cls in SYSTEM_DATA_TYPES:
+            with self.subTest(cls.__name__):
+                self.assertEqual(
+                    [c.to_tuple() for c in loaded.system_data[cls]], [c.to_tuple() for c in snapshot.system_data[cls]]
+                )
+        self.assertEqual(loaded.system_data[DiskDrive][0].get("Index"), 1)
+
+    def test_only_fields_set_are_recorded(self):
+        hub = UsbHub()
+        hub.set_data_values({"PNPDeviceID": "USB\\ROOT_HUB30\\4&38EF038C&0&0"})
+
+        values = to_json(SystemDataSnapshot({UsbHub: [hub]}, {}))
+
+        self.assertEqual(values["components"], {"UsbHub": [{"PNPDeviceID": "USB\\ROOT_HUB30\\4&38EF038C&0&0"}]})
+
+    def test_rejects_unsupported_snapshots(self):
+        with self.assertRaises(ValueError):
+            from_json({"version": 0})
+        with self.assertRaises(ValueError):
+            from_json({"version": 1, "components": {"Win32_Process": []}})
+
+
+@mock.patch("mbed_devices._internal.windows.disk_aggregation.get_volumes_information", mock.Mock(return_value={}))
+class TestReplayingSystemDataLoader(TestCase):
+    def test_aggregates_devices_of_snapshot(self):
+        board, snapshot = make_board_snapshot()
+        loader = ReplayingSystemDataLoader(from_json(to_json(snapshot)))
+
+        usb_devices = SystemUsbData(loader, loader.parent_id_prefix_cache).all()
+
+        self.assertEqual(
+            [WindowsDeviceDetector.map_to_candidate(usb) for usb in usb_devices if usb.is_composite], [board.candidate]
+        )
+
+
+class FakeWmi:
+    """Stands in for the WMI service, listing a single PnP entity of each class queried."""
+
+    def ExecQuery(self, query, language, flags):
+        win32_class_name = query.split(" from ")[1].split()[0]
+        return [SimpleNamespace(DeviceID=f"{win32_class_name}-1", PNPDeviceID=f"{win32_class_name}-1")]
+
+
+class TestRecordingSystemDataLoader(TestCase):
+    def test_records_system_data_and_parent_id_prefixes(self):
+        registry_reader = FakeRegistryReader({"Win32_USBHub-1": "8&2f125ec6&0"})
+
+        pool = WmiConnectionPool(max_workers=2, connect=FakeWmi, disconnect=mock.Mock())
+        with tempfile.TemporaryDirectory() as directory, pool:
+            path = pathlib.Path(directory, "snapshot.json")
+            loader = RecordingSystemDataLoader(path, connection_pool=pool, registry_reader=registry_reader)
+            recorded = loader.get_system_data(UsbHub)
+            replayed = ReplayingSystemDataLoader.from_file(path)
+
+            self.assertEqual(
+                [c.to_tuple() for c in replayed.get_system_data(UsbHub)], [c.to_tuple() for c in recorded]
+            )
+        parent_id_prefix_cache = replayed.parent_id_prefix_cache
+        parent_id_prefix_cache.refresh([hub.pnp_id for hub in replayed.get_system_data(UsbHub)])
+        self.assertEqual(parent_id_prefix_cache.get("Win32_USBHub-1"), "8&2f125ec6&0")
+        self.assertEqual(registry_reader.reads, [["Win32_USBHub-1"]])
@@ -0,0 +1,72 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+from unittest import TestCase
+
+from mbed_devices._internal.windows.uid_canonicaliser import (
+    UidCanonicaliser,
+    UidKey,
+    get_instance_id_key,
+    get_serial_number_key,
+    get_variant_keys,
+)
+from mbed_devices._internal.windows.usb_device_identifier import parse_device_id
+
+STLINK = parse_device_id("USB\\VID_0483&PID_374B\\0670FF303931594E43184021", serial_number="8&2ae96f5b&0")
+STLINK_INTERFACE = parse_device_id("USB\\VID_0483&PID_374B&MI_01\\8&2AE96F5B&0&0001", serial_number="9&4a48a72&0")
+STLINK_WITHOUT_PARENT_ID_PREFIX = parse_device_id("USB\\VID_0483&PID_374B\\0670FF303931594E43184021")
+HUB_PORT_3 = parse_device_id("USB\\VID_2109&PID_2812\\6&38E4CCB6&0&3", serial_number="7&3885ae75&0")
+HUB_PORT_4 = parse_device_id("USB\\VID_2109&PID_2812\\6&38E4CCB6&0&4", serial_number="7&25cbfdd0&0")
+DEVICE_ON_SAME_HUB = parse_device_id("USB\\VID_1FD2&PID_5003\\6&38E4CCB6&0&10", serial_number="7&1f9e0013&0")
+
+
+class TestKeys(TestCase):
+    def test_instance_id_key_of_device_with_serial_number_is_its_parent_id_prefix(self):
+        self.assertEqual(get_instance_id_key(STLINK), UidKey("8&2ae96f5b&0", "0483", "374B"))
+
+    def test_instance_id_key_of_interface_is_its_parent_id_prefix(self):
+        self.assertEqual(get_instance_id_key(STLINK_INTERFACE), UidKey("8&2ae96f5b&0", "0483", "374B"))
+
+    def test_serial_number_key(self):
+        self.assertEqual(get_serial_number_key(STLINK), UidKey("0670ff303931594e43184021", "0483", "374B"))
+        self.assertIsNone(get_serial_number_key(STLINK_INTERFACE))
+
+    def test_variant_keys(self):
+        self.assertEqual(get_variant_keys(STLINK), (get_instance_id_key(STLINK), get_serial_number_key(STLINK)))
+        self.assertEqual(get_variant_keys(STLINK_INTERFACE), (get_instance_id_key(STLINK_INTERFACE),))
+
+
+class TestUidCanonicaliser(TestCase):
+    def test_maps_all_variants_of_a_device_to_the_first_key_added(self):
+        canonicaliser = UidCanonicaliser()
+
+        key = canonicaliser.add(STLINK)
+
+        self.assertEqual(key, UidKey("8&2ae96f5b&0", "0483", "374B"))
+        self.assertEqual(canonicaliser.add(STLINK_INTERFACE), key)
+        self.assertEqual(canonicaliser.find(STLINK_WITHOUT_PARENT_ID_PREFIX), key)
+
+    def test_merges_devices_found_to_share_a_variant(self):
+        canonicaliser = UidCanonicaliser()
+        interface_key = canonicaliser.add(STLINK_INTERFACE)
+        canonicaliser.add(STLINK_WITHOUT_PARENT_ID_PREFIX)
+
+        canonicaliser.add(STLINK)
+
+        self.assertEqual(canonicaliser.find(STLINK_WITHOUT_PARENT_ID_PREFIX), interface_key)
+        self.assertEqual(canonicaliser.find(STLINK), interface_key)
+
+    def test_keeps_devices_sharing_a_hub_prefix_apart_by_product(self):
+        canonicaliser = UidCanonicaliser()
+
+        self.assertEqual(canonicaliser.add(HUB_PORT_3), canonicaliser.add(HUB_PORT_4))
+        self.assertNotEqual(canonicaliser.add(HUB_PORT_3), canonicaliser.add(DEVICE_ON_SAME_HUB))
+
+    def test_does_not_find_devices_not_added(self):
+        canonicaliser = UidCanonicaliser()
+        canonicaliser.add(HUB_PORT_3)
+
+        self.assertIsNone(canonicaliser.find(STLINK))
+        self.assertNotIn(STLINK, canonicaliser)
+        self.assertIn(HUB_PORT_4, canonicaliser)
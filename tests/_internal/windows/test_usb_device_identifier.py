@@ -6,10 +6,8 @@ from unittest import TestCase
 from mbed_devices._internal.windows.component_descriptor_utils import data_object_to_dict
 from mbed_devices._internal.windows.windows_identifier import WindowsUID
 from tests._internal.windows.test_windows_identifier import generateUID
-from tests.markers import windows_only
 
 
-@windows_only
 class TestUsbDeviceId(TestCase):
     """Tests based on https://docs.microsoft.com/en-us/windows-hardware/drivers/install/standard-usb-identifiers."""
 
@@ -120,3 +118,33 @@ class TestUsbDeviceId(TestCase):
         # Checks dictionary lookup
         self.assertIn(c, {c: ""})
         self.assertIn(a, {c: ""})
+
+
+class TestParseDeviceIdCache(TestCase):
+    def test_parses_each_device_id_once(self):
+        from mbed_devices._internal.windows.usb_device_identifier import parse_device_id
+
+        pnp_id = "USB\\VID_0D28&PID_0204&MI_01&REV_1000\\8&2F125EC6&0&0001"
+        parse_device_id.cache_clear()
+
+        usb_id = parse_device_id(pnp_id)
+
+        self.assertIs(parse_device_id(pnp_id), usb_id)
+        self.assertEqual((usb_id.VID, usb_id.PID, usb_id.MI, usb_id.REV), ("0D28", "0204", "01", "1000"))
+        self.assertEqual(parse_device_id.cache_info().hits, 1)
+
+    def test_identifiers_with_different_serial_numbers_are_parsed_separately(self):
+        from mbed_devices._internal.windows.usb_device_identifier import parse_device_id
+
+        pnp_id = "USB\\VID_1366&PID_1015\\000440112138"
+
+        self.assertIsNone(parse_device_id(pnp_id).uid.serial_number)
+        self.assertEqual(parse_device_id(pnp_id, "8&2f125ec6&0").uid.serial_number, "8&2f125ec6&0")
+
+    def test_number_of_identifiers_kept_is_bounded(self):
+        from mbed_devices._internal.windows.usb_device_identifier import (
+            PARSED_DEVICE_IDS_CACHE_SIZE,
+            parse_device_id,
+        )
+
+        self.assertEqual(parse_device_id.cache_info().maxsize, PARSED_DEVICE_IDS_CACHE_SIZE)
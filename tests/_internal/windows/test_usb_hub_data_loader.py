@@ -3,7 +3,7 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 import unittest
-from tests.markers import windows_only
+from mbed_devices._internal.windows.device_instance_id import ParentIdPrefixCache, RegistryReader
 from mbed_devices._internal.windows.windows_identifier import WindowsUID
 
 MOCKED_SERIAL_NUMBER_DATA = {
@@ -26,7 +26,21 @@ MOCKED_SERIAL_NUMBER_DATA = {
 }
 
 
-def generate_mocked_system_usb_device_information():
+class FakeRegistryReader(RegistryReader):
+    def __init__(self, values):
+        self.values = values
+        self.reads = []
+
+    def read_values(self, pnp_ids, value_name):
+        pnp_ids = list(pnp_ids)
+        self.reads.append(pnp_ids)
+        return {pnp_id: self.values[pnp_id] for pnp_id in pnp_ids if pnp_id in self.values}
+
+
+def generate_mocked_system_usb_device_information(parent_id_prefix_cache=None):
+    if parent_id_prefix_cache is None:
+        parent_id_prefix_cache = ParentIdPrefixCache(FakeRegistryReader(MOCKED_SERIAL_NUMBER_DATA))
+
     from mbed_devices._internal.windows.usb_hub_data_loader import SystemUsbDeviceInformation, UsbHub, UsbIdentifier
     from mbed_devices._internal.windows.system_data_loader import SystemDataLoader
 
@@ -99,7 +113,7 @@ def generate_mocked_system_usb_device_information():
 
     class MockedSystemUsbDeviceInformation(SystemUsbDeviceInformation):
         def __init__(self):
-            super().__init__(MockedDataLoader())
+            super().__init__(MockedDataLoader(), parent_id_prefix_cache)
 
         def _list_usb_controller_ids(self):
             return controllers
@@ -111,13 +125,9 @@ def generate_mocked_system_usb_device_information():
             for h in hubs:
                 yield h
 
-        def _determine_potential_serial_number(self, usb_device):
-            return MOCKED_SERIAL_NUMBER_DATA.get(usb_device.pnp_id)
-
     return MockedSystemUsbDeviceInformation()
 
 
-@windows_only
 class TestUsbHub(unittest.TestCase):
     def test_system_usb_ids_list(self):
         from mbed_devices._internal.windows.usb_hub_data_loader import UsbIdentifier
@@ -221,3 +231,47 @@ class TestUsbHub(unittest.TestCase):
         mock = generate_mocked_system_usb_device_information()
         self.assertIsNotNone(mock.get_usb_devices(known_usb))
         self.assertListEqual([h.component_id for h in mock.get_usb_devices(known_usb)], expected_related_interfaces)
+
+
+class TestUsbHubParentIdPrefixes(unittest.TestCase):
+    def test_reads_the_registry_in_one_go_and_keeps_values_across_scans(self):
+        registry_reader = FakeRegistryReader(MOCKED_SERIAL_NUMBER_DATA)
+        parent_id_prefix_cache = ParentIdPrefixCache(registry_reader)
+
+        first_scan = generate_mocked_system_usb_device_information(parent_id_prefix_cache).usb_device_ids()
+        second_scan = generate_mocked_system_usb_device_information(parent_id_prefix_cache).usb_device_ids()
+
+        # Only the keys which could not be read are read again.
+        self.assertEqual(len(registry_reader.reads), 2)
+        self.assertTrue(set(MOCKED_SERIAL_NUMBER_DATA).issubset(registry_reader.reads[0]))
+        self.assertFalse(set(MOCKED_SERIAL_NUMBER_DATA).intersection(registry_reader.reads[1]))
+        self.assertEqual(set(first_scan), set(second_scan))
+
+
+class TestUsbHubLoading(unittest.TestCase):
+    def test_does_not_query_again_a_system_without_usb_devices(self):
+        from mbed_devices._internal.windows.usb_hub_data_loader import SystemUsbDeviceInformation
+        from mbed_devices._internal.windows.system_data_loader import SystemDataLoader
+
+        class MockedDataLoader(SystemDataLoader):
+            def _load(self):
+                pass
+
+        queries = []
+
+        class EmptySystemUsbDeviceInformation(SystemUsbDeviceInformation):
+            def _list_usb_controller_ids(self):
+                return []
+
+            def _iterate_over_hubs(self):
+                queries.append(None)
+                return iter([])
+
+        information = EmptySystemUsbDeviceInformation(
+            MockedDataLoader(), ParentIdPrefixCache(FakeRegistryReader(MOCKED_SERIAL_NUMBER_DATA))
+        )
+
+        self.assertEqual(information.usb_devices, {})
+        self.assertEqual(information.usb_device_ids(), set())
+        self.assertIsNone(information.find_usb_device_id("USB\\VID_0483&PID_374B\\0670FF303931594E43184021"))
+        self.assertEqual(len(queries), 1)
@@ -0,0 +1,116 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import subprocess
+import sys
+import threading
+import time
+from unittest import TestCase, mock
+
+from mbed_devices._internal.windows.volume_set import (
+    UNKNOWN_VOLUME_INFORMATION,
+    DriveType,
+    VolumeInformation,
+    get_volume_information,
+    get_volumes_information,
+)
+
+DAPLINK_VOLUME_INFORMATION = VolumeInformation(
+    Name="DAPLINK",
+    SerialNumber=654449012,
+    MaxComponentLengthOfAFileName=255,
+    SysFlags=131590,
+    FileSystem="FAT",
+    UniqueName="\\\\?\\Volume{d0613192-49b4-11ea-99e5-c85b76dfd333}\\",
+    DriveType=DriveType.DRIVE_REMOVABLE,
+)
+
+
+def mock_win32():
+    win32 = mock.Mock()
+    win32.win32api.GetVolumeInformation.return_value = ("DAPLINK", 654449012, 255, 131590, "FAT")
+    win32.win32file.GetVolumeNameForVolumeMountPoint.return_value = DAPLINK_VOLUME_INFORMATION.UniqueName
+    win32.win32file.GetDriveType.return_value = 2
+    return mock.patch.dict(
+        sys.modules, {"win32": win32, "win32.win32api": win32.win32api, "win32.win32file": win32.win32file}
+    )
+
+
+class TestGetVolumeInformation(TestCase):
+    def test_queries_the_root_of_the_volume(self):
+        with mock_win32():
+            import win32
+
+            self.assertEqual(get_volume_information("F:"), DAPLINK_VOLUME_INFORMATION)
+
+        win32.win32api.GetVolumeInformation.assert_called_once_with("F:\\")
+
+    def test_unknown_values_when_queries_fail(self):
+        with mock_win32():
+            import win32
+
+            win32.win32api.GetVolumeInformation.side_effect = Exception("Device not ready")
+            win32.win32file.GetDriveType.side_effect = Exception("Device not ready")
+
+            information = get_volume_information("F:")
+
+        self.assertEqual(information.Name, "Unknown")
+        self.assertEqual(information.DriveType, DriveType.DRIVE_UNKNOWN)
+
+
+class TestGetVolumesInformation(TestCase):
+    def test_queries_volumes_concurrently(self):
+        all_running = threading.Barrier(3, timeout=5)
+
+        def get_information(volume):
+            all_running.wait()
+            return DAPLINK_VOLUME_INFORMATION._replace(Name=volume)
+
+        volumes_information = get_volumes_information(["E:", "F:", "G:"], get_information=get_information)
+
+        names = {volume: information.Name for volume, information in volumes_information.items()}
+        self.assertEqual(names, {"E:": "E:", "F:": "F:", "G:": "G:"})
+
+    def test_unknown_information_for_volumes_not_queried_in_time(self):
+        release = threading.Event()
+
+        def get_information(volume):
+            if volume == "F:":
+                release.wait(5)
+            return DAPLINK_VOLUME_INFORMATION
+
+        start = time.monotonic()
+        volumes_information = get_volumes_information(["E:", "F:"], timeout=0.1, get_information=get_information)
+        release.set()
+
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(volumes_information, {"E:": DAPLINK_VOLUME_INFORMATION, "F:": UNKNOWN_VOLUME_INFORMATION})
+
+    def test_hung_queries_do_not_prevent_the_interpreter_from_exiting(self):
+        script = (
+            "import time\n"
+            "from mbed_devices._internal.windows.volume_set import get_volumes_information\n"
+            "get_volumes_information(['E:'], timeout=0.1, get_information=lambda volume: time.sleep(30))\n"
+        )
+
+        start = time.monotonic()
+        subprocess.run(
+            [sys.executable, "-c", script], check=True, timeout=20, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_unknown_information_for_volumes_whose_query_failed(self):
+        def get_information(volume):
+            raise OSError("Device not ready")
+
+        volumes_information = get_volumes_information(["E:"], get_information=get_information)
+
+        self.assertEqual(volumes_information, {"E:": UNKNOWN_VOLUME_INFORMATION})
+
+    def test_does_not_query_without_volumes(self):
+        get_information = mock.Mock()
+
+        self.assertEqual(get_volumes_information([], get_information=get_information), {})
+        get_information.assert_not_called()
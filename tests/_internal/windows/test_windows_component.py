@@ -2,8 +2,9 @@
 # Copyright (C) 2020 Arm Mbed. All rights reserved.
 # SPDX-License-Identifier: Apache-2.0
 #
+from types import SimpleNamespace
 from typing import NamedTuple, Any
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from mbed_devices._internal.windows.component_descriptor_utils import is_undefined_data_object, is_undefined_value
 from tests._internal.windows.test_component_descriptor_utils import generate_undefined_values, generate_valid_values
@@ -23,6 +24,8 @@ def get_test_class():
     from mbed_devices._internal.windows.component_descriptor import ComponentDescriptor
 
     class AComponentForTest(ComponentDescriptor):
+        __slots__ = ()
+
         def __init__(self) -> None:
             """Initialiser."""
             super().__init__(ComponentDefinition, win32_class_name="Win32_ComputerSystem")
@@ -35,7 +38,6 @@ def get_test_class():
     return AComponentForTest
 
 
-@windows_only
 class TestComponentDescriptor(TestCase):
     def test_init(self):
         self.assertIsNotNone(get_test_class()())
@@ -67,6 +69,61 @@ class TestComponentDescriptor(TestCase):
         self.assertIsNotNone(a_defined_component.component_id)
         self.assertFalse(a_defined_component.is_undefined)
 
+    def test_descriptors_have_no_instance_dictionary(self):
+        from mbed_devices._internal.windows.system_data_loader import SYSTEM_DATA_TYPES
+
+        for cls in [get_test_class(), *SYSTEM_DATA_TYPES]:
+            with self.subTest(cls=cls):
+                self.assertFalse(hasattr(cls(), "__dict__"))
+
+    def test_values_are_set_once(self):
+        a_component = get_test_class()()
+        a_component.set_data_values({"field1": "a", "field6": 6})
+
+        self.assertEqual(a_component.field1, "a")
+        self.assertEqual(a_component.get("field6"), 6)
+        self.assertTrue(is_undefined_value(a_component.field2))
+        self.assertEqual(a_component.known_values, {"field1": "a", "field6": 6})
+
+    def test_only_queried_fields_are_held(self):
+        from mbed_devices._internal.windows.usb_hub import UsbHub
+
+        hub = UsbHub()
+        hub.set_data_values({"DeviceID": "USB\\ROOT_HUB30\\4&38EF038C&0&0"})
+
+        self.assertEqual(len(hub._values), len(hub.queried_field_names))
+        self.assertIs(hub._layout, UsbHub()._layout)
+        self.assertEqual(hub.PNPDeviceID, "Unknown")
+        self.assertEqual(hub.to_tuple().DeviceID, "USB\\ROOT_HUB30\\4&38EF038C&0&0")
+
+    def test_setting_fields_which_are_not_queried(self):
+        from mbed_devices._internal.windows.usb_hub import UsbHub
+
+        hub = UsbHub()
+        hub.set_data_values({"DeviceID": "USB\\ROOT_HUB30\\4&38EF038C&0&0"})
+        hub.set_data_values({"Status": "OK"})
+
+        self.assertEqual(hub.known_values, {"DeviceID": "USB\\ROOT_HUB30\\4&38EF038C&0&0", "Status": "OK"})
+        self.assertEqual(hub.queried_field_names, UsbHub().queried_field_names)
+
+    def test_is_undefined_is_reevaluated_when_values_are_set(self):
+        a_component = get_test_class()()
+        self.assertTrue(a_component.is_undefined)
+
+        a_component.set_data_values({"field1": "a"})
+
+        self.assertFalse(a_component.is_undefined)
+
+    def test_unknown_fields(self):
+        a_component = get_test_class()()
+
+        with self.assertRaises(ValueError):
+            a_component.set_data_values({"field7": "a"})
+        with self.assertRaises(AttributeError):
+            a_component.field7
+        self.assertTrue(is_undefined_value(a_component.get("field7")))
+
+    @windows_only
     def test_iterator(self):
         from mbed_devices._internal.windows.component_descriptor import ComponentDescriptorWrapper
 
@@ -76,3 +133,90 @@ class TestComponentDescriptor(TestCase):
         for element in generator:
             # The generator should be defined but none of the element should be defined as fields should not exist
             self.assertTrue(element.is_undefined)
+
+
+class TestBuildQuery(TestCase):
+    def test_selects_all_fields_without_filter(self):
+        from mbed_devices._internal.windows.component_descriptor import build_query
+
+        self.assertEqual(build_query("Win32_USBHub", [], []), "Select * from Win32_USBHub")
+
+    def test_selects_given_fields_satisfying_all_filters(self):
+        from mbed_devices._internal.windows.component_descriptor import build_query
+
+        self.assertEqual(
+            build_query("Win32_PnPEntity", ["DeviceID", "Caption"], ["ClassGuid='x'", "PNPDeviceID like 'USB%'"]),
+            "Select DeviceID, Caption from Win32_PnPEntity where (ClassGuid='x') and (PNPDeviceID like 'USB%')",
+        )
+
+
+class TestComponentQueries(TestCase):
+    def test_only_usb_disk_drives_are_queried(self):
+        from mbed_devices._internal.windows.disk_drive import DiskDrive
+
+        self.assertEqual(
+            DiskDrive().win32_query,
+            "Select Caption, DeviceID, Index, InterfaceType, Manufacturer, MediaType, Model, PNPDeviceID, "
+            "SerialNumber, Status from Win32_DiskDrive where InterfaceType='USB'",
+        )
+
+    def test_only_usb_serial_ports_are_queried(self):
+        from mbed_devices._internal.windows.serial_port import SerialPort
+
+        self.assertEqual(
+            SerialPort().win32_query,
+            "Select Caption, DeviceID, PNPDeviceID from Win32_PnPEntity "
+            "where (ClassGuid=\"{4d36e978-e325-11ce-bfc1-08002be10318}\") "
+            "and (PNPDeviceID like 'USB%' or PNPDeviceID like 'FTDIBUS%')",
+        )
+
+    def test_extra_filters_narrow_the_query(self):
+        from mbed_devices._internal.windows.component_descriptor import escape_wql_string
+        from mbed_devices._internal.windows.usb_hub import UsbHub
+
+        pnp_id = "USB\\VID_0D28&PID_0204\\0240000034544E45"
+        query = UsbHub().build_win32_query([f"PNPDeviceID = '{escape_wql_string(pnp_id)}'"])
+
+        self.assertEqual(
+            query,
+            "Select DeviceID, PNPDeviceID from Win32_USBHub "
+            "where PNPDeviceID = 'USB\\\\VID_0D28&PID_0204\\\\0240000034544E45'",
+        )
+
+    def test_escapes_quotes_in_wql_strings(self):
+        from mbed_devices._internal.windows.component_descriptor import escape_wql_string
+
+        self.assertEqual(escape_wql_string("it's"), "it\\'s")
+
+    def test_queried_fields_are_defined_by_components(self):
+        from mbed_devices._internal.windows.system_data_loader import SYSTEM_DATA_TYPES
+
+        for cls in SYSTEM_DATA_TYPES:
+            with self.subTest(cls=cls):
+                component = cls()
+                self.assertTrue(set(component.queried_field_names).issubset(component.field_names))
+                self.assertTrue(component.win32_query.startswith(f"Select {component.queried_field_names[0]}"))
+
+    def test_queries_all_fields_unless_specified(self):
+        component = get_test_class()()
+
+        self.assertEqual(component.queried_field_names, component.field_names)
+        self.assertEqual(
+            component.win32_query, "Select field1, field2, field3, field4, field5, field6 from Win32_ComputerSystem"
+        )
+
+
+class TestWin32Wrapper(TestCase):
+    def test_enumerates_query_results_forward_only_and_counts_property_reads(self):
+        from mbed_devices._internal.windows.component_descriptor import Win32Wrapper
+
+        wmi = mock.Mock()
+        wmi.ExecQuery.return_value = [SimpleNamespace(field1="a", field2="b")]
+        wrapper = Win32Wrapper(wmi)
+        component_class = get_test_class()
+
+        elements = list(wrapper.element_generator(component_class, "Select * from Win32_ComputerSystem"))
+
+        wmi.ExecQuery.assert_called_once_with("Select * from Win32_ComputerSystem", "WQL", 0x30)
+        self.assertEqual(elements[0].get("field1"), "a")
+        self.assertEqual(wrapper.property_reads, len(component_class().field_names))
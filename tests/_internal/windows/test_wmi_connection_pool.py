@@ -0,0 +1,148 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import subprocess
+import sys
+import threading
+from unittest import TestCase, mock
+
+from mbed_devices._internal.windows.wmi_connection_pool import (
+    WmiConnectionPool,
+    get_shared_connection_pool,
+    shutdown_shared_connection_pool,
+)
+
+
+def get_connection(win32_wrapper):
+    return threading.current_thread().name, win32_wrapper.wmi
+
+
+class TestWmiConnectionPool(TestCase):
+    def test_keeps_a_connection_per_thread_across_calls(self):
+        connect = mock.Mock(side_effect=object)
+
+        with WmiConnectionPool(max_workers=1, connect=connect, disconnect=mock.Mock()) as pool:
+            connections = [pool.submit(get_connection).result() for _ in range(5)]
+
+        connect.assert_called_once_with()
+        self.assertEqual(len(set(connections)), 1)
+
+    def test_connects_each_thread_once(self):
+        connect = mock.Mock(side_effect=object)
+        all_running = threading.Barrier(3, timeout=5)
+
+        def wait_for_other_calls(win32_wrapper):
+            all_running.wait()
+            return get_connection(win32_wrapper)
+
+        with WmiConnectionPool(max_workers=3, connect=connect, disconnect=mock.Mock()) as pool:
+            for _ in range(4):
+                connections = [future.result() for future in [pool.submit(wait_for_other_calls) for _ in range(3)]]
+                self.assertEqual(len(set(connections)), 3)
+
+        self.assertEqual(connect.call_count, 3)
+
+    def test_reports_connection_failures_and_connects_again_on_next_call(self):
+        wmi = object()
+        connect = mock.Mock(side_effect=[OSError("COM failure"), wmi])
+
+        with WmiConnectionPool(max_workers=1, connect=connect, disconnect=mock.Mock()) as pool:
+            with self.assertRaises(OSError):
+                pool.submit(get_connection).result()
+            self.assertEqual(pool.submit(get_connection).result()[1], wmi)
+
+    def test_disconnects_each_thread_when_shut_down(self):
+        disconnected_threads = []
+        all_running = threading.Barrier(2, timeout=5)
+
+        def wait_for_other_calls(win32_wrapper):
+            all_running.wait()
+            return get_connection(win32_wrapper)
+
+        def disconnect():
+            disconnected_threads.append(threading.current_thread().name)
+
+        pool = WmiConnectionPool(max_workers=2, connect=object, disconnect=disconnect)
+        connections = [future.result() for future in [pool.submit(wait_for_other_calls) for _ in range(2)]]
+        self.assertEqual(disconnected_threads, [])
+
+        pool.shutdown()
+
+        self.assertEqual(sorted(disconnected_threads), sorted(thread_name for thread_name, _ in connections))
+
+    def test_does_not_disconnect_threads_which_failed_to_connect(self):
+        disconnect = mock.Mock()
+
+        with WmiConnectionPool(max_workers=1, connect=mock.Mock(side_effect=OSError), disconnect=disconnect) as pool:
+            with self.assertRaises(OSError):
+                pool.submit(get_connection).result()
+
+        disconnect.assert_not_called()
+
+    def test_counts_idle_threads_once_calls_queued_while_all_threads_are_busy_are_complete(self):
+        all_running = threading.Barrier(3, timeout=5)
+
+        def wait_for_other_calls(win32_wrapper):
+            all_running.wait()
+
+        with WmiConnectionPool(max_workers=2, connect=object, disconnect=mock.Mock()) as pool:
+            futures = [pool.submit(wait_for_other_calls) for _ in range(2)]
+            queued_future = pool.submit(get_connection)
+            all_running.wait()
+            for future in [*futures, queued_future]:
+                future.result()
+
+            idle_threads = 0
+            while pool._idle_threads.acquire(timeout=0.1):
+                idle_threads += 1
+
+        self.assertEqual(idle_threads, 2)
+
+    def test_stops_waiting_for_threads_after_timeout(self):
+        release = threading.Event()
+        pool = WmiConnectionPool(max_workers=1, connect=object, disconnect=mock.Mock())
+        future = pool.submit(lambda win32_wrapper: release.wait(5))
+
+        pool.shutdown(timeout=0.1)
+
+        self.assertFalse(future.done())
+        release.set()
+        future.result()
+
+    def test_refuses_calls_once_shut_down(self):
+        pool = WmiConnectionPool(connect=object)
+        pool.shutdown()
+
+        with self.assertRaises(RuntimeError):
+            pool.submit(get_connection)
+
+
+class TestSharedConnectionPool(TestCase):
+    def tearDown(self):
+        shutdown_shared_connection_pool()
+
+    def test_shares_pool_until_shut_down(self):
+        pool = get_shared_connection_pool()
+        self.assertIs(get_shared_connection_pool(), pool)
+
+        shutdown_shared_connection_pool()
+
+        self.assertIsNot(get_shared_connection_pool(), pool)
+
+    def test_shuts_down_shared_pool_at_exit(self):
+        script = (
+            "from functools import partial\n"
+            "from unittest import mock\n"
+            "from mbed_devices._internal.windows import wmi_connection_pool\n"
+            "disconnect = partial(print, 'disconnected')\n"
+            "pool = partial(wmi_connection_pool.WmiConnectionPool, connect=object, disconnect=disconnect)\n"
+            "with mock.patch.object(wmi_connection_pool, 'WmiConnectionPool', pool):\n"
+            "    wmi_connection_pool.get_shared_connection_pool().submit(lambda win32_wrapper: None).result()\n"
+        )
+
+        completed = subprocess.run(
+            [sys.executable, "-c", script], check=True, timeout=20, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+
+        self.assertEqual(completed.stdout.decode().split(), ["disconnected"])
@@ -0,0 +1,19 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import pytest
+
+from mbed_devices._internal import board_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_board_cache(tmp_path, monkeypatch):
+    """Keeps the boards resolved by tests out of the user's board cache."""
+    path = tmp_path / "boards.sqlite3"
+    monkeypatch.setenv("MBED_DEVICES_BOARD_CACHE_PATH", str(path))
+    yield path
+    with board_cache._board_caches_lock:
+        cache = board_cache._board_caches.pop(path, None)
+    if cache is not None:
+        cache.close()
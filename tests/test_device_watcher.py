@@ -0,0 +1,245 @@
+#
+# Copyright (C) 2020 Arm Mbed. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+import pathlib
+import threading
+from unittest import TestCase, mock
+
+from mbed_targets.exceptions import MbedTargetsError
+
+from tests.factories import CandidateDeviceFactory
+from mbed_devices._internal.exceptions import NoBoardForCandidate
+from mbed_devices._internal.hotplug import CandidateTracker, HotplugEvent, HotplugEventSource
+from mbed_devices.device import Device
+from mbed_devices.device_watcher import DeviceWatcher
+from tests.test_mbed_devices import joined_resolutions
+
+
+class ScriptedEventSource(HotplugEventSource):
+    """Replays a list of events, calling `on_event` before yielding each one."""
+
+    def __init__(self, events, on_event):
+        self._events = events
+        self._on_event = on_event
+        self.opened = False
+        self.closed = False
+
+    def open(self):
+        self.opened = True
+
+    def __iter__(self):
+        for event in self._events:
+            self._on_event(event)
+            yield event
+
+    def close(self):
+        self.closed = True
+
+
+class ScriptedCandidateTracker(CandidateTracker):
+    """Reports the candidates connected at start, then the changes scripted for each event."""
+
+    def __init__(self, candidates, changes_at_each_event):
+        self._candidates = candidates
+        self._changes_at_each_event = changes_at_each_event
+
+    def scan(self):
+        return self._candidates
+
+    def update(self, event):
+        return self._changes_at_each_event[event]
+
+
+@mock.patch("mbed_devices.mbed_devices.get_board_cache", mock.Mock(return_value=None))
+@mock.patch("mbed_devices.mbed_devices.resolve_board")
+@mock.patch("mbed_devices.device_watcher.detect_candidate_devices")
+class TestDeviceWatcher(TestCase):
+    def setUp(self):
+        self.attached = []
+        self.detached = []
+        self.changed = []
+
+    def make_watcher(self, event_source):
+        return DeviceWatcher(
+            on_attached=self.attached.append,
+            on_detached=self.detached.append,
+            on_changed=self.changed.append,
+            event_source=event_source,
+        )
+
+    def test_tracks_devices_through_scripted_event_stream(self, detect_candidate_devices, resolve_board):
+        first = CandidateDeviceFactory(serial_number="0240000001")
+        second = CandidateDeviceFactory(serial_number="0240000002")
+        second_remounted = CandidateDeviceFactory(
+            serial_number="0240000002",
+            product_id=second.product_id,
+            vendor_id=second.vendor_id,
+            mount_points=[pathlib.Path("/media/user/DAPLINK1")],
+        )
+        connected_at_each_event = {
+            HotplugEvent("add", "block", "/dev/sdc"): [first, second],
+            HotplugEvent("change", "mount"): [first, second_remounted],
+            HotplugEvent("remove", "block", "/dev/sdb"): [second_remounted],
+        }
+        detect_candidate_devices.return_value = [first]
+
+        def on_event(event):
+            detect_candidate_devices.return_value = connected_at_each_event[event]
+
+        watcher = self.make_watcher(ScriptedEventSource(list(connected_at_each_event), on_event))
+        watcher.run()
+
+        board = resolve_board.return_value
+        self.assertEqual(self.attached, [Device.from_candidate(first, board), Device.from_candidate(second, board)])
+        self.assertEqual(self.changed, [Device.from_candidate(second_remounted, board)])
+        self.assertEqual(self.detached, [Device.from_candidate(first, board)])
+        self.assertEqual(watcher.devices, [Device.from_candidate(second_remounted, board)])
+        # Known devices are not looked up again
+        self.assertEqual(resolve_board.call_count, 2)
+
+    def test_applies_changes_reported_by_candidate_tracker(self, detect_candidate_devices, resolve_board):
+        first = CandidateDeviceFactory(serial_number="0240000001")
+        second = CandidateDeviceFactory(serial_number="0240000002")
+        first_remounted = CandidateDeviceFactory(
+            serial_number="0240000001",
+            product_id=first.product_id,
+            vendor_id=first.vendor_id,
+            mount_points=[pathlib.Path("G:")],
+        )
+        changes_at_each_event = {
+            HotplugEvent("add", "Win32_LogicalDisk", "F:"): {"0240000002": second},
+            HotplugEvent("add", "Win32_LogicalDisk", "G:"): {"0240000001": first_remounted},
+            HotplugEvent("remove", "Win32_LogicalDisk", "F:"): {"0240000002": None},
+            HotplugEvent("remove", "Win32_PnPEntity", "USB\\VID_0D28&PID_0204\\0240000002"): {},
+        }
+        tracker = ScriptedCandidateTracker([first], changes_at_each_event)
+
+        watcher = DeviceWatcher(
+            on_attached=self.attached.append,
+            on_detached=self.detached.append,
+            on_changed=self.changed.append,
+            event_source=ScriptedEventSource(list(changes_at_each_event), on_event=lambda event: None),
+            candidate_tracker=tracker,
+        )
+        watcher.run()
+
+        board = resolve_board.return_value
+        self.assertEqual(self.attached, [Device.from_candidate(first, board), Device.from_candidate(second, board)])
+        self.assertEqual(self.changed, [Device.from_candidate(first_remounted, board)])
+        self.assertEqual(self.detached, [Device.from_candidate(second, board)])
+        self.assertEqual(watcher.devices, [Device.from_candidate(first_remounted, board)])
+        detect_candidate_devices.assert_not_called()
+
+    def test_tracks_unidentified_devices(self, detect_candidate_devices, resolve_board):
+        candidate = CandidateDeviceFactory()
+        detect_candidate_devices.return_value = [candidate]
+        resolve_board.side_effect = NoBoardForCandidate
+
+        watcher = self.make_watcher(ScriptedEventSource([], on_event=None))
+        watcher.refresh()
+
+        self.assertEqual(self.attached, [Device.from_candidate(candidate)])
+
+    def test_retries_look_up_which_failed_on_next_refresh(self, detect_candidate_devices, resolve_board):
+        candidate = CandidateDeviceFactory()
+        detect_candidate_devices.return_value = [candidate]
+        resolve_board.side_effect = [MbedTargetsError, resolve_board.return_value]
+
+        watcher = self.make_watcher(ScriptedEventSource([], on_event=None))
+        watcher.refresh()
+        self.assertEqual(watcher.devices, [])
+
+        watcher.refresh()
+        self.assertEqual(watcher.devices, [Device.from_candidate(candidate, resolve_board.return_value)])
+        self.assertEqual(len(self.attached), 1)
+
+    def test_callbacks_can_query_the_watcher(self, detect_candidate_devices, resolve_board):
+        detect_candidate_devices.return_value = [CandidateDeviceFactory()]
+        seen = []
+        watcher = DeviceWatcher(
+            on_attached=lambda device: seen.append(watcher.devices), event_source=ScriptedEventSource([], None)
+        )
+
+        watcher.refresh()
+
+        self.assertEqual(seen, [watcher.devices])
+
+    def test_devices_can_be_read_while_boards_are_looked_up(self, detect_candidate_devices, resolve_board):
+        detect_candidate_devices.return_value = [CandidateDeviceFactory()]
+        read_devices = []
+
+        def read_devices_from_another_thread(candidate):
+            reader = threading.Thread(target=lambda: read_devices.append(watcher.devices))
+            reader.start()
+            reader.join(timeout=5)
+            return mock.sentinel.board
+
+        resolve_board.side_effect = read_devices_from_another_thread
+        watcher = self.make_watcher(ScriptedEventSource([], on_event=None))
+
+        watcher.refresh()
+
+        self.assertEqual(read_devices, [[]])
+        self.assertEqual(len(watcher.devices), 1)
+
+    @mock.patch.dict("os.environ", {"MBED_DEVICES_BOARD_RESOLUTION_TIMEOUT": "0.1"})
+    def test_tracks_devices_which_cannot_be_identified_in_time_as_unidentified(
+        self, detect_candidate_devices, resolve_board
+    ):
+        unresponsive, responsive = CandidateDeviceFactory.create_batch(2)
+        detect_candidate_devices.return_value = [unresponsive, responsive]
+        release = threading.Event()
+
+        def resolve(candidate):
+            if candidate is unresponsive:
+                release.wait(5)
+            return mock.sentinel.board
+
+        resolve_board.side_effect = resolve
+        watcher = self.make_watcher(ScriptedEventSource([], on_event=None))
+
+        with joined_resolutions(release), self.assertLogs(level="WARNING"):
+            watcher.refresh()
+            self.assertFalse(release.is_set())
+
+        self.assertEqual(
+            watcher.devices,
+            [Device.from_candidate(unresponsive), Device.from_candidate(responsive, mock.sentinel.board)],
+        )
+
+    def test_logs_callbacks_which_fail(self, detect_candidate_devices, resolve_board):
+        candidates = CandidateDeviceFactory.create_batch(2)
+        detect_candidate_devices.return_value = candidates
+        attached = []
+
+        def on_attached(device):
+            attached.append(device)
+            raise ValueError("Callback failed")
+
+        watcher = DeviceWatcher(on_attached=on_attached, event_source=ScriptedEventSource([], None))
+
+        with self.assertLogs("mbed_devices.device_watcher", level="ERROR"):
+            watcher.refresh()
+
+        self.assertEqual(len(attached), 2)
+        self.assertEqual(watcher.devices, attached)
+
+    def test_collects_events_before_the_first_scan(self, detect_candidate_devices, resolve_board):
+        event_source = ScriptedEventSource([], on_event=None)
+        opened_at_scan = []
+        detect_candidate_devices.side_effect = lambda: opened_at_scan.append(event_source.opened) or []
+
+        self.make_watcher(event_source).run()
+
+        self.assertEqual(opened_at_scan, [True])
+
+    def test_runs_in_background_until_stopped(self, detect_candidate_devices, resolve_board):
+        detect_candidate_devices.return_value = []
+        event_source = ScriptedEventSource([], on_event=None)
+
+        with self.make_watcher(event_source) as watcher:
+            self.assertIsNotNone(watcher._thread)
+
+        self.assertTrue(event_source.closed)
+        self.assertIsNone(watcher._thread)
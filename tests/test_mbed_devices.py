@@ -2,25 +2,58 @@
 # Copyright (C) 2020 Arm Mbed. All rights reserved.
 # SPDX-License-Identifier: Apache-2.0
 #
+import asyncio
+import contextlib
+import pathlib
+import threading
+from concurrent.futures import Future
 from unittest import TestCase, mock
 
 from mbed_targets import Board
 from mbed_targets.exceptions import MbedTargetsError
 
 from tests.factories import CandidateDeviceFactory
-from mbed_devices.device import Device
+from mbed_devices.device import ConnectedDevices, Device
 from mbed_devices._internal.exceptions import NoBoardForCandidate
 
-from mbed_devices.mbed_devices import get_connected_devices
-from mbed_devices.exceptions import DeviceLookupFailed
+from mbed_devices._internal.board_cache import CachedBoard
+from mbed_devices.mbed_devices import (
+    _make_resolution_executor,
+    find_device,
+    find_devices,
+    get_connected_devices,
+    get_connected_devices_async,
+    iter_connected_devices,
+    iter_connected_devices_async,
+)
+from mbed_devices.exceptions import DeviceLookupFailed, DeviceNotFound
 
 
-@mock.patch("mbed_devices.mbed_devices.detect_candidate_devices")
+@contextlib.contextmanager
+def joined_resolutions(release):
+    """Sets the release event on exit, then waits for all the resolutions started, including abandoned ones."""
+    executors = []
+
+    def make_resolution_executor(timeout):
+        executors.append(_make_resolution_executor(timeout))
+        return executors[-1]
+
+    with mock.patch("mbed_devices.mbed_devices._make_resolution_executor", make_resolution_executor):
+        try:
+            yield
+        finally:
+            release.set()
+            for executor in executors:
+                assert executor.join(timeout=5)
+
+
+@mock.patch("mbed_devices.mbed_devices.get_board_cache", mock.Mock(return_value=None))
+@mock.patch("mbed_devices.mbed_devices.iter_candidate_devices")
 @mock.patch("mbed_devices.mbed_devices.resolve_board")
 class TestGetConnectedDevices(TestCase):
-    def test_builds_devices_from_candidates(self, resolve_board, detect_candidate_devices):
+    def test_builds_devices_from_candidates(self, resolve_board, iter_candidate_devices):
         candidate = CandidateDeviceFactory()
-        detect_candidate_devices.return_value = [candidate]
+        iter_candidate_devices.return_value = [candidate]
 
         connected_devices = get_connected_devices()
         self.assertEqual(
@@ -38,10 +71,10 @@ class TestGetConnectedDevices(TestCase):
         resolve_board.assert_called_once_with(candidate)
 
     @mock.patch.object(Board, "from_offline_board_entry")
-    def test_skips_candidates_without_a_board(self, board, resolve_board, detect_candidate_devices):
+    def test_skips_candidates_without_a_board(self, board, resolve_board, iter_candidate_devices):
         candidate = CandidateDeviceFactory()
         resolve_board.side_effect = NoBoardForCandidate
-        detect_candidate_devices.return_value = [candidate]
+        iter_candidate_devices.return_value = [candidate]
         board.return_value = None
 
         connected_devices = get_connected_devices()
@@ -58,9 +91,320 @@ class TestGetConnectedDevices(TestCase):
             ],
         )
 
-    def test_raises_device_lookup_failed_on_internal_error(self, resolve_board, detect_candidate_devices):
+    def test_raises_device_lookup_failed_on_internal_error(self, resolve_board, iter_candidate_devices):
+        resolve_board.side_effect = MbedTargetsError
+        iter_candidate_devices.return_value = [CandidateDeviceFactory()]
+
+        with self.assertRaises(DeviceLookupFailed):
+            get_connected_devices()
+
+    @mock.patch.dict("os.environ", {"MBED_DEVICES_BOARD_RESOLUTION_TIMEOUT": "0.1"})
+    def test_reports_devices_which_time_out_as_unidentified(self, resolve_board, iter_candidate_devices):
+        hung_candidate = CandidateDeviceFactory()
+        candidate = CandidateDeviceFactory()
+        iter_candidate_devices.return_value = [hung_candidate, candidate]
+        hang = threading.Event()
+
+        def resolve(candidate_device):
+            if candidate_device == hung_candidate:
+                hang.wait()
+            return mock.sentinel.board
+
+        resolve_board.side_effect = resolve
+
+        with joined_resolutions(hang), self.assertLogs("mbed_devices.mbed_devices", level="WARNING"):
+            connected_devices = get_connected_devices()
+
+        self.assertEqual(
+            [device.serial_number for device in connected_devices.identified_devices], [candidate.serial_number]
+        )
+        self.assertEqual(
+            [device.serial_number for device in connected_devices.unidentified_devices], [hung_candidate.serial_number]
+        )
+
+    def test_keeps_the_order_of_candidates(self, resolve_board, iter_candidate_devices):
+        candidates = CandidateDeviceFactory.create_batch(20)
+        iter_candidate_devices.return_value = candidates
+        resolve_board.side_effect = lambda candidate_device: mock.Mock(spec_set=Board)
+
+        connected_devices = get_connected_devices()
+
+        self.assertEqual(
+            [device.serial_number for device in connected_devices.identified_devices],
+            [candidate.serial_number for candidate in candidates],
+        )
+
+
+@mock.patch("mbed_devices.mbed_devices.make_cache_key")
+@mock.patch("mbed_devices.mbed_devices.get_board_cache")
+@mock.patch("mbed_devices.mbed_devices.iter_candidate_devices")
+@mock.patch("mbed_devices.mbed_devices.resolve_board")
+class TestGetConnectedDevicesWithBoardCache(TestCase):
+    def test_uses_cached_board(self, resolve_board, iter_candidate_devices, get_board_cache, make_cache_key):
+        iter_candidate_devices.return_value = [CandidateDeviceFactory()]
+        board = mock.Mock(spec_set=Board)
+        get_board_cache.return_value.get.return_value = CachedBoard(board=board)
+
+        connected_devices = get_connected_devices()
+
+        self.assertEqual(connected_devices.identified_devices[0].mbed_board, board)
+        get_board_cache.return_value.get.assert_called_once_with(make_cache_key.return_value)
+        resolve_board.assert_not_called()
+
+    def test_uses_cached_unidentified_device(
+        self, resolve_board, iter_candidate_devices, get_board_cache, make_cache_key
+    ):
+        iter_candidate_devices.return_value = [CandidateDeviceFactory()]
+        get_board_cache.return_value.get.return_value = CachedBoard(board=None)
+
+        connected_devices = get_connected_devices()
+
+        self.assertEqual(len(connected_devices.unidentified_devices), 1)
+        resolve_board.assert_not_called()
+
+    def test_caches_resolved_board(self, resolve_board, iter_candidate_devices, get_board_cache, make_cache_key):
+        iter_candidate_devices.return_value = [CandidateDeviceFactory()]
+        get_board_cache.return_value.get.return_value = None
+
+        get_connected_devices()
+
+        get_board_cache.return_value.put.assert_called_once_with(
+            make_cache_key.return_value, resolve_board.return_value
+        )
+
+    def test_caches_unidentified_device(self, resolve_board, iter_candidate_devices, get_board_cache, make_cache_key):
+        iter_candidate_devices.return_value = [CandidateDeviceFactory()]
+        get_board_cache.return_value.get.return_value = None
+        resolve_board.side_effect = NoBoardForCandidate
+
+        get_connected_devices()
+
+        get_board_cache.return_value.put.assert_called_once_with(make_cache_key.return_value, None)
+
+    @mock.patch.dict("os.environ", {"MBED_DEVICES_BOARD_RESOLUTION_TIMEOUT": "0.1"})
+    def test_does_not_cache_abandoned_resolutions(
+        self, resolve_board, iter_candidate_devices, get_board_cache, make_cache_key
+    ):
+        iter_candidate_devices.return_value = [CandidateDeviceFactory()]
+        get_board_cache.return_value.get.return_value = None
+        hang = threading.Event()
+        resolve_board.side_effect = lambda candidate_device: hang.wait()
+
+        with joined_resolutions(hang), self.assertLogs("mbed_devices.mbed_devices", level="WARNING"):
+            connected_devices = get_connected_devices()
+
+        self.assertEqual(len(connected_devices.unidentified_devices), 1)
+        resolve_board.assert_called_once()
+        get_board_cache.return_value.put.assert_not_called()
+
+    def test_does_not_cache_lookup_failures(
+        self, resolve_board, iter_candidate_devices, get_board_cache, make_cache_key
+    ):
+        iter_candidate_devices.return_value = [CandidateDeviceFactory()]
+        get_board_cache.return_value.get.return_value = None
         resolve_board.side_effect = MbedTargetsError
-        detect_candidate_devices.return_value = [CandidateDeviceFactory()]
 
         with self.assertRaises(DeviceLookupFailed):
             get_connected_devices()
+
+        get_board_cache.return_value.put.assert_not_called()
+
+    @mock.patch("mbed_devices.mbed_devices.is_cache_read_enabled", mock.Mock(return_value=False))
+    def test_refreshes_cache(self, resolve_board, iter_candidate_devices, get_board_cache, make_cache_key):
+        iter_candidate_devices.return_value = [CandidateDeviceFactory()]
+
+        get_connected_devices()
+
+        get_board_cache.return_value.get.assert_not_called()
+        get_board_cache.return_value.put.assert_called_once_with(
+            make_cache_key.return_value, resolve_board.return_value
+        )
+
+
+class SynchronousExecutor:
+    def __init__(self, timeout):
+        pass
+
+    def submit(self, function, argument):
+        future = Future()
+        future.set_result(function(argument))
+        return future
+
+
+@mock.patch("mbed_devices.mbed_devices.get_board_cache", mock.Mock(return_value=None))
+@mock.patch("mbed_devices.mbed_devices.iter_candidate_devices")
+@mock.patch("mbed_devices.mbed_devices.resolve_board")
+class TestIterConnectedDevices(TestCase):
+    def test_yields_devices_in_detection_order(self, resolve_board, iter_candidate_devices):
+        candidates = CandidateDeviceFactory.create_batch(10)
+        iter_candidate_devices.return_value = iter(candidates)
+        resolve_board.side_effect = lambda candidate: None
+
+        devices = list(iter_connected_devices())
+
+        self.assertEqual(devices, [Device.from_candidate(candidate) for candidate in candidates])
+
+    def test_stops_detecting_devices_when_caller_stops_iterating(self, resolve_board, iter_candidate_devices):
+        candidates = CandidateDeviceFactory.create_batch(10)
+        detected_candidates = []
+        board = Board.from_offline_board_entry({"board_type": "K64F"})
+
+        def detect():
+            for candidate in candidates:
+                detected_candidates.append(candidate)
+                yield candidate
+
+        iter_candidate_devices.return_value = detect()
+        resolve_board.side_effect = lambda candidate: board if candidate == candidates[1] else None
+
+        with mock.patch("mbed_devices.mbed_devices._make_resolution_executor", SynchronousExecutor):
+            device = next(device for device in iter_connected_devices() if device.mbed_board.board_type == "K64F")
+
+        self.assertEqual(device, Device.from_candidate(candidates[1], board))
+        self.assertEqual(len(detected_candidates), 2)
+
+
+def make_board(board_type, product_code):
+    return Board.from_offline_board_entry({"board_type": board_type, "product_code": product_code})
+
+
+@mock.patch("mbed_devices.mbed_devices.get_board_cache", mock.Mock(return_value=None))
+@mock.patch("mbed_devices.mbed_devices.iter_candidate_devices")
+@mock.patch("mbed_devices.mbed_devices.resolve_board")
+class TestFindDevices(TestCase):
+    def test_pushes_serial_number_down_to_detector(self, resolve_board, iter_candidate_devices):
+        candidate = CandidateDeviceFactory()
+        iter_candidate_devices.return_value = iter([candidate, CandidateDeviceFactory()])
+        resolve_board.return_value = make_board("K64F", "0240")
+
+        devices = find_devices(serial_number=candidate.serial_number)
+
+        self.assertEqual(devices, [Device.from_candidate(candidate, resolve_board.return_value)])
+        iter_candidate_devices.assert_called_once_with(serial_number=candidate.serial_number)
+        resolve_board.assert_called_once_with(candidate)
+
+    def test_only_identifies_device_with_mount_point(self, resolve_board, iter_candidate_devices):
+        candidate = CandidateDeviceFactory(mount_points=[pathlib.Path("/media/user/DAPLINK")])
+        iter_candidate_devices.return_value = iter([CandidateDeviceFactory(), candidate, CandidateDeviceFactory()])
+
+        devices = find_devices(mount_point="/media/user/DAPLINK")
+
+        self.assertEqual(devices, [Device.from_candidate(candidate, resolve_board.return_value)])
+        resolve_board.assert_called_once_with(candidate)
+
+    def test_filters_by_board(self, resolve_board, iter_candidate_devices):
+        candidates = CandidateDeviceFactory.create_batch(4)
+        boards = [make_board("K64F", "0240"), make_board("NUCLEO_F401RE", "0720"), None, make_board("K64F", "0240")]
+        iter_candidate_devices.return_value = iter(candidates)
+        resolve_board.side_effect = lambda candidate: boards[candidates.index(candidate)]
+
+        self.assertEqual(
+            find_devices(board_type="k64f"),
+            [Device.from_candidate(candidates[0], boards[0]), Device.from_candidate(candidates[3], boards[3])],
+        )
+
+    def test_filters_by_product_code(self, resolve_board, iter_candidate_devices):
+        candidates = CandidateDeviceFactory.create_batch(2)
+        boards = [make_board("K64F", "0240"), make_board("NUCLEO_F401RE", "0720")]
+        iter_candidate_devices.return_value = iter(candidates)
+        resolve_board.side_effect = lambda candidate: boards[candidates.index(candidate)]
+
+        self.assertEqual(find_devices(product_code="0720"), [Device.from_candidate(candidates[1], boards[1])])
+
+
+@mock.patch("mbed_devices.mbed_devices.get_board_cache", mock.Mock(return_value=None))
+@mock.patch("mbed_devices.mbed_devices.iter_candidate_devices")
+@mock.patch("mbed_devices.mbed_devices.resolve_board")
+class TestFindDevice(TestCase):
+    def test_returns_first_matching_device(self, resolve_board, iter_candidate_devices):
+        candidates = CandidateDeviceFactory.create_batch(3)
+        iter_candidate_devices.return_value = iter(candidates)
+        resolve_board.return_value = make_board("K64F", "0240")
+
+        self.assertEqual(
+            find_device(board_type="K64F"), Device.from_candidate(candidates[0], resolve_board.return_value)
+        )
+
+    def test_raises_when_no_device_matches(self, resolve_board, iter_candidate_devices):
+        iter_candidate_devices.return_value = iter([])
+
+        with self.assertRaises(DeviceNotFound):
+            find_device(serial_number="1234")
+
+
+def run_coroutine(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def collect(async_iterator):
+    return [item async for item in async_iterator]
+
+
+@mock.patch("mbed_devices.mbed_devices.get_board_cache", mock.Mock(return_value=None))
+@mock.patch("mbed_devices.mbed_devices.iter_candidate_devices")
+@mock.patch("mbed_devices.mbed_devices.resolve_board")
+class TestGetConnectedDevicesAsync(TestCase):
+    def test_builds_devices_from_candidates(self, resolve_board, iter_candidate_devices):
+        identified_candidate = CandidateDeviceFactory()
+        unidentified_candidate = CandidateDeviceFactory()
+        iter_candidate_devices.return_value = [identified_candidate, unidentified_candidate]
+        resolve_board.side_effect = lambda candidate: mock.sentinel.board if candidate == identified_candidate else None
+
+        connected_devices = run_coroutine(get_connected_devices_async())
+
+        self.assertEqual(
+            connected_devices.identified_devices, [Device.from_candidate(identified_candidate, mock.sentinel.board)]
+        )
+        self.assertEqual(connected_devices.unidentified_devices, [Device.from_candidate(unidentified_candidate)])
+
+    def test_handles_no_devices(self, resolve_board, iter_candidate_devices):
+        iter_candidate_devices.return_value = []
+
+        self.assertEqual(run_coroutine(get_connected_devices_async()), ConnectedDevices())
+
+    def test_raises_device_lookup_failed_on_internal_error(self, resolve_board, iter_candidate_devices):
+        resolve_board.side_effect = MbedTargetsError
+        iter_candidate_devices.return_value = [CandidateDeviceFactory()]
+
+        with self.assertRaises(DeviceLookupFailed):
+            run_coroutine(get_connected_devices_async())
+
+
+@mock.patch("mbed_devices.mbed_devices.get_board_cache", mock.Mock(return_value=None))
+@mock.patch("mbed_devices.mbed_devices.iter_candidate_devices")
+@mock.patch("mbed_devices.mbed_devices.resolve_board")
+class TestIterConnectedDevicesAsync(TestCase):
+    def test_yields_devices_as_soon_as_they_are_identified(self, resolve_board, iter_candidate_devices):
+        slow_candidate = CandidateDeviceFactory()
+        fast_candidate = CandidateDeviceFactory()
+        iter_candidate_devices.return_value = [slow_candidate, fast_candidate]
+        fast_device_yielded = threading.Event()
+
+        def resolve(candidate):
+            if candidate == slow_candidate:
+                # Only completes once the other device was yielded, which would deadlock if devices were yielded in
+                # order.
+                self.assertTrue(fast_device_yielded.wait(timeout=5))
+            return None
+
+        resolve_board.side_effect = resolve
+
+        async def iterate():
+            serial_numbers = []
+            async for device in iter_connected_devices_async():
+                serial_numbers.append(device.serial_number)
+                fast_device_yielded.set()
+            return serial_numbers
+
+        self.assertEqual(
+            run_coroutine(iterate()), [fast_candidate.serial_number, slow_candidate.serial_number],
+        )
+
+    def test_handles_no_devices(self, resolve_board, iter_candidate_devices):
+        iter_candidate_devices.return_value = []
+
+        self.assertEqual(run_coroutine(collect(iter_connected_devices_async())), [])
@@ -15,5 +15,9 @@ class TestCli(TestCase):
 
 
 class TestEnvVariables(TestCase):
-    def test_aliases_list_of_env_variables_from_mbed_targets(self):
-        self.assertEqual(env_variables, mbed_targets_env_variables)
+    def test_includes_env_variables_from_mbed_targets(self):
+        for variable in mbed_targets_env_variables:
+            self.assertIn(variable.name, [v.name for v in env_variables])
+
+    def test_includes_env_variables_from_mbed_devices(self):
+        self.assertIn("MBED_DEVICES_LINUX_BACKEND", [v.name for v in env_variables])